@@ -1,5 +1,5 @@
 from fastapi import FastAPI, Request, HTTPException, Query, WebSocket
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import os
@@ -44,12 +44,45 @@ from backend.ws import ble_socket, uwb_socket, biometric_socket, card_socket, mq
 # Add import for the route mapper (to be created) - Keeping this for now
 from backend.modules.ble.api.route_mapper import frontend_api_router
 
+from backend.core.metrics import metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from backend.core.metrics_collectors import install_default_collectors
+from backend.core.request_metrics import RequestMetricsMiddleware
+from backend.core.loop_monitor import get_loop_monitor
+from backend.modules.ble.utils.ble_persistence import get_persistence_service
+from backend.modules.ble.utils.events import ble_event_bus
+from backend.caching.discovery import install_hotplug_invalidation
+
 logger = setup_logging()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    routes = [
+        f"{route.path} [{' '.join(route.methods)}]"
+        for route in app.routes
+        if not isinstance(route, Mount) and hasattr(route, "methods")
+    ]
+    routes.sort()
+    logger.info("Available routes:")
+    for route in routes:
+        logger.info(f"  {route}")
+    logger.info("Application startup complete")
+    await get_loop_monitor().start()
+    await monitoring_manager.start_all()
+    yield
+    # Shutdown
+    await get_loop_monitor().stop()
+    logger.info("Shutting down monitoring system")
+    await monitoring_manager.stop_all()
+    await get_persistence_service().flush()
+    uwb_socket.uwb_repository.flush_history()
+    logger.info("Application shutdown complete")
+
 app = FastAPI(
     title="ANITA Backend",
     description="Advanced NFC/IoT Technology Application",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -61,6 +94,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Metrics exposed at /metrics and /api/system/perf/routes
+install_default_collectors()
+app.add_middleware(
+    RequestMetricsMiddleware,
+    slow_threshold=float(os.environ.get('SLOW_REQUEST_THRESHOLD', '1.0'))
+)
+
+# Drop cached hardware discovery results when adapters or readers change
+install_hotplug_invalidation(ble_event_bus)
+
+# Poll monitors when their sources change instead of waiting for the next tick
+monitoring_manager.notify_on(ble_event_bus, ("device_*", "adapter_*"), "ble_device_monitor")
+monitoring_manager.notify_on(ble_event_bus, ("device_*",), "device_monitor")
+monitoring_manager.notify_on(ble_event_bus, ("reader_*", "hardware_changed"), "hardware_monitor")
+
 # Include the WebSocket factory router for all WebSocket endpoints
 app.include_router(websocket_factory.router)
 
@@ -94,28 +142,6 @@ async def ble_websocket_main(websocket: WebSocket):
     from backend.modules.ble.comms.websocket import websocket_endpoint
     await websocket_endpoint(websocket)
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
-    routes = [
-        f"{route.path} [{' '.join(route.methods)}]"
-        for route in app.routes
-        if not isinstance(route, Mount) and hasattr(route, "methods")
-    ]
-    routes.sort()
-    logger.info("Available routes:")
-    for route in routes:
-        logger.info(f"  {route}")
-    logger.info("Application startup complete")
-    await monitoring_manager.start_all()
-    yield
-    # Shutdown
-    logger.info("Shutting down monitoring system")
-    await monitoring_manager.stop_all()
-    logger.info("Application shutdown complete")
-
-app.lifespan = lifespan
-
 @app.get("/health", tags=["System"])
 async def health_check():
     """Check the health of the application."""
@@ -167,6 +193,13 @@ try:
 except AttributeError:
     logger.error("Main API router not found - check backend/routes/api/__init__.py")
 
+# Include system routes (host info and /api/system/perf/*)
+try:
+    app.include_router(system_routes.router, prefix="/api")
+    logger.info("System routes registered successfully")
+except Exception as e:
+    logger.error(f"Failed to register system routes: {e}")
+
 # Include frontend API router if available
 if has_frontend_api:
     try:
@@ -423,6 +456,11 @@ async def nfc_write_text_modal(request: Request):
 async def nfc_write_url_modal(request: Request):
     return templates.TemplateResponse("modals/nfc_write_url.html", {"request": request})
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of all registered metrics."""
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Catch-all route for undefined paths to prevent 404 errors
 @app.get("/{path:path}", response_class=HTMLResponse)
 async def catch_all(request: Request, path: str):
@@ -0,0 +1,106 @@
+# ws_broadcast_benchmark.py
+"""
+Benchmark WebSocket broadcast cost against client count.
+
+Compares the previous per-client ``send_json`` loop (one JSON encode and one
+awaited send per recipient, in sequence) with ``WebSocketManager``'s
+serialize-once concurrent fan-out, using in-memory fake sockets so only the
+server-side cost is measured.
+
+Usage:
+    python automation_scripts/diagnostics/ws_broadcast_benchmark.py [--iterations 200] [--latency-ms 0]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.ws.manager import WebSocketManager, WebSocketClient  # noqa: E402
+from backend.ws.serialization import ORJSON_AVAILABLE  # noqa: E402
+
+CLIENT_COUNTS = [1, 10, 50, 100, 250, 500]
+
+
+class FakeWebSocket:
+    """In-memory WebSocket that optionally simulates network latency."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.bytes_sent = 0
+
+    async def send_json(self, message):
+        await self.send_text(json.dumps(message, default=str))
+
+    async def send_text(self, text: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.bytes_sent += len(text)
+
+
+def make_event(device_count: int = 50) -> dict:
+    """Build a position update event similar to what the UWB monitor sends."""
+    return {
+        "type": "uwb.position_update",
+        "payload": {
+            "positions": {
+                f"tag-{i}": {"x": i * 0.1, "y": i * 0.2, "z": 1.0, "timestamp": time.time()}
+                for i in range(device_count)
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+    }
+
+
+async def legacy_broadcast(manager: WebSocketManager, message: dict) -> int:
+    """The previous implementation: encode and await each client in turn."""
+    sent = 0
+    for websocket in list(manager.active_clients.keys()):
+        await websocket.send_json(message)
+        sent += 1
+    return sent
+
+
+async def run(iterations: int, latency: float) -> None:
+    event = make_event()
+    print(f"orjson available: {ORJSON_AVAILABLE}, iterations: {iterations}, "
+          f"simulated latency: {latency * 1000:.1f} ms")
+    print(f"{'clients':>8} {'legacy ms/bcast':>16} {'fan-out ms/bcast':>17} {'speedup':>8}")
+
+    for count in CLIENT_COUNTS:
+        manager = WebSocketManager()
+        for _ in range(count):
+            websocket = FakeWebSocket(latency)
+            manager.active_clients[websocket] = WebSocketClient(websocket)
+
+        # Fewer iterations for the slow path when latency is simulated
+        legacy_iterations = iterations if not latency else max(1, iterations // 20)
+
+        start = time.perf_counter()
+        for _ in range(legacy_iterations):
+            await legacy_broadcast(manager, event)
+        legacy = (time.perf_counter() - start) / legacy_iterations * 1000
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await manager.broadcast_message(event)
+        fan_out = (time.perf_counter() - start) / iterations * 1000
+
+        print(f"{count:>8} {legacy:>16.3f} {fan_out:>17.3f} {legacy / fan_out:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket broadcast benchmark")
+    parser.add_argument("--iterations", type=int, default=200, help="Broadcasts per client count")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated per-send latency")
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+"""
+In-process cache library.
+
+``Cache`` is a bounded key/value store with:
+
+- O(1) eviction: LRU through an ordered dict, or LFU through per-frequency
+  ordered buckets (ties go to the least recently used key)
+- Limits on entry count and on total size in bytes
+- TTL expiry through a hashed timer wheel, so expired entries are removed
+  in O(1) amortized time per entry instead of scanning the cache
+- ``cached`` decorator for sync and async functions; concurrent async calls
+  for the same key share one call (single-flight)
+
+Caches are created by name with ``get_cache`` and report their statistics
+through ``get_all_cache_stats``, which backs ``/api/cache/stats``.
+"""
+
+import asyncio
+import functools
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+LRU = "lru"
+LFU = "lfu"
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate size of a value in bytes (payload length for bytes and strings)."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", "surrogatepass"))
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "slot", "frequency")
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float]):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.slot: Optional[int] = None
+        self.frequency = 1
+
+
+class _LruOrder:
+    """Keys in recency order; the victim is the least recently used."""
+
+    def __init__(self):
+        self._order: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def add(self, key: Hashable, entry: _Entry) -> None:
+        self._order[key] = None
+
+    def touch(self, key: Hashable, entry: _Entry) -> None:
+        self._order.move_to_end(key)
+
+    def remove(self, key: Hashable, entry: _Entry) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> Hashable:
+        return next(iter(self._order))
+
+    def clear(self) -> None:
+        self._order.clear()
+
+
+class _LfuOrder:
+    """Keys bucketed by access count; the victim is the oldest key of the lowest count."""
+
+    def __init__(self):
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}
+        self._min_frequency = 0
+
+    def add(self, key: Hashable, entry: _Entry) -> None:
+        entry.frequency = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_frequency = 1
+
+    def touch(self, key: Hashable, entry: _Entry) -> None:
+        frequency = entry.frequency
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+        entry.frequency = frequency + 1
+        self._buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def remove(self, key: Hashable, entry: _Entry) -> None:
+        bucket = self._buckets.get(entry.frequency)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[entry.frequency]
+                if self._min_frequency == entry.frequency and self._buckets:
+                    self._min_frequency = min(self._buckets)
+
+    def victim(self) -> Hashable:
+        return next(iter(self._buckets[self._min_frequency]))
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._min_frequency = 0
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel for expiry times.
+
+    Keys are placed in the slot of their expiry tick. Advancing the wheel
+    visits only the slots whose tick has passed; a key scheduled more than
+    one revolution ahead stays in its slot until a later pass.
+
+    Args:
+        tick: Slot width in seconds (expiry granularity)
+        slots: Number of slots
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self.slots: List[Set[Hashable]] = [set() for _ in range(slots)]
+        self._current = int(time.monotonic() // tick)
+
+    def schedule(self, key: Hashable, expires_at: float) -> int:
+        # A key due in an already visited tick goes in the next one
+        index = max(int(expires_at // self.tick), self._current + 1) % len(self.slots)
+        self.slots[index].add(key)
+        return index
+
+    def cancel(self, key: Hashable, slot: int) -> None:
+        self.slots[slot].discard(key)
+
+    def due(self, now: float) -> List[Hashable]:
+        """Keys in the slots passed since the last call (candidates for expiry)."""
+        target = int(now // self.tick)
+        if target <= self._current:
+            return []
+        ticks = min(target - self._current, len(self.slots))
+        keys: List[Hashable] = []
+        for tick in range(target - ticks + 1, target + 1):
+            slot = self.slots[tick % len(self.slots)]
+            if slot:
+                keys.extend(slot)
+        self._current = target
+        return keys
+
+    def clear(self) -> None:
+        for slot in self.slots:
+            slot.clear()
+
+
+class Cache:
+    """
+    Bounded cache with LRU or LFU eviction, TTL expiry and byte limits.
+
+    Args:
+        name: Namespace name used in stats
+        max_entries: Maximum number of entries (None for no limit)
+        max_bytes: Maximum total size of values in bytes (None for no limit)
+        ttl: Default time to live in seconds (None for no expiry)
+        policy: ``lru`` or ``lfu``
+        sizeof: Function giving a value's size in bytes
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        max_entries: Optional[int] = 1024,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        policy: str = LRU,
+        sizeof: Callable[[Any], int] = estimate_size
+    ):
+        if policy not in (LRU, LFU):
+            raise ValueError(f"Unknown cache policy '{policy}'")
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.policy = policy
+        self.sizeof = sizeof
+
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._order = _LruOrder() if policy == LRU else _LfuOrder()
+        self._wheel = TimerWheel()
+        self._lock = threading.RLock()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and (entry.expires_at is None or entry.expires_at > time.monotonic())
+
+    def get(self, key: Hashable, default: Any = None, count: bool = True) -> Any:
+        """
+        Get a value.
+
+        Args:
+            key: Cache key
+            default: Returned when the key is missing or expired
+            count: Count the lookup as a hit or miss
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire_due(now)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= now:
+                self._remove(key, entry)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return default
+            self._order.touch(key, entry)
+            if count:
+                self.hits += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time to live in seconds (defaults to the cache's ttl)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        size = self.sizeof(value)
+        with self._lock:
+            now = time.monotonic()
+            self._expire_due(now)
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._remove(key, existing)
+            if self.max_bytes is not None and size > self.max_bytes:
+                logger.debug(f"Cache {self.name}: value for {key!r} larger than max_bytes, not cached")
+                return
+
+            # Make room first, so a new entry is never its own victim (LFU)
+            self._make_room(size)
+            entry = _Entry(value, size, now + ttl if ttl is not None else None)
+            self._entries[key] = entry
+            self._order.add(key, entry)
+            self.bytes += size
+            if entry.expires_at is not None:
+                entry.slot = self._wheel.schedule(key, entry.expires_at)
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key; returns True if it was present."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            self._remove(key, entry)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._order.clear()
+            self._wheel.clear()
+            self.bytes = 0
+
+    def keys(self) -> List[Hashable]:
+        """Keys of entries that have not expired."""
+        with self._lock:
+            self._expire_due(time.monotonic())
+            return list(self._entries)
+
+    def _remove(self, key: Hashable, entry: _Entry) -> None:
+        del self._entries[key]
+        self._order.remove(key, entry)
+        self.bytes -= entry.size
+        if entry.slot is not None:
+            self._wheel.cancel(key, entry.slot)
+
+    def _make_room(self, size: int) -> None:
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) >= self.max_entries)
+            or (self.max_bytes is not None and self.bytes + size > self.max_bytes)
+        ):
+            key = self._order.victim()
+            self._remove(key, self._entries[key])
+            self.evictions += 1
+
+    def _expire_due(self, now: float) -> None:
+        for key in self._wheel.due(now):
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= now:
+                self._remove(key, entry)
+                self.expirations += 1
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                          ttl: Optional[float] = None,
+                          should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Get a value, loading it on a miss.
+
+        Concurrent misses for the same key wait for the first caller's load
+        instead of starting their own (single-flight). The load runs in its
+        own task, so cancelling any caller (including the first) leaves the
+        others waiting. A failed load is not cached; every waiter receives
+        the exception.
+
+        Args:
+            key: Cache key
+            loader: Coroutine function producing the value
+            ttl: Time to live for the loaded value
+            should_cache: Predicate on the loaded value; values it rejects (e.g.
+                error responses) are still shared with waiters but not stored
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        task = asyncio.ensure_future(self._load(key, loader, ttl, should_cache))
+        # Waiters re-raise a failure; don't log it as unretrieved if all were cancelled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                    ttl: Optional[float], should_cache: Optional[Callable[[Any], bool]]) -> Any:
+        try:
+            value = await loader()
+        finally:
+            self._inflight.pop(key, None)
+        if should_cache is None or should_cache(value):
+            self.set(key, value, ttl)
+        return value
+
+    def cached(self, ttl: Optional[float] = None, key_func: Optional[Callable[..., Hashable]] = None):
+        """
+        Decorator caching a function's results.
+
+        Works on sync and async functions; async calls are single-flight.
+
+        Args:
+            ttl: Time to live in seconds (defaults to the cache's ttl)
+            key_func: Builds the key from the call arguments (defaults to name and arguments)
+        """
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            def make_key(args, kwargs) -> Hashable:
+                if key_func:
+                    return key_func(*args, **kwargs)
+                return (func.__qualname__, args, tuple(sorted(kwargs.items())))
+
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    return await self.get_or_load(make_key(args, kwargs), lambda: func(*args, **kwargs), ttl)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                key = make_key(args, kwargs)
+                result = self.get(key, _MISSING)
+                if result is _MISSING:
+                    result = func(*args, **kwargs)
+                    self.set(key, result, ttl)
+                return result
+            return wrapper
+
+        return decorator
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "policy": self.policy,
+                "size": len(self._entries),
+                "max_size": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "coalesced": self.coalesced
+            }
+
+
+# Named cache namespaces
+_caches: Dict[str, Cache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, **options: Any) -> Cache:
+    """
+    Get a named cache, creating it with ``options`` on first use.
+
+    Args:
+        name: Namespace name
+        **options: ``Cache`` arguments, used only when the cache is created
+    """
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                cache = _caches[name] = Cache(name, **options)
+                logger.debug(f"Cache namespace '{name}' created")
+    return cache
+
+
+def get_caches() -> Dict[str, Cache]:
+    """All named caches."""
+    return dict(_caches)
+
+
+def get_all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every named cache, keyed by name."""
+    return {name: cache.get_stats() for name, cache in list(_caches.items())}
@@ -1,25 +1,25 @@
-import functools
-import time
 import logging
 from typing import Callable, Any, Dict, Optional
 
+from backend.caching.cache import Cache, get_cache
+
 logger = logging.getLogger(__name__)
 
 
 class CacheManager:
     """
-    A simple cache manager that uses a dictionary to store cached results.
+    A simple cache manager on top of the shared cache library.
     Supports:
         - Time-based expiration
-        - Function result caching using a decorator
+        - Function result caching using a decorator (sync and async functions)
     Enhancements:
         - Added support for custom key generation functions.
-        - Added a max_size parameter to limit the cache size and implement a basic eviction policy (LRU).
-        - Added a lock to ensure thread safety.
-        - Improved logging for debugging purposes.
+        - Added a max_size parameter to limit the cache size, with O(1) LRU eviction.
+        - Thread safe; expired items are removed by the cache's timer wheel.
+        - Named caches report their stats through /api/cache/stats.
     """
 
-    def __init__(self, default_expiration: int = 60, max_size: int = 128):
+    def __init__(self, default_expiration: int = 60, max_size: int = 128, name: Optional[str] = None):
         """
         Initializes the CacheManager.
 
@@ -27,13 +27,23 @@ class CacheManager:
             default_expiration: The default expiration time in seconds for cached items.
             max_size: The maximum number of items to store in the cache.  When the cache is full,
                       the least recently used item is evicted.
+            name: Cache namespace name. Named caches are shared and listed in the cache stats;
+                  unnamed ones are private to this manager.
         """
-        self.cache: Dict[Any, Any] = {}  # key: (value, expiration_time, last_used)
         self.default_expiration = default_expiration
         self.max_size = max_size
-        self._lock = functools.lru_cache(maxsize=1)(lambda: __import__('threading').Lock()) # Lazy load threading only if needed
-        self.hits = 0
-        self.misses = 0
+        if name:
+            self._cache = get_cache(name, max_entries=max_size)
+        else:
+            self._cache = Cache("cache_manager", max_entries=max_size)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
 
     def get(self, key: Any) -> Any:
         """
@@ -45,25 +55,7 @@ class CacheManager:
         Returns:
             The value if found and not expired, otherwise None.
         """
-        with self._lock():
-            if key in self.cache:
-                value, expiration_time, last_used = self.cache[key]
-                if expiration_time is None or expiration_time > time.time():
-                    # Update last used time
-                    self.cache[key] = (value, expiration_time, time.time())
-                    self.hits += 1
-                    logger.debug(f"Cache hit for key: {key}")
-                    return value
-                else:
-                    # Remove expired item
-                    del self.cache[key]
-                    self.misses += 1
-                    logger.debug(f"Cache expired for key: {key}")
-                    return None
-            else:
-                self.misses += 1
-                logger.debug(f"Cache miss for key: {key}")
-                return None
+        return self._cache.get(key)
 
     def set(self, key: Any, value: Any, expiration: Optional[int] = None) -> None:
         """
@@ -72,19 +64,11 @@ class CacheManager:
         Args:
             key: The key of the item to add.
             value: The value of the item to add.
-            expiration: The expiration time in seconds. If None, uses the default expiration.
+            expiration: The expiration time in seconds. If None, the item does not expire.
         """
-        with self._lock():
-            if expiration is None:
-                expiration_time = None
-            else:
-                expiration_time = time.time() + expiration
-
-            self.cache[key] = (value, expiration_time, time.time())
-            logger.debug(f"Cache set for key: {key} with expiration: {expiration}")
-
-            # Enforce max size
-            self._enforce_max_size()
+        # The cache's own ttl is None, so None keeps the item until evicted
+        self._cache.set(key, value, expiration)
+        logger.debug(f"Cache set for key: {key} with expiration: {expiration}")
 
     def delete(self, key: Any) -> None:
         """
@@ -93,74 +77,33 @@ class CacheManager:
         Args:
             key: The key of the item to remove.
         """
-        with self._lock():
-            if key in self.cache:
-                del self.cache[key]
-                logger.debug(f"Cache delete for key: {key}")
+        if self._cache.delete(key):
+            logger.debug(f"Cache delete for key: {key}")
 
     def clear(self) -> None:
         """
         Clears the entire cache.
         """
-        with self._lock():
-            self.cache.clear()
-            logger.debug("Cache cleared")
-
-    def _enforce_max_size(self):
-        """
-        Enforces the maximum size of the cache by evicting the least recently used item.
-        """
-        if len(self.cache) > self.max_size:
-            # Find the least recently used item
-            lru_key = None
-            lru_time = time.time() + 1  # Initialize to future time to ensure first item is always smaller
-            for key, (value, expiration_time, last_used) in self.cache.items():
-                if last_used < lru_time:
-                    lru_time = last_used
-                    lru_key = key
-
-            # Evict the LRU item
-            if lru_key:
-                del self.cache[lru_key]
-                logger.debug(f"Cache eviction for key: {lru_key} due to max size limit")
+        self._cache.clear()
+        logger.debug("Cache cleared")
 
     def cache_result(self, expiration: Optional[int] = None, key_func: Optional[Callable[..., Any]] = None):
         """
         A decorator to cache the result of a function.
 
+        Async functions are supported; concurrent calls with the same key share one call.
+
         Args:
             expiration: The expiration time in seconds. If None, uses the default expiration.
             key_func: A function that takes the same arguments as the decorated function and returns a cache key.
-                      If None, the arguments themselves are used as the key.
+                      If None, the function name and arguments are used as the key.
         """
-
-        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
-            @functools.wraps(func)
-            def wrapper(*args: Any, **kwargs: Any) -> Any:
-                # Generate the cache key
-                if key_func:
-                    key = key_func(*args, **kwargs)
-                else:
-                    key = (func.__name__, args, tuple(sorted(kwargs.items())))  # Include function name and sort kwargs for consistent key
-
-                # Try to retrieve the result from the cache
-                result = self.get(key)
-                if result is not None:
-                    return result
-
-                # If not in cache, call the function and cache the result
-                result = func(*args, **kwargs)
-                self.set(key, result, expiration)
-                return result
-
-            return wrapper
-
-        return decorator
+        ttl = self.default_expiration if expiration is None else expiration
+        return self._cache.cached(ttl=ttl, key_func=key_func)
 
     def get_cache_stats(self) -> Dict[str, int]:
         """
         Returns cache statistics.
         """
-        with self._lock():
-            size = len(self.cache)
-            return {"size": size, "hits": self.hits, "misses": self.misses, "max_size": self.max_size}
\ No newline at end of file
+        stats = self._cache.get_stats()
+        return {"size": stats["size"], "hits": stats["hits"], "misses": stats["misses"], "max_size": self.max_size}
@@ -0,0 +1,131 @@
+"""
+Single-flight, short-TTL cache for hardware discovery.
+
+Adapter, reader and health discovery shell out to system tools or call
+drivers, and take seconds. When many clients ask at once (one dashboard tab
+each), ``discover`` runs one discovery per kind and key; every concurrent
+caller awaits that same call, and callers within the TTL get its result.
+
+Results that describe a failure (``should_cache`` returns False) are shared
+with the callers already waiting but not kept, so the next request retries.
+Hardware changes drop cached results through ``invalidate``, either directly
+or via event bus events (``install_hotplug_invalidation``).
+
+TTLs default to ``DEFAULT_TTLS`` and can be overridden per kind with
+``DISCOVERY_TTL_<KIND>`` environment variables (seconds, 0 disables caching).
+"""
+
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+from backend.caching.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+BLE_ADAPTERS = "ble_adapters"
+BLE_ADAPTER_STATUS = "ble_adapter_status"
+CARD_READERS = "card_readers"
+NFC_DEVICE = "nfc_device"
+BLUETOOTH_HEALTH = "bluetooth_health"
+
+DEFAULT_TTLS: Dict[str, float] = {
+    BLE_ADAPTERS: 5.0,
+    BLE_ADAPTER_STATUS: 2.0,
+    CARD_READERS: 5.0,
+    NFC_DEVICE: 5.0,
+    BLUETOOTH_HEALTH: 10.0,
+}
+
+# Event bus events that mean the hardware changed, and the kinds they make stale
+HOTPLUG_EVENTS: Dict[str, Iterable[str]] = {
+    "adapter_resetting": (BLE_ADAPTERS, BLE_ADAPTER_STATUS, BLUETOOTH_HEALTH),
+    "adapter_reset": (BLE_ADAPTERS, BLE_ADAPTER_STATUS, BLUETOOTH_HEALTH),
+    "adapter_selected": (BLE_ADAPTER_STATUS, BLUETOOTH_HEALTH),
+    "adapter_added": (BLE_ADAPTERS, BLE_ADAPTER_STATUS, BLUETOOTH_HEALTH),
+    "adapter_removed": (BLE_ADAPTERS, BLE_ADAPTER_STATUS, BLUETOOTH_HEALTH),
+    "reader_added": (CARD_READERS, NFC_DEVICE),
+    "reader_removed": (CARD_READERS, NFC_DEVICE),
+    "hardware_changed": tuple(DEFAULT_TTLS),
+}
+
+_cache = get_cache("discovery", max_entries=256)
+
+
+def get_discovery_ttl(kind: str) -> float:
+    """TTL in seconds for a discovery kind (environment override first)."""
+    value = os.environ.get(f"DISCOVERY_TTL_{kind.upper()}")
+    if value is not None:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            logger.warning(f"Ignoring invalid DISCOVERY_TTL_{kind.upper()}={value!r}")
+    return DEFAULT_TTLS.get(kind, 5.0)
+
+
+async def discover(
+    kind: str,
+    loader: Callable[[], Awaitable[Any]],
+    key: Hashable = None,
+    force_refresh: bool = False,
+    should_cache: Optional[Callable[[Any], bool]] = None
+) -> Any:
+    """
+    Run a discovery, sharing in-flight calls and recent results.
+
+    Args:
+        kind: Discovery kind (selects the TTL)
+        loader: Coroutine function performing the discovery
+        key: Distinguishes discoveries of one kind (e.g. adapter address)
+        force_refresh: Drop the cached result first; a discovery already in
+            flight is still joined, since it started after the cached one
+        should_cache: Predicate deciding whether a result may be cached
+
+    Returns:
+        The discovery result
+    """
+    cache_key = (kind, key)
+    if force_refresh:
+        _cache.delete(cache_key)
+    ttl = get_discovery_ttl(kind)
+    if ttl <= 0:
+        return await loader()
+    return await _cache.get_or_load(cache_key, loader, ttl, should_cache)
+
+
+def invalidate(*kinds: str) -> int:
+    """
+    Drop cached discovery results.
+
+    Args:
+        *kinds: Kinds to drop (all kinds if none given)
+
+    Returns:
+        Number of results dropped
+    """
+    dropped = 0
+    for cache_key in _cache.keys():
+        if not kinds or cache_key[0] in kinds:
+            dropped += _cache.delete(cache_key)
+    if dropped:
+        logger.debug(f"Invalidated {dropped} discovery results ({', '.join(kinds) or 'all'})")
+    return dropped
+
+
+def install_hotplug_invalidation(bus: Any, events: Optional[Dict[str, Iterable[str]]] = None) -> None:
+    """
+    Invalidate discovery results when hardware change events are emitted.
+
+    Args:
+        bus: Event bus with ``on(event_type, handler, with_event_type=...)``
+        events: Event type to kinds mapping (defaults to ``HOTPLUG_EVENTS``)
+    """
+    events = HOTPLUG_EVENTS if events is None else events
+
+    def on_hotplug(event_type: str, data: Any) -> None:
+        invalidate(*events.get(event_type, ()))
+
+    for event_type in events:
+        bus.on(event_type, on_hotplug, with_event_type=True)
+    logger.debug(f"Discovery cache invalidates on {len(events)} hotplug events")
+
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from backend.caching.cache import Cache, TimerWheel
+
+def test_lru_and_lfu_eviction():
+    lru = Cache("lru", max_entries=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert lru.keys() == ["a", "c"]
+
+    lfu = Cache("lfu", max_entries=2, policy="lfu")
+    lfu.set("a", 1)
+    lfu.set("b", 2)
+    lfu.get("a")
+    lfu.get("b")
+    lfu.get("b")
+    lfu.set("c", 3)
+    assert sorted(lfu.keys()) == ["b", "c"]
+    assert lfu.get_stats()["evictions"] == 1
+
+def test_byte_limit_evicts_least_recent():
+    cache = Cache("bytes", max_entries=None, max_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    cache.set("c", b"123")
+    assert "a" not in cache and cache.bytes == 8
+    cache.set("huge", b"x" * 11)
+    assert "huge" not in cache
+
+def test_timer_wheel_expires_without_lookups(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("backend.caching.cache.time.monotonic", lambda: now[0])
+    cache = Cache("ttl", ttl=5)
+    cache._wheel = TimerWheel(tick=1.0, slots=8)
+    cache.set("short", 1)
+    cache.set("long", 2, ttl=30)
+
+    now[0] += 6
+    cache.set("other", 3)  # Any operation advances the wheel
+    assert len(cache) == 2 and cache.expirations == 1
+    now[0] += 30
+    assert cache.get("long") is None
+    assert cache.get_stats()["expirations"] == 3
+
+@pytest.mark.asyncio
+async def test_async_decorator_is_single_flight():
+    cache = Cache("flight")
+    calls = []
+
+    @cache.cached(ttl=60)
+    async def load(device_id):
+        calls.append(device_id)
+        await asyncio.sleep(0.01)
+        return {"id": device_id}
+
+    results = await asyncio.gather(*(load("dev-1") for _ in range(10)))
+    assert calls == ["dev-1"] and all(r == {"id": "dev-1"} for r in results)
+    assert cache.coalesced == 9
+    await load("dev-1")
+    assert calls == ["dev-1"]
+
+@pytest.mark.asyncio
+async def test_failed_load_is_shared_but_not_cached():
+    cache = Cache("errors")
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("device busy")
+
+    results = await asyncio.gather(*(cache.get_or_load("k", failing) for _ in range(3)), return_exceptions=True)
+    assert len(attempts) == 1 and all(isinstance(r, RuntimeError) for r in results)
+    assert "k" not in cache
+
+@pytest.mark.asyncio
+async def test_cancelled_first_caller_does_not_cancel_waiters():
+    cache = Cache("cancel")
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    first = asyncio.create_task(cache.get_or_load("k", slow))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load("k", slow))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await waiter == "value"
+    assert first.cancelled()
+    assert calls == [1] and cache.get("k") == "value"
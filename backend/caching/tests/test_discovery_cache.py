@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from backend.caching import discovery
+
+
+@pytest.fixture(autouse=True)
+def clear_discovery():
+    discovery.invalidate()
+    yield
+    discovery.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_discovery():
+    calls = 0
+
+    async def scan():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["hci0"]
+
+    results = await asyncio.gather(*(discovery.discover("ble_adapters", scan) for _ in range(20)))
+    assert results == [["hci0"]] * 20
+    assert calls == 1
+
+    # Within the TTL the cached result is returned; force_refresh runs again
+    await discovery.discover("ble_adapters", scan)
+    assert calls == 1
+    await discovery.discover("ble_adapters", scan, force_refresh=True)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_results_are_shared_but_not_cached():
+    calls = 0
+
+    async def timeout():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"status": "error"}
+
+    not_error = lambda result: result["status"] != "error"
+    results = await asyncio.gather(*(
+        discovery.discover("card_readers", timeout, should_cache=not_error) for _ in range(5)
+    ))
+    assert calls == 1 and all(r["status"] == "error" for r in results)
+    await discovery.discover("card_readers", timeout, should_cache=not_error)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_by_kind_and_ttl_override(monkeypatch):
+    async def load():
+        return object()
+
+    status = await discovery.discover("ble_adapter_status", load, key="AA")
+    readers = await discovery.discover("card_readers", load)
+    assert discovery.invalidate("ble_adapter_status") == 1
+    assert await discovery.discover("ble_adapter_status", load, key="AA") is not status
+    assert await discovery.discover("card_readers", load) is readers
+
+    monkeypatch.setenv("DISCOVERY_TTL_NFC_DEVICE", "0")
+    assert discovery.get_discovery_ttl("nfc_device") == 0
+    assert await discovery.discover("nfc_device", load) is not await discovery.discover("nfc_device", load)
+
+
+def test_hotplug_events_invalidate():
+    handlers = {}
+
+    class Bus:
+        def on(self, event_type, handler, with_event_type=False):
+            handlers[event_type] = handler
+
+    discovery.install_hotplug_invalidation(Bus())
+    discovery._cache.set(("card_readers", None), ["reader"])
+    discovery._cache.set(("ble_adapters", None), ["hci0"])
+    handlers["reader_added"]("reader_added", {"name": "reader"})
+    assert discovery._cache.keys() == [("ble_adapters", None)]
@@ -0,0 +1,276 @@
+"""
+Event loop lag monitor and blocking-call detector.
+
+A probe task sleeps for a fixed interval and measures how late it wakes up;
+the difference is the scheduling lag every other coroutine sees at that
+moment. A watchdog thread checks the probe's heartbeat. When the loop has
+not run the probe for longer than the stall threshold, the loop thread is
+stuck in synchronous code. The watchdog then captures the loop thread's
+stack, which names the blocking call while it is still running.
+
+Stalls are grouped by call site: the innermost frame in application code,
+plus the innermost frame overall (e.g. ``subprocess.py`` or ``socket.py``),
+so repeated offenders rank by total time blocked.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from backend.core.metrics import MetricFamily, metrics_registry
+
+logger = logging.getLogger("metrics")
+
+DEFAULT_PROBE_INTERVAL = 0.1       # seconds
+DEFAULT_STALL_THRESHOLD = 0.25     # seconds without a probe tick
+LAG_HISTORY = 3000                 # ~5 minutes at the default interval
+STALL_HISTORY = 20
+MAX_STACK_DEPTH = 30
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_LIBRARY_MARKERS = ("site-packages", "dist-packages")
+
+
+def _is_application_frame(filename: str) -> bool:
+    return (filename.startswith(_PROJECT_ROOT)
+            and not any(marker in filename for marker in _LIBRARY_MARKERS)
+            and filename != __file__)
+
+
+def _frame_label(frame: traceback.FrameSummary) -> str:
+    filename = frame.filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    return f"{filename}:{frame.lineno} in {frame.name}"
+
+
+class _Stall:
+    __slots__ = ("site", "blocking_in", "stack", "started_at", "duration")
+
+    def __init__(self, site: str, blocking_in: str, stack: List[str], started_at: float):
+        self.site = site
+        self.blocking_in = blocking_in
+        self.stack = stack
+        self.started_at = started_at
+        self.duration = 0.0
+
+
+class LoopMonitor:
+    """
+    Measures event loop scheduling lag and records where the loop blocks.
+
+    Args:
+        interval: Probe interval in seconds
+        stall_threshold: Lag (seconds) past which the loop counts as stalled
+    """
+
+    def __init__(self, interval: float = DEFAULT_PROBE_INTERVAL,
+                 stall_threshold: float = DEFAULT_STALL_THRESHOLD):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+
+        self._lags: deque = deque(maxlen=LAG_HISTORY)
+        self._heartbeat = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self._lock = threading.Lock()
+        self._pending: Optional[_Stall] = None
+        self._captured_beat = 0.0
+        self._sites: Dict[str, Dict[str, Any]] = {}
+        self._recent_stalls: deque = deque(maxlen=STALL_HISTORY)
+        self.stall_count = 0
+
+        self._lag_histogram = metrics_registry.histogram(
+            "event_loop_lag_seconds", "Event loop scheduling lag", buckets=LAG_BUCKETS
+        )
+        metrics_registry.register_collector("event_loop", self._collect)
+
+    async def start(self) -> None:
+        """Start the probe task and the watchdog thread on the running loop."""
+        if self.running:
+            logger.warning("Loop monitor is already running")
+            return
+        self.running = True
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._stop_event = threading.Event()
+        self.task = asyncio.create_task(self._probe_loop())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Loop monitor started (interval {self.interval}s, stall threshold {self.stall_threshold}s)")
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        self._stop_event.set()
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        logger.info("Loop monitor stopped")
+
+    async def _probe_loop(self) -> None:
+        while self.running:
+            beat = time.perf_counter()
+            self._heartbeat = beat
+            await asyncio.sleep(self.interval)
+            self.record_lag(max(0.0, time.perf_counter() - beat - self.interval))
+
+    def record_lag(self, lag: float) -> None:
+        """Record one probe's lag and close a stall the watchdog caught."""
+        self._lags.append(lag)
+        self._lag_histogram.observe(lag)
+        if lag < self.stall_threshold:
+            if self._pending is not None:
+                with self._lock:
+                    self._pending = None
+            return
+
+        with self._lock:
+            stall, self._pending = self._pending, None
+        self.stall_count += 1
+        if stall is None:
+            # Stall ended before the watchdog looked; the lag is still counted
+            stall = _Stall("unknown", "unknown", [], time.time() - lag)
+        stall.duration = lag
+        self._attribute(stall)
+
+    def _attribute(self, stall: _Stall) -> None:
+        with self._lock:
+            site = self._sites.get(stall.site)
+            if site is None:
+                site = self._sites[stall.site] = {
+                    "site": stall.site, "blocking_in": stall.blocking_in,
+                    "count": 0, "total_time": 0.0, "max_time": 0.0, "stack": stall.stack
+                }
+            site["count"] += 1
+            site["total_time"] += stall.duration
+            site["max_time"] = max(site["max_time"], stall.duration)
+            site["blocking_in"] = stall.blocking_in
+            site["stack"] = stall.stack
+            self._recent_stalls.append({
+                "site": stall.site,
+                "blocking_in": stall.blocking_in,
+                "duration": stall.duration,
+                "started_at": stall.started_at,
+                "stack": stall.stack
+            })
+        logger.warning(f"Event loop blocked for {stall.duration:.3f}s at {stall.site} ({stall.blocking_in})")
+
+    # Watchdog thread
+
+    def _watch(self) -> None:
+        check_interval = max(0.01, self.stall_threshold / 4)
+        while not self._stop_event.wait(check_interval):
+            try:
+                self.check_stall()
+            except Exception as e:
+                logger.debug(f"Loop watchdog check failed: {e}")
+
+    def check_stall(self, now: Optional[float] = None) -> bool:
+        """
+        Capture the loop thread's stack if the probe is overdue.
+
+        Returns:
+            True if a stack was captured
+        """
+        now = time.perf_counter() if now is None else now
+        beat = self._heartbeat
+        if (now - beat - self.interval < self.stall_threshold
+                or beat == self._captured_beat or self._loop_thread_id is None):
+            return False
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return False
+        frames = traceback.extract_stack(frame, limit=MAX_STACK_DEPTH)
+        application = [f for f in frames if _is_application_frame(f.filename)]
+        stall = _Stall(
+            site=_frame_label(application[-1]) if application else _frame_label(frames[-1]),
+            blocking_in=_frame_label(frames[-1]),
+            stack=[_frame_label(f) for f in frames],
+            started_at=time.time() - (now - beat - self.interval)
+        )
+        with self._lock:
+            self._pending = stall
+            self._captured_beat = beat
+        return True
+
+    # Reporting
+
+    def get_lag_stats(self) -> Dict[str, Any]:
+        """Lag percentiles over the recent probe history (seconds)."""
+        lags = sorted(self._lags)
+        if not lags:
+            return {"count": 0, "avg": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+        result = {"count": len(lags), "avg": sum(lags) / len(lags), "max": lags[-1]}
+        for name, quantile in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            result[name] = lags[min(len(lags) - 1, math.ceil(quantile * len(lags)) - 1)]
+        return result
+
+    def get_blocking_sites(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Call sites that blocked the loop, by total time blocked."""
+        with self._lock:
+            sites = [dict(site) for site in self._sites.values()]
+        sites.sort(key=lambda s: s["total_time"], reverse=True)
+        return sites[:limit]
+
+    def get_stats(self, limit: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            recent = list(self._recent_stalls)[::-1]
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "stall_threshold": self.stall_threshold,
+            "lag": self.get_lag_stats(),
+            "stalls": self.stall_count,
+            "blocking_sites": self.get_blocking_sites(limit),
+            "recent_stalls": recent[:limit]
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._lags.clear()
+            self._sites.clear()
+            self._recent_stalls.clear()
+            self.stall_count = 0
+
+    def _collect(self) -> List[MetricFamily]:
+        blocked = MetricFamily("event_loop_blocked_seconds_total", "counter",
+                               "Time the event loop was stalled, by application call site")
+        for site in self.get_blocking_sites(limit=20):
+            blocked.add(site["total_time"], {"site": site["site"]})
+        return [
+            MetricFamily("event_loop_stalls_total", "counter", "Event loop stalls past the threshold")
+            .add(self.stall_count),
+            blocked
+        ]
+
+
+# Global loop monitor instance
+loop_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """Get the global loop monitor instance."""
+    global loop_monitor
+    if loop_monitor is None:
+        loop_monitor = LoopMonitor()
+    return loop_monitor
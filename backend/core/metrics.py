@@ -0,0 +1,330 @@
+"""
+Process-wide metrics registry with Prometheus text exposition.
+
+Metrics come from two places:
+
+- Counters, gauges and histograms owned by the registry and updated
+  inline (e.g. HTTP request latency)
+- Collectors: callables run at scrape time that read an existing
+  subsystem's statistics (BLE timings, caches, WebSocket queues, executors)
+  and return metric families, so those subsystems keep their own counters
+
+``render()`` produces the text exposition format (version 0.0.4), which
+Prometheus and OpenMetrics scrapers both accept.
+"""
+
+import bisect
+import logging
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Callable, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _label_string(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    return ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values))
+
+
+def _braced(labels: str) -> str:
+    return "{" + labels + "}" if labels else ""
+
+
+class MetricFamily:
+    """
+    Samples of one metric, as returned by collectors.
+
+    Args:
+        name: Metric name
+        metric_type: counter, gauge, histogram or summary
+        help_text: Description shown in the exposition
+    """
+
+    def __init__(self, name: str, metric_type: str, help_text: str = ""):
+        self.name = name
+        self.type = metric_type
+        self.help = help_text
+        self.samples: List[Tuple[str, str, float]] = []
+
+    def add(self, value: float, labels: Optional[Dict[str, object]] = None, suffix: str = "") -> "MetricFamily":
+        """Add a sample (``suffix`` is e.g. ``_bucket`` for histograms)."""
+        label_string = _label_string(list(labels), list(labels.values())) if labels else ""
+        self.samples.append((suffix, label_string, value))
+        return self
+
+    def add_histogram(
+        self,
+        bounds: Sequence[float],
+        cumulative_counts: Sequence[int],
+        total: float,
+        count: int,
+        labels: Optional[Dict[str, object]] = None
+    ) -> "MetricFamily":
+        """
+        Add one histogram series.
+
+        Args:
+            bounds: Finite bucket upper bounds, ascending
+            cumulative_counts: Observations <= each bound
+            total: Sum of observations
+            count: Number of observations (the +Inf bucket)
+            labels: Series labels
+        """
+        base = _label_string(list(labels), list(labels.values())) if labels else ""
+        prefix = base + "," if base else ""
+        for bound, cumulative in zip(bounds, cumulative_counts):
+            self.samples.append(("_bucket", f'{prefix}le="{_format_value(float(bound))}"', cumulative))
+        self.samples.append(("_bucket", f'{prefix}le="+Inf"', count))
+        self.samples.append(("_sum", base, total))
+        self.samples.append(("_count", base, count))
+        return self
+
+    def render(self, lines: List[str]) -> None:
+        if self.help:
+            lines.append(f"# HELP {self.name} {_escape_help(self.help)}")
+        lines.append(f"# TYPE {self.name} {self.type}")
+        for suffix, labels, value in self.samples:
+            lines.append(f"{self.name}{suffix}{_braced(labels)} {_format_value(value)}")
+
+
+class _Metric(ABC):
+    """Base class for registry-owned metrics with labelled series."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_child(self):
+        pass
+
+    def labels(self, *values):
+        """Get the series for a set of label values."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    child.label_string = _label_string(self.labelnames, values)
+                    self._children[values] = child
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use .labels()")
+        return self.labels()
+
+    @abstractmethod
+    def collect(self) -> MetricFamily:
+        pass
+
+
+class _ValueChild:
+    __slots__ = ("value", "label_string")
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter (name it with a ``_total`` suffix)."""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.metric_type, self.help)
+        for child in list(self._children.values()):
+            family.samples.append(("", child.label_string, child.value))
+        return family
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count", "label_string")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    """
+    Histogram with fixed bucket bounds.
+
+    Observations are counted per bucket; cumulative counts are only built
+    when rendering.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.metric_type, self.help)
+        for child in list(self._children.values()):
+            cumulative, running = [], 0
+            for bucket_count in child.counts[:-1]:
+                running += bucket_count
+                cumulative.append(running)
+            prefix = child.label_string + "," if child.label_string else ""
+            for bound, value in zip(self.buckets, cumulative):
+                family.samples.append(("_bucket", f'{prefix}le="{_format_value(float(bound))}"', value))
+            family.samples.append(("_bucket", f'{prefix}le="+Inf"', child.count))
+            family.samples.append(("_sum", child.label_string, child.sum))
+            family.samples.append(("_count", child.label_string, child.count))
+        return family
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """Registry of metrics and scrape-time collectors."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric '{metric.name}' already registered with a different type or labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, name: str, collector: Collector) -> None:
+        """
+        Register a scrape-time collector (replaces one with the same name).
+
+        Args:
+            name: Collector name, used in error logs
+            collector: Callable returning metric families
+        """
+        self._collectors[name] = collector
+        logger.info(f"Metrics collector '{name}' registered")
+
+    def unregister_collector(self, name: str) -> None:
+        self._collectors.pop(name, None)
+
+    def collect(self) -> List[MetricFamily]:
+        """Gather all metric families; a failing collector is skipped."""
+        families = [metric.collect() for metric in list(self._metrics.values())]
+        for name, collector in list(self._collectors.items()):
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector '{name}' failed: {e}")
+        return families
+
+    def render(self) -> str:
+        """Render every metric in the text exposition format."""
+        lines: List[str] = []
+        # Collectors may each contribute series of the same metric; render one family per name
+        merged: Dict[str, MetricFamily] = {}
+        for family in self.collect():
+            existing = merged.get(family.name)
+            if existing is None:
+                merged[family.name] = family
+            else:
+                existing.samples.extend(family.samples)
+        for family in merged.values():
+            if family.samples:
+                family.render(lines)
+        lines.append("")
+        return "\n".join(lines)
+
+
+# Global metrics registry instance
+metrics_registry = MetricsRegistry()
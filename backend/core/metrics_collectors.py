@@ -0,0 +1,216 @@
+"""
+Scrape-time collectors exposing subsystem statistics through the metrics registry.
+
+Each collector reads counters the subsystem already keeps. Subsystems are
+looked up lazily, and a collector reports nothing when its subsystem is
+not available (missing optional dependency, not loaded yet).
+"""
+
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+from backend.core.metrics import MetricFamily, MetricsRegistry, metrics_registry
+
+logger = logging.getLogger("metrics")
+
+# Buckets for BLE operation latency (seconds)
+BLE_OPERATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Buckets for per-client WebSocket send queue depth
+QUEUE_DEPTH_BUCKETS = (0, 1, 4, 16, 64, 256, 1024)
+
+# Manager classes that keep a class-level ThreadPoolExecutor
+EXECUTOR_OWNERS = (
+    ("backend.modules.task_manager", "TaskManager"),
+    ("backend.modules.settings_manager", "SettingsManager"),
+    ("backend.modules.nfc_manager", "NFCManager"),
+    ("backend.modules.smartcard_manager", "SmartcardManager"),
+    ("backend.modules.auth_manager", "AuthManager"),
+    ("backend.modules.device_manager", "DeviceManager"),
+    ("backend.modules.notification_manager", "NotificationManager"),
+    ("backend.modules.report_manager", "ReportManager"),
+    ("backend.modules.alert_manager", "AlertManager"),
+    ("backend.modules.uwb_manager", "UWBManager"),
+)
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+
+def register_executor(name: str, executor: ThreadPoolExecutor) -> None:
+    """Expose an executor's queue length and thread count."""
+    _executors[name] = executor
+
+
+def collect_ble_operations() -> Iterable[MetricFamily]:
+    """BLE operation latency histograms and failure counts."""
+    from backend.modules.ble.utils.ble_metrics import get_metrics_collector
+
+    collector = get_metrics_collector()
+    durations = MetricFamily(
+        "ble_operation_duration_seconds", "histogram", "Duration of successful BLE operations"
+    )
+    failures = MetricFamily("ble_operation_failures_total", "counter", "Failed BLE operations")
+    bounds = [bound * 1e6 for bound in BLE_OPERATION_BUCKETS]
+    for operation, histogram in collector.get_histograms().items():
+        labels = {"operation": operation}
+        durations.add_histogram(
+            BLE_OPERATION_BUCKETS, histogram.cumulative_counts(bounds),
+            histogram.total / 1e6, histogram.count, labels
+        )
+        failures.add(histogram.failures, labels)
+
+    errors = MetricFamily("ble_errors_total", "counter", "BLE errors by type")
+    for error_type, count in collector.error_counts.items():
+        errors.add(count, {"type": error_type})
+    return [durations, failures, errors]
+
+
+def collect_ble_connections() -> Iterable[MetricFamily]:
+    """Connection pool occupancy and GATT cache effectiveness."""
+    families = []
+    pool_module = sys.modules.get("backend.modules.ble.core.connection_pool")
+    if pool_module is not None:
+        stats = pool_module.get_connection_pool().get_stats()
+        families.append(MetricFamily("ble_pool_connections", "gauge", "Open pooled BLE connections")
+                        .add(stats["connections"]))
+        families.append(MetricFamily("ble_pool_max_connections", "gauge", "Pooled BLE connection limit")
+                        .add(stats["max_connections"]))
+        families.append(MetricFamily("ble_pool_evictions_total", "counter", "Pooled connections evicted")
+                        .add(stats["evictions"]))
+
+    gatt_module = sys.modules.get("backend.modules.ble.core.gatt_cache")
+    gatt_cache = gatt_module.get_gatt_cache() if gatt_module is not None else None
+    if gatt_cache is not None:
+        families.extend(_cache_families("gatt", gatt_cache.hits, gatt_cache.misses, gatt_cache.get_stats()["devices"]))
+    return families
+
+
+def collect_ble_event_bus() -> Iterable[MetricFamily]:
+    """Event bus queue depth, lag and drops per subscription."""
+    events_module = sys.modules.get("backend.modules.ble.utils.events")
+    if events_module is None:
+        return []
+    bus = events_module.ble_event_bus
+    depth = MetricFamily("ble_event_queue_depth", "gauge", "Events waiting per event bus subscription")
+    lag = MetricFamily("ble_event_max_lag_seconds", "gauge", "Longest wait between emit and handler per subscription")
+    delivered = MetricFamily("ble_events_delivered_total", "counter", "Events handled per subscription")
+    dropped = MetricFamily("ble_events_dropped_total", "counter", "Events dropped from full subscription queues")
+    coalesced = MetricFamily("ble_events_coalesced_total", "counter", "Events replaced by a newer event with the same key")
+    for stats in bus.get_stats()["subscriptions"]:
+        labels = {"subscription": stats["name"], "pattern": stats["pattern"]}
+        depth.add(stats["queue_depth"], labels)
+        lag.add(stats["max_lag"], labels)
+        delivered.add(stats["delivered"], labels)
+        dropped.add(stats["dropped"], labels)
+        coalesced.add(stats["coalesced"], labels)
+    emitted = MetricFamily("ble_events_emitted_total", "counter", "Events emitted on the BLE event bus").add(bus.emitted)
+    return [emitted, depth, lag, delivered, dropped, coalesced]
+
+
+def collect_caches() -> Iterable[MetricFamily]:
+    """Hit ratio, size and evictions of every named cache namespace."""
+    cache_module = sys.modules.get("backend.caching.cache")
+    if cache_module is None:
+        return []
+    families = []
+    evictions = MetricFamily("cache_evictions_total", "counter", "Entries evicted to stay within limits")
+    cache_bytes = MetricFamily("cache_bytes", "gauge", "Estimated size of cached values")
+    for name, stats in cache_module.get_all_cache_stats().items():
+        families.extend(_cache_families(name, stats["hits"], stats["misses"], stats["size"]))
+        evictions.add(stats["evictions"], {"cache": name})
+        cache_bytes.add(stats["bytes"], {"cache": name})
+    return families + [evictions, cache_bytes]
+
+
+def _cache_families(name: str, hits: int, misses: int, entries: int) -> List[MetricFamily]:
+    labels = {"cache": name}
+    lookups = hits + misses
+    return [
+        MetricFamily("cache_hits_total", "counter", "Cache hits").add(hits, labels),
+        MetricFamily("cache_misses_total", "counter", "Cache misses").add(misses, labels),
+        MetricFamily("cache_hit_ratio", "gauge", "Cache hits / lookups since start")
+        .add(hits / lookups if lookups else 0.0, labels),
+        MetricFamily("cache_entries", "gauge", "Entries in the cache").add(entries, labels),
+    ]
+
+
+def collect_websockets() -> Iterable[MetricFamily]:
+    """WebSocket connections, message counts and send queue depths."""
+    families = []
+    ws_module = sys.modules.get("backend.ws.manager")
+    if ws_module is not None:
+        stats = ws_module.manager.get_connection_stats()
+        families.append(MetricFamily("ws_connections", "gauge", "Connected WebSocket clients")
+                        .add(stats["active_connections"]))
+        families.append(MetricFamily("ws_messages_sent_total", "counter", "WebSocket messages sent")
+                        .add(stats["total_messages"]))
+        families.append(MetricFamily("ws_send_timeouts_total", "counter", "WebSocket sends that timed out")
+                        .add(stats["send_timeouts"]))
+
+    ble_ws_module = sys.modules.get("backend.modules.ble.comms.websocket")
+    if ble_ws_module is not None:
+        clients = ble_ws_module.websocket_manager.get_client_stats()
+        depths = [client["depth"] for client in clients]
+        cumulative = [sum(1 for depth in depths if depth <= bound) for bound in QUEUE_DEPTH_BUCKETS]
+        families.append(
+            MetricFamily("ble_ws_send_queue_depth", "histogram", "Send queue depth per BLE WebSocket client")
+            .add_histogram(QUEUE_DEPTH_BUCKETS, cumulative, sum(depths), len(depths))
+        )
+        families.append(MetricFamily("ble_ws_send_queue_dropped_total", "counter",
+                                     "Messages dropped by BLE WebSocket send queues (connected clients)")
+                        .add(sum(client["dropped"] for client in clients)))
+    return families
+
+
+def collect_executors() -> Iterable[MetricFamily]:
+    """Work queue length and thread count of known thread pools."""
+    for module_name, class_name in EXECUTOR_OWNERS:
+        module = sys.modules.get(module_name)
+        executor = getattr(getattr(module, class_name, None), "executor", None)
+        if isinstance(executor, ThreadPoolExecutor):
+            _executors.setdefault(class_name, executor)
+
+    queue_length = MetricFamily("executor_queue_length", "gauge", "Work items waiting for a thread")
+    threads = MetricFamily("executor_threads", "gauge", "Threads started by the executor")
+    max_threads = MetricFamily("executor_max_threads", "gauge", "Maximum threads of the executor")
+    for name, executor in list(_executors.items()):
+        labels = {"executor": name}
+        queue_length.add(executor._work_queue.qsize(), labels)
+        threads.add(len(executor._threads), labels)
+        max_threads.add(executor._max_workers, labels)
+    return [queue_length, threads, max_threads]
+
+
+def collect_process() -> Iterable[MetricFamily]:
+    """CPU, memory and open files of this process."""
+    try:
+        import psutil
+    except ImportError:
+        return []
+
+    process = psutil.Process()
+    memory = process.memory_info()
+    families = [
+        MetricFamily("process_cpu_percent", "gauge", "Process CPU usage since the last scrape")
+        .add(process.cpu_percent(interval=None)),
+        MetricFamily("process_resident_memory_bytes", "gauge", "Resident memory size").add(memory.rss),
+        MetricFamily("process_threads", "gauge", "Threads in the process").add(process.num_threads()),
+        MetricFamily("system_memory_percent", "gauge", "System memory in use")
+        .add(psutil.virtual_memory().percent),
+    ]
+    if hasattr(process, "num_fds"):
+        families.append(MetricFamily("process_open_fds", "gauge", "Open file descriptors").add(process.num_fds()))
+    return families
+
+
+def install_default_collectors(registry: MetricsRegistry = metrics_registry) -> None:
+    """Register the built-in subsystem collectors."""
+    registry.register_collector("ble_operations", collect_ble_operations)
+    registry.register_collector("ble_connections", collect_ble_connections)
+    registry.register_collector("ble_event_bus", collect_ble_event_bus)
+    registry.register_collector("caches", collect_caches)
+    registry.register_collector("websockets", collect_websockets)
+    registry.register_collector("executors", collect_executors)
+    registry.register_collector("process", collect_process)
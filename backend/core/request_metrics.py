@@ -0,0 +1,303 @@
+"""
+Request-level latency instrumentation.
+
+``RequestMetricsMiddleware`` is a plain ASGI middleware that times every HTTP
+request and labels it with the matched route template (``/api/ble/device/{id}``
+rather than the concrete path), so series stay bounded. It keeps:
+
+- ``http_request_duration_seconds``: histogram per method, route and status class
+- ``http_requests_in_flight``: requests currently running, computed at scrape time
+- ``http_slow_requests_total``: requests slower than the slow threshold
+
+While a request runs past the slow threshold, a sampler thread periodically
+captures the stack of the event loop thread and the request task's await
+chain. A request that blocks the loop shows the blocking call in the loop
+stack; a request that is merely waiting shows what it awaits. The last slow
+requests are kept with their samples for ``/api/system/perf/routes``.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from backend.core.metrics import MetricFamily, MetricsRegistry, metrics_registry
+
+logger = logging.getLogger("metrics")
+
+# Buckets for HTTP request latency (seconds)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DEFAULT_SLOW_THRESHOLD = 1.0       # seconds
+DEFAULT_SAMPLE_INTERVAL = 0.1      # seconds between stack samples of a slow request
+MAX_SAMPLES_PER_REQUEST = 20
+MAX_STACK_DEPTH = 25
+SLOW_REQUEST_HISTORY = 50
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """Route template set on the scope by the router, once routing has run."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def _format_stack(frames) -> List[str]:
+    return [f"{frame.filename}:{frame.lineno} in {frame.name}" for frame in frames]
+
+
+class _ActiveRequest:
+    __slots__ = ("scope", "method", "path", "start", "started_at", "thread_id", "task", "samples", "next_sample")
+
+    def __init__(self, scope: Dict[str, Any], slow_threshold: float):
+        self.scope = scope
+        self.method = scope.get("method", "GET")
+        self.path = scope.get("path", "")
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+        self.thread_id = threading.get_ident()
+        try:
+            self.task = asyncio.current_task()
+        except RuntimeError:
+            self.task = None
+        self.samples: List[Dict[str, Any]] = []
+        self.next_sample = self.start + slow_threshold
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency and sampling slow requests.
+
+    Args:
+        app: The wrapped ASGI application
+        registry: Metrics registry to record into
+        slow_threshold: Requests running longer than this (seconds) are sampled and kept
+        sample_interval: Seconds between stack samples of a slow request
+    """
+
+    def __init__(
+        self,
+        app,
+        registry: MetricsRegistry = metrics_registry,
+        slow_threshold: float = DEFAULT_SLOW_THRESHOLD,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL
+    ):
+        self.app = app
+        self.slow_threshold = slow_threshold
+        self.sample_interval = sample_interval
+        self.durations = registry.histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route template",
+            ("method", "route", "status"),
+            buckets=REQUEST_BUCKETS
+        )
+        self.slow_requests = registry.counter(
+            "http_slow_requests_total",
+            "HTTP requests slower than the slow threshold",
+            ("method", "route")
+        )
+        self.slow_history: deque = deque(maxlen=SLOW_REQUEST_HISTORY)
+        self._active: Dict[int, _ActiveRequest] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self._sampler_lock = threading.Lock()
+
+        registry.register_collector("http_in_flight", self._collect_in_flight)
+        set_request_metrics(self)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self._sampler is None:
+            self._start_sampler()
+
+        request = _ActiveRequest(scope, self.slow_threshold)
+        self._active[id(request)] = request
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._active.pop(id(request), None)
+            self._finish(request, status_code, time.perf_counter() - request.start)
+
+    def _finish(self, request: _ActiveRequest, status_code: int, duration: float) -> None:
+        route = _route_template(request.scope)
+        self.durations.labels(request.method, route, f"{status_code // 100}xx").observe(duration)
+        if duration < self.slow_threshold:
+            return
+
+        self.slow_requests.labels(request.method, route).inc()
+        self.slow_history.append({
+            "method": request.method,
+            "route": route,
+            "path": request.path,
+            "status": status_code,
+            "duration": duration,
+            "started_at": request.started_at,
+            "samples": request.samples
+        })
+        logger.warning(
+            f"Slow request: {request.method} {request.path} ({route}) took {duration:.3f}s, "
+            f"{len(request.samples)} stack samples"
+        )
+
+    # Slow request sampling
+
+    def _start_sampler(self) -> None:
+        with self._sampler_lock:
+            if self._sampler is None:
+                self._sampler = threading.Thread(
+                    target=self._sample_loop, name="slow-request-sampler", daemon=True
+                )
+                self._sampler.start()
+
+    def _sample_loop(self) -> None:
+        while True:
+            time.sleep(self.sample_interval)
+            try:
+                self.sample_slow_requests()
+            except Exception as e:
+                logger.debug(f"Slow request sampling failed: {e}")
+
+    def sample_slow_requests(self, now: Optional[float] = None) -> int:
+        """
+        Capture stacks of requests running past the slow threshold.
+
+        Returns:
+            Number of samples taken
+        """
+        now = time.perf_counter() if now is None else now
+        due = [r for r in list(self._active.values())
+               if r.next_sample <= now and len(r.samples) < MAX_SAMPLES_PER_REQUEST]
+        if not due:
+            return 0
+
+        frames = sys._current_frames()
+        loop_stacks: Dict[int, List[str]] = {}
+        for request in due:
+            if request.thread_id not in loop_stacks:
+                frame = frames.get(request.thread_id)
+                loop_stacks[request.thread_id] = (
+                    _format_stack(traceback.extract_stack(frame, limit=MAX_STACK_DEPTH))
+                    if frame is not None else []
+                )
+            request.samples.append({
+                "elapsed": now - request.start,
+                "loop_stack": loop_stacks[request.thread_id],
+                "awaiting": self._task_stack(request.task)
+            })
+            request.next_sample = now + self.sample_interval
+        return len(due)
+
+    @staticmethod
+    def _task_stack(task) -> List[str]:
+        if task is None:
+            return []
+        try:
+            stack = task.get_stack(limit=MAX_STACK_DEPTH)
+        except Exception:
+            return []
+        return [f"{f.f_code.co_filename}:{f.f_lineno} in {f.f_code.co_name}" for f in stack]
+
+    # Reporting
+
+    def in_flight(self) -> Dict[Tuple[str, str], int]:
+        """Requests currently running, by method and route template."""
+        counts: Dict[Tuple[str, str], int] = {}
+        for request in list(self._active.values()):
+            key = (request.method, _route_template(request.scope))
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def _collect_in_flight(self) -> List[MetricFamily]:
+        family = MetricFamily("http_requests_in_flight", "gauge", "HTTP requests currently being served")
+        for (method, route), count in self.in_flight().items():
+            family.add(count, {"method": method, "route": route})
+        return [family]
+
+    def get_route_stats(self) -> List[Dict[str, Any]]:
+        """
+        Latency per method and route template, slowest total time first.
+
+        Percentiles are interpolated within histogram buckets.
+        """
+        routes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for (method, route, status), child in list(self.durations._children.items()):
+            entry = routes.get((method, route))
+            if entry is None:
+                entry = routes[(method, route)] = {
+                    "method": method, "route": route, "count": 0, "errors": 0,
+                    "total_time": 0.0, "counts": [0] * (len(REQUEST_BUCKETS) + 1)
+                }
+            entry["count"] += child.count
+            entry["total_time"] += child.sum
+            if status == "5xx":
+                entry["errors"] += child.count
+            for index, value in enumerate(child.counts):
+                entry["counts"][index] += value
+
+        in_flight = self.in_flight()
+        slow_counts = {key: child.value for key, child in list(self.slow_requests._children.items())}
+        results = []
+        for key, entry in routes.items():
+            counts = entry.pop("counts")
+            count = entry["count"]
+            entry["avg"] = entry["total_time"] / count if count else 0.0
+            for name, quantile in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+                entry[name] = _bucket_quantile(quantile, counts, count)
+            entry["in_flight"] = in_flight.get(key, 0)
+            entry["slow"] = int(slow_counts.get(key, 0))
+            results.append(entry)
+        results.sort(key=lambda e: e["total_time"], reverse=True)
+        return results
+
+    def get_slow_requests(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recent slow requests with their stack samples, newest first."""
+        if limit <= 0:
+            return []
+        return list(self.slow_history)[-limit:][::-1]
+
+
+def _bucket_quantile(quantile: float, counts: List[int], total: int) -> float:
+    """Estimate a quantile from per-bucket counts, like Prometheus histogram_quantile."""
+    if not total:
+        return 0.0
+    rank = quantile * total
+    cumulative = 0
+    lower = 0.0
+    for index, count in enumerate(counts):
+        if index == len(REQUEST_BUCKETS):
+            return REQUEST_BUCKETS[-1]
+        upper = REQUEST_BUCKETS[index]
+        if count and cumulative + count >= rank:
+            return lower + (upper - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = upper
+    return REQUEST_BUCKETS[-1]
+
+
+# Middleware instance installed by the application
+request_metrics: Optional[RequestMetricsMiddleware] = None
+
+
+def set_request_metrics(middleware: RequestMetricsMiddleware) -> None:
+    global request_metrics
+    request_metrics = middleware
+
+
+def get_request_metrics() -> Optional[RequestMetricsMiddleware]:
+    """Installed request metrics middleware, or None before the app has started."""
+    return request_metrics
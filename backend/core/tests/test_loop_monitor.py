@@ -0,0 +1,33 @@
+import asyncio
+import time
+import pytest
+from backend.core.loop_monitor import LoopMonitor
+
+def blocking_call():
+    time.sleep(0.15)
+
+@pytest.mark.asyncio
+async def test_stall_is_attributed_to_blocking_call_site():
+    monitor = LoopMonitor(interval=0.01, stall_threshold=0.05)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    stats = monitor.get_stats()
+    assert stats["stalls"] == 1
+    assert stats["lag"]["max"] >= 0.1
+    site = stats["blocking_sites"][0]
+    assert "blocking_call" in site["site"]
+    assert site["count"] == 1 and site["total_time"] >= 0.1
+
+def test_short_lag_is_not_a_stall():
+    monitor = LoopMonitor(interval=0.01, stall_threshold=0.05)
+    for lag in (0.001, 0.002, 0.02):
+        monitor.record_lag(lag)
+    stats = monitor.get_stats()
+    assert stats["stalls"] == 0 and stats["lag"]["count"] == 3
+    assert stats["lag"]["max"] == 0.02
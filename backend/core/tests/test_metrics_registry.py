@@ -0,0 +1,33 @@
+from backend.core.metrics import MetricsRegistry, MetricFamily
+from backend.modules.ble.utils.histogram import LatencyHistogram
+
+def test_render_counters_and_histograms():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    requests.labels('/a"b').inc(2)
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert 'requests_total{route="/a\\"b"} 2.0' in text
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+
+def test_failing_collector_is_skipped():
+    registry = MetricsRegistry()
+
+    def broken():
+        raise RuntimeError("unavailable")
+
+    registry.register_collector("broken", broken)
+    registry.register_collector("ok", lambda: [MetricFamily("up", "gauge").add(1)])
+    assert "up 1" in registry.render()
+
+def test_cumulative_counts_match_bucket_bounds():
+    histogram = LatencyHistogram()
+    for micros in (900, 990, 1100, 5000, 20000):
+        histogram.record(micros)
+    assert histogram.cumulative_counts([1000, 10000]) == [2, 4]
@@ -0,0 +1,90 @@
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from backend.core.metrics import MetricsRegistry
+from backend.core.request_metrics import RequestMetricsMiddleware
+
+def make_app(delay, block=0.0, status=200):
+    async def app(scope, receive, send):
+        # The router records the matched route on the scope
+        scope["route"] = SimpleNamespace(path="/api/device/{device_id}")
+        if block:
+            time.sleep(block)
+        await asyncio.sleep(delay)
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+async def call(middleware, path):
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    await middleware({"type": "http", "method": "GET", "path": path}, receive, send)
+
+@pytest.mark.asyncio
+async def test_latency_recorded_per_route_template():
+    registry = MetricsRegistry()
+    middleware = RequestMetricsMiddleware(make_app(0.0), registry, slow_threshold=10.0)
+    for device_id in range(5):
+        await call(middleware, f"/api/device/{device_id}")
+
+    stats = middleware.get_route_stats()
+    assert len(stats) == 1 and stats[0]["route"] == "/api/device/{device_id}"
+    assert stats[0]["count"] == 5 and stats[0]["in_flight"] == 0
+    assert 'route="/api/device/{device_id}",status="2xx",le="+Inf"} 5' in registry.render()
+
+@pytest.mark.asyncio
+async def test_slow_request_keeps_stack_samples():
+    registry = MetricsRegistry()
+    middleware = RequestMetricsMiddleware(make_app(0.05, status=503), registry,
+                                          slow_threshold=0.01, sample_interval=0.01)
+    task = asyncio.ensure_future(call(middleware, "/api/device/7"))
+    await asyncio.sleep(0.02)
+    assert middleware.in_flight() == {("GET", "/api/device/{device_id}"): 1}
+    # The background sampler may have just sampled; look past its next sample time
+    assert middleware.sample_slow_requests(now=time.perf_counter() + 1.0) == 1
+    await task
+
+    slow = middleware.get_slow_requests()
+    assert slow[0]["path"] == "/api/device/7" and slow[0]["status"] == 503
+    assert slow[0]["samples"][0]["awaiting"]
+    stats = middleware.get_route_stats()[0]
+    assert stats["slow"] == 1 and stats["errors"] == 1
+
+@pytest.mark.asyncio
+async def test_included_router_is_labelled_by_route_template():
+    import httpx
+    from fastapi import APIRouter, FastAPI
+
+    router = APIRouter()
+
+    @router.get("/device/{device_id}")
+    async def get_device(device_id: str):
+        return {"id": device_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    registry = MetricsRegistry()
+    middleware = RequestMetricsMiddleware(app, registry, slow_threshold=10.0)
+
+    transport = httpx.ASGITransport(app=middleware)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for device_id in ("a", "b", "c"):
+            assert (await client.get(f"/api/device/{device_id}")).status_code == 200
+        assert (await client.get("/api/missing")).status_code == 404
+
+    routes = {entry["route"]: entry["count"] for entry in middleware.get_route_stats()}
+    assert routes["/api/device/{device_id}"] == 3
+    assert "/api/device/a" not in routes
+
+@pytest.mark.asyncio
+async def test_slow_request_limit_is_clamped():
+    middleware = RequestMetricsMiddleware(make_app(0.0), MetricsRegistry(), slow_threshold=0.0)
+    await call(middleware, "/api/device/1")
+    assert len(middleware.get_slow_requests(limit=1)) == 1
+    assert middleware.get_slow_requests(limit=0) == []
+    assert middleware.get_slow_requests(limit=-1) == []
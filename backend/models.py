@@ -127,6 +127,10 @@ class CachePolicy(BaseModel):
     max_size: int
     eviction_policy: str
 
+class CacheStatsReport(CacheStats):
+    policy: Optional[CachePolicy] = None
+    namespaces: Dict[str, Dict[str, Any]] = {}
+
 # Card Models
 class CardReadRequest(BaseModel):
     reader_name: str
@@ -172,16 +176,27 @@ class UWBMode(BaseModel):
     pass
 
 class UWBAnchor(BaseModel):
-    pass
+    anchor_id: str
+    x: float
+    y: float
+    z: float = 0.0
+    name: Optional[str] = None
 
 class UWBTag(BaseModel):
     pass
 
 class UWBPosition(BaseModel):
-    pass
+    x: float
+    y: float
+    z: float = 0.0
+    timestamp: Optional[float] = None
+    accuracy: Optional[float] = None
 
 class UWBRangingResult(BaseModel):
-    pass
+    anchor_id: str
+    tag_id: str
+    distance: float
+    timestamp: Optional[float] = None
 
 class RFIDTagDataRequest(BaseModel):
     pass
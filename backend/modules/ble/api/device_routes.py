@@ -13,12 +13,13 @@ from backend.modules.ble.core.ble_service import BleService
 from backend.modules.ble.core.ble_metrics import BleMetricsCollector
 from backend.modules.ble.models.ble_models import (
     BLEDeviceInfo, ConnectionParams, ConnectionResult, ConnectionStatus,
-    WriteRequest, NotificationRequest, ServiceFilterRequest,
+    WriteRequest, BatchGattRequest, BulkWriteRequest, TransferRequest, NotificationRequest, ServiceFilterRequest,
     DevicePairRequest, DeviceBondRequest, ScanParams,
     CharacteristicValue, ReadResult
 )
 from backend.modules.ble.models.ble_models import DeviceResponse
 from backend.modules.ble.core.ble_service_factory import get_ble_service
+from backend.modules.ble.core.transfer import TransferOptions
 
 # Create a single router definition
 device_router = APIRouter(prefix="/device", tags=["BLE Devices"])  # Change from "/devices" to "/device"
@@ -319,14 +320,18 @@ async def check_device_exists(
 
 # Service and characteristic discovery endpoints
 @device_router.get("/services", response_model=None)
-async def get_device_services(ble_service: BleService = Depends(get_ble_service)):
-    """Get services from the connected device."""
+async def get_device_services(
+    address: Optional[str] = Query(None, description="Device address (defaults to the connected device)"),
+    ble_service: BleService = Depends(get_ble_service)
+):
+    """Get services from a device."""
     try:
-        is_connected, _ = await ble_service.is_connected()
-        if not is_connected:
-            raise HTTPException(status_code=400, detail="No device connected")
+        if not address:
+            is_connected, _ = await ble_service.is_connected()
+            if not is_connected:
+                raise HTTPException(status_code=400, detail="No device connected")
         
-        services = await ble_service.get_services()
+        services = await ble_service.get_services(address=address)
         if not services:
             return Response(content=json.dumps({"services": [], "count": 0, "message": "No services found"}, default=str), media_type="application/json")
         
@@ -338,15 +343,17 @@ async def get_device_services(ble_service: BleService = Depends(get_ble_service)
 @device_router.get("/services/{service_uuid}/characteristics", response_model=None)
 async def get_service_characteristics(
     service_uuid: str,
+    address: Optional[str] = Query(None, description="Device address (defaults to the connected device)"),
     ble_service: BleService = Depends(get_ble_service)
 ):
     """Get characteristics for a specific service."""
     try:
-        is_connected, _ = await ble_service.is_connected()
-        if not is_connected:
-            raise HTTPException(status_code=400, detail="No device connected")
+        if not address:
+            is_connected, _ = await ble_service.is_connected()
+            if not is_connected:
+                raise HTTPException(status_code=400, detail="No device connected")
         
-        characteristics = await ble_service.get_characteristics(service_uuid)
+        characteristics = await ble_service.get_characteristics(service_uuid, address=address)
         return Response(content=json.dumps({"characteristics": characteristics, "count": len(characteristics)}, default=str), media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting characteristics: {e}", exc_info=True)
@@ -356,16 +363,18 @@ async def get_service_characteristics(
 @device_router.get("/read/{characteristic}", response_model=None)
 async def read_characteristic(
     characteristic: str,
+    address: Optional[str] = Query(None, description="Device address (defaults to the connected device)"),
     ble_service: BleService = Depends(get_ble_service)
 ):
     """Read a value from a characteristic."""
     try:
-        is_connected, _ = await ble_service.is_connected()
-        if not is_connected:
-            raise HTTPException(status_code=400, detail="No device connected")
+        if not address:
+            is_connected, _ = await ble_service.is_connected()
+            if not is_connected:
+                raise HTTPException(status_code=400, detail="No device connected")
         
         # Read the value
-        value = await ble_service.read_characteristic(characteristic)
+        value = await ble_service.read_characteristic(characteristic, address=address)
         
         # Return both hex and string representations if it's binary data
         if isinstance(value, bytes):
@@ -394,16 +403,18 @@ async def write_characteristic(
 ):
     """Write a value to a characteristic."""
     try:
-        is_connected, _ = await ble_service.is_connected()
-        if not is_connected:
-            raise HTTPException(status_code=400, detail="No device connected")
+        if not request.address:
+            is_connected, _ = await ble_service.is_connected()
+            if not is_connected:
+                raise HTTPException(status_code=400, detail="No device connected")
         
         # Write the value
         result = await ble_service.write_characteristic(
             request.characteristic, 
             request.value, 
             value_type=request.value_type,
-            with_response=request.response
+            response=request.response,
+            address=request.address
         )
         
         return Response(content=json.dumps({"status": "success", "written": request.value}, default=str), media_type="application/json")
@@ -411,6 +422,150 @@ async def write_characteristic(
         logger.error(f"Error writing characteristic: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@device_router.post("/batch", response_model=None)
+async def execute_gatt_batch(
+    request: BatchGattRequest,
+    ble_service: BleService = Depends(get_ble_service)
+):
+    """Run several characteristic reads and writes in one request."""
+    try:
+        if not request.address:
+            is_connected, _ = await ble_service.is_connected()
+            if not is_connected:
+                raise HTTPException(status_code=400, detail="No device connected")
+        
+        results = await ble_service.execute_gatt_batch(
+            [operation.model_dump() for operation in request.operations],
+            address=request.address,
+            stop_on_error=request.stop_on_error
+        )
+        
+        return Response(content=json.dumps({
+            "status": "success" if all(result["success"] for result in results) else "partial",
+            "results": results
+        }, default=str), media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error executing GATT batch: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@device_router.post("/write/bulk", response_model=None)
+async def bulk_write_characteristic(
+    request: BulkWriteRequest,
+    ble_service: BleService = Depends(get_ble_service)
+):
+    """Stream a large payload to a characteristic using write-without-response."""
+    try:
+        if not request.address:
+            is_connected, _ = await ble_service.is_connected()
+            if not is_connected:
+                raise HTTPException(status_code=400, detail="No device connected")
+        
+        result = await ble_service.bulk_write(
+            request.characteristic,
+            request.value,
+            value_type=request.value_type,
+            chunk_size=request.chunk_size,
+            ack_every=request.ack_every,
+            address=request.address
+        )
+        
+        return Response(content=json.dumps({"status": "success", **result}, default=str),
+                        media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in bulk write: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@device_router.get("/read/{characteristic}/long", response_model=None)
+async def read_long_characteristic(
+    characteristic: str,
+    length: Optional[int] = Query(None, gt=0, description="Expected total length, if known"),
+    address: Optional[str] = Query(None, description="Device address (defaults to the connected device)"),
+    ble_service: BleService = Depends(get_ble_service)
+):
+    """Read and reassemble a value larger than one ATT read."""
+    try:
+        result = await ble_service.read_long(characteristic, length=length, address=address)
+        data = result.pop("data")
+        result["value"] = CharacteristicValue(
+            hex=data.hex(),
+            text=data.decode('utf-8', errors='replace'),
+            bytes=[b for b in data]
+        ).model_dump()
+        return Response(content=json.dumps(result, default=str), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error in long read: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@device_router.post("/transfer", response_model=None)
+async def start_transfer(
+    request: TransferRequest,
+    ble_service: BleService = Depends(get_ble_service)
+):
+    """Upload a large payload in MTU-sized chunks."""
+    try:
+        if not request.address:
+            is_connected, _ = await ble_service.is_connected()
+            if not is_connected:
+                raise HTTPException(status_code=400, detail="No device connected")
+        
+        options = TransferOptions(
+            mode=request.mode,
+            chunk_size=request.chunk_size,
+            framing=request.framing,
+            crc=request.crc,
+            ack_characteristic=request.ack_characteristic,
+            ack_window=request.ack_window,
+            ack_timeout=request.ack_timeout,
+            max_retries=request.max_retries
+        )
+        result = await ble_service.upload(
+            request.characteristic,
+            request.value,
+            value_type=request.value_type,
+            options=options,
+            address=request.address
+        )
+        return Response(content=json.dumps(result, default=str), media_type="application/json")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in transfer: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@device_router.post("/transfer/{transfer_id}/resume", response_model=None)
+async def resume_transfer(
+    transfer_id: str,
+    ble_service: BleService = Depends(get_ble_service)
+):
+    """Resume a failed upload from the last confirmed offset."""
+    try:
+        if ble_service.transfer_engine.get_transfer(transfer_id) is None:
+            raise HTTPException(status_code=404, detail=f"Unknown transfer: {transfer_id}")
+        
+        result = await ble_service.resume_upload(transfer_id)
+        return Response(content=json.dumps(result, default=str), media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error resuming transfer: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@device_router.get("/transfers", response_model=None)
+async def list_transfers(ble_service: BleService = Depends(get_ble_service)):
+    """List recent chunked transfers with their progress and throughput."""
+    try:
+        return Response(content=json.dumps(ble_service.get_transfers(), default=str),
+                        media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error listing transfers: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @device_router.post("/notify", response_model=None)
 async def enable_notifications(
     request: NotificationRequest,  
@@ -539,3 +694,45 @@ async def stop_scan(ble_service: BleService = Depends(get_ble_service)):
             media_type="application/json",
             status_code=500
         )
+
+@device_router.get("/scan/live", response_model=None)
+async def get_live_devices(
+    max_age: Optional[float] = Query(None, description="Only include devices seen within this many seconds"),
+    name_prefix: Optional[str] = Query(None, description="Filter devices by name prefix")
+):
+    """Get a snapshot of the continuous scanner's device table without scanning."""
+    try:
+        from backend.modules.ble.core.scanner import get_scanner
+        scanner = get_scanner()
+        devices = scanner.get_devices(max_age=max_age, name_prefix=name_prefix)
+        return Response(content=json.dumps({
+            "status": "success",
+            "scanning": scanner.scanning,
+            "sequence": scanner.sequence,
+            "devices": devices,
+            "count": len(devices)
+        }, default=str), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error getting live devices: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@device_router.get("/scan/status", response_model=None)
+async def get_scan_status():
+    """Get the state of the continuous scanner."""
+    try:
+        from backend.modules.ble.core.scanner import get_scanner
+        return Response(content=json.dumps(get_scanner().get_status(), default=str),
+                        media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error getting scan status: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@device_router.get("/pool", response_model=None)
+async def get_connection_pool_status(ble_service: BleService = Depends(get_ble_service)):
+    """Get the state of the multi-device connection pool."""
+    try:
+        return Response(content=json.dumps(ble_service.get_connection_pool_stats(), default=str),
+                        media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error getting connection pool status: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
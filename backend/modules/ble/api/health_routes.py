@@ -21,6 +21,7 @@ from backend.modules.ble.models.ble_models import (
     DiagnosticResult, MetricsResponse, StackInfo, ResetResponse
 )
 from backend.modules.ble.core.ble_service_factory import get_ble_service
+from backend.modules.ble.utils.events import ble_event_bus
 
 # Create router
 health_router = APIRouter(prefix="/health", tags=["BLE Health & Diagnostics"])
@@ -211,6 +212,20 @@ async def get_ble_metrics(
         logger.error(f"Error getting BLE metrics: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@health_router.get("/events", response_model=None)
+async def get_event_bus_stats():
+    """
+    Get BLE event bus statistics.
+    
+    Returns per-subscription queue depth, delivery lag, drops and coalesced
+    events, to spot handlers that cannot keep up with their events.
+    """
+    try:
+        return Response(content=json.dumps(ble_event_bus.get_stats(), default=str), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error getting event bus stats: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @health_router.post("/diagnostics", response_model=None)
 async def run_diagnostics(
     request: DiagnosticRequest = None,
@@ -337,3 +352,27 @@ async def clear_metrics(
     except Exception as e:
         logger.error(f"Error clearing metrics: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+@health_router.get("/websocket", response_model=None)
+async def get_websocket_stats():
+    """
+    Get WebSocket client statistics.
+    
+    Reports each client's outbound queue depth, drop and coalesce counts and
+    send latency, plus the state of the advertisement delta stream.
+    
+    Returns:
+        Per-client queue statistics
+    """
+    try:
+        from backend.modules.ble.comms import websocket_manager, get_scan_stream
+        
+        clients = websocket_manager.get_client_stats()
+        return Response(content=json.dumps({
+            "connections": len(clients),
+            "clients": clients,
+            "scan_stream": get_scan_stream().get_stats()
+        }, default=str), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error getting WebSocket stats: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -4,16 +4,19 @@ This module provides API endpoints for managing BLE characteristic notifications
 - Subscribe/unsubscribe to characteristic notifications
 - View active notifications
 - Access notification history
+- Export the on-disk notification log
 - Real-time notifications via WebSocket
 """
 
 import logging
 from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, Body, Path, WebSocket, WebSocketDisconnect, Response
+from fastapi.responses import StreamingResponse
 import json
 
 from backend.modules.ble.core.ble_service_factory import get_ble_service
 from backend.modules.ble.core.ble_service import BleService
+from backend.modules.ble.core.exceptions import BleNotSupportedError
 from backend.modules.ble.comms import websocket_manager
 from backend.modules.ble.models.ble_models import (
     NotificationRequest, NotificationSubscription, NotificationsResult,
@@ -41,6 +44,7 @@ async def subscribe_to_characteristic(
     Parameters:
         - characteristic: UUID of the characteristic to subscribe to
         - enable: Whether to enable (true) or disable (false) notifications
+        - batch: Optional batching policy (max_batch_size, max_delay_ms, latest_only)
     
     Returns:
         Object with status information
@@ -49,9 +53,10 @@ async def subscribe_to_characteristic(
         if not ble_service.is_connected():
             raise HTTPException(status_code=400, detail="No device connected")
         
-        result = await ble_service.subscribe_to_characteristic(
+        result = await ble_service.subscribe_to_notifications(
             characteristic_uuid=request.characteristic,
-            enable=request.enable
+            enable=request.enable,
+            batch=request.batch
         )
         
         return Response(content=json.dumps({
@@ -90,7 +95,7 @@ async def unsubscribe_from_characteristic(
         request_data["enable"] = False
         unsubscribe_request = NotificationRequest(**request_data)
         
-        result = await ble_service.subscribe_to_characteristic(
+        result = await ble_service.subscribe_to_notifications(
             characteristic_uuid=unsubscribe_request.characteristic,
             enable=False
         )
@@ -140,6 +145,8 @@ async def get_active_notifications(ble_service: BleService = Depends(get_ble_ser
 async def get_notification_history(
     characteristic: Optional[str] = Query(None, description="Filter history by characteristic UUID"),
     limit: int = Query(100, description="Maximum number of events to return"),
+    start_time: Optional[float] = Query(None, description="Only events at or after this time (seconds since epoch)"),
+    end_time: Optional[float] = Query(None, description="Only events at or before this time (seconds since epoch)"),
     ble_service: BleService = Depends(get_ble_service)
 ):
     """
@@ -151,6 +158,8 @@ async def get_notification_history(
     Parameters:
         - characteristic: Optional UUID to filter by
         - limit: Maximum number of events to return (default 100)
+        - start_time: Optional inclusive lower time bound
+        - end_time: Optional inclusive upper time bound
     
     Returns:
         Object with history events and count
@@ -159,7 +168,9 @@ async def get_notification_history(
         if not ble_service.is_connected():
             raise HTTPException(status_code=400, detail="No device connected")
         
-        history_raw = ble_service.get_notification_history(characteristic, limit)
+        history_raw = await ble_service.get_notification_history(
+            characteristic, limit, start_time, end_time
+        )
         
         # Convert to Pydantic models for consistent formatting
         events = []
@@ -171,7 +182,7 @@ async def get_notification_history(
                     hex=value.get("hex", ""),
                     text=value.get("text", ""),
                     bytes=value.get("bytes", []),
-                    int=value.get("int")
+                    int_value=value.get("int_value")
                 )
             else:
                 char_value = None
@@ -198,6 +209,45 @@ async def get_notification_history(
         logger.error(f"Error getting notification history: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@notification_router.get("/history/export", response_model=None)
+async def export_notification_log(
+    characteristic: Optional[str] = Query(None, description="Filter by characteristic UUID"),
+    start_time: Optional[float] = Query(None, description="Only events at or after this time (seconds since epoch)"),
+    end_time: Optional[float] = Query(None, description="Only events at or before this time (seconds since epoch)"),
+    ble_service: BleService = Depends(get_ble_service)
+):
+    """
+    Export the on-disk notification log as JSON lines.
+    
+    Records are streamed oldest first straight from the memory-mapped log
+    segments, one JSON object per line with the payload as hex.
+    
+    Parameters:
+        - characteristic: Optional UUID to filter by
+        - start_time: Optional inclusive lower time bound
+        - end_time: Optional inclusive upper time bound
+    
+    Returns:
+        Streaming application/x-ndjson response
+    """
+    try:
+        records = ble_service.replay_notification_log(characteristic, start_time, end_time)
+    except BleNotSupportedError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error exporting notification log: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    def lines():
+        for timestamp, uuid, data in records:
+            yield json.dumps({
+                "timestamp": timestamp,
+                "characteristic_uuid": uuid,
+                "hex": data.hex()
+            }) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @notification_router.delete("/history", response_model=None)
 async def clear_notification_history(
     characteristic: Optional[str] = Query(None, description="Clear history for specific characteristic only"),
@@ -219,7 +269,7 @@ async def clear_notification_history(
         if not ble_service.is_connected():
             raise HTTPException(status_code=400, detail="No device connected")
         
-        ble_service.clear_notification_history(characteristic)
+        await ble_service.clear_notification_history(characteristic)
         
         return Response(content=json.dumps({
             "status": "success", 
@@ -258,7 +308,7 @@ async def notification_websocket(websocket: WebSocket, ble_service: BleService =
         # Add this connection to the WebSocket manager
         # The manager will handle the same functionality, but we'll register 
         # this with the BLE service as well for backward compatibility
-        websocket_manager.active_connections.add(websocket)
+        websocket_manager.register(websocket)
         
         # Also register with BLE service for backward compatibility
         ble_service.register_notification_websocket(websocket)
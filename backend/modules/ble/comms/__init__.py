@@ -31,12 +31,17 @@ from .websocket import (
     websocket_manager,
     BleWebSocketManager
 )
+from .scan_stream import ScanDeltaStream, get_scan_stream
+from .client_queue import ClientSendQueue
 
 # Export the primary interfaces
 __all__ = [
     "websocket_endpoint",
     "websocket_manager",
     "BleWebSocketManager",
+    "ScanDeltaStream",
+    "get_scan_stream",
+    "ClientSendQueue",
     "send_notification",
     "broadcast_message",
     "broadcast_model",
@@ -138,7 +143,10 @@ async def broadcast_model(model: Any) -> bool:
 # Convenience functions for common message types
 async def broadcast_scan_results(devices: List[Dict[str, Any]]) -> bool:
     """
-    Broadcast scan results to all clients.
+    Broadcast scan results to clients not on the advertisement delta stream.
+    
+    Clients subscribed with ``scan_subscribe`` already receive incremental
+    ``scan_delta`` messages, so the full list is only sent to the others.
     
     Args:
         devices: List of device information dictionaries
@@ -146,10 +154,18 @@ async def broadcast_scan_results(devices: List[Dict[str, Any]]) -> bool:
     Returns:
         True if the message was broadcast
     """
-    return await broadcast_message("scan_result", {
-        "devices": devices,
-        "count": len(devices)
-    })
+    scan_stream = get_scan_stream()
+    message = {
+        "type": "scan_result",
+        "data": {
+            "devices": devices,
+            "count": len(devices)
+        }
+    }
+    for connection in list(_ws_manager.active_connections):
+        if not scan_stream.is_subscribed(connection):
+            await _ws_manager.send_message(connection, message)
+    return True
 
 async def broadcast_connection_status(
     status: str, 
@@ -0,0 +1,228 @@
+"""
+Bounded per-client outbound queues for BLE WebSocket connections.
+
+Every connection gets a ``ClientSendQueue`` drained by a single writer task,
+so a slow client only delays its own messages and messages to one client are
+always sent in the order they were queued. When a queue is full the
+configured overflow policy decides what happens:
+
+- ``drop_oldest``: discard the oldest queued message
+- ``coalesce``: replace a queued message with the same key (e.g. the latest
+  value of a characteristic), otherwise discard the oldest message
+- ``disconnect``: close the connection
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+# Overflow policies
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+DISCONNECT = "disconnect"
+
+OVERFLOW_POLICIES = (DROP_OLDEST, COALESCE, DISCONNECT)
+
+
+class ClientSendQueue:
+    """Bounded outbound message queue with a single writer task."""
+
+    def __init__(
+        self,
+        websocket,
+        max_size: int = 256,
+        overflow_policy: str = DROP_OLDEST,
+        send_timeout: Optional[float] = 10.0,
+        on_close: Optional[Callable[[Any], None]] = None
+    ):
+        """
+        Initialize the send queue.
+
+        Args:
+            websocket: WebSocket connection to write to
+            max_size: Maximum number of queued messages
+            overflow_policy: One of ``drop_oldest``, ``coalesce`` or ``disconnect``
+            send_timeout: Seconds a single send may take before the client is dropped
+            on_close: Callback invoked with the websocket when the queue closes itself
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.websocket = websocket
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self.send_timeout = send_timeout
+        self.on_close = on_close
+        self.closed = False
+
+        # Each entry is [key, message, enqueued_at]; keyed entries are indexed for coalescing
+        self._entries: deque = deque()
+        self._keyed: Dict[Hashable, list] = {}
+        self._ready = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self._send_latencies: deque = deque(maxlen=256)
+        self._queue_latencies: deque = deque(maxlen=256)
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer())
+
+    def put(self, message: Any, key: Optional[Hashable] = None) -> bool:
+        """
+        Queue a message without blocking.
+
+        Args:
+            message: JSON-serializable message
+            key: Optional coalescing key (only used by the ``coalesce`` policy)
+
+        Returns:
+            False if the queue is closed or the message caused a disconnect
+        """
+        if self.closed:
+            return False
+
+        now = time.perf_counter()
+
+        if self.overflow_policy == COALESCE and key is not None:
+            entry = self._keyed.get(key)
+            if entry is not None:
+                # Keep the original position so ordering with other keys is preserved
+                entry[1] = message
+                self.coalesced += 1
+                return True
+
+        if len(self._entries) >= self.max_size:
+            if self.overflow_policy == DISCONNECT:
+                logger.warning(f"Send queue overflow ({self.max_size}), disconnecting client")
+                self.close(notify=True)
+                return False
+            self._drop_oldest()
+
+        entry = [key, message, now]
+        self._entries.append(entry)
+        if key is not None and self.overflow_policy == COALESCE:
+            self._keyed[key] = entry
+
+        self.enqueued += 1
+        if len(self._entries) > self.max_depth:
+            self.max_depth = len(self._entries)
+        self._ready.set()
+        return True
+
+    def _drop_oldest(self) -> None:
+        """Discard the oldest queued message."""
+        self._pop()
+        self.dropped += 1
+
+    def _pop(self) -> list:
+        """Remove and return the next entry."""
+        entry = self._entries.popleft()
+        key = entry[0]
+        if key is not None and self._keyed.get(key) is entry:
+            del self._keyed[key]
+        return entry
+
+    async def _writer(self) -> None:
+        """Send queued messages in order until the queue is closed."""
+        try:
+            while not self.closed:
+                if not self._entries:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+
+                _, message, enqueued_at = self._pop()
+                started = time.perf_counter()
+                if isinstance(message, (str, bytes)):
+                    send = self.websocket.send_text(message) if isinstance(message, str) \
+                        else self.websocket.send_bytes(message)
+                else:
+                    send = self.websocket.send_json(message)
+
+                if self.send_timeout:
+                    await asyncio.wait_for(send, timeout=self.send_timeout)
+                else:
+                    await send
+
+                finished = time.perf_counter()
+                self._queue_latencies.append(started - enqueued_at)
+                self._send_latencies.append(finished - started)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Error writing to WebSocket client, closing queue: {e}")
+            self.close(notify=True)
+
+    def close(self, notify: bool = False) -> None:
+        """
+        Close the queue and stop the writer task.
+
+        Args:
+            notify: Whether to invoke the ``on_close`` callback
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._entries.clear()
+        self._keyed.clear()
+        self._ready.set()
+
+        if self._writer_task and self._writer_task is not asyncio.current_task():
+            self._writer_task.cancel()
+
+        if notify and self.on_close:
+            try:
+                self.on_close(self.websocket)
+            except Exception as e:
+                logger.error(f"Error in send queue close callback: {e}")
+
+    @property
+    def depth(self) -> int:
+        """Number of queued messages."""
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics.
+
+        Returns:
+            Dictionary with depth, counters and latency summaries in milliseconds
+        """
+        return {
+            "depth": len(self._entries),
+            "max_depth": self.max_depth,
+            "max_size": self.max_size,
+            "overflow_policy": self.overflow_policy,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "closed": self.closed,
+            "send_latency_ms": _summarize(self._send_latencies),
+            "queue_latency_ms": _summarize(self._queue_latencies)
+        }
+
+
+def _summarize(samples: deque) -> Dict[str, Optional[float]]:
+    """Summarize latency samples (seconds) as milliseconds."""
+    if not samples:
+        return {"avg": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "avg": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3)
+    }
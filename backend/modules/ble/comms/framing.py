@@ -0,0 +1,332 @@
+"""
+Notification frame formats for BLE WebSocket clients.
+
+Clients choose a frame format when they connect, using query parameters on
+the WebSocket URL:
+
+    /api/ble/ws?format=binary
+    /api/ble/ws?format=msgpack&fields=int_value
+    /api/ble/ws?format=json&fields=hex
+
+Formats:
+- ``json`` (default): text frames with the decoded value, as before
+- ``msgpack``: MessagePack map with the raw payload bytes (needs ``msgpack``)
+- ``binary``: fixed 28-byte little-endian header followed by the raw payload
+
+Binary header layout (``<BBHd16s``):
+
+    version (u8) | frame type (u8) | payload length (u16) | timestamp (f64) | characteristic UUID (16 bytes)
+
+A batch of notifications is sent as the concatenation of one such record per
+sample in a single binary message.
+
+Decoded representations (``hex``, ``text``, ``bytes``, ``int_value``) are only
+computed when a client asks for them with ``fields``. JSON clients get all of
+them by default for backward compatibility; msgpack clients get none.
+"""
+
+import logging
+import struct
+import uuid
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable
+
+from bleak.uuids import normalize_uuid_str
+
+from backend.ws.serialization import encode_message
+
+logger = logging.getLogger(__name__)
+
+# Try to import MessagePack with fallback
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+# Frame formats
+FORMAT_JSON = "json"
+FORMAT_MSGPACK = "msgpack"
+FORMAT_BINARY = "binary"
+FRAME_FORMATS = (FORMAT_JSON, FORMAT_MSGPACK, FORMAT_BINARY)
+
+# Decoded value representations
+REPRESENTATIONS = ("hex", "text", "bytes", "int_value")
+
+# Binary frame header
+BINARY_HEADER = struct.Struct("<BBHd16s")
+FRAME_VERSION = 1
+FRAME_TYPE_NOTIFICATION = 1
+
+class FramingOptions:
+    """Frame format and requested value representations for one client."""
+
+    __slots__ = ("format", "representations")
+
+    def __init__(self, frame_format: str = FORMAT_JSON, representations: Optional[Tuple[str, ...]] = None):
+        self.format = frame_format
+        if representations is None:
+            representations = REPRESENTATIONS if frame_format == FORMAT_JSON else ()
+        self.representations = tuple(r for r in REPRESENTATIONS if r in representations)
+
+    @property
+    def key(self) -> Tuple[str, Tuple[str, ...]]:
+        """Key identifying clients that receive identical frames."""
+        return (self.format, self.representations)
+
+    @classmethod
+    def from_query(cls, query_params) -> "FramingOptions":
+        """
+        Negotiate framing from WebSocket query parameters.
+
+        Falls back to JSON when the requested format is unknown or its
+        encoder is not installed.
+
+        Args:
+            query_params: Mapping with optional ``format`` and ``fields`` keys
+
+        Returns:
+            Negotiated framing options
+        """
+        requested = (query_params.get("format") or FORMAT_JSON).lower()
+        if requested not in FRAME_FORMATS:
+            logger.warning(f"Unknown frame format requested: {requested}, using json")
+            requested = FORMAT_JSON
+        elif requested == FORMAT_MSGPACK and not MSGPACK_AVAILABLE:
+            logger.warning("msgpack requested but not installed, using json")
+            requested = FORMAT_JSON
+
+        fields = query_params.get("fields")
+        representations = None
+        if fields is not None:
+            representations = tuple(f.strip() for f in fields.split(",") if f.strip())
+        return cls(requested, representations)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Describe the negotiated framing for the client."""
+        return {"format": self.format, "fields": list(self.representations)}
+
+
+def decode_value(data: Union[bytes, bytearray], representations=REPRESENTATIONS) -> Dict[str, Any]:
+    """
+    Compute the requested decoded representations of a value.
+
+    Args:
+        data: Raw characteristic value
+        representations: Representations to compute
+
+    Returns:
+        Dictionary with one entry per requested representation
+    """
+    value = {}
+    for representation in representations:
+        if representation == "hex":
+            value["hex"] = data.hex() if data else ""
+        elif representation == "text":
+            value["text"] = _try_decode_bytes(data)
+        elif representation == "bytes":
+            value["bytes"] = list(data) if data else []
+        elif representation == "int_value":
+            value["int_value"] = _try_convert_to_int(data)
+    return value
+
+
+@lru_cache(maxsize=256)
+def uuid_to_bytes(characteristic_uuid: str) -> bytes:
+    """Convert a (possibly short) UUID string to its 16-byte form."""
+    try:
+        return uuid.UUID(normalize_uuid_str(characteristic_uuid.strip())).bytes
+    except ValueError:
+        return bytes(16)
+
+
+@lru_cache(maxsize=256)
+def normalize_uuid(characteristic_uuid: str) -> str:
+    """
+    Canonical form of a (possibly short) UUID: lowercase, full 128 bits.
+
+    Strings that are not UUIDs are returned unchanged.
+    """
+    try:
+        return normalize_uuid_str(characteristic_uuid.strip())
+    except ValueError:
+        return characteristic_uuid
+
+
+def encode_binary_notification(characteristic_uuid: str, data: bytes, timestamp: float) -> bytes:
+    """
+    Encode a notification as a fixed header plus the raw payload.
+
+    Args:
+        characteristic_uuid: Characteristic UUID
+        data: Raw notification payload
+        timestamp: Notification time (seconds since epoch)
+
+    Returns:
+        Binary frame
+    """
+    payload = bytes(data or b"")
+    header = BINARY_HEADER.pack(
+        FRAME_VERSION, FRAME_TYPE_NOTIFICATION, len(payload),
+        timestamp, uuid_to_bytes(characteristic_uuid)
+    )
+    return header + payload
+
+
+def decode_binary_notification(frame: bytes) -> Dict[str, Any]:
+    """
+    Decode a binary notification frame (mainly for tests and Python clients).
+
+    Args:
+        frame: Binary frame
+
+    Returns:
+        Dictionary with characteristic UUID, timestamp and raw data
+    """
+    version, frame_type, length, timestamp, uuid_bytes = BINARY_HEADER.unpack_from(frame)
+    offset = BINARY_HEADER.size
+    return {
+        "version": version,
+        "frame_type": frame_type,
+        "characteristic_uuid": str(uuid.UUID(bytes=uuid_bytes)),
+        "timestamp": timestamp,
+        "data": bytes(frame[offset:offset + length])
+    }
+
+
+def decode_binary_notifications(frame: bytes) -> List[Dict[str, Any]]:
+    """
+    Decode all notification records in a binary message.
+
+    Args:
+        frame: Binary message containing one or more records
+
+    Returns:
+        List of decoded notifications
+    """
+    notifications = []
+    offset = 0
+    view = memoryview(frame)
+    while offset + BINARY_HEADER.size <= len(frame):
+        notification = decode_binary_notification(view[offset:])
+        notifications.append(notification)
+        offset += BINARY_HEADER.size + len(notification["data"])
+    return notifications
+
+
+class NotificationFrames:
+    """
+    Encodes a single notification lazily, once per distinct client framing.
+
+    Args:
+        characteristic_uuid: Characteristic UUID
+        data: Raw notification payload
+        timestamp: Notification time
+        json_builder: Builds the JSON message from the decoded value dict
+    """
+
+    __slots__ = ("characteristic_uuid", "data", "timestamp", "json_builder", "_frames")
+
+    def __init__(
+        self,
+        characteristic_uuid: str,
+        data: bytes,
+        timestamp: float,
+        json_builder: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ):
+        self.characteristic_uuid = characteristic_uuid
+        self.data = bytes(data or b"")
+        self.timestamp = timestamp
+        self.json_builder = json_builder
+        self._frames: Dict[Tuple, Union[str, bytes]] = {}
+
+    def frame_for(self, options: FramingOptions) -> Union[str, bytes]:
+        """Get the encoded frame for a client's framing options."""
+        frame = self._frames.get(options.key)
+        if frame is None:
+            frame = self._encode(options)
+            self._frames[options.key] = frame
+        return frame
+
+    def _encode(self, options: FramingOptions) -> Union[str, bytes]:
+        if options.format == FORMAT_BINARY:
+            return encode_binary_notification(self.characteristic_uuid, self.data, self.timestamp)
+
+        value = decode_value(self.data, options.representations)
+        if options.format == FORMAT_MSGPACK:
+            message = {
+                "type": "notification",
+                "characteristic": self.characteristic_uuid,
+                "timestamp": self.timestamp,
+                "data": self.data
+            }
+            message.update(value)
+            return msgpack.packb(message, use_bin_type=True)
+
+        return encode_message(self.json_builder(value))
+
+
+def _try_decode_bytes(value: bytes) -> str:
+    """Try to decode bytes to UTF-8 string."""
+    if not value:
+        return ""
+    try:
+        return bytes(value).decode('utf-8')
+    except UnicodeDecodeError:
+        return "(binary data)"
+
+
+def _try_convert_to_int(value: bytes) -> Optional[int]:
+    """Try to convert bytes to integer value."""
+    if not value or len(value) not in [1, 2, 4, 8]:
+        return None
+    return int.from_bytes(value, byteorder='little', signed=False)
+
+
+class NotificationBatchFrames(NotificationFrames):
+    """
+    Encodes a batch of notifications for one characteristic as a single message.
+
+    Args:
+        characteristic_uuid: Characteristic UUID
+        samples: List of ``(timestamp, data)`` tuples, oldest first
+        json_builder: Builds the JSON message from the list of sample dicts
+    """
+
+    __slots__ = ("samples",)
+
+    def __init__(
+        self,
+        characteristic_uuid: str,
+        samples: List[Tuple[float, bytes]],
+        json_builder: Callable[[List[Dict[str, Any]]], Dict[str, Any]]
+    ):
+        last_timestamp, last_data = samples[-1]
+        super().__init__(characteristic_uuid, last_data, last_timestamp, json_builder)
+        self.samples = samples
+
+    def _encode(self, options: FramingOptions) -> Union[str, bytes]:
+        if options.format == FORMAT_BINARY:
+            return b"".join(
+                encode_binary_notification(self.characteristic_uuid, data, timestamp)
+                for timestamp, data in self.samples
+            )
+
+        if options.format == FORMAT_MSGPACK:
+            message = {
+                "type": "notification_batch",
+                "characteristic": self.characteristic_uuid,
+                "timestamps": [timestamp for timestamp, _ in self.samples],
+                "data": [bytes(data) for _, data in self.samples]
+            }
+            if options.representations:
+                message["values"] = [
+                    decode_value(data, options.representations) for _, data in self.samples
+                ]
+            return msgpack.packb(message, use_bin_type=True)
+
+        return encode_message(self.json_builder([
+            {"timestamp": timestamp, "value": decode_value(data, options.representations)}
+            for timestamp, data in self.samples
+        ]))
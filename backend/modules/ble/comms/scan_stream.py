@@ -0,0 +1,369 @@
+"""
+BLE advertisement delta stream for WebSocket clients.
+
+Instead of pushing the full device list to every client on every scan, the
+stream follows the continuous scanner's device table and sends each client
+only what changed since its last message:
+
+    {"type": "scan_delta", "seq": 42, "added": [...], "changed": [...], "expired": [...]}
+
+Each client has its own sequence number. When a client sees a gap it sends
+``scan_resync`` and receives a full ``scan_snapshot``; the server also forces a
+snapshot when it detects that deltas were dropped upstream. RSSI-only changes
+below a client's ``rssi_threshold`` are suppressed, and messages are rate
+limited to ``max_rate`` per second with changes coalesced by address in
+between, so bandwidth follows the change rate rather than the population.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+from backend.modules.ble.config import get_config
+from backend.modules.ble.core.scanner import get_scanner, DEVICE_EXPIRED
+from backend.modules.ble.models.ble_models import MessageType
+
+logger = logging.getLogger(__name__)
+
+# Fields that are always included in a "changed" entry
+_CHANGED_BASE_FIELDS = ("address", "rssi", "last_seen")
+# Fields included in a "changed" entry only when their value changed
+_CHANGED_OPTIONAL_FIELDS = ("name", "tx_power", "metadata")
+
+
+class ScanStreamClient:
+    """Per-client delta stream state."""
+
+    __slots__ = (
+        "client_id", "send", "rssi_threshold", "max_rate", "seq", "known",
+        "pending", "needs_resync", "wakeup", "task", "messages_sent",
+        "suppressed"
+    )
+
+    def __init__(
+        self,
+        client_id: Any,
+        send: Callable[[Dict[str, Any]], Awaitable[Any]],
+        rssi_threshold: float,
+        max_rate: float
+    ):
+        self.client_id = client_id
+        self.send = send
+        self.rssi_threshold = rssi_threshold
+        self.max_rate = max_rate
+        self.seq = 0
+        self.known: Dict[str, Dict[str, Any]] = {}    # Address -> last device state sent
+        self.pending: Dict[str, tuple] = {}           # Address -> (kind, device) not yet sent
+        self.needs_resync = True
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.messages_sent = 0
+        self.suppressed = 0
+
+    @property
+    def min_interval(self) -> float:
+        """Minimum seconds between messages for this client."""
+        return 1.0 / self.max_rate if self.max_rate and self.max_rate > 0 else 0.0
+
+
+class ScanDeltaStream:
+    """Fans out scanner device-table deltas to subscribed WebSocket clients."""
+
+    def __init__(self, scanner=None):
+        """
+        Initialize the delta stream.
+
+        Args:
+            scanner: Optional scanner instance (defaults to the shared scanner)
+        """
+        self.scanner = scanner or get_scanner()
+        self.max_batch = get_config("websocket.scan_stream.max_batch", 500)
+        self._clients: Dict[Any, ScanStreamClient] = {}
+        self._pump_task: Optional[asyncio.Task] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._last_sequence = 0
+
+    # ======================================================================
+    # Client management
+    # ======================================================================
+
+    async def subscribe(
+        self,
+        client_id: Any,
+        send: Callable[[Dict[str, Any]], Awaitable[Any]],
+        rssi_threshold: Optional[float] = None,
+        max_rate: Optional[float] = None
+    ) -> ScanStreamClient:
+        """
+        Subscribe a client to the delta stream, or update its settings.
+
+        The client receives a snapshot first and deltas afterwards.
+
+        Args:
+            client_id: Key identifying the client (usually the WebSocket)
+            send: Coroutine function used to deliver a message to the client
+            rssi_threshold: Minimum RSSI change (dBm) reported for RSSI-only updates
+            max_rate: Maximum messages per second
+
+        Returns:
+            The client's stream state
+        """
+        if rssi_threshold is None:
+            rssi_threshold = get_config("websocket.scan_stream.rssi_threshold", 3)
+        if max_rate is None:
+            max_rate = get_config("websocket.scan_stream.max_rate", 2.0)
+
+        client = self._clients.get(client_id)
+        if client is not None:
+            client.send = send
+            client.rssi_threshold = float(rssi_threshold)
+            client.max_rate = float(max_rate)
+            return client
+
+        # Keep any filters a running scan already has
+        if not self.scanner.scanning:
+            await self.scanner.start()
+
+        client = ScanStreamClient(client_id, send, float(rssi_threshold), float(max_rate))
+        self._clients[client_id] = client
+
+        if self._pump_task is None or self._pump_task.done():
+            self._queue = self.scanner.subscribe()
+            self._last_sequence = self.scanner.sequence
+            self._pump_task = asyncio.create_task(self._pump())
+
+        client.task = asyncio.create_task(self._client_loop(client))
+        client.wakeup.set()
+
+        logger.info(f"Scan stream client subscribed (threshold={rssi_threshold}dBm, rate={max_rate}/s), "
+                    f"total clients: {len(self._clients)}")
+        return client
+
+    def unsubscribe(self, client_id: Any) -> None:
+        """
+        Remove a client from the delta stream.
+
+        Args:
+            client_id: Key used when subscribing
+        """
+        client = self._clients.pop(client_id, None)
+        if client is None:
+            return
+        if client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+        if not self._clients:
+            self._stop_pump()
+
+        logger.info(f"Scan stream client unsubscribed, remaining clients: {len(self._clients)}")
+
+    def request_resync(self, client_id: Any) -> bool:
+        """
+        Ask for a full snapshot to be sent to a client.
+
+        Args:
+            client_id: Key used when subscribing
+
+        Returns:
+            True if the client is subscribed
+        """
+        client = self._clients.get(client_id)
+        if client is None:
+            return False
+        client.needs_resync = True
+        client.wakeup.set()
+        return True
+
+    def is_subscribed(self, client_id: Any) -> bool:
+        """Check whether a client is subscribed to the delta stream."""
+        return client_id in self._clients
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get delta stream statistics.
+
+        Returns:
+            Dictionary with per-client counters
+        """
+        return {
+            "clients": len(self._clients),
+            "scanner_sequence": self.scanner.sequence,
+            "per_client": [
+                {
+                    "seq": client.seq,
+                    "known_devices": len(client.known),
+                    "pending": len(client.pending),
+                    "messages_sent": client.messages_sent,
+                    "suppressed": client.suppressed,
+                    "rssi_threshold": client.rssi_threshold,
+                    "max_rate": client.max_rate
+                }
+                for client in self._clients.values()
+            ]
+        }
+
+    # ======================================================================
+    # Delta processing
+    # ======================================================================
+
+    def _stop_pump(self) -> None:
+        """Stop consuming scanner deltas."""
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+            self._pump_task = None
+        if self._queue is not None:
+            self.scanner.unsubscribe(self._queue)
+            self._queue = None
+
+    async def _pump(self) -> None:
+        """Distribute scanner deltas to each client's pending set."""
+        queue = self._queue
+        try:
+            while True:
+                kind, device = await queue.get()
+                sequence = device.get("sequence", 0)
+                # The scanner numbers every change, so a gap means deltas were dropped
+                gap = sequence != self._last_sequence + 1
+                self._last_sequence = sequence
+
+                for client in self._clients.values():
+                    if gap:
+                        client.needs_resync = True
+                    elif not client.needs_resync:
+                        client.pending[device["address"]] = (kind, device)
+                    client.wakeup.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in scan stream pump: {e}", exc_info=True)
+
+    async def _client_loop(self, client: ScanStreamClient) -> None:
+        """Send snapshots and rate-limited deltas to a single client."""
+        try:
+            while True:
+                await client.wakeup.wait()
+                client.wakeup.clear()
+
+                if client.needs_resync:
+                    message = self.build_snapshot(client)
+                else:
+                    message = self.build_delta(client)
+
+                if message is not None:
+                    await client.send(message)
+                    client.messages_sent += 1
+
+                if client.pending:
+                    client.wakeup.set()
+
+                if client.min_interval:
+                    await asyncio.sleep(client.min_interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Scan stream send failed, unsubscribing client: {e}")
+            self.unsubscribe(client.client_id)
+
+    def build_snapshot(self, client: ScanStreamClient) -> Dict[str, Any]:
+        """
+        Build a full snapshot and reset the client's known state.
+
+        Args:
+            client: Client stream state
+
+        Returns:
+            Snapshot message
+        """
+        devices = self.scanner.get_devices()
+        client.known = {device["address"]: device for device in devices}
+        client.pending = {}
+        client.needs_resync = False
+        client.seq += 1
+        return {
+            "type": MessageType.SCAN_SNAPSHOT.value,
+            "seq": client.seq,
+            "devices": devices,
+            "count": len(devices),
+            "timestamp": int(time.time() * 1000)
+        }
+
+    def build_delta(self, client: ScanStreamClient) -> Optional[Dict[str, Any]]:
+        """
+        Build a delta from the client's pending changes.
+
+        Args:
+            client: Client stream state
+
+        Returns:
+            Delta message, or None if nothing significant changed
+        """
+        if not client.pending:
+            return None
+
+        added, changed, expired = [], [], []
+        processed = 0
+        for address in list(client.pending):
+            if processed >= self.max_batch:
+                break
+            kind, device = client.pending.pop(address)
+            processed += 1
+
+            previous = client.known.get(address)
+            if kind == DEVICE_EXPIRED:
+                if previous is not None:
+                    del client.known[address]
+                    expired.append(address)
+            elif previous is None:
+                client.known[address] = device
+                added.append(device)
+            else:
+                entry = self._diff(previous, device, client.rssi_threshold)
+                if entry is None:
+                    client.suppressed += 1
+                    continue
+                client.known[address] = device
+                changed.append(entry)
+
+        if not (added or changed or expired):
+            return None
+
+        client.seq += 1
+        return {
+            "type": MessageType.SCAN_DELTA.value,
+            "seq": client.seq,
+            "added": added,
+            "changed": changed,
+            "expired": expired,
+            "timestamp": int(time.time() * 1000)
+        }
+
+    @staticmethod
+    def _diff(
+        previous: Dict[str, Any], device: Dict[str, Any], rssi_threshold: float
+    ) -> Optional[Dict[str, Any]]:
+        """Return a compact change entry, or None if the change is below threshold."""
+        entry = {field: device.get(field) for field in _CHANGED_BASE_FIELDS}
+        for field in _CHANGED_OPTIONAL_FIELDS:
+            if device.get(field) != previous.get(field):
+                entry[field] = device.get(field)
+
+        if len(entry) > len(_CHANGED_BASE_FIELDS):
+            return entry
+
+        old_rssi, new_rssi = previous.get("rssi"), device.get("rssi")
+        if old_rssi is None or new_rssi is None:
+            return entry if old_rssi != new_rssi else None
+        if abs(new_rssi - old_rssi) >= rssi_threshold:
+            return entry
+        return None
+
+# Singleton instance
+_scan_stream = None
+
+def get_scan_stream() -> ScanDeltaStream:
+    """Get the singleton scan delta stream."""
+    global _scan_stream
+    if _scan_stream is None:
+        _scan_stream = ScanDeltaStream()
+    return _scan_stream
@@ -8,12 +8,15 @@ from typing import Dict, List, Any, Set, Optional, Callable, Union
 from fastapi import WebSocket, WebSocketDisconnect
 
 from backend.modules.ble.core.device_manager import BleDeviceManager
-from backend.modules.ble.config import BLE_CONFIG
+from backend.modules.ble.config import BLE_CONFIG, get_config
+from .scan_stream import get_scan_stream
+from .client_queue import ClientSendQueue
+from .framing import FramingOptions, NotificationFrames, NotificationBatchFrames
 # Import the Pydantic models
 from backend.modules.ble.models.ble_models import (
     MessageType, BaseMessage, ScanRequestMessage, ScanResultMessage,
     ConnectRequestMessage, ConnectResultMessage, ConnectionStatus,
-    CharacteristicValue, ReadResult, WriteParams, NotificationMessage,
+    CharacteristicValue, ReadResult, WriteParams, GattOperation, NotificationMessage,
     PingMessage, PongMessage, ErrorMessage, ScanParams, ConnectionParams
 )
 
@@ -76,6 +79,7 @@ async def websocket_endpoint(websocket: WebSocket):
         # Clean up on disconnection
         if websocket in active_connections:
             active_connections.remove(websocket)
+        get_scan_stream().unsubscribe(websocket)
         logger.info(f"WebSocket connection closed. Active connections: {len(active_connections)}")
 
 async def process_message(websocket: WebSocket, message: Dict[str, Any]):
@@ -93,7 +97,10 @@ async def process_message(websocket: WebSocket, message: Dict[str, Any]):
             "disconnect_request": handle_disconnect_request,
             "get_services": handle_get_services,
             "connection_status": handle_connection_status,  # Add handler for connection_status
-            "reconnect_request": handle_reconnect_request  # Add handler for reconnection requests
+            "reconnect_request": handle_reconnect_request,  # Add handler for reconnection requests
+            "scan_subscribe": handle_scan_subscribe,
+            "scan_unsubscribe": handle_scan_unsubscribe,
+            "scan_resync": handle_scan_resync
         }
         
         # Call the appropriate handler if it exists
@@ -155,7 +162,7 @@ async def handle_scan_request(websocket: WebSocket, message: Dict[str, Any]):
         # Get scan parameters using the correct field names
         scan_time = message.get("scan_time", 10.0)  # Changed from timeout to scan_time
         service_uuids = message.get("service_uuids", None)
-        continuous = message.get("continuous", False)
+        continuous = message.get("continuous", True)
         
         # Send acknowledgment
         await websocket.send_json({
@@ -168,20 +175,19 @@ async def handle_scan_request(websocket: WebSocket, message: Dict[str, Any]):
         from backend.modules.ble.core.ble_service import get_ble_service
         ble_service = get_ble_service()
         
-        # Use scan_for_devices with correct parameter names
-        result = await ble_service.scan_for_devices(
-            scan_time=scan_time,  # Changed from timeout to scan_time
+        # Reads the live device table when the continuous scanner is running
+        devices = await ble_service.scan_devices(
+            scan_time=scan_time,
             active=True,
             service_uuids=service_uuids,
-            mock=None,
-            real_scan=True
+            continuous=continuous
         )
         
         # Send results
         await websocket.send_json({
             "type": "scan_results",
-            "devices": result.get("devices", []),
-            "count": len(result.get("devices", [])),
+            "devices": devices,
+            "count": len(devices),
             "timestamp": int(time.time() * 1000)
         })
     except Exception as e:
@@ -193,6 +199,38 @@ async def handle_scan_request(websocket: WebSocket, message: Dict[str, Any]):
             "timestamp": int(time.time() * 1000)
         })
 
+async def handle_scan_subscribe(websocket: WebSocket, message: Dict[str, Any]):
+    """Subscribe the client to the advertisement delta stream."""
+    try:
+        await get_scan_stream().subscribe(
+            websocket,
+            websocket.send_json,
+            rssi_threshold=message.get("rssi_threshold"),
+            max_rate=message.get("max_rate")
+        )
+    except Exception as e:
+        logger.error(f"Error handling scan subscribe: {e}")
+        await websocket.send_json({
+            "type": "error",
+            "context": "scan_subscribe",
+            "message": str(e),
+            "timestamp": int(time.time() * 1000)
+        })
+
+async def handle_scan_unsubscribe(websocket: WebSocket, message: Dict[str, Any]):
+    """Unsubscribe the client from the advertisement delta stream."""
+    get_scan_stream().unsubscribe(websocket)
+
+async def handle_scan_resync(websocket: WebSocket, message: Dict[str, Any]):
+    """Send a full snapshot after the client detected a sequence gap."""
+    if not get_scan_stream().request_resync(websocket):
+        await websocket.send_json({
+            "type": "error",
+            "context": "scan_resync",
+            "message": "Not subscribed to the scan stream",
+            "timestamp": int(time.time() * 1000)
+        })
+
 from backend.modules.ble.core.ble_service_factory import get_ble_service
 
 async def handle_connect_request(websocket: WebSocket, message: Dict[str, Any]):
@@ -322,6 +360,9 @@ class BleWebSocketManager:
     - Client connections
     - Message dispatching
     - Event broadcasting
+    
+    Outbound messages go through a bounded per-client ``ClientSendQueue``
+    drained by one writer task, so a slow client cannot stall the others.
     """
     
     def __init__(self):
@@ -336,9 +377,13 @@ class BleWebSocketManager:
             MessageType.GET_CHARACTERISTICS: self._handle_get_characteristics,
             MessageType.READ_CHARACTERISTIC: self._handle_read_characteristic,
             MessageType.WRITE_CHARACTERISTIC: self._handle_write_characteristic,
+            MessageType.GATT_BATCH: self._handle_gatt_batch,
             MessageType.SUBSCRIBE: self._handle_subscribe,
             MessageType.UNSUBSCRIBE: self._handle_unsubscribe,
             MessageType.PING: self._handle_ping,
+            MessageType.SCAN_SUBSCRIBE: self._handle_scan_subscribe,
+            MessageType.SCAN_UNSUBSCRIBE: self._handle_scan_unsubscribe,
+            MessageType.SCAN_RESYNC: self._handle_scan_resync,
             "get_adapter_info": self._handle_get_adapter_info,  # Legacy support
         }
         
@@ -348,6 +393,13 @@ class BleWebSocketManager:
         # Track device notifications
         self._active_notifications: Dict[str, List[WebSocket]] = {}
         
+        # Outbound send queues and negotiated notification framing by client
+        self._send_queues: Dict[WebSocket, ClientSendQueue] = {}
+        self._client_framing: Dict[WebSocket, FramingOptions] = {}
+        self.queue_size = get_config("websocket.send_queue.max_size", 256)
+        self.overflow_policy = get_config("websocket.send_queue.overflow_policy", "drop_oldest")
+        self.send_timeout = get_config("websocket.send_queue.send_timeout", 10.0)
+        
         logger.info("BLE WebSocket manager initialized")
         
     def _get_device_manager(self) -> BleDeviceManager:
@@ -370,17 +422,60 @@ class BleWebSocketManager:
                 
         return self.device_manager
         
+    def register(self, websocket: WebSocket, overflow_policy: Optional[str] = None) -> ClientSendQueue:
+        """
+        Register an accepted WebSocket and start its send queue.
+        
+        Args:
+            websocket: Accepted WebSocket connection
+            overflow_policy: Optional per-client overflow policy override
+            
+        Returns:
+            The client's send queue
+        """
+        self.active_connections.add(websocket)
+        self._client_subscriptions.setdefault(websocket, [])
+        
+        if websocket not in self._client_framing:
+            query_params = getattr(websocket, "query_params", None) or {}
+            self._client_framing[websocket] = FramingOptions.from_query(query_params)
+        
+        send_queue = self._send_queues.get(websocket)
+        if send_queue is None or send_queue.closed:
+            send_queue = ClientSendQueue(
+                websocket,
+                max_size=self.queue_size,
+                overflow_policy=overflow_policy or self.overflow_policy,
+                send_timeout=self.send_timeout,
+                on_close=self._handle_queue_closed
+            )
+            self._send_queues[websocket] = send_queue
+            send_queue.start()
+        return send_queue
+    
+    def _handle_queue_closed(self, websocket: WebSocket):
+        """Drop a client whose send queue overflowed or failed."""
+        self.disconnect(websocket)
+        asyncio.create_task(self._close_websocket(websocket))
+    
+    async def _close_websocket(self, websocket: WebSocket):
+        """Close a WebSocket, ignoring errors from already-closed sockets."""
+        try:
+            await websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
+    
     async def connect(self, websocket: WebSocket):
         """Handle a new WebSocket connection."""
         await websocket.accept()
-        self.active_connections.add(websocket)
-        self._client_subscriptions[websocket] = []
+        self.register(websocket)
         
-        # Send initial status message
+        # Send initial status message, including the negotiated framing
         await self.send_message(websocket, {
             "type": MessageType.CONNECTION_STATUS,
             "status": ConnectionStatus.CONNECTED,
-            "message": "WebSocket connected"
+            "message": "WebSocket connected",
+            "framing": self._client_framing[websocket].to_dict()
         })
         
         # Send adapter status
@@ -399,6 +494,12 @@ class BleWebSocketManager:
         """Handle WebSocket disconnection."""
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        get_scan_stream().unsubscribe(websocket)
+        
+        send_queue = self._send_queues.pop(websocket, None)
+        if send_queue:
+            send_queue.close()
+        self._client_framing.pop(websocket, None)
             
         # Clean up subscriptions for this client
         if websocket in self._client_subscriptions:
@@ -427,32 +528,153 @@ class BleWebSocketManager:
         
         # Convert Pydantic models to dict if needed
         if hasattr(message, "dict"):
-            message = message.model_dump()
+            message = message.model_dump(mode="json")
             
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.warning(f"Failed to broadcast to client: {e}")
-                disconnected.add(connection)
-                
-        # Clean up any disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
+        # Queue for every client; writer tasks do the actual sends
+        for connection in list(self.active_connections):
+            self.enqueue(connection, message)
+    
+    def broadcast_notification(
+        self,
+        characteristic_uuid: str,
+        data: bytes,
+        timestamp: Optional[float] = None,
+        targets: Optional[List[WebSocket]] = None,
+        json_builder: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    ) -> int:
+        """
+        Queue a characteristic notification for clients in their negotiated format.
+        
+        The notification is encoded at most once per distinct framing, and
+        decoded representations are only computed for clients that asked
+        for them.
+        
+        Args:
+            characteristic_uuid: Characteristic UUID
+            data: Raw notification payload
+            timestamp: Notification time (defaults to now)
+            targets: Recipients (defaults to all connected clients)
+            json_builder: Builds the JSON message from the decoded value
+            
+        Returns:
+            Number of clients the notification was queued for
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if json_builder is None:
+            json_builder = lambda value: {
+                "type": MessageType.NOTIFICATION.value,
+                "characteristic_uuid": characteristic_uuid,
+                "value": value,
+                "timestamp": timestamp
+            }
+        
+        frames = NotificationFrames(characteristic_uuid, data, timestamp, json_builder)
+        return self._queue_frames(frames, targets, key=f"notification:{characteristic_uuid}")
+    
+    def broadcast_notification_batch(
+        self,
+        characteristic_uuid: str,
+        samples: List[tuple],
+        targets: Optional[List[WebSocket]] = None,
+        json_builder: Optional[Callable[[List[Dict[str, Any]]], Dict[str, Any]]] = None,
+        coalesce: bool = False
+    ) -> int:
+        """
+        Queue a batch of notifications for one characteristic as a single message.
+        
+        Args:
+            characteristic_uuid: Characteristic UUID
+            samples: List of ``(timestamp, data)`` tuples, oldest first
+            targets: Recipients (defaults to all connected clients)
+            json_builder: Builds the JSON message from the list of sample dicts
+            coalesce: Allow a queued batch to be replaced by this one
+                (only safe when the batch carries the latest value only)
+            
+        Returns:
+            Number of clients the batch was queued for
+        """
+        if not samples:
+            return 0
+        if json_builder is None:
+            json_builder = lambda batch: {
+                "type": MessageType.NOTIFICATION_BATCH.value,
+                "characteristic_uuid": characteristic_uuid,
+                "samples": batch,
+                "count": len(batch)
+            }
+        
+        frames = NotificationBatchFrames(characteristic_uuid, samples, json_builder)
+        key = f"notification:{characteristic_uuid}" if coalesce else None
+        return self._queue_frames(frames, targets, key=key)
+    
+    def _queue_frames(self, frames: NotificationFrames, targets: Optional[List[WebSocket]], key: Optional[str]) -> int:
+        """Queue lazily encoded frames for each target in its negotiated format."""
+        default_framing = FramingOptions()
+        
+        queued = 0
+        for connection in list(self.active_connections if targets is None else targets):
+            framing = self._client_framing.get(connection, default_framing)
+            if self.enqueue(connection, frames.frame_for(framing), key=key):
+                queued += 1
+        return queued
+    
+    def enqueue(
+        self, websocket: WebSocket, message: Union[Dict[str, Any], BaseMessage], key: Optional[str] = None
+    ) -> bool:
+        """
+        Queue a message for a client without waiting for it to be sent.
+        
+        Args:
+            websocket: Target client
+            message: Message to send
+            key: Optional coalescing key, e.g. ``notification:<uuid>``
+            
+        Returns:
+            True if the message was queued
+        """
+        if hasattr(message, "dict"):
+            message = message.model_dump(mode="json")
+        
+        send_queue = self._send_queues.get(websocket)
+        if send_queue is None:
+            if websocket not in self.active_connections:
+                return False
+            send_queue = self.register(websocket)
+        return send_queue.put(message, key=key)
     
     async def send_message(self, websocket: WebSocket, message: Union[Dict[str, Any], BaseMessage]):
         """Send a message to a specific client."""
         try:
-            # Convert Pydantic models to dict if needed
+            if websocket in self._send_queues:
+                self.enqueue(websocket, message)
+                return
+            
+            # Connection not managed by this manager - send directly
             if hasattr(message, "dict"):
-                message = message.model_dump()
-                
+                message = message.model_dump(mode="json")
             await websocket.send_json(message)
         except Exception as e:
             logger.error(f"Error sending message: {e}")
             self.disconnect(websocket)
     
+    def get_client_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get send queue statistics for each connected client.
+        
+        Returns:
+            List of per-client queue statistics
+        """
+        stats = []
+        for websocket, send_queue in list(self._send_queues.items()):
+            client = getattr(websocket, "client", None)
+            stats.append({
+                "client": f"{client.host}:{client.port}" if client else None,
+                "subscriptions": list(self._client_subscriptions.get(websocket, [])),
+                **send_queue.get_stats()
+            })
+        return stats
+    
     async def process_message(self, websocket: WebSocket, message: Dict[str, Any]):
         """Process an incoming WebSocket message."""
         try:
@@ -502,7 +724,7 @@ class BleWebSocketManager:
             # Get scan parameters - note we use scan_time not timeout
             scan_time = data.get("scan_time", 10.0)
             service_uuids = data.get("service_uuids", [])
-            continuous = data.get("continuous", False)
+            continuous = data.get("continuous", True)
             active = data.get("active", True)
             
             # Send acknowledgment
@@ -591,6 +813,37 @@ class BleWebSocketManager:
                 "command_id": data.get("command_id")  # Return command_id if present
             }
     
+    async def _handle_scan_subscribe(self, websocket: WebSocket, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Subscribe the client to the advertisement delta stream."""
+        try:
+            await get_scan_stream().subscribe(
+                websocket,
+                lambda message: self.send_message(websocket, message),
+                rssi_threshold=data.get("rssi_threshold"),
+                max_rate=data.get("max_rate")
+            )
+            return None
+        except Exception as e:
+            logger.error(f"Error subscribing to scan stream: {e}")
+            return {
+                "type": MessageType.ERROR,
+                "error": str(e)
+            }
+    
+    async def _handle_scan_unsubscribe(self, websocket: WebSocket, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Unsubscribe the client from the advertisement delta stream."""
+        get_scan_stream().unsubscribe(websocket)
+        return None
+    
+    async def _handle_scan_resync(self, websocket: WebSocket, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Send a full snapshot after the client detected a sequence gap."""
+        if get_scan_stream().request_resync(websocket):
+            return None
+        return {
+            "type": MessageType.ERROR,
+            "error": "Not subscribed to the scan stream"
+        }
+    
     async def _handle_connect(self, websocket: WebSocket, data: Dict[str, Any]) -> Dict[str, Any]:
         """Handle BLE device connection request."""
         try:
@@ -666,6 +919,16 @@ class BleWebSocketManager:
     async def _handle_get_services(self, websocket: WebSocket, data: Dict[str, Any]) -> Dict[str, Any]:
         """Handle request to get device services."""
         try:
+            address = data.get("address")
+            if address:
+                services = await get_ble_service().get_services(address=address)
+                return {
+                    "type": MessageType.SERVICES_RESULT,
+                    "address": address,
+                    "services": services,
+                    "count": len(services)
+                }
+            
             if not self._get_device_manager().client or not self._get_device_manager().client.is_connected:
                 return {
                     "type": MessageType.ERROR,
@@ -716,6 +979,17 @@ class BleWebSocketManager:
                     "type": MessageType.ERROR,
                     "error": "No service UUID provided"
                 }
+            
+            address = data.get("address")
+            if address:
+                characteristics = await get_ble_service().get_characteristics(service_uuid, address=address)
+                return {
+                    "type": MessageType.CHARACTERISTICS_RESULT,
+                    "address": address,
+                    "service_uuid": service_uuid,
+                    "characteristics": characteristics,
+                    "count": len(characteristics)
+                }
                 
             if not self._get_device_manager().client or not self._get_device_manager().client.is_connected:
                 return {
@@ -770,6 +1044,17 @@ class BleWebSocketManager:
                     "type": MessageType.READ_ERROR,
                     "error": "No characteristic UUID provided"
                 }
+            
+            # Address-targeted reads go through the connection pool
+            address = data.get("address")
+            if address:
+                value = await get_ble_service().read_characteristic(char_uuid, address=address)
+                return {
+                    "type": MessageType.READ_RESULT,
+                    "characteristic_uuid": char_uuid,
+                    "address": address,
+                    "value": value
+                }
                 
             if not self._get_device_manager().client or not self._get_device_manager().client.is_connected:
                 return {
@@ -804,7 +1089,8 @@ class BleWebSocketManager:
             return {
                 "type": MessageType.READ_ERROR,
                 "error": str(e),
-                "characteristic_uuid": data.get("characteristic_uuid")
+                "characteristic_uuid": data.get("characteristic_uuid"),
+                "address": data.get("address")
             }
     
     def _try_decode_bytes(self, value: bytes) -> str:
@@ -848,8 +1134,11 @@ class BleWebSocketManager:
                     "type": MessageType.WRITE_ERROR,
                     "error": "No value provided"
                 }
-                
-            if not self._get_device_manager().client or not self._get_device_manager().client.is_connected:
+            
+            address = data.get("address")
+            if not address and (
+                not self._get_device_manager().client or not self._get_device_manager().client.is_connected
+            ):
                 return {
                     "type": MessageType.WRITE_ERROR,
                     "error": "Not connected to device"
@@ -868,15 +1157,25 @@ class BleWebSocketManager:
                     "error": f"Invalid value or value type: {write_params.value_type}"
                 }
                 
-            # Write the value
-            await self._get_device_manager().client.write_gatt_char(
-                write_params.characteristic_uuid, 
-                bytes_value
-            )
+            # Write the value (address-targeted writes go through the connection pool)
+            if address:
+                await get_ble_service().write_characteristic(
+                    write_params.characteristic_uuid,
+                    bytes_value,
+                    value_type="bytes",
+                    response=data.get("response", True),
+                    address=address
+                )
+            else:
+                await self._get_device_manager().client.write_gatt_char(
+                    write_params.characteristic_uuid, 
+                    bytes_value
+                )
             
             return {
                 "type": MessageType.WRITE_RESULT,
                 "characteristic_uuid": write_params.characteristic_uuid,
+                "address": address,
                 "success": True
             }
         except Exception as e:
@@ -884,7 +1183,42 @@ class BleWebSocketManager:
             return {
                 "type": MessageType.WRITE_ERROR,
                 "error": str(e),
-                "characteristic_uuid": data.get("characteristic_uuid")
+                "characteristic_uuid": data.get("characteristic_uuid"),
+                "address": data.get("address")
+            }
+    
+    async def _handle_gatt_batch(self, websocket: WebSocket, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle request to run several reads and writes in one message."""
+        try:
+            operations = [
+                GattOperation(**operation).model_dump() for operation in data.get("operations") or []
+            ]
+            if not operations:
+                return {
+                    "type": MessageType.ERROR,
+                    "error": "No operations provided"
+                }
+            
+            results = await get_ble_service().execute_gatt_batch(
+                operations,
+                address=data.get("address"),
+                stop_on_error=bool(data.get("stop_on_error", False))
+            )
+            
+            return {
+                "type": MessageType.GATT_BATCH_RESULT,
+                "address": data.get("address"),
+                "request_id": data.get("request_id"),
+                "success": all(result["success"] for result in results),
+                "results": results
+            }
+        except Exception as e:
+            logger.error(f"Error executing GATT batch: {e}")
+            return {
+                "type": MessageType.ERROR,
+                "error": str(e),
+                "request_id": data.get("request_id"),
+                "address": data.get("address")
             }
     
     def _convert_value_to_bytes(self, value: Any, value_type: str, byte_length: int = 4) -> Optional[bytes]:
@@ -966,37 +1300,21 @@ class BleWebSocketManager:
         try:
             # Define the notification callback
             def notification_handler(sender, data):
-                # Use the CharacteristicValue model
-                char_value = CharacteristicValue(
-                    hex=data.hex() if data else "",
-                    text=self._try_decode_bytes(data),
-                    bytes=[b for b in data] if data else [],
-                    int=self._try_convert_to_int(data)
-                )
-                
-                # Create notification message using Pydantic model
-                notification = NotificationMessage(
-                    type=MessageType.NOTIFICATION,
-                    characteristic_uuid=char_uuid,
-                    value=char_value
-                )
-                
-                # Send to all subscribers
-                if char_uuid in self._active_notifications:
-                    disconnected = []
-                    for connection in self._active_notifications[char_uuid]:
-                        try:
-                            # Create a task for each sending operation
-                            asyncio.create_task(
-                                self.send_message(connection, notification)
-                            )
-                        except Exception as e:
-                            logger.error(f"Error sending notification: {e}")
-                            disconnected.append(connection)
-                    
-                    # Schedule cleanup of disconnected clients
-                    if disconnected:
-                        asyncio.create_task(self._cleanup_disconnected(disconnected))
+                # Queue for all subscribers in their negotiated format; with the
+                # coalesce policy only the latest value per characteristic is
+                # kept while a client is behind
+                subscribers = self._active_notifications.get(char_uuid)
+                if subscribers:
+                    self.broadcast_notification(
+                        char_uuid,
+                        data,
+                        targets=subscribers,
+                        json_builder=lambda value: {
+                            "type": MessageType.NOTIFICATION.value,
+                            "characteristic_uuid": char_uuid,
+                            "value": value
+                        }
+                    )
             
             # Start the notifications
             await self._get_device_manager().client.start_notify(char_uuid, notification_handler)
@@ -27,7 +27,12 @@ BLE_CONFIG = {
         "window": 0.1,                  # Scan window (platform-specific support)
         "active": True,                 # Use active scanning
         "max_cached_devices": 100,      # Maximum number of devices to keep in cache
-        "default_service_filters": []   # Default service UUIDs to filter by
+        "default_service_filters": [],  # Default service UUIDs to filter by
+        "continuous": {
+            "device_ttl": 30.0,             # Seconds before an unseen device expires
+            "prune_interval": 5.0,          # Seconds between expiry sweeps
+            "subscriber_queue_size": 1000   # Max pending deltas per subscriber
+        }
     },
     
     # Connection settings
@@ -39,7 +44,12 @@ BLE_CONFIG = {
         "max_reconnect_attempts": 5,    # Maximum reconnection attempts
         "use_cached_services": True,    # Use cached services when available
         "remember_devices": True,       # Remember devices for future connections
-        "disconnect_timeout": 5.0       # Timeout for disconnect operations
+        "disconnect_timeout": 5.0,      # Timeout for disconnect operations
+        "pool": {
+            "max_connections": 20,          # Concurrent device connections
+            "max_concurrent_operations": 4, # Concurrent GATT operations per adapter
+            "idle_timeout": 300.0           # Seconds before an unused connection is closed
+        }
     },
     
     # Service management
@@ -48,16 +58,34 @@ BLE_CONFIG = {
         "read_timeout": 5.0,            # Timeout for characteristic reads
         "write_timeout": 5.0,           # Timeout for characteristic writes
         "max_write_without_response_size": 512,  # Max size for write without response
+        "bulk_write_ack_every": 16,     # Bulk writes: chunks between acknowledged writes (0 = never)
         "service_descriptions_file": "service_descriptions.json",  # Custom service descriptions
-        "characteristic_descriptions_file": "characteristic_descriptions.json"  # Custom char descriptions
+        "characteristic_descriptions_file": "characteristic_descriptions.json",  # Custom char descriptions
+        "gatt_cache_directory": None    # Persistent GATT cache (defaults to ~/.blemanager/gatt_cache)
     },
     
     # Notification management
     "notifications": {
         "max_history": 1000,            # Maximum notification history per characteristic
         "buffer_size": 100,             # Buffer size for notification processing
+        "history_payload_size": 20,     # Average payload bytes reserved per history sample
+        "log": {
+            "enabled": False,           # Persist notifications to an on-disk segment log
+            "directory": None,          # Defaults to ~/.blemanager/notification_log
+            "segment_size_mb": 16,      # Size of each segment file
+            "max_payload": 244,         # Payload bytes per record (longer payloads are truncated)
+            "index_interval": 1024,     # Records between sparse index entries
+            "retention_mb": 512,        # Total log size limit (None for no limit)
+            "retention_hours": 72,      # Age limit for closed segments (None for no limit)
+            "flush_interval": 1.0       # Seconds between flushes to disk
+        },
         "auto_subscribe_services": [],  # Service UUIDs to auto-subscribe on connection
-        "auto_subscribe_characteristics": []  # Characteristic UUIDs to auto-subscribe
+        "auto_subscribe_characteristics": [],  # Characteristic UUIDs to auto-subscribe
+        "batch": {
+            "max_batch_size": 1,        # Notifications per message (1 = no batching)
+            "max_delay_ms": 0.0,        # Longest time a notification waits in a batch
+            "latest_only": False        # Deliver only the newest value per window
+        }
     },
     
     # Error handling and recovery
@@ -70,6 +98,12 @@ BLE_CONFIG = {
         "aggressive_recovery": False        # Use aggressive recovery strategies
     },
     
+    # Event bus
+    "events": {
+        "queue_size": 1000,             # Events queued per subscription
+        "policy": "drop_oldest"         # Overflow policy: drop_oldest, drop_newest or coalesce
+    },
+    
     # WebSocket configuration
     "websocket": {
         "path": "/api/ble/ws",
@@ -77,7 +111,17 @@ BLE_CONFIG = {
         "max_connections": 10,           # Maximum concurrent WebSocket connections
         "heartbeat_interval": 30,        # Heartbeat interval in seconds
         "notification_buffering": True,  # Buffer notifications for new connections
-        "authorization_required": False  # Require authorization for WebSocket connections
+        "authorization_required": False, # Require authorization for WebSocket connections
+        "scan_stream": {
+            "rssi_threshold": 3,         # Default dBm change needed to report an RSSI-only update
+            "max_rate": 2.0,             # Default maximum delta messages per second per client
+            "max_batch": 500             # Maximum devices per delta message
+        },
+        "send_queue": {
+            "max_size": 256,             # Maximum queued outbound messages per client
+            "overflow_policy": "drop_oldest",  # "drop_oldest", "coalesce" or "disconnect"
+            "send_timeout": 10.0         # Seconds a single send may take before dropping the client
+        }
     },
     
     # Persistence
@@ -85,7 +129,8 @@ BLE_CONFIG = {
         "enabled": True,                 # Enable device persistence
         "storage_path": "ble_devices",   # Relative path for device storage
         "max_devices": 50,               # Maximum number of saved devices
-        "save_services": True            # Save discovered services for devices
+        "save_services": True,           # Save discovered services for devices
+        "flush_delay": 1.0               # Seconds to batch device state writes
     },
     
     # Metrics and monitoring
@@ -5,6 +5,8 @@ from .adapter_manager import BleAdapterManager, get_adapter_manager
 from .device_manager import BleDeviceManager, get_device_manager
 from .ble_service import BleService, get_ble_service
 from .scanner import BleScanner, get_scanner
+from .connection_pool import BleConnectionPool, get_connection_pool
+from .transfer import TransferEngine, TransferOptions, get_transfer_engine
 
 # Import utilities needed by core components
 from ..utils.ble_metrics import BleMetricsCollector, get_metrics_collector
@@ -28,6 +30,11 @@ __all__ = [
     "get_device_manager",
     "BleAdapterManager", 
     "get_adapter_manager",
+    "BleConnectionPool",
+    "get_connection_pool",
+    "TransferEngine",
+    "TransferOptions",
+    "get_transfer_engine",
     
     # Utilities now included from utils
     "BleMetricsCollector",
@@ -13,6 +13,7 @@ import uuid
 import bleak
 from bleak import BleakScanner, BleakError
 
+from backend.caching import discovery
 from backend.modules.ble.utils.events import ble_event_bus
 from backend.modules.ble.models import (
     BleAdapter, AdapterStatus, AdapterSelectionRequest, 
@@ -64,17 +65,30 @@ class BleAdapterManager:
         #     # If not running in async context, we'll discover later
         #     pass
     
-    async def discover_adapters(self, max_retries: int = 3, retry_delay: float = 2.0) -> List[Dict[str, Any]]:
+    async def discover_adapters(self, max_retries: int = 3, retry_delay: float = 2.0,
+                                force_refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Discover Bluetooth adapters on the system.
         
+        Concurrent calls share one discovery, and the result is reused for
+        a few seconds (see ``backend.caching.discovery``).
+        
         Args:
             max_retries: Maximum number of retries for discovering adapters.
             retry_delay: Delay between retries in seconds.
+            force_refresh: If True, ignore a cached result.
         
         Returns:
             List of adapter dictionaries
         """
+        return await discovery.discover(
+            discovery.BLE_ADAPTERS,
+            lambda: self._discover_adapters(max_retries, retry_delay),
+            force_refresh=force_refresh
+        )
+    
+    async def _discover_adapters(self, max_retries: int, retry_delay: float) -> List[Dict[str, Any]]:
+        """Discover adapters without the cache."""
         attempt = 0
         last_error = None
         adapters = []
@@ -269,6 +283,7 @@ class BleAdapterManager:
             
             # Update current adapter
             self._current_adapter = adapter_id
+            discovery.invalidate(discovery.BLE_ADAPTER_STATUS, discovery.BLUETOOTH_HEALTH)
             
             # Log success
             self.logger.info(f"Successfully selected adapter: {adapter_id}")
@@ -296,16 +311,29 @@ class BleAdapterManager:
                 adapter_id=adapter_id
             )
     
-    async def get_adapter_status(self, address: Optional[str] = None) -> Dict[str, Any]:
+    async def get_adapter_status(self, address: Optional[str] = None, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Get the status of a Bluetooth adapter.
         
+        Concurrent calls for one adapter share one query, and the result is
+        reused for a few seconds (see ``backend.caching.discovery``).
+        
         Args:
             address: Optional adapter address (uses current if None)
+            force_refresh: If True, ignore a cached result
             
         Returns:
             Dictionary with adapter status
         """
+        return await discovery.discover(
+            discovery.BLE_ADAPTER_STATUS,
+            lambda: self._get_adapter_status(address),
+            key=address or self._current_adapter,
+            force_refresh=force_refresh
+        )
+    
+    async def _get_adapter_status(self, address: Optional[str] = None) -> Dict[str, Any]:
+        """Get adapter status without the cache."""
         try:
             # Use specified address or current adapter
             adapter_address = address or self._current_adapter
@@ -414,7 +442,8 @@ class BleAdapterManager:
                 success = True
                 actions_taken.append("Power cycled adapter")
             
-            # Get updated status
+            # Get updated status (cached results predate the reset)
+            discovery.invalidate(discovery.BLE_ADAPTERS, discovery.BLE_ADAPTER_STATUS, discovery.BLUETOOTH_HEALTH)
             status = await self.get_adapter_status(adapter_address)
             
             # Emit event after reset
@@ -25,6 +25,10 @@ from bleak.backends.device import BLEDevice
 from bleak.backends.scanner import AdvertisementData # noqa: F401
 from fastapi import HTTPException # noqa: F401
 
+from .scanner import get_scanner
+from .gatt_cache import get_gatt_cache, build_gatt_table, read_database_hash
+from ..utils.ble_persistence import get_persistence_service
+
 logger = logging.getLogger("backend.modules.ble.core.ble_manager")
 class BLEManager:
     def __init__(self, logger=None, bonded_devices_file="bonded_devices.txt"):
@@ -46,24 +50,22 @@ class BLEManager:
         self.logger.info(f"BLE Manager initialized using Bleak {platform.system()}")
 
     def _load_bonded_devices(self):
-        """Load previously bonded devices from storage."""
+        """Load previously bonded devices from the device state store."""
         try:
-            # Simple implementation using a file
-            # In production, use a more robust storage solution
-            if os.path.exists(self.bonded_devices_file):
-                with open(self.bonded_devices_file, "r") as f:
-                    self.bonded_devices = set(line.strip() for line in f if line.strip())
-                self.logger.info(f"Loaded {len(self.bonded_devices)} bonded devices")
+            # The store migrates the legacy text file and keeps it in sync
+            self.bonded_devices = set(get_persistence_service().attach_legacy_bonded_file(self.bonded_devices_file))
+            self.logger.info(f"Loaded {len(self.bonded_devices)} bonded devices")
         except Exception as e:
             self.logger.error(f"Failed to load bonded devices: {e}")
 
-    def _save_bonded_devices(self):
-        """Save bonded devices to storage."""
+    def _save_bonded_devices(self, address: Optional[str] = None):
+        """Record bonded devices in the device state store (written behind)."""
         try:
-            with open(self.bonded_devices_file, "w") as f:
-                for device in self.bonded_devices:
-                    f.write(f"{device}\n")
-            self.logger.info(f"Saved {len(self.bonded_devices)} bonded devices")
+            store = get_persistence_service()
+            addresses = [address] if address else self.bonded_devices
+            for bonded in addresses:
+                if not store.is_bonded(bonded):
+                    store.mark_bonded({"address": bonded})
         except Exception as e:
             self.logger.error(f"Failed to save bonded devices: {e}")
 
@@ -127,34 +129,48 @@ class BLEManager:
                 scanner_kwargs["adapter"] = self._adapter_index
                 self.logger.info(f"Using Linux adapter {self._adapter_index} for scanning")
             
-            # Create the scanner with any adapter-specific settings
-            scanner = BleakScanner(**scanner_kwargs)
-            devices = await scanner.discover(timeout=scan_time)
+            # Read from the continuous scanner, starting it with any
+            # adapter-specific settings if it is not already running; the
+            # service filter is applied to this read, not to the shared scan
+            scan_engine = get_scanner()
+            if await scan_engine.ensure_running(
+                active=active, warmup=scan_time, **scanner_kwargs
+            ):
+                devices = scan_engine.get_devices(name_prefix=name_prefix, services=services)
+            else:
+                # Fall back to a one-shot discovery
+                scanner = BleakScanner(**scanner_kwargs)
+                devices = [
+                    {"address": d.address, "name": d.name, "rssi": d.rssi}
+                    for d in await scanner.discover(timeout=scan_time)
+                ]
 
             # Log all discovered devices before filtering
             try:
-                logger.info(f"Raw scan results: {[device.address for device in devices]}")
+                logger.info(f"Raw scan results: {[device['address'] for device in devices]}")
             except Exception as e:
                 logger.error(f"Error logging scan results: {str(e)}", exc_info=True)
 
             results = []
             seen_addresses = set()
             for device in devices:
-                if not allow_duplicates and device.address in seen_addresses:
+                address = device["address"].lower()
+                if not allow_duplicates and address in seen_addresses:
                     continue
 
-                if name_prefix and (not device.name or not device.name.startswith(name_prefix)):
+                name = device.get("name")
+                if name_prefix and (not name or not name.startswith(name_prefix)):
                     continue
 
-                seen_addresses.add(device.address)
+                seen_addresses.add(address)
                 results.append({
-                    "address": device.address.lower(),  # Convert to lowercase
-                    "name": device.name or "Unknown Device",
-                    "rssi": device.rssi
+                    "address": address,  # Convert to lowercase
+                    "name": name or "Unknown Device",
+                    "rssi": device.get("rssi")
                 })
 
             # Store the scan results
-            self._cached_devices = devices
+            self._cached_devices = results
 
             return results
         except Exception as e:
@@ -253,7 +269,7 @@ class BLEManager:
 
             # If we successfully connected, add to bonded devices
             self.bonded_devices.add(address)
-            self._save_bonded_devices()
+            self._save_bonded_devices(address)
 
             self.logger.info(f"Successfully connected to {address}")
             return True
@@ -320,7 +336,11 @@ class BLEManager:
             self.logger.warning(f"MTU negotiation failed: {e}")
 
     async def _cache_services(self):
-        """Discover and cache services and characteristics."""
+        """Discover and cache services and characteristics.
+        
+        Uses the persistent GATT cache when the device's Database Hash
+        matches the cached table.
+        """
         if not self.client or not self.client.is_connected:
             return
             
@@ -329,22 +349,31 @@ class BLEManager:
             self.services_cache = {}
             self.characteristics_cache = {}
             
-            # Discover services
+            gatt_cache = get_gatt_cache()
+            table = None
+            database_hash = await read_database_hash(self.client)
+            if gatt_cache is not None:
+                table = gatt_cache.lookup(self.device_address, database_hash)
+            if table is None:
+                table = build_gatt_table(self.client.services)
+                if gatt_cache is not None:
+                    gatt_cache.put(self.device_address, table, database_hash)
+            
             services = {}
-            for service in self.client.services:
-                service_uuid = str(service.uuid).lower()
+            for service in table:
+                service_uuid = service["uuid"]
                 services[service_uuid] = {
                     "description": self._get_service_description(service_uuid),
                     "characteristics": []
                 }
                 
                 # Process characteristics for this service
-                for char in service.characteristics:
-                    char_uuid = str(char.uuid).lower()
+                for char in service["characteristics"]:
+                    char_uuid = char["uuid"]
                     char_info = {
                         "uuid": char_uuid,
                         "description": self._get_characteristic_description(char_uuid),
-                        "properties": [p.name for p in char.properties],
+                        "properties": char["properties"],
                         "service_uuid": service_uuid
                     }
                     services[service_uuid]["characteristics"].append(char_info)
@@ -598,6 +627,7 @@ class BLEManager:
                 negotiated_mtu = await self.client.exchange_mtu(mtu_size)
                 
             self.logger.info(f"MTU negotiated: {negotiated_mtu}")
+            self.mtu = negotiated_mtu
             return negotiated_mtu
         except Exception as e:
             self.logger.error(f"Error negotiating MTU: {e}", exc_info=True)
@@ -1127,7 +1157,7 @@ def find_mac_address(self, target_mac: str):
     # Check cached devices
     if hasattr(self, '_cached_devices'):
         for i, device in enumerate(self._cached_devices):
-            if hasattr(device, 'address') and device.address.lower() == target_mac:
+            if device.get('address', '').lower() == target_mac:
                 results.append(f"Found in _cached_devices at index {i}")
     
     # Check bonded devices
@@ -15,14 +15,18 @@ from backend.modules.ble.utils.ble_metrics import get_metrics_collector
 from backend.modules.ble.utils.ble_recovery import get_error_recovery
 from backend.modules.ble.utils.system_monitor import get_system_monitor
 from backend.modules.ble.utils.bt_checker import BluetoothResourceManager
+from backend.modules.ble.utils.ble_device_info import normalize_address
 from backend.modules.ble.models import (
     BLEDeviceInfo, ScanParams, ConnectionParams, CharacteristicValue, 
-    ConnectionStatus, MessageType
+    ConnectionStatus, MessageType, NotificationBatchPolicy
 )
 from .adapter_manager import get_adapter_manager
 from .device_manager import get_device_manager, BleDeviceManager
 from .service_manager import BleServiceManager
 from .notification_manager import BleNotificationManager
+from .connection_pool import get_connection_pool
+from .gatt_cache import get_gatt_cache
+from .transfer import TransferOptions, get_transfer_engine
 from .exceptions import (
     BleConnectionError, BleServiceError, BleAdapterError,
     BleOperationError, BleNotSupportedError
@@ -68,6 +72,13 @@ class BleService:
             self._safe_mode = False
             self._initialized = True
             
+            # Pooled connections for per-address GATT operations
+            self.connection_pool = get_connection_pool()
+            self._primary_address = None
+            
+            # Chunked transfers (sessions outlive individual connections)
+            self.transfer_engine = get_transfer_engine()
+            
             # Get manager instances
             self.service_manager = BleServiceManager()
             self.notification_manager = BleNotificationManager()
@@ -264,17 +275,27 @@ class BleService:
         name_prefix: Optional[str] = None,
         services: Optional[List[str]] = None,
         allow_duplicates: bool = False,
+        service_uuids: Optional[List[str]] = None,
+        continuous: bool = True,
     ) -> List[Dict[str, Any]]:
-        """Scan for BLE devices."""
+        """
+        Scan for BLE devices.
+
+        The background scan is shared by every consumer, so it is always
+        left running after the call and later requests read the live device
+        table instead of starting a new scan. ``continuous`` is accepted for
+        compatibility; use ``stop_scan`` to stop the shared scanner.
+        """
         try:
             # Use BleDeviceManager for scanning
-            return await self.device_manager.scan_devices(
+            devices = await self.device_manager.scan_devices(
                 scan_time=scan_time,
                 active=active,
                 name_prefix=name_prefix,
-                services=services,
+                services=services or service_uuids,
                 allow_duplicates=allow_duplicates
             )
+            return devices
         except Exception as e:
             self._logger.error(f"Error scanning devices: {e}", exc_info=True)
             # Return empty list instead of raising error
@@ -292,8 +313,8 @@ class BleService:
     async def get_discovered_devices(self) -> List[Dict[str, Any]]:
         """Get list of devices discovered during the last scan."""
         try:
-            # Return the cached devices from the device manager
-            return self.device_manager._cached_devices
+            # Live device table while the continuous scan runs, else last scan
+            return self.device_manager.get_live_devices()
         except Exception as e:
             self._logger.error(f"Error getting discovered devices: {e}", exc_info=True)
             return []
@@ -420,47 +441,110 @@ class BleService:
     # GATT Service and Characteristic Methods
     # ======================================================================
     
-    async def get_services(self) -> List[Dict[str, Any]]:
+    async def _run_gatt(self, address: Optional[str], operation: Callable) -> Any:
         """
-        Get services from connected device.
+        Run a GATT operation on a device.
+        
+        With an address the operation runs on that device's pooled connection
+        (connecting if needed, serialized with other operations on the same
+        device). Without one it runs on the single current connection.
+        
+        Args:
+            address: Optional device address
+            operation: Coroutine function taking a BleServiceManager
+        """
+        if address:
+            return await self.connection_pool.run(
+                address, lambda connection: operation(connection.service_manager)
+            )
+        return await operation(self.service_manager)
+    
+    def _cached_gatt_entry(self, address: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Cached GATT entry for a device that is not currently connected.
+        
+        Connected devices validate the cache against their Database Hash
+        instead, so this only answers for addresses without a pooled connection.
+        """
+        gatt_cache = get_gatt_cache()
+        if not address or gatt_cache is None or self.connection_pool.get(address) is not None:
+            return None
+        return gatt_cache.get(address)
+    
+    @staticmethod
+    def _mark_stale(items: List[Dict[str, Any]], entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Flag results served from the cache without validating them against the device."""
+        for item in items:
+            item["stale"] = True
+            item["cached_at"] = entry.get("cached_at")
+        return items
+    
+    async def get_services(self, address: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get services from a device.
+        
+        Args:
+            address: Optional device address (defaults to the current device).
+                Devices with a cached GATT table are answered without connecting;
+                those results are marked ``stale``.
         
         Returns:
             List of service dictionaries
         """
         try:
-            return await self.service_manager.get_services()
+            entry = self._cached_gatt_entry(address)
+            if entry is not None:
+                return self._mark_stale(self.service_manager.describe_services(entry["services"]), entry)
+            return await self._run_gatt(address, lambda manager: manager.get_services())
         except Exception as e:
             self._logger.error(f"Error getting services: {e}", exc_info=True)
             raise BleServiceError(f"Error getting services: {e}")
     
-    async def get_characteristics(self, service_uuid: str) -> List[Dict[str, Any]]:
+    async def get_characteristics(
+        self, service_uuid: str, address: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get characteristics for a service.
         
         Args:
             service_uuid: Service UUID
+            address: Optional device address (defaults to the current device).
+                Devices with a cached GATT table are answered without connecting;
+                those results are marked ``stale``.
             
         Returns:
             List of characteristic dictionaries
         """
         try:
-            return await self.service_manager.get_characteristics(service_uuid)
+            entry = self._cached_gatt_entry(address)
+            if entry is not None:
+                return self._mark_stale(
+                    self.service_manager.describe_characteristics(entry["services"], service_uuid), entry
+                )
+            return await self._run_gatt(
+                address, lambda manager: manager.get_characteristics(service_uuid)
+            )
         except Exception as e:
             self._logger.error(f"Error getting characteristics: {e}", exc_info=True)
             raise BleServiceError(f"Error getting characteristics: {e}")
     
-    async def read_characteristic(self, characteristic_uuid: str) -> Dict[str, Any]:
+    async def read_characteristic(
+        self, characteristic_uuid: str, address: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Read a characteristic value.
         
         Args:
             characteristic_uuid: Characteristic UUID
+            address: Optional device address (defaults to the current device)
             
         Returns:
             Dictionary with characteristic value
         """
         try:
-            value = await self.service_manager.read_characteristic(characteristic_uuid)
+            value = await self._run_gatt(
+                address, lambda manager: manager.read_characteristic(characteristic_uuid)
+            )
             return value.model_dump()
         except Exception as e:
             self._logger.error(f"Error reading characteristic: {e}", exc_info=True)
@@ -468,7 +552,7 @@ class BleService:
             # Try to recover
             await self.error_recovery.recover_from_error(
                 "gatt_error",
-                device_address=getattr(self.device_manager.client, "address", None),
+                device_address=address or getattr(self.device_manager.client, "address", None),
                 error_details={"message": str(e), "operation": "read", "characteristic_uuid": characteristic_uuid}
             )
             
@@ -479,7 +563,8 @@ class BleService:
         characteristic_uuid: str, 
         value: Union[str, bytes, bytearray, int],
         value_type: str = "hex",
-        response: bool = True
+        response: bool = True,
+        address: Optional[str] = None
     ) -> bool:
         """
         Write a value to a characteristic.
@@ -489,16 +574,20 @@ class BleService:
             value: Value to write
             value_type: Type of value (hex, text, bytes, int)
             response: Whether to wait for response
+            address: Optional device address (defaults to the current device)
             
         Returns:
             True if successful
         """
         try:
-            return await self.service_manager.write_characteristic(
-                characteristic_uuid,
-                value,
-                value_type=value_type,
-                response=response
+            return await self._run_gatt(
+                address,
+                lambda manager: manager.write_characteristic(
+                    characteristic_uuid,
+                    value,
+                    value_type=value_type,
+                    response=response
+                )
             )
         except Exception as e:
             self._logger.error(f"Error writing characteristic: {e}", exc_info=True)
@@ -506,12 +595,158 @@ class BleService:
             # Try to recover
             await self.error_recovery.recover_from_error(
                 "gatt_error",
-                device_address=getattr(self.device_manager.client, "address", None),
+                device_address=address or getattr(self.device_manager.client, "address", None),
                 error_details={"message": str(e), "operation": "write", "characteristic_uuid": characteristic_uuid}
             )
             
             raise BleServiceError(f"Error writing characteristic: {e}")
     
+    async def execute_gatt_batch(
+        self,
+        operations: List[Dict[str, Any]],
+        address: Optional[str] = None,
+        stop_on_error: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Run several reads and writes in one call.
+        
+        The whole batch holds the device's connection, so operations from
+        other callers cannot interleave with it.
+        
+        Args:
+            operations: Operation dictionaries (see ``GattOperation``)
+            address: Optional device address (defaults to the current device)
+            stop_on_error: Skip the remaining operations after a failure
+            
+        Returns:
+            One result dictionary per operation, in request order
+        """
+        try:
+            return await self._run_gatt(
+                address,
+                lambda manager: manager.execute_batch(operations, stop_on_error=stop_on_error)
+            )
+        except Exception as e:
+            self._logger.error(f"Error executing GATT batch: {e}", exc_info=True)
+            raise BleServiceError(f"Error executing GATT batch: {e}")
+    
+    async def bulk_write(
+        self,
+        characteristic_uuid: str,
+        value: Union[str, bytes, bytearray],
+        value_type: str = "hex",
+        chunk_size: Optional[int] = None,
+        ack_every: Optional[int] = None,
+        address: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream a large payload to a characteristic with write-without-response.
+        
+        Args:
+            characteristic_uuid: Characteristic UUID
+            value: Payload to write
+            value_type: Type of value (hex, text, bytes)
+            chunk_size: Bytes per write (defaults to the negotiated limit)
+            ack_every: Chunks between acknowledged writes (0 disables)
+            address: Optional device address (defaults to the current device)
+            
+        Returns:
+            Dictionary with byte/chunk counts, duration and throughput
+        """
+        async def operation(manager: BleServiceManager) -> Dict[str, Any]:
+            data = manager._convert_value_to_bytes(value, value_type)
+            if data is None:
+                raise BleServiceError(f"Invalid value or value type: {value_type}")
+            return await manager.write_stream(
+                characteristic_uuid, data, chunk_size=chunk_size, ack_every=ack_every
+            )
+        
+        try:
+            return await self._run_gatt(address, operation)
+        except Exception as e:
+            self._logger.error(f"Error in bulk write: {e}", exc_info=True)
+            raise BleServiceError(f"Error in bulk write: {e}")
+    
+    async def upload(
+        self,
+        characteristic_uuid: str,
+        value: Union[str, bytes, bytearray],
+        value_type: str = "hex",
+        options: Optional[TransferOptions] = None,
+        address: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Upload a large payload in MTU-sized chunks.
+        
+        Args:
+            characteristic_uuid: Characteristic UUID
+            value: Payload to upload
+            value_type: Type of value (hex, text, bytes)
+            options: Chunking, framing and ACK options
+            address: Optional device address (defaults to the current device)
+            
+        Returns:
+            Transfer session dictionary (keep ``transfer_id`` to resume)
+        """
+        async def operation(manager: BleServiceManager) -> Dict[str, Any]:
+            data = manager._convert_value_to_bytes(value, value_type)
+            if data is None:
+                raise BleServiceError(f"Invalid value or value type: {value_type}")
+            return await self.transfer_engine.upload(
+                manager, characteristic_uuid, data, options=options, address=address
+            )
+        
+        return await self._run_gatt(address, operation)
+    
+    async def resume_upload(self, transfer_id: str) -> Dict[str, Any]:
+        """
+        Resume a failed upload from the last confirmed offset.
+        
+        Args:
+            transfer_id: ID returned by ``upload``
+            
+        Returns:
+            Transfer session dictionary
+        """
+        transfer = self.transfer_engine.get_transfer(transfer_id)
+        if transfer is None:
+            raise BleServiceError(f"Unknown transfer: {transfer_id}")
+        return await self._run_gatt(
+            transfer["address"],
+            lambda manager: self.transfer_engine.resume(manager, transfer_id)
+        )
+    
+    async def read_long(
+        self,
+        characteristic_uuid: str,
+        length: Optional[int] = None,
+        address: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Read and reassemble a value larger than one ATT read.
+        
+        Args:
+            characteristic_uuid: Characteristic UUID
+            length: Expected total length, if known
+            address: Optional device address (defaults to the current device)
+            
+        Returns:
+            Dictionary with the reassembled ``data`` and throughput
+        """
+        return await self._run_gatt(
+            address,
+            lambda manager: self.transfer_engine.read_long(manager, characteristic_uuid, length=length)
+        )
+    
+    def get_transfers(self) -> List[Dict[str, Any]]:
+        """
+        Get recent chunked transfers.
+        
+        Returns:
+            List of transfer session dictionaries
+        """
+        return self.transfer_engine.list_transfers()
+    
     # ======================================================================
     # Notification Methods
     # ======================================================================
@@ -519,7 +754,8 @@ class BleService:
     async def subscribe_to_notifications(
         self, 
         characteristic_uuid: str,
-        enable: bool = True
+        enable: bool = True,
+        batch: Optional[NotificationBatchPolicy] = None
     ) -> bool:
         """
         Subscribe to notifications for a characteristic.
@@ -527,13 +763,14 @@ class BleService:
         Args:
             characteristic_uuid: Characteristic UUID
             enable: Whether to enable (True) or disable (False) notifications
+            batch: Optional batching policy (defaults to notifications.batch config)
             
         Returns:
             True if successful
         """
         try:
             return await self.notification_manager.subscribe_to_characteristic(
-                characteristic_uuid, enable
+                characteristic_uuid, enable, batch=batch
             )
         except Exception as e:
             self._logger.error(f"Error subscribing to notifications: {e}", exc_info=True)
@@ -554,7 +791,9 @@ class BleService:
     async def get_notification_history(
         self, 
         characteristic_uuid: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Get notification history.
@@ -562,18 +801,42 @@ class BleService:
         Args:
             characteristic_uuid: Optional characteristic UUID filter
             limit: Maximum number of notifications to return
+            start_time: Optional inclusive lower bound (seconds since epoch)
+            end_time: Optional inclusive upper bound (seconds since epoch)
             
         Returns:
             Dictionary with notification history
         """
         try:
             return self.notification_manager.get_notification_history(
-                characteristic_uuid, limit
+                characteristic_uuid, limit, start_time, end_time
             )
         except Exception as e:
             self._logger.error(f"Error getting notification history: {e}", exc_info=True)
             raise BleOperationError(f"Error getting notification history: {e}")
     
+    def replay_notification_log(
+        self,
+        characteristic_uuid: Optional[str] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
+    ):
+        """
+        Iterate notifications stored in the on-disk log, oldest first.
+        
+        Args:
+            characteristic_uuid: Optional characteristic UUID filter
+            start_time: Optional inclusive lower bound (seconds since epoch)
+            end_time: Optional inclusive upper bound (seconds since epoch)
+            
+        Returns:
+            Iterator of (timestamp, characteristic_uuid, data) tuples
+        """
+        notification_log = self.notification_manager.notification_log
+        if notification_log is None:
+            raise BleNotSupportedError("Notification log is not enabled")
+        return notification_log.replay(start_time, end_time, characteristic_uuid)
+    
     async def clear_notification_history(
         self, 
         characteristic_uuid: Optional[str] = None
@@ -594,6 +857,15 @@ class BleService:
     # System and Health Methods
     # ======================================================================
     
+    def get_connection_pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool occupancy.
+        
+        Returns:
+            Dictionary with pool limits and per-device connection details
+        """
+        return self.connection_pool.get_stats()
+    
     async def get_system_health(self) -> Dict[str, Any]:
         """
         Get system health information.
@@ -673,14 +945,35 @@ class BleService:
     # ======================================================================
     
     async def _handle_device_connected(self, event_data: Dict[str, Any]) -> None:
-        """Handle device connected event."""
+        """Handle device connected event (the device manager's primary device)."""
         address = event_data.get("address")
-        if address:
-            # Make sure the service manager has the client
+        if not address:
+            return
+        
+        connection = self.connection_pool.get(address)
+        if connection is None:
             self.service_manager.set_client(self.device_manager.client)
+            return
+        
+        # The shared service manager reads, writes and streams notifications
+        # without going through the pool, so the pool must not close the device
+        if self._primary_address and self._primary_address != address:
+            self.connection_pool.unpin(self._primary_address)
+        self.connection_pool.pin(address)
+        self._primary_address = connection.address
+        self.service_manager.set_client(connection.client)
     
     async def _handle_device_disconnected(self, event_data: Dict[str, Any]) -> None:
         """Handle device disconnected event."""
+        # Only the device behind the shared service manager owns the subscriptions
+        address = (event_data or {}).get("address")
+        client_address = getattr(self.service_manager.client, "address", None)
+        if address and client_address and normalize_address(address) != normalize_address(client_address):
+            return
+        
+        if address and normalize_address(address) == self._primary_address:
+            self._primary_address = None
+        
         # Clear any subscriptions
         await self.notification_manager.clear_all_subscriptions()
     
@@ -700,6 +993,7 @@ class BleService:
             
             # Clear notification subscriptions
             await self.notification_manager.clear_all_subscriptions()
+            self.notification_manager.close()
             
             self._logger.info("BLE service cleaned up")
         except Exception as e:
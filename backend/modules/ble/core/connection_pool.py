@@ -0,0 +1,394 @@
+"""Pool of concurrent BLE connections keyed by device address."""
+
+import logging
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Callable, Awaitable, TypeVar
+
+from bleak import BleakClient, BleakError
+
+from backend.modules.ble.config import get_config
+from backend.modules.ble.utils.events import ble_event_bus
+from backend.modules.ble.utils.ble_metrics import get_metrics_collector
+from backend.modules.ble.utils.ble_device_info import normalize_address
+from .service_manager import BleServiceManager
+from .gatt_cache import GattCache, get_gatt_cache
+from .exceptions import BleConnectionError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PooledConnection:
+    """
+    A pooled connection to one device.
+
+    Operations on the same device are serialized by ``lock``; each connection
+    has its own service manager so GATT caches are not shared across devices.
+    Pinned connections are never closed for being idle or to make room.
+    ``address`` is the normalized (uppercase) form the pool is keyed by.
+    """
+
+    def __init__(self, address: str, client: BleakClient, adapter: str):
+        self.address = address
+        self.client = client
+        self.adapter = adapter
+        self.service_manager = BleServiceManager(client=client)
+        self.lock = asyncio.Lock()
+        self.connected_at = time.time()
+        self.last_used = time.monotonic()
+        self.active = 0
+        self.operations = 0
+        self.pinned = False
+
+    @property
+    def is_connected(self) -> bool:
+        return bool(self.client is not None and self.client.is_connected)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "adapter": self.adapter,
+            "connected": self.is_connected,
+            "connected_at": self.connected_at,
+            "idle_seconds": round(time.monotonic() - self.last_used, 3),
+            "active_operations": self.active,
+            "operations": self.operations,
+            "pinned": self.pinned
+        }
+
+
+class BleConnectionPool:
+    """
+    Concurrent connections to many devices.
+
+    - Connections are opened on first use and reused afterwards
+    - Operations on one device run one at a time (per-device lock)
+    - Each adapter runs at most ``max_concurrent_operations`` operations
+      (including connects) at a time
+    - Connections idle for ``idle_timeout`` seconds are closed, and the least
+      recently used idle connection is closed when the pool is full
+    - Pinned connections (used outside the pool, e.g. the primary device) are
+      exempt from both
+    - Addresses are normalized, so "aa:bb:..." and "AA:BB:..." share one
+      connection
+
+    Args:
+        max_connections: Maximum number of open connections
+        max_concurrent_operations: Concurrent operations per adapter
+        idle_timeout: Seconds before an unused connection is closed
+        connect_timeout: Timeout for establishing a connection
+        client_factory: Creates the client for an address (for tests)
+        gatt_cache: GATT cache used to skip service discovery for known devices
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_concurrent_operations: int = 4,
+        idle_timeout: float = 300.0,
+        connect_timeout: float = 10.0,
+        client_factory: Optional[Callable[..., Any]] = None,
+        gatt_cache: Optional[GattCache] = None
+    ):
+        self.max_connections = max_connections
+        self.max_concurrent_operations = max_concurrent_operations
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self._client_factory = client_factory or BleakClient
+        self._gatt_cache = gatt_cache
+
+        self._connections: "OrderedDict[str, PooledConnection]" = OrderedDict()
+        self._connecting: Dict[str, asyncio.Future] = {}
+        self._adapter_slots: Dict[str, asyncio.Semaphore] = {}
+        self._reaper_task: Optional[asyncio.Task] = None
+
+        self.evictions = 0
+        self.connects = 0
+
+    def _slots(self, adapter: str) -> asyncio.Semaphore:
+        semaphore = self._adapter_slots.get(adapter)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_operations)
+            self._adapter_slots[adapter] = semaphore
+        return semaphore
+
+    # Connection management
+    def get(self, address: str) -> Optional[PooledConnection]:
+        """Get an open pooled connection without connecting."""
+        address = normalize_address(address)
+        connection = self._connections.get(address)
+        if connection is not None and not connection.is_connected:
+            self._discard(address, "lost")
+            return None
+        return connection
+
+    def addresses(self) -> List[str]:
+        """Addresses of open connections, least recently used first."""
+        return [address for address, connection in self._connections.items() if connection.is_connected]
+
+    async def connect(self, address: str, adapter: str = "default") -> PooledConnection:
+        """
+        Get a connection to a device, connecting if needed.
+
+        Concurrent callers for the same address share one connection attempt.
+
+        Args:
+            address: Device address
+            adapter: Adapter the connection should count against
+
+        Returns:
+            The pooled connection
+        """
+        address = normalize_address(address)
+        connection = self.get(address)
+        if connection is not None:
+            self._connections.move_to_end(address)
+            return connection
+
+        pending = self._connecting.get(address)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._connecting[address] = future
+        try:
+            connection = await self._open(address, adapter)
+            future.set_result(connection)
+            return connection
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._connecting.pop(address, None)
+
+    async def _open(self, address: str, adapter: str) -> PooledConnection:
+        await self._make_room()
+
+        client_kwargs, connect_kwargs = (
+            self._gatt_cache.backend_options(address) if self._gatt_cache is not None else ({}, {})
+        )
+        client = self._client_factory(
+            address,
+            disconnected_callback=lambda _client: self._on_disconnected(address),
+            timeout=self.connect_timeout,
+            **client_kwargs
+        )
+        async with self._slots(adapter):
+            start_time = time.monotonic()
+            try:
+                await client.connect(**connect_kwargs)
+            except (BleakError, asyncio.TimeoutError) as e:
+                get_metrics_collector().record_operation("connect", 0.0, success=False)
+                raise BleConnectionError(f"Failed to connect to {address}: {e}")
+            get_metrics_collector().record_operation("connect", time.monotonic() - start_time)
+
+        connection = PooledConnection(address, client, adapter)
+        self._connections[address] = connection
+        self.connects += 1
+        self.start()
+        logger.info(f"Pooled connection opened to {address} ({len(self._connections)}/{self.max_connections})")
+        await ble_event_bus.emit("pooled_device_connected", {"address": address})
+        return connection
+
+    async def _make_room(self) -> None:
+        """Close the least recently used idle connection if the pool is full."""
+        # Other connection attempts in flight will also need a slot
+        pending = len(self._connecting) - 1
+        while len(self._connections) + pending >= self.max_connections and self._connections:
+            victim = next(
+                (
+                    address for address, connection in self._connections.items()
+                    if not connection.active and not connection.pinned
+                ),
+                None
+            )
+            if victim is None:
+                raise BleConnectionError(
+                    f"Connection pool is full ({self.max_connections} busy connections)"
+                )
+            self.evictions += 1
+            await self.disconnect(victim, reason="evicted")
+
+    def pin(self, address: str) -> bool:
+        """
+        Keep a connection open while it is used outside the pool.
+
+        Returns:
+            True if the address has an open connection
+        """
+        address = normalize_address(address)
+        connection = self.get(address)
+        if connection is None:
+            return False
+        connection.pinned = True
+        return True
+
+    def unpin(self, address: str) -> None:
+        """Let an idle connection be closed again."""
+        connection = self._connections.get(normalize_address(address))
+        if connection is not None:
+            connection.pinned = False
+            connection.last_used = time.monotonic()
+
+    async def disconnect(self, address: str, reason: str = "requested") -> bool:
+        """
+        Close and remove a pooled connection.
+
+        Args:
+            address: Device address
+            reason: Reason reported in the disconnect event
+
+        Returns:
+            True if a connection was closed
+        """
+        address = normalize_address(address)
+        connection = self._connections.pop(address, None)
+        if connection is None:
+            return False
+        try:
+            if connection.is_connected:
+                await connection.client.disconnect()
+        except BleakError as e:
+            logger.warning(f"Error disconnecting pooled connection {address}: {e}")
+        logger.info(f"Pooled connection to {address} closed ({reason})")
+        await ble_event_bus.emit("device_disconnected", {"address": address, "reason": reason})
+        return True
+
+    def _discard(self, address: str, reason: str) -> None:
+        if self._connections.pop(address, None) is not None:
+            logger.info(f"Pooled connection to {address} dropped ({reason})")
+            # emit only queues the event, and hands it to the bus's loop when
+            # Bleak calls back from another thread
+            ble_event_bus.emit("device_disconnected", {"address": address, "reason": reason})
+
+    def _on_disconnected(self, address: str) -> None:
+        """Bleak disconnect callback."""
+        self._discard(address, "lost")
+
+    async def close_all(self) -> None:
+        """Close every pooled connection."""
+        await self.stop()
+        for address in list(self._connections):
+            await self.disconnect(address, reason="shutdown")
+
+    # Operations
+    @asynccontextmanager
+    async def acquire(self, address: str, adapter: str = "default"):
+        """
+        Exclusive access to a device's connection.
+
+        Waits for earlier operations on the same device and for a free slot
+        on the adapter.
+
+        Usage:
+            async with pool.acquire(address) as connection:
+                await connection.client.read_gatt_char(uuid)
+        """
+        connection = await self.connect(address, adapter)
+        connection.active += 1
+        try:
+            async with connection.lock, self._slots(connection.adapter):
+                connection.operations += 1
+                yield connection
+        finally:
+            connection.active -= 1
+            connection.last_used = time.monotonic()
+            if connection.address in self._connections:
+                self._connections.move_to_end(connection.address)
+
+    async def run(
+        self,
+        address: str,
+        operation: Callable[[PooledConnection], Awaitable[T]],
+        adapter: str = "default"
+    ) -> T:
+        """
+        Run an operation against a device's connection.
+
+        Args:
+            address: Device address
+            operation: Coroutine function taking the pooled connection
+            adapter: Adapter for new connections
+
+        Returns:
+            The operation's result
+        """
+        async with self.acquire(address, adapter) as connection:
+            return await operation(connection)
+
+    # Idle management
+    async def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Close connections that have been idle longer than ``idle_timeout``.
+
+        Returns:
+            Number of connections closed
+        """
+        now = now if now is not None else time.monotonic()
+        idle = [
+            address for address, connection in self._connections.items()
+            if not connection.active and not connection.pinned
+            and now - connection.last_used >= self.idle_timeout
+        ]
+        for address in idle:
+            await self.disconnect(address, reason="idle")
+        return len(idle)
+
+    def start(self) -> None:
+        """Start the background idle reaper."""
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._reap_loop())
+
+    async def stop(self) -> None:
+        """Stop the background idle reaper."""
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            try:
+                await self._reaper_task
+            except asyncio.CancelledError:
+                pass
+            self._reaper_task = None
+
+    async def _reap_loop(self) -> None:
+        interval = max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.error(f"Error evicting idle connections: {e}", exc_info=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool occupancy and per-connection details."""
+        return {
+            "connections": len(self._connections),
+            "max_connections": self.max_connections,
+            "max_concurrent_operations": self.max_concurrent_operations,
+            "idle_timeout": self.idle_timeout,
+            "connects": self.connects,
+            "evictions": self.evictions,
+            "devices": [connection.to_dict() for connection in self._connections.values()]
+        }
+
+
+# Singleton instance
+_connection_pool = None
+
+def get_connection_pool() -> BleConnectionPool:
+    """Get the singleton connection pool."""
+    global _connection_pool
+    if _connection_pool is None:
+        _connection_pool = BleConnectionPool(
+            max_connections=get_config("connection.pool.max_connections", 20),
+            max_concurrent_operations=get_config("connection.pool.max_concurrent_operations", 4),
+            idle_timeout=get_config("connection.pool.idle_timeout", 300.0),
+            connect_timeout=get_config("connection.timeout", 10.0),
+            gatt_cache=get_gatt_cache()
+        )
+    return _connection_pool
@@ -23,7 +23,9 @@ from backend.modules.ble.models import (
 from .adapter_manager import get_adapter_manager
 from .exceptions import BleConnectionError, BleOperationError, BleNotSupportedError
 from backend.modules.ble.utils.ble_scanner_wrapper import get_ble_scanner
-from backend.modules.ble.utils.ble_device_info import enhance_device_info
+from .scanner import get_scanner
+from .connection_pool import get_connection_pool
+from backend.modules.ble.utils.ble_device_info import enhance_device_info, normalize_address
 
 logger = logging.getLogger(__name__)
 
@@ -35,11 +37,27 @@ class BleDeviceManager:
     def __init__(self):
         self._cached_devices = []
         self._connected_devices = {}
+        self._pooled_addresses = set()
         self.logger = logger
         self._scanner = get_ble_scanner()
+        self._scan_engine = get_scanner()
+        self._pool = get_connection_pool()
         self._mock_mode = False
         self._mock_devices = self._get_mock_devices()
 
+    @property
+    def pool(self):
+        """The connection pool holding real device connections."""
+        return self._pool
+
+    @property
+    def client(self) -> Optional[BleakClient]:
+        """Client of the most recently used connection (for single-device callers)."""
+        addresses = self._pool.addresses()
+        if not addresses:
+            return None
+        return self._pool.get(addresses[-1]).client
+
     def set_logger(self, logger_instance):
         """
         Set a custom logger instance.
@@ -68,12 +86,15 @@ class BleDeviceManager:
             List of discovered devices.
         """
         try:
-            self.logger.info("Starting BLE scan using thread-safe scanner...")
-            
             if self._mock_mode:
                 self.logger.info("Using mock devices for scan")
                 devices = self._mock_devices
+            elif await self._scan_engine.ensure_running(active=active, warmup=scan_time):
+                # Continuous scan is running - read the live device table,
+                # filtered for this caller only
+                devices = self._scan_engine.get_devices(services=services)
             else:
+                self.logger.info("Continuous scan unavailable, using thread-safe scanner...")
                 devices = await self._scanner.discover_devices(
                     timeout=scan_time,
                     service_uuids=services,
@@ -106,7 +127,9 @@ class BleDeviceManager:
                     "name": device.get("name") or "Unknown",
                     # "details": device.get("details"),  # Removed: Causes serialization errors
                     "rssi": device.get("rssi"),
-                    "metadata": serializable_metadata
+                    "metadata": serializable_metadata,
+                    "last_seen": device.get("last_seen"),
+                    "sequence": device.get("sequence")
                 }
                 processed_devices.append(device_info)
         
@@ -180,7 +203,10 @@ class BleDeviceManager:
         Returns:
             ConnectionResult object.
         """
-        if address in self._connected_devices:
+        address = normalize_address(address)
+        if address in self._connected_devices and (
+            self._connected_devices[address]["client"] is None or self._pool.get(address) is not None
+        ):
             self.logger.info(f"Device {address} already connected")
             client = self._connected_devices[address]["client"]
             connected_at = self._connected_devices[address]["connected_at"]
@@ -210,8 +236,8 @@ class BleDeviceManager:
         while attempt < max_retries:
             try:
                 self.logger.info(f"Connecting to device {address} (attempt {attempt + 1}/{max_retries})...")
-                client = BleakClient(address)
-                await client.connect()
+                connection = await self._pool.connect(address)
+                client = connection.client
 
                 self.logger.info(f"Successfully connected to device {address}")
                 self._connected_devices[address] = {
@@ -219,6 +245,9 @@ class BleDeviceManager:
                     "connected_at": time.time(),
                     "connection_params": connection_params
                 }
+                self._pooled_addresses.add(address)
+                # The device becomes the primary (service manager) device
+                ble_event_bus.emit("device_connected", {"address": address})
 
                 return ConnectionResult(
                     success=True,
@@ -226,7 +255,7 @@ class BleDeviceManager:
                     connection_time=int(time.time() - self._connected_devices[address]["connected_at"]),
                     client=client
                 )
-            except BleakError as e:
+            except (BleakError, BleConnectionError) as e:
                 attempt += 1
                 last_error = str(e)
                 self.logger.warning(f"Connection attempt {attempt} failed for {address}: {e}")
@@ -247,12 +276,13 @@ class BleDeviceManager:
         Returns:
             True if the disconnection was successful, False otherwise.
         """
+        address = normalize_address(address)
         try:
             self.logger.info(f"Attempting to disconnect from device at {address}...")
-            client = self._connected_devices.get(address)
-            if client:
-                await client.disconnect()
-                del self._connected_devices[address]
+            entry = self._connected_devices.pop(address, None)
+            self._pooled_addresses.discard(address)
+            closed = await self._pool.disconnect(address)
+            if entry or closed:
                 self.logger.info(f"Successfully disconnected from {address}.")
                 return True
             else:
@@ -271,6 +301,40 @@ class BleDeviceManager:
         """
         return self._cached_devices
 
+    def get_live_devices(
+        self, max_age: Optional[float] = None, name_prefix: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Return a snapshot of the continuous scanner's device table.
+
+        Falls back to the cached devices from the last scan when the
+        continuous scanner is not running.
+
+        Args:
+            max_age: Only include devices seen within this many seconds.
+            name_prefix: Filter devices by name prefix.
+
+        Returns:
+            List of devices.
+        """
+        if self._scan_engine.scanning:
+            return self._scan_engine.get_devices(max_age=max_age, name_prefix=name_prefix)
+        return self._cached_devices
+
+    async def stop_scan(self) -> bool:
+        """
+        Stop the continuous background scan.
+
+        Returns:
+            True if the scan was stopped.
+        """
+        try:
+            await self._scan_engine.stop()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error stopping scan: {e}", exc_info=True)
+            return False
+
     def get_connected_devices(self) -> List[str]:
         """
         Return the list of currently connected device addresses.
@@ -278,20 +342,32 @@ class BleDeviceManager:
         Returns:
             List of connected device addresses.
         """
-        return list(self._connected_devices.keys())
+        pooled = self._pool.addresses()
+        # Drop entries for connections the pool has closed (idle, evicted or lost)
+        for address in self._pooled_addresses.difference(pooled):
+            self._connected_devices.pop(address, None)
+        self._pooled_addresses.intersection_update(pooled)
+        unpooled = [address for address in self._connected_devices if address not in pooled]
+        return unpooled + pooled
+
+    async def clear_all_connections(self) -> None:
+        """
+        Disconnect every device, including pooled connections.
+        """
+        self._connected_devices = {}
+        self._pooled_addresses.clear()
+        await self._pool.close_all()
 
     async def get_saved_devices(self) -> List[Dict]:
         """
-        Return the list of bonded/saved devices (Not Implemented).
-        
-        Placeholder implementation. Requires platform-specific logic or persistence.
+        Return the list of bonded/saved devices.
+
+        Served from the device state store's in-memory index.
 
         Returns:
-            An empty list (currently).
+            List of bonded device dictionaries.
         """
-        self.logger.warning("get_saved_devices is not yet implemented.")
-        # TODO: Implement logic to retrieve bonded/paired devices from OS or persistence
-        raise NotImplementedError("Bonded device retrieval is not implemented.")
+        return await get_persistence_service().get_bonded_devices()
 
     def _get_mock_devices(self) -> List[Dict]:
         """
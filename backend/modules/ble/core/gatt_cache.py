@@ -0,0 +1,231 @@
+"""
+Persistent GATT attribute cache.
+
+Discovered GATT tables are stored per device address, together with the
+device's Database Hash (characteristic 0x2B2A, Bluetooth 5.1+). A cached
+table is reused when the hash read after connecting matches the stored one,
+and dropped when the hash changes or the device sends a Service Changed
+(0x2A05) indication.
+
+For devices with a validated entry, connections also ask the Bleak backend
+to skip over-the-air service discovery and serve services from its own cache
+(see ``GattCache.backend_options``); the Database Hash read after connecting
+is what keeps that safe.
+
+Tables are kept in memory and written to one JSON file per device so they
+survive restarts.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from backend.modules.ble.config import get_config
+from backend.modules.ble.utils.ble_device_info import normalize_address
+
+logger = logging.getLogger(__name__)
+
+DATABASE_HASH_UUID = "00002b2a-0000-1000-8000-00805f9b34fb"
+SERVICE_CHANGED_UUID = "00002a05-0000-1000-8000-00805f9b34fb"
+
+
+def build_gatt_table(services) -> List[Dict[str, Any]]:
+    """
+    Convert a Bleak service collection into a JSON-serializable table.
+
+    Args:
+        services: Iterable of Bleak GATT services
+
+    Returns:
+        List of service dictionaries with their characteristics and descriptors
+    """
+    table = []
+    for service in services:
+        characteristics = []
+        for char in getattr(service, "characteristics", []):
+            characteristics.append({
+                "uuid": str(char.uuid).lower(),
+                "handle": getattr(char, "handle", None),
+                "properties": [str(p) for p in (char.properties or [])],
+                "descriptors": [
+                    {"uuid": str(desc.uuid).lower(), "handle": getattr(desc, "handle", None)}
+                    for desc in (getattr(char, "descriptors", None) or [])
+                ]
+            })
+        table.append({
+            "uuid": str(service.uuid).lower(),
+            "handle": getattr(service, "handle", None),
+            "characteristics": characteristics
+        })
+    return table
+
+
+def find_characteristic(services, uuid: str):
+    """Find a characteristic by UUID in a Bleak service collection."""
+    for service in services or []:
+        for char in getattr(service, "characteristics", []):
+            if str(char.uuid).lower() == uuid:
+                return char
+    return None
+
+
+async def read_database_hash(client) -> Optional[str]:
+    """
+    Read the GATT Database Hash from a connected device.
+
+    Returns:
+        Hex string, or None if the device does not expose it
+    """
+    if find_characteristic(client.services, DATABASE_HASH_UUID) is None:
+        return None
+    try:
+        value = await client.read_gatt_char(DATABASE_HASH_UUID)
+        return bytes(value).hex() if value else None
+    except Exception as e:
+        logger.debug(f"Could not read database hash from {getattr(client, 'address', '?')}: {e}")
+        return None
+
+
+class GattCache:
+    """
+    GATT tables keyed by normalized device address.
+
+    Args:
+        directory: Directory for the per-device JSON files (None for memory only)
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, address: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^0-9A-Za-z_-]", "_", address) + ".json")
+
+    def get(self, address: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached entry for a device.
+
+        Returns:
+            Dictionary with ``services``, ``database_hash`` and ``cached_at``, or None
+        """
+        address = normalize_address(address)
+        entry = self._entries.get(address)
+        if entry is None and self.directory:
+            try:
+                with open(self._path(address), "r") as f:
+                    entry = json.load(f)
+                self._entries[address] = entry
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable GATT cache for {address}: {e}")
+                return None
+        return entry
+
+    def lookup(self, address: str, database_hash: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the cached table if it matches the device's current database hash.
+
+        Devices without a Database Hash cannot be validated and always miss.
+
+        Args:
+            address: Device address
+            database_hash: Hash read from the device
+
+        Returns:
+            Cached GATT table, or None
+        """
+        entry = self.get(address)
+        if entry is not None and database_hash and entry.get("database_hash") == database_hash:
+            self.hits += 1
+            return entry["services"]
+        self.misses += 1
+        return None
+
+    def backend_options(self, address: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Bleak options that skip service rediscovery when connecting to a known device.
+
+        Only entries with a Database Hash qualify, since the hash read after
+        connecting is the only way to notice that the backend's cache is out
+        of date. WinRT is told to read services from the OS cache
+        (``use_cached_services``) and BlueZ to reuse Bleak's copy of the
+        BlueZ object tree (``dangerous_use_bleak_cache``).
+
+        Args:
+            address: Device address
+
+        Returns:
+            Tuple of (``BleakClient`` keyword arguments, ``connect()`` keyword arguments)
+        """
+        entry = self.get(address)
+        if entry is None or not entry.get("database_hash"):
+            return {}, {}
+        return {"winrt": {"use_cached_services": True}}, {"dangerous_use_bleak_cache": True}
+
+    def put(self, address: str, services: List[Dict[str, Any]], database_hash: Optional[str]) -> None:
+        """Store a device's GATT table."""
+        address = normalize_address(address)
+        entry = {
+            "address": address,
+            "database_hash": database_hash,
+            "cached_at": time.time(),
+            "services": services
+        }
+        self._entries[address] = entry
+        if not self.directory:
+            return
+        path = self._path(address)
+        try:
+            with open(path + ".tmp", "w") as f:
+                json.dump(entry, f)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            logger.warning(f"Could not persist GATT cache for {address}: {e}")
+
+    def invalidate(self, address: str) -> None:
+        """Drop a device's cached table (e.g. after Service Changed)."""
+        address = normalize_address(address)
+        self._entries.pop(address, None)
+        self.invalidations += 1
+        if self.directory:
+            try:
+                os.remove(self._path(address))
+            except FileNotFoundError:
+                pass
+        logger.info(f"GATT cache invalidated for {address}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "devices": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "directory": self.directory
+        }
+
+
+# Singleton instance
+_gatt_cache = None
+
+def get_gatt_cache() -> Optional[GattCache]:
+    """Get the singleton GATT cache, or None if caching is disabled."""
+    global _gatt_cache
+    if _gatt_cache is None and get_config("connection.use_cached_services", True):
+        directory = get_config("service.gatt_cache_directory") or os.path.join(
+            os.path.expanduser("~"), ".blemanager", "gatt_cache"
+        )
+        try:
+            _gatt_cache = GattCache(directory)
+        except OSError as e:
+            logger.warning(f"GATT cache directory unavailable ({e}), caching in memory only")
+            _gatt_cache = GattCache()
+    return _gatt_cache
@@ -0,0 +1,498 @@
+# backend/modules/ble/core/notification_log.py
+"""
+Append-only on-disk log of BLE notifications.
+
+Notifications are written as fixed-size records to segment files:
+
+    notifications-<first record number>.log
+
+Each segment starts with a 16-byte header (``magic``, ``record size``)
+followed by records laid out as ``<d16sH`` (timestamp, characteristic UUID
+bytes, payload length) plus the payload padded to ``max_payload`` bytes.
+Because records have a fixed size and timestamps never decrease, record
+``n`` lives at a known offset and time lookups are binary searches.
+
+Next to every segment a sparse ``.idx`` file gets one ``<dQ>`` entry
+(timestamp, record number) every ``index_interval`` records, so a lookup
+only has to bisect a small window of the segment.
+
+Segments are read through ``mmap`` so replay and export never load a whole
+segment into memory. Closed segments are removed oldest first when the log
+exceeds its size or age limit. With an age limit the active segment is also
+closed once it spans a quarter of it, so slow logs expire too.
+
+Appends happen on the event loop while exports read (and flush) from worker
+threads; writer state is guarded by one lock.
+"""
+
+import bisect
+import glob
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from backend.modules.ble.comms.framing import normalize_uuid
+
+logger = logging.getLogger(__name__)
+
+def _uuid_key(characteristic_uuid: str) -> bytes:
+    """
+    16-byte record key for a characteristic UUID.
+
+    Raises:
+        ValueError: If the string is not a (short or full) UUID
+    """
+    return uuid.UUID(normalize_uuid(characteristic_uuid)).bytes
+
+
+SEGMENT_MAGIC = b"BLENLOG1"
+SEGMENT_HEADER = struct.Struct("<8sI4x")
+RECORD_HEADER = struct.Struct("<d16sH")
+INDEX_ENTRY = struct.Struct("<dQ")
+
+SEGMENT_PREFIX = "notifications-"
+SEGMENT_SUFFIX = ".log"
+INDEX_SUFFIX = ".idx"
+
+# Seconds between age-retention checks made from append
+RETENTION_CHECK_INTERVAL = 60.0
+
+
+class _Segment:
+    """One segment file and its sparse index."""
+
+    def __init__(self, path: str, base: int, record_size: int):
+        self.path = path
+        self.index_path = path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+        self.base = base
+        self.record_size = record_size
+
+    @property
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path) + (
+                os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+            )
+        except OSError:
+            return 0
+
+    @property
+    def record_count(self) -> int:
+        try:
+            return max(0, (os.path.getsize(self.path) - SEGMENT_HEADER.size) // self.record_size)
+        except OSError:
+            return 0
+
+    def load_index(self) -> Tuple[List[float], List[int]]:
+        """Read the sparse index as parallel timestamp/record lists."""
+        timestamps, records = [], []
+        if not os.path.exists(self.index_path):
+            return timestamps, records
+        with open(self.index_path, "rb") as f:
+            data = f.read()
+        for offset in range(0, len(data) - INDEX_ENTRY.size + 1, INDEX_ENTRY.size):
+            timestamp, record = INDEX_ENTRY.unpack_from(data, offset)
+            timestamps.append(timestamp)
+            records.append(record)
+        return timestamps, records
+
+    def remove(self) -> None:
+        for path in (self.path, self.index_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class _SegmentReader:
+    """Memory-mapped, read-only view of a segment."""
+
+    def __init__(self, segment: _Segment):
+        self.segment = segment
+        self.record_size = segment.record_size
+        self.count = segment.record_count
+        self._file = open(segment.path, "rb")
+        self._map = None
+        if self.count:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "_SegmentReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _offset(self, record: int) -> int:
+        return SEGMENT_HEADER.size + record * self.record_size
+
+    def timestamp(self, record: int) -> float:
+        return struct.unpack_from("<d", self._map, self._offset(record))[0]
+
+    def read(self, record: int) -> Tuple[float, bytes, bytes]:
+        """Read ``(timestamp, uuid bytes, payload)`` for a record."""
+        offset = self._offset(record)
+        timestamp, uuid_bytes, length = RECORD_HEADER.unpack_from(self._map, offset)
+        start = offset + RECORD_HEADER.size
+        return timestamp, uuid_bytes, self._map[start:start + length]
+
+    def bisect(self, timestamp: float, right: bool = False) -> int:
+        """First record with a timestamp >= (or > when ``right``) ``timestamp``."""
+        lo, hi = 0, self.count
+        index_times, index_records = self.segment.load_index()
+        if index_times:
+            position = (bisect.bisect_right if right else bisect.bisect_left)(index_times, timestamp)
+            if position > 0:
+                lo = min(index_records[position - 1], self.count)
+            if position < len(index_records):
+                hi = min(index_records[position] + 1, self.count)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = self.timestamp(mid)
+            if value < timestamp or (right and value == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+class NotificationLog:
+    """
+    Segmented append-only notification log.
+
+    Args:
+        directory: Directory holding segment and index files
+        segment_size: Target segment size in bytes
+        max_payload: Payload bytes reserved per record (longer payloads are truncated)
+        index_interval: Records between sparse index entries
+        retention_bytes: Total size limit (None for no limit)
+        retention_seconds: Age limit (None for no limit)
+        flush_interval: Seconds between flushes of buffered writes
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 16 * 1024 * 1024,
+        max_payload: int = 244,
+        index_interval: int = 1024,
+        retention_bytes: Optional[int] = None,
+        retention_seconds: Optional[float] = None,
+        flush_interval: float = 1.0
+    ):
+        self.directory = directory
+        self.max_payload = max_payload
+        self.record_size = RECORD_HEADER.size + max_payload
+        self.records_per_segment = max(1, (segment_size - SEGMENT_HEADER.size) // self.record_size)
+        self.index_interval = max(1, index_interval)
+        self.retention_bytes = retention_bytes
+        self.retention_seconds = retention_seconds
+        self.flush_interval = flush_interval
+
+        self.records_written = 0
+        self.truncated = 0
+
+        self._segments: List[_Segment] = []
+        self._file = None
+        self._index_file = None
+        self._segment_records = 0
+        self._next_record = 0
+        self._last_timestamp = float("-inf")
+        self._segment_first_timestamp: Optional[float] = None
+        self._last_flush = time.monotonic()
+        self._last_retention_check = time.monotonic()
+        self._padding = bytes(max_payload)
+        self._lock = threading.RLock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_segments()
+        self.enforce_retention()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _load_segments(self) -> None:
+        """Discover existing segments and reopen the newest one for appending."""
+        for path in sorted(glob.glob(os.path.join(self.directory, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))):
+            name = os.path.basename(path)
+            try:
+                base = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+                with open(path, "rb") as f:
+                    magic, record_size = SEGMENT_HEADER.unpack(f.read(SEGMENT_HEADER.size))
+            except (ValueError, struct.error) as e:
+                logger.warning(f"Skipping unreadable notification log segment {path}: {e}")
+                continue
+            if magic != SEGMENT_MAGIC:
+                logger.warning(f"Skipping notification log segment with bad header: {path}")
+                continue
+            self._segments.append(_Segment(path, base, record_size))
+
+        self._segments.sort(key=lambda segment: segment.base)
+        if not self._segments:
+            return
+
+        last = self._segments[-1]
+        count = last.record_count
+        # Drop a partially written trailing record
+        with open(last.path, "r+b") as f:
+            f.truncate(SEGMENT_HEADER.size + count * last.record_size)
+        self._next_record = last.base + count
+        if count:
+            with _SegmentReader(last) as reader:
+                self._last_timestamp = reader.timestamp(count - 1)
+
+        if last.record_size == self.record_size and count < self.records_per_segment:
+            self._file = open(last.path, "ab")
+            self._index_file = open(last.index_path, "ab")
+            self._segment_records = count
+            if count:
+                with _SegmentReader(last) as reader:
+                    self._segment_first_timestamp = reader.timestamp(0)
+
+    def _roll(self) -> None:
+        """Close the current segment and start a new one."""
+        self._close_files()
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{self._next_record:020d}{SEGMENT_SUFFIX}")
+        segment = _Segment(path, self._next_record, self.record_size)
+        self._file = open(path, "wb")
+        self._file.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, self.record_size))
+        self._index_file = open(segment.index_path, "wb")
+        self._segments.append(segment)
+        self._segment_records = 0
+        self._segment_first_timestamp = None
+        self.enforce_retention()
+
+    def _segment_expired(self, timestamp: float) -> bool:
+        """Whether the active segment spans enough time to close it for age retention."""
+        return (
+            self.retention_seconds is not None
+            and self._segment_first_timestamp is not None
+            and timestamp - self._segment_first_timestamp >= self.retention_seconds / 4
+        )
+
+    def append(self, characteristic_uuid: str, timestamp: float, data: bytes) -> None:
+        """
+        Append a notification to the log.
+
+        Args:
+            characteristic_uuid: Characteristic UUID
+            timestamp: Notification time (clamped to be non-decreasing)
+            data: Raw payload
+
+        Raises:
+            ValueError: If ``characteristic_uuid`` is not a UUID; records are
+                keyed by the 16-byte UUID, so other strings cannot be stored
+        """
+        key = _uuid_key(characteristic_uuid)
+        data = bytes(data or b"")
+        if len(data) > self.max_payload:
+            self.truncated += 1
+            data = data[:self.max_payload]
+
+        with self._lock:
+            timestamp = max(timestamp, self._last_timestamp)
+            if (
+                self._file is None
+                or self._segment_records >= self.records_per_segment
+                or self._segment_expired(timestamp)
+            ):
+                self._roll()
+
+            if self._segment_records % self.index_interval == 0:
+                self._index_file.write(INDEX_ENTRY.pack(timestamp, self._segment_records))
+
+            self._file.write(RECORD_HEADER.pack(timestamp, key, len(data)))
+            self._file.write(data)
+            self._file.write(self._padding[len(data):])
+
+            if self._segment_first_timestamp is None:
+                self._segment_first_timestamp = timestamp
+            self._segment_records += 1
+            self._next_record += 1
+            self._last_timestamp = timestamp
+            self.records_written += 1
+
+            now = time.monotonic()
+            if now - self._last_flush >= self.flush_interval:
+                self.flush()
+            if self.retention_seconds is not None and now - self._last_retention_check >= RETENTION_CHECK_INTERVAL:
+                self.enforce_retention()
+
+    def flush(self) -> None:
+        """Flush buffered writes so readers see them (safe from other threads)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._index_file.flush()
+            self._last_flush = time.monotonic()
+
+    def _close_files(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._index_file.close()
+            self._file = None
+            self._index_file = None
+
+    def close(self) -> None:
+        """Flush and close the active segment."""
+        with self._lock:
+            self.flush()
+            self._close_files()
+
+    def enforce_retention(self, now: Optional[float] = None) -> int:
+        """
+        Remove closed segments that exceed the size or age limits.
+
+        The segment being written is never removed.
+
+        Returns:
+            Number of segments removed
+        """
+        now = now if now is not None else time.time()
+        removed = 0
+        with self._lock:
+            self._last_retention_check = time.monotonic()
+            total = sum(segment.size for segment in self._segments)
+
+            while len(self._segments) > 1:
+                oldest = self._segments[0]
+                too_big = self.retention_bytes is not None and total > self.retention_bytes
+                too_old = False
+                if self.retention_seconds is not None and not too_big:
+                    newest_in_segment = self._segment_last_timestamp(oldest)
+                    too_old = newest_in_segment is not None and newest_in_segment < now - self.retention_seconds
+                if not (too_big or too_old):
+                    break
+                total -= oldest.size
+                oldest.remove()
+                self._segments.pop(0)
+                removed += 1
+
+        if removed:
+            logger.info(f"Removed {removed} notification log segment(s)")
+        return removed
+
+    def _segment_last_timestamp(self, segment: _Segment) -> Optional[float]:
+        if not segment.record_count:
+            return None
+        with _SegmentReader(segment) as reader:
+            return reader.timestamp(reader.count - 1)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _snapshot(self) -> List[_Segment]:
+        with self._lock:
+            return list(self._segments)
+
+    @staticmethod
+    def _open_reader(segment: _Segment) -> Optional[_SegmentReader]:
+        try:
+            return _SegmentReader(segment)
+        except FileNotFoundError:
+            # Removed by retention after the snapshot was taken
+            return None
+
+    def replay(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        characteristic_uuid: Optional[str] = None
+    ) -> Iterator[Tuple[float, str, bytes]]:
+        """
+        Iterate logged notifications in time order (oldest first).
+
+        Args:
+            start_time: Inclusive lower bound (None for no bound)
+            end_time: Inclusive upper bound (None for no bound)
+            characteristic_uuid: Optional characteristic filter
+
+        Yields:
+            ``(timestamp, characteristic_uuid, data)`` tuples
+        """
+        self.flush()
+        try:
+            wanted = _uuid_key(characteristic_uuid) if characteristic_uuid else None
+        except ValueError:
+            return  # Nothing but UUIDs is ever logged
+        for segment in self._snapshot():
+            reader = self._open_reader(segment)
+            if reader is None:
+                continue
+            with reader:
+                if not reader.count:
+                    continue
+                if end_time is not None and reader.timestamp(0) > end_time:
+                    return
+                first = reader.bisect(start_time) if start_time is not None else 0
+                stop = reader.bisect(end_time, right=True) if end_time is not None else reader.count
+                for record in range(first, stop):
+                    timestamp, uuid_bytes, data = reader.read(record)
+                    if wanted is None or uuid_bytes == wanted:
+                        yield timestamp, str(uuid.UUID(bytes=uuid_bytes)), data
+
+    def query(
+        self,
+        characteristic_uuid: Optional[str] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[Tuple[float, str, bytes]]:
+        """
+        Get the most recent logged notifications, newest first.
+
+        Segments are walked from the newest backwards so only the records
+        needed to satisfy ``limit`` are read.
+
+        Returns:
+            List of ``(timestamp, characteristic_uuid, data)`` tuples
+        """
+        self.flush()
+        try:
+            wanted = _uuid_key(characteristic_uuid) if characteristic_uuid else None
+        except ValueError:
+            return []  # Nothing but UUIDs is ever logged
+        results = []
+        for segment in reversed(self._snapshot()):
+            reader = self._open_reader(segment)
+            if reader is None:
+                continue
+            with reader:
+                if not reader.count:
+                    continue
+                if start_time is not None and reader.timestamp(reader.count - 1) < start_time:
+                    break
+                first = reader.bisect(start_time) if start_time is not None else 0
+                stop = reader.bisect(end_time, right=True) if end_time is not None else reader.count
+                for record in range(stop - 1, first - 1, -1):
+                    timestamp, uuid_bytes, data = reader.read(record)
+                    if wanted is not None and uuid_bytes != wanted:
+                        continue
+                    results.append((timestamp, str(uuid.UUID(bytes=uuid_bytes)), data))
+                    if limit is not None and len(results) >= limit:
+                        return results
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Segment counts, sizes and write counters."""
+        segments = self._snapshot()
+        return {
+            "directory": self.directory,
+            "segments": len(segments),
+            "records": sum(segment.record_count for segment in segments),
+            "size_bytes": sum(segment.size for segment in segments),
+            "record_size": self.record_size,
+            "records_written": self.records_written,
+            "truncated": self.truncated
+        }
@@ -2,18 +2,76 @@
 
 import logging
 import asyncio
+import os
 import time
 from typing import Dict, Any, List, Optional, Callable, Union
-from collections import deque
 
 from backend.modules.ble.models import (
     NotificationEvent, NotificationHistory, CharacteristicValue,
-    NotificationMessage, MessageType
+    NotificationMessage, MessageType, NotificationSubscription,
+    NotificationBatchPolicy
 )
 from backend.modules.ble.utils.events import ble_event_bus
-from backend.modules.ble.comms import websocket_manager, broadcast_message
+from backend.modules.ble.utils.ble_device_info import normalize_address
+from backend.modules.ble.comms import websocket_manager
+from backend.modules.ble.comms.framing import decode_value, normalize_uuid
+from backend.modules.ble.config import get_config
+from .notification_store import NotificationHistoryStore
+from .notification_log import NotificationLog
 from .exceptions import BleConnectionError, BleServiceError
 
+
+class _NotificationBatcher:
+    """
+    Collects notifications for one characteristic according to a batch policy.
+    
+    A batch is flushed when it reaches ``max_batch_size`` samples or
+    ``max_delay_ms`` after its first sample. With ``latest_only`` the batch
+    holds just the newest sample.
+    """
+    
+    def __init__(self, characteristic_uuid: str, policy: NotificationBatchPolicy, flush: Callable):
+        self.characteristic_uuid = characteristic_uuid
+        self.policy = policy
+        self._flush_callback = flush
+        self._samples: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+    
+    def add(self, timestamp: float, data: bytes) -> None:
+        """Add a sample, flushing if the batch is full."""
+        if self.policy.latest_only:
+            self._samples = [(timestamp, data)]
+        else:
+            self._samples.append((timestamp, data))
+        
+        if not self.policy.latest_only and len(self._samples) >= self.policy.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            if self.policy.max_delay_ms > 0:
+                self._timer = asyncio.get_running_loop().call_later(
+                    self.policy.max_delay_ms / 1000.0, self.flush
+                )
+            elif self.policy.latest_only:
+                self.flush()
+    
+    def flush(self) -> None:
+        """Deliver pending samples."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._samples:
+            return
+        samples, self._samples = self._samples, []
+        self._flush_callback(self.characteristic_uuid, samples, self.policy.latest_only)
+    
+    def cancel(self) -> None:
+        """Drop pending samples and stop the timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._samples = []
+
+
 class BleNotificationManager:
     """
     Manages BLE characteristic notifications.
@@ -38,21 +96,68 @@ class BleNotificationManager:
         self.service_manager = service_manager
         self.max_history = max_history
         
-        # Notification history (deque for efficient size limiting)
-        self._notification_history: Dict[str, deque] = {}
+        # Notification history (columnar ring buffer per characteristic)
+        self._notification_history = NotificationHistoryStore(
+            capacity=max_history,
+            payload_size=get_config("notifications.history_payload_size", 20)
+        )
+        
+        # Optional persistent log (serves history beyond the in-memory buffers)
+        self._notification_log = self._create_notification_log()
         
         # Active subscriptions
         self._active_subscriptions: Dict[str, Dict[str, Any]] = {}
         
+        # Batchers for subscriptions with a batch policy
+        self._batchers: Dict[str, _NotificationBatcher] = {}
+        
         # Register for events
         ble_event_bus.on("device_disconnected", self._handle_device_disconnected)
     
+    def _create_notification_log(self) -> Optional[NotificationLog]:
+        """Open the on-disk notification log if it is enabled."""
+        if not get_config("notifications.log.enabled", False):
+            return None
+        
+        directory = get_config("notifications.log.directory") or os.path.join(
+            os.path.expanduser("~"), ".blemanager", "notification_log"
+        )
+        retention_mb = get_config("notifications.log.retention_mb", 512)
+        retention_hours = get_config("notifications.log.retention_hours", 72)
+        try:
+            return NotificationLog(
+                directory,
+                segment_size=int(get_config("notifications.log.segment_size_mb", 16) * 1024 * 1024),
+                max_payload=get_config("notifications.log.max_payload", 244),
+                index_interval=get_config("notifications.log.index_interval", 1024),
+                retention_bytes=int(retention_mb * 1024 * 1024) if retention_mb is not None else None,
+                retention_seconds=retention_hours * 3600 if retention_hours is not None else None,
+                flush_interval=get_config("notifications.log.flush_interval", 1.0)
+            )
+        except OSError as e:
+            self.logger.error(f"Could not open notification log in {directory}: {e}")
+            return None
+    
+    @property
+    def notification_log(self) -> Optional[NotificationLog]:
+        """The on-disk notification log, or None if it is disabled."""
+        return self._notification_log
+    
+    def close(self) -> None:
+        """Flush and close the on-disk notification log."""
+        if self._notification_log is not None:
+            self._notification_log.close()
+    
     def set_service_manager(self, service_manager):
         """Set the service manager to use for operations."""
         self.service_manager = service_manager
     
     async def subscribe_to_characteristic(
-        self, characteristic_uuid: str, enable: bool = True
+        self,
+        characteristic_uuid: str,
+        enable: bool = True,
+        batch: Optional[NotificationBatchPolicy] = None,
+        client_id: str = "default"
     ) -> bool:
         """
         Subscribe to notifications for a characteristic.
@@ -60,6 +165,8 @@ class BleNotificationManager:
         Args:
             characteristic_uuid: UUID of the characteristic
             enable: Whether to enable (True) or disable (False) notifications
+            batch: Optional batching policy for delivering notifications
+            client_id: Identifier of the subscriber
             
         Returns:
             True if successful
@@ -76,10 +183,19 @@ class BleNotificationManager:
                 
                 if success:
                     # Track the subscription
+                    subscription = NotificationSubscription(
+                        characteristic_uuid=characteristic_uuid,
+                        client_id=client_id,
+                        batch=batch or NotificationBatchPolicy(
+                            **get_config("notifications.batch", {})
+                        )
+                    )
                     self._active_subscriptions[characteristic_uuid] = {
-                        "timestamp": time.time(),
-                        "enabled": True
+                        "timestamp": subscription.timestamp,
+                        "enabled": True,
+                        "subscription": subscription
                     }
+                    self.set_batch_policy(characteristic_uuid, subscription.batch)
                     
                     # Emit event
                     ble_event_bus.emit("notification_subscribed", {
@@ -92,8 +208,9 @@ class BleNotificationManager:
                 success = await self.service_manager.stop_notify(characteristic_uuid)
                 
                 if success and characteristic_uuid in self._active_subscriptions:
-                    # Update subscription status
+                    # Update subscription status and deliver anything still batched
                     self._active_subscriptions[characteristic_uuid]["enabled"] = False
+                    self.set_batch_policy(characteristic_uuid, None)
                     
                     # Emit event
                     ble_event_bus.emit("notification_unsubscribed", {
@@ -105,6 +222,33 @@ class BleNotificationManager:
             self.logger.error(f"Error subscribing to characteristic: {e}", exc_info=True)
             raise BleServiceError(f"Error subscribing to characteristic: {e}")
     
+    def set_batch_policy(
+        self, characteristic_uuid: str, policy: Optional[NotificationBatchPolicy]
+    ) -> None:
+        """
+        Set or clear the batching policy for a characteristic.
+        
+        Pending samples under the previous policy are delivered first.
+        
+        Args:
+            characteristic_uuid: UUID of the characteristic
+            policy: Batch policy, or None to deliver every notification immediately
+        """
+        # Batchers are looked up by the normalized UUID notifications carry
+        key = normalize_uuid(characteristic_uuid)
+        previous = self._batchers.pop(key, None)
+        if previous:
+            previous.flush()
+        
+        if policy is not None and (policy.enabled or policy.latest_only):
+            self._batchers[key] = _NotificationBatcher(
+                key, policy, self._deliver_batch
+            )
+        
+        subscription = self._active_subscriptions.get(characteristic_uuid, {}).get("subscription")
+        if subscription is not None:
+            subscription.batch = policy or NotificationBatchPolicy()
+    
     def get_active_subscriptions(self) -> List[str]:
         """
         Get a list of characteristic UUIDs with active subscriptions.
@@ -118,38 +262,65 @@ class BleNotificationManager:
         ]
     
     def get_notification_history(
-        self, characteristic_uuid: Optional[str] = None, limit: int = 100
+        self,
+        characteristic_uuid: Optional[str] = None,
+        limit: int = 100,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Get the notification history for a characteristic.
         
+        Recent events come from the in-memory buffers. When those cannot fill
+        ``limit`` (older samples were evicted, or the process restarted) and
+        the on-disk log is enabled, the events are served from the log.
+        
         Args:
             characteristic_uuid: Optional UUID to filter by
             limit: Maximum number of events to return
+            start_time: Optional inclusive lower bound (seconds since epoch)
+            end_time: Optional inclusive upper bound (seconds since epoch)
             
         Returns:
             Dictionary with notification events
         """
         if characteristic_uuid:
-            # Get history for a specific characteristic
-            events = list(self._notification_history.get(characteristic_uuid, []))[-limit:]
+            characteristic_uuid = normalize_uuid(characteristic_uuid)
+            # Get the most recent events for a specific characteristic (oldest first)
+            events = [
+                {**self._history_event(timestamp, data), "characteristic_uuid": characteristic_uuid}
+                for timestamp, data in self._notification_history.query(
+                    characteristic_uuid, start_time, end_time, limit
+                )
+            ]
+            if self._notification_log is not None and len(events) < limit:
+                logged = self._notification_log.query(characteristic_uuid, start_time, end_time, limit)
+                if len(logged) > len(events):
+                    events = [
+                        {**self._history_event(timestamp, data), "characteristic_uuid": characteristic_uuid}
+                        for timestamp, _, data in reversed(logged)
+                    ]
             return {
                 "events": events,
                 "count": len(events),
                 "characteristic_uuid": characteristic_uuid
             }
         else:
-            # Get combined history across all characteristics
-            all_events = []
-            for uuid, events in self._notification_history.items():
-                all_events.extend([
-                    {**event, "characteristic_uuid": uuid}
-                    for event in events
-                ])
-            
-            # Sort by timestamp (most recent first)
-            all_events.sort(key=lambda e: e.get("timestamp", 0), reverse=True)
-            all_events = all_events[:limit]
+            # Merge the per-characteristic buffers (most recent first),
+            # decoding only what is returned
+            all_events = [
+                {**self._history_event(timestamp, data), "characteristic_uuid": uuid}
+                for timestamp, uuid, data in self._notification_history.query_all(
+                    start_time, end_time, limit
+                )
+            ]
+            if self._notification_log is not None and len(all_events) < limit:
+                logged = self._notification_log.query(None, start_time, end_time, limit)
+                if len(logged) > len(all_events):
+                    all_events = [
+                        {**self._history_event(timestamp, data), "characteristic_uuid": uuid}
+                        for timestamp, uuid, data in logged
+                    ]
             
             return {
                 "events": all_events,
@@ -163,13 +334,9 @@ class BleNotificationManager:
         Args:
             characteristic_uuid: Optional UUID to clear history for
         """
-        if characteristic_uuid:
-            # Clear history for a specific characteristic
-            if characteristic_uuid in self._notification_history:
-                self._notification_history[characteristic_uuid] = deque(maxlen=self.max_history)
-        else:
-            # Clear all history
-            self._notification_history = {}
+        self._notification_history.clear(
+            normalize_uuid(characteristic_uuid) if characteristic_uuid else None
+        )
     
     async def clear_all_subscriptions(self) -> bool:
         """
@@ -197,6 +364,9 @@ class BleNotificationManager:
             
             # Clear the tracking dict
             self._active_subscriptions = {}
+            for batcher in self._batchers.values():
+                batcher.cancel()
+            self._batchers = {}
             
             return True
         except Exception as e:
@@ -211,59 +381,93 @@ class BleNotificationManager:
         Handle a notification from a characteristic.
         
         This method is called when a notification is received from a device.
-        It stores the notification in history and broadcasts it to WebSocket clients.
+        It stores the notification in history and broadcasts it to WebSocket
+        clients, either immediately or through the subscription's batcher.
         
         Args:
-            characteristic_uuid: UUID of the characteristic
+            characteristic_uuid: UUID of the characteristic (or the Bleak
+                characteristic object passed as the notification sender)
             data: Notification data
         """
         try:
-            # Create a notification event
             timestamp = time.time()
+            data = bytes(data or b"")
+            # One key per characteristic in history, the log and batchers,
+            # whether it arrives as a short or full UUID
+            characteristic_uuid = normalize_uuid(getattr(characteristic_uuid, "uuid", characteristic_uuid))
             
-            # Convert data to various formats for flexibility
-            char_value = CharacteristicValue(
-                hex=data.hex() if data else "",
-                text=self._try_decode_bytes(data),
-                bytes=[b for b in data] if data else [],
-                int=self._try_convert_to_int(data)
-            )
-            
-            # Create event object
-            event = {
-                "timestamp": timestamp,
-                "value": char_value.model_dump()
-            }
-            
-            # Store in history
-            if characteristic_uuid not in self._notification_history:
-                self._notification_history[characteristic_uuid] = deque(maxlen=self.max_history)
+            # Store the raw value; decoded forms are computed when history is read
+            self._notification_history.append(characteristic_uuid, timestamp, data)
+            if self._notification_log is not None:
+                try:
+                    self._notification_log.append(characteristic_uuid, timestamp, data)
+                except ValueError:
+                    self.logger.debug(f"Not logging notification from non-UUID characteristic {characteristic_uuid}")
+                except OSError as e:
+                    self.logger.error(f"Error writing notification log: {e}")
             
-            self._notification_history[characteristic_uuid].append(event)
+            batcher = self._batchers.get(characteristic_uuid)
+            if batcher is not None:
+                batcher.add(timestamp, data)
+                return
             
-            # Broadcast to WebSocket clients
-            notification_message = {
-                "type": MessageType.NOTIFICATION,
-                "characteristic": characteristic_uuid,
-                "value": char_value.model_dump(),
-                "timestamp": timestamp
-            }
+            # Broadcast to WebSocket clients in each client's negotiated format
+            websocket_manager.broadcast_notification(
+                characteristic_uuid,
+                data,
+                timestamp,
+                json_builder=lambda value: {
+                    "type": MessageType.NOTIFICATION.value,
+                    "data": {
+                        "characteristic": characteristic_uuid,
+                        "value": value,
+                        "timestamp": timestamp
+                    }
+                }
+            )
             
-            # Use the broadcast function from comms package
-            await broadcast_message(MessageType.NOTIFICATION, {
-                "characteristic": characteristic_uuid,
-                "value": char_value.model_dump(),
+            # Emit event with the raw value
+            ble_event_bus.emit("notification_received", {
+                "uuid": characteristic_uuid,
+                "data": data,
                 "timestamp": timestamp
             })
+        except Exception as e:
+            self.logger.error(f"Error handling notification: {e}", exc_info=True)
+    
+    def _deliver_batch(self, characteristic_uuid: str, samples: List[tuple], latest_only: bool) -> None:
+        """Send a batch of notifications as one message and one event."""
+        try:
+            websocket_manager.broadcast_notification_batch(
+                characteristic_uuid,
+                samples,
+                json_builder=lambda batch: {
+                    "type": MessageType.NOTIFICATION_BATCH.value,
+                    "data": {
+                        "characteristic": characteristic_uuid,
+                        "samples": batch,
+                        "count": len(batch)
+                    }
+                },
+                coalesce=latest_only
+            )
             
-            # Emit event
+            timestamp, data = samples[-1]
             ble_event_bus.emit("notification_received", {
                 "uuid": characteristic_uuid,
-                "value": char_value.model_dump(),
-                "timestamp": timestamp
+                "data": data,
+                "timestamp": timestamp,
+                "samples": samples
             })
         except Exception as e:
-            self.logger.error(f"Error handling notification: {e}", exc_info=True)
+            self.logger.error(f"Error delivering notification batch: {e}", exc_info=True)
+    
+    def _history_event(self, timestamp: float, data: bytes) -> Dict[str, Any]:
+        """Build a history event with the decoded value."""
+        return {
+            "timestamp": timestamp,
+            "value": decode_value(data)
+        }
     
     # Event handlers
     async def _handle_device_disconnected(self, event_data: Dict[str, Any]) -> None:
@@ -275,26 +479,16 @@ class BleNotificationManager:
         Args:
             event_data: Event data
         """
+        # Other pooled devices disconnecting do not affect our subscriptions
+        address = (event_data or {}).get("address")
+        client = getattr(self.service_manager, "client", None)
+        client_address = getattr(client, "address", None)
+        if address and client_address and normalize_address(address) != normalize_address(client_address):
+            return
+        
         # Just clear subscription tracking - the service manager will
         # take care of stopping notifications on the device side
         self._active_subscriptions = {}
-    
-    # Helper methods
-    def _try_decode_bytes(self, value: bytes) -> str:
-        """Try to decode bytes to UTF-8 string."""
-        if not value:
-            return ""
-        try:
-            return value.decode('utf-8')
-        except UnicodeDecodeError:
-            return "(binary data)"
-
-    def _try_convert_to_int(self, value: bytes) -> Optional[int]:
-        """Try to convert bytes to integer value."""
-        if not value or len(value) not in [1, 2, 4, 8]:
-            return None
-            
-        try:
-            return int.from_bytes(value, byteorder='little', signed=False)
-        except Exception:
-            return None
+        for batcher in self._batchers.values():
+            batcher.flush()
+        self._batchers = {}
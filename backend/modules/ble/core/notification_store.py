@@ -0,0 +1,299 @@
+# backend/modules/ble/core/notification_store.py
+"""
+Columnar ring-buffer storage for BLE notification history.
+
+Each characteristic gets a ``NotificationRingBuffer`` made of three
+preallocated columns:
+
+- ``timestamps``: ``array('d')`` with one entry per sample
+- ``offsets`` / ``lengths``: where each payload lives in the arena
+- ``arena``: one ``bytearray`` holding raw payloads back to back
+
+Samples are kept in arrival order, so time-range queries are binary searches
+over the timestamp column. Payloads are only copied out (and only decoded by
+the caller) for the samples a query actually returns. When either the sample
+slots or the arena run out, the oldest samples are overwritten.
+"""
+
+import bisect
+import heapq
+import itertools
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Average payload size used to size the arena when none is given
+DEFAULT_PAYLOAD_SIZE = 20
+
+
+class _TimestampView:
+    """Sequence view of a ring buffer's timestamps in logical (oldest-first) order."""
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self, buffer: "NotificationRingBuffer"):
+        self._buffer = buffer
+
+    def __len__(self) -> int:
+        return self._buffer._count
+
+    def __getitem__(self, index: int) -> float:
+        return self._buffer._timestamps[self._buffer._slot(index)]
+
+
+class NotificationRingBuffer:
+    """
+    Fixed-capacity notification history for a single characteristic.
+
+    Args:
+        capacity: Maximum number of samples
+        arena_size: Bytes reserved for payloads (defaults to
+            ``capacity * DEFAULT_PAYLOAD_SIZE``)
+    """
+
+    def __init__(self, capacity: int, arena_size: Optional[int] = None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.arena_size = max(1, arena_size or capacity * DEFAULT_PAYLOAD_SIZE)
+
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._offsets = array("I", bytes(4 * capacity))
+        self._lengths = array("I", bytes(4 * capacity))
+        self._arena = bytearray(self.arena_size)
+
+        self._start = 0        # Slot of the oldest sample
+        self._count = 0        # Number of stored samples
+        self._write_pos = 0    # Next free byte in the arena
+        self._last_timestamp = float("-inf")
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """Memory reserved by the columns and the arena."""
+        return (
+            self._timestamps.itemsize * self.capacity
+            + self._offsets.itemsize * self.capacity
+            + self._lengths.itemsize * self.capacity
+            + self.arena_size
+        )
+
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("notification index out of range")
+        return (self._start + index) % self.capacity
+
+    def _evict_oldest(self) -> None:
+        self._start = (self._start + 1) % self.capacity
+        self._count -= 1
+        self.evicted += 1
+
+    def append(self, timestamp: float, data: bytes) -> None:
+        """
+        Store a sample, evicting the oldest ones if needed.
+
+        Timestamps are clamped to be non-decreasing so the column stays sorted
+        even if the wall clock steps backwards. Payloads larger than the arena
+        are truncated.
+
+        Args:
+            timestamp: Notification time (seconds since epoch)
+            data: Raw payload
+        """
+        data = bytes(data[:self.arena_size])
+        length = len(data)
+        timestamp = max(timestamp, self._last_timestamp)
+
+        if self._count == self.capacity:
+            self._evict_oldest()
+
+        position = self._write_pos
+        if position + length > self.arena_size:
+            # Wrap around: the samples stored after the write position are the oldest
+            while self._count and self._offsets[self._start] >= position:
+                self._evict_oldest()
+            position = 0
+
+        # Evict samples whose payload would be overwritten
+        end = position + length
+        while self._count:
+            offset = self._offsets[self._start]
+            if offset < end and offset + max(self._lengths[self._start], 1) > position:
+                self._evict_oldest()
+            else:
+                break
+
+        self._arena[position:end] = data
+        slot = (self._start + self._count) % self.capacity
+        self._timestamps[slot] = timestamp
+        self._offsets[slot] = position
+        self._lengths[slot] = length
+        self._count += 1
+        self._write_pos = end
+        self._last_timestamp = timestamp
+
+    def timestamp_at(self, index: int) -> float:
+        """Timestamp of the sample at a logical index (0 is the oldest)."""
+        return self._timestamps[self._slot(index)]
+
+    def payload_at(self, index: int) -> bytes:
+        """Copy of the payload at a logical index (0 is the oldest)."""
+        slot = self._slot(index)
+        offset = self._offsets[slot]
+        return bytes(self._arena[offset:offset + self._lengths[slot]])
+
+    def index_range(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Find the logical index range of samples in ``[start_time, end_time]``.
+
+        Returns:
+            ``(first, stop)`` suitable for ``range(first, stop)``
+        """
+        view = _TimestampView(self)
+        first = 0 if start_time is None else bisect.bisect_left(view, start_time)
+        stop = self._count if end_time is None else bisect.bisect_right(view, end_time)
+        return first, max(first, stop)
+
+    def iter_range(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        newest_first: bool = False
+    ) -> Iterator[Tuple[float, int]]:
+        """
+        Iterate ``(timestamp, index)`` pairs in a time range without copying payloads.
+
+        Args:
+            start_time: Inclusive lower bound (None for no bound)
+            end_time: Inclusive upper bound (None for no bound)
+            newest_first: Iterate from the newest sample backwards
+        """
+        first, stop = self.index_range(start_time, end_time)
+        indices = range(stop - 1, first - 1, -1) if newest_first else range(first, stop)
+        for index in indices:
+            yield self._timestamps[(self._start + index) % self.capacity], index
+
+    def query(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[Tuple[float, bytes]]:
+        """
+        Get the most recent samples in a time range, oldest first.
+
+        Args:
+            start_time: Inclusive lower bound (None for no bound)
+            end_time: Inclusive upper bound (None for no bound)
+            limit: Maximum number of samples (the newest ones are kept)
+
+        Returns:
+            List of ``(timestamp, data)`` tuples
+        """
+        first, stop = self.index_range(start_time, end_time)
+        if limit is not None:
+            first = max(first, stop - limit)
+        return [(self.timestamp_at(i), self.payload_at(i)) for i in range(first, stop)]
+
+    def clear(self) -> None:
+        """Drop all samples (the preallocated columns are kept)."""
+        self._start = 0
+        self._count = 0
+        self._write_pos = 0
+        self._last_timestamp = float("-inf")
+
+
+class NotificationHistoryStore:
+    """
+    Notification history for all characteristics.
+
+    Args:
+        capacity: Samples kept per characteristic
+        payload_size: Average payload size used to size each arena
+    """
+
+    def __init__(self, capacity: int = 1000, payload_size: int = DEFAULT_PAYLOAD_SIZE):
+        self.capacity = capacity
+        self.payload_size = payload_size
+        self._buffers: Dict[str, NotificationRingBuffer] = {}
+
+    def __contains__(self, characteristic_uuid: str) -> bool:
+        return characteristic_uuid in self._buffers
+
+    def __len__(self) -> int:
+        return sum(len(buffer) for buffer in self._buffers.values())
+
+    def get(self, characteristic_uuid: str) -> Optional[NotificationRingBuffer]:
+        """Get the buffer for a characteristic, if any."""
+        return self._buffers.get(characteristic_uuid)
+
+    def append(self, characteristic_uuid: str, timestamp: float, data: bytes) -> None:
+        """Record a notification."""
+        buffer = self._buffers.get(characteristic_uuid)
+        if buffer is None:
+            buffer = NotificationRingBuffer(self.capacity, self.capacity * self.payload_size)
+            self._buffers[characteristic_uuid] = buffer
+        buffer.append(timestamp, data)
+
+    def query(
+        self,
+        characteristic_uuid: str,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[Tuple[float, bytes]]:
+        """Get samples for one characteristic, oldest first."""
+        buffer = self._buffers.get(characteristic_uuid)
+        if buffer is None:
+            return []
+        return buffer.query(start_time, end_time, limit)
+
+    def query_all(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[Tuple[float, str, bytes]]:
+        """
+        Get samples across all characteristics, newest first.
+
+        Buffers are already sorted, so this is a k-way merge that stops after
+        ``limit`` samples instead of a sort of the whole history.
+
+        Returns:
+            List of ``(timestamp, characteristic_uuid, data)`` tuples
+        """
+        streams = [
+            self._tagged(uuid, buffer.iter_range(start_time, end_time, newest_first=True))
+            for uuid, buffer in self._buffers.items()
+        ]
+        merged = heapq.merge(*streams, key=lambda sample: sample[0], reverse=True)
+        return [
+            (timestamp, uuid, self._buffers[uuid].payload_at(index))
+            for timestamp, uuid, index in itertools.islice(merged, limit)
+        ]
+
+    @staticmethod
+    def _tagged(characteristic_uuid: str, samples: Iterator[Tuple[float, int]]) -> Iterator[Tuple[float, str, int]]:
+        for timestamp, index in samples:
+            yield timestamp, characteristic_uuid, index
+
+    def clear(self, characteristic_uuid: Optional[str] = None) -> None:
+        """Clear history for one characteristic, or all of it."""
+        if characteristic_uuid is None:
+            self._buffers = {}
+        elif characteristic_uuid in self._buffers:
+            self._buffers[characteristic_uuid].clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Sample counts and reserved memory."""
+        return {
+            "characteristics": len(self._buffers),
+            "samples": len(self),
+            "evicted": sum(buffer.evicted for buffer in self._buffers.values()),
+            "reserved_bytes": sum(buffer.nbytes for buffer in self._buffers.values())
+        }
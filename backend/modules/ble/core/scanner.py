@@ -1,7 +1,12 @@
 """
 BLE scanner module for discovering nearby devices.
 
-This module provides functionality for scanning and discovering BLE devices.
+This module provides a long-lived, callback-driven scan engine. Instead of
+running a blocking ``discover()`` for every request, the scanner keeps a
+``BleakScanner`` running in the background and maintains an incrementally
+updated device table keyed by address. REST routes, WebSocket handlers and
+monitors read snapshots of that table (or subscribe to its deltas) without
+starting a new scan.
 """
 
 import logging
@@ -9,29 +14,456 @@ import asyncio
 from typing import Dict, List, Any, Optional, Set, Callable
 import time
 
-from backend.modules.ble.models import BLEDeviceInfo
-from backend.modules.ble.utils.ble_metrics import get_metrics_collector
-from backend.modules.ble.utils.events import ble_event_bus
+from bleak import BleakScanner
+from bleak.uuids import normalize_uuid_str
+
+from backend.modules.ble.config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Delta kinds published to subscribers
+DEVICE_ADDED = "added"
+DEVICE_UPDATED = "updated"
+DEVICE_EXPIRED = "expired"
+
+
+def _service_key(service_uuid: str) -> str:
+    """Full 128-bit lowercase form of a service UUID, for filter matching."""
+    try:
+        return normalize_uuid_str(service_uuid)
+    except ValueError:
+        return service_uuid.lower()
+
+
+class _DeviceEntry:
+    """Mutable record for a single advertiser in the device table."""
+
+    __slots__ = (
+        "address", "name", "rssi", "tx_power", "manufacturer_data",
+        "service_data", "service_uuids", "metadata", "first_seen",
+        "last_seen", "seen_count", "sequence"
+    )
+
+    def __init__(self, address: str):
+        self.address = address
+        self.name = None
+        self.rssi = None
+        self.tx_power = None
+        self.manufacturer_data = None
+        self.service_data = None
+        self.service_uuids = None
+        self.metadata: Dict[str, Any] = {}
+        self.first_seen = 0.0
+        self.last_seen = 0.0
+        self.seen_count = 0
+        self.sequence = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a serializable copy of this entry."""
+        return {
+            "address": self.address,
+            "name": self.name or "Unknown Device",
+            "rssi": self.rssi,
+            "tx_power": self.tx_power,
+            "metadata": self.metadata,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "seen_count": self.seen_count,
+            "sequence": self.sequence,
+            "is_real": True,
+            "source": "scan"
+        }
+
+
 class BleScanner:
-    """BLE device scanner."""
-    
-    def __init__(self):
-        """Initialize the BLE scanner."""
+    """
+    Continuous BLE scan engine.
+
+    The scanner runs a single ``BleakScanner`` with a detection callback and
+    updates a keyed device table in place as advertisements arrive. Devices
+    that have not been seen for ``device_ttl`` seconds are expired by a
+    background prune task. Consumers can:
+
+    - read a snapshot with :meth:`get_devices` / :meth:`get_device`
+    - subscribe to ``(kind, device)`` deltas with :meth:`subscribe`
+    """
+
+    def __init__(
+        self,
+        device_ttl: Optional[float] = None,
+        prune_interval: Optional[float] = None,
+        subscriber_queue_size: Optional[int] = None
+    ):
+        """
+        Initialize the BLE scanner.
+
+        Args:
+            device_ttl: Seconds after which an unseen device is expired
+            prune_interval: Seconds between expiry sweeps
+            subscriber_queue_size: Maximum pending deltas per subscriber
+        """
         self.client = None
         self.scanning = False
-        self.discovered_devices = {}  # Address -> device info
-        self.scan_filters = {}  # Filters to apply during scans
-        self.metrics = get_metrics_collector()
-        
+        self.discovered_devices: Dict[str, _DeviceEntry] = {}  # Address -> device entry
+        self.scan_filters: Dict[str, Any] = {}  # Filters applied to the running scan
+
+        self.device_ttl = device_ttl or get_config("scanning.continuous.device_ttl", 30.0)
+        self.prune_interval = prune_interval or get_config("scanning.continuous.prune_interval", 5.0)
+        self.subscriber_queue_size = subscriber_queue_size or get_config(
+            "scanning.continuous.subscriber_queue_size", 1000
+        )
+
+        self._bleak_scanner: Optional[BleakScanner] = None
+        self._prune_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._sequence = 0
+        self._started_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._advertisement_count = 0
+
+        # Delta subscribers
+        self._subscribers: Set[asyncio.Queue] = set()
+
         # Scan results callback
-        self._scan_callback = None
-        
+        self._scan_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
+
         logger.info("BLE scanner initialized")
-    
-    # Implementation methods as defined in the previous message
+
+    # ======================================================================
+    # Lifecycle
+    # ======================================================================
+
+    async def start(self, active: bool = True, restart: bool = True, **scanner_kwargs) -> bool:
+        """
+        Start the background scan if it is not already running.
+
+        The scanner is shared, so it never filters by service: every
+        advertisement lands in the device table and consumers filter on read
+        with ``get_devices(services=...)``.
+
+        Args:
+            active: Whether to use active scanning
+            restart: Restart a running scan whose settings differ
+            **scanner_kwargs: Extra platform-specific ``BleakScanner`` arguments
+
+        Returns:
+            True if the scanner is running after the call
+        """
+        async with self._lock:
+            filters = {"active": active, **scanner_kwargs}
+            if self.scanning:
+                if not restart or filters == self.scan_filters:
+                    return True
+                # Settings changed - restart the underlying scanner
+                await self._stop_scanner()
+
+            try:
+                self._bleak_scanner = BleakScanner(
+                    detection_callback=self._detection_callback,
+                    scanning_mode="active" if active else "passive",
+                    **scanner_kwargs
+                )
+                await self._bleak_scanner.start()
+            except Exception as e:
+                self._last_error = str(e)
+                self._bleak_scanner = None
+                logger.error(f"Failed to start continuous scan: {e}", exc_info=True)
+                return False
+
+            self.scan_filters = filters
+            self.scanning = True
+            self._started_at = time.time()
+            self._last_error = None
+
+            if self._prune_task is None or self._prune_task.done():
+                self._prune_task = asyncio.create_task(self._prune_loop())
+
+            logger.info(f"Continuous BLE scan started (active={active})")
+            return True
+
+    async def stop(self) -> None:
+        """Stop the background scan. The device table is kept."""
+        async with self._lock:
+            await self._stop_scanner()
+
+            if self._prune_task:
+                self._prune_task.cancel()
+                try:
+                    await self._prune_task
+                except asyncio.CancelledError:
+                    pass
+                self._prune_task = None
+
+            logger.info("Continuous BLE scan stopped")
+
+    async def _stop_scanner(self) -> None:
+        """Stop the underlying BleakScanner without touching the prune task."""
+        if self._bleak_scanner is not None:
+            try:
+                await self._bleak_scanner.stop()
+            except Exception as e:
+                logger.warning(f"Error stopping BleakScanner: {e}")
+            self._bleak_scanner = None
+        self.scanning = False
+
+    async def ensure_running(
+        self,
+        active: bool = True,
+        warmup: float = 0.0,
+        **scanner_kwargs
+    ) -> bool:
+        """
+        Make sure the scanner is running, optionally waiting for it to warm up.
+
+        A scanner that is already running is reused as-is, whatever settings
+        it was started with, so one caller never restarts the scan under
+        another. The settings and the warm-up delay only apply on a cold
+        start.
+
+        Args:
+            active: Whether to use active scanning
+            warmup: Seconds to wait for the table to populate after a cold start
+            **scanner_kwargs: Extra platform-specific ``BleakScanner`` arguments
+
+        Returns:
+            True if the scanner is running
+        """
+        was_running = self.scanning
+        running = await self.start(active=active, restart=False, **scanner_kwargs)
+        if running and not was_running and warmup > 0:
+            await asyncio.sleep(warmup)
+        return running
+
+    # ======================================================================
+    # Device table
+    # ======================================================================
+
+    def _detection_callback(self, device, advertisement_data) -> None:
+        """Update the device table from a single advertisement."""
+        now = time.time()
+        address = device.address.lower()
+        self._advertisement_count += 1
+
+        entry = self.discovered_devices.get(address)
+        kind = DEVICE_UPDATED
+        if entry is None:
+            entry = _DeviceEntry(address)
+            entry.first_seen = now
+            self.discovered_devices[address] = entry
+            kind = DEVICE_ADDED
+
+        entry.last_seen = now
+        entry.seen_count += 1
+
+        name = device.name or getattr(advertisement_data, "local_name", None)
+        rssi = getattr(advertisement_data, "rssi", None)
+        if rssi is None:
+            rssi = getattr(device, "rssi", None)
+        tx_power = getattr(advertisement_data, "tx_power", None)
+        manufacturer_data = getattr(advertisement_data, "manufacturer_data", None) or {}
+        service_data = getattr(advertisement_data, "service_data", None) or {}
+        service_uuids = getattr(advertisement_data, "service_uuids", None) or []
+
+        changed = kind == DEVICE_ADDED
+        if name and name != entry.name:
+            entry.name = name
+            changed = True
+        if rssi != entry.rssi:
+            entry.rssi = rssi
+            changed = True
+        if tx_power != entry.tx_power:
+            entry.tx_power = tx_power
+            changed = True
+
+        # Only re-encode advertisement payloads when the raw bytes change
+        if (manufacturer_data != entry.manufacturer_data
+                or service_data != entry.service_data
+                or service_uuids != entry.service_uuids):
+            entry.manufacturer_data = dict(manufacturer_data)
+            entry.service_data = dict(service_data)
+            entry.service_uuids = list(service_uuids)
+            entry.metadata = {
+                "manufacturer_data": {str(k): bytes(v).hex() for k, v in manufacturer_data.items()},
+                "service_data": {str(k): bytes(v).hex() for k, v in service_data.items()},
+                "service_uuids": list(service_uuids)
+            }
+            changed = True
+
+        if not changed:
+            return
+
+        self._sequence += 1
+        entry.sequence = self._sequence
+        self._publish(kind, entry)
+
+    def _publish(self, kind: str, entry: _DeviceEntry) -> None:
+        """Push a delta to subscribers and the optional scan callback."""
+        if not self._subscribers and self._scan_callback is None:
+            return
+
+        device = entry.to_dict()
+
+        if self._scan_callback is not None:
+            try:
+                self._scan_callback(kind, device)
+            except Exception as e:
+                logger.error(f"Error in scan callback: {e}")
+
+        for queue in self._subscribers:
+            if queue.full():
+                # Drop the oldest delta; consumers can resync from a snapshot
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait((kind, device))
+
+    async def _prune_loop(self) -> None:
+        """Expire devices that have not advertised within ``device_ttl``."""
+        try:
+            while True:
+                await asyncio.sleep(self.prune_interval)
+                self.prune_expired()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in scanner prune loop: {e}", exc_info=True)
+
+    def prune_expired(self, now: Optional[float] = None) -> List[str]:
+        """
+        Remove devices not seen within ``device_ttl`` seconds.
+
+        Args:
+            now: Optional reference time (defaults to ``time.time()``)
+
+        Returns:
+            List of expired addresses
+        """
+        cutoff = (now or time.time()) - self.device_ttl
+        expired = [
+            address for address, entry in self.discovered_devices.items()
+            if entry.last_seen < cutoff
+        ]
+        for address in expired:
+            entry = self.discovered_devices.pop(address)
+            self._sequence += 1
+            entry.sequence = self._sequence
+            self._publish(DEVICE_EXPIRED, entry)
+        return expired
+
+    def get_device(self, address: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a single device from the table.
+
+        Args:
+            address: Device address
+
+        Returns:
+            Device dictionary or None if not present
+        """
+        entry = self.discovered_devices.get(address.lower())
+        return entry.to_dict() if entry else None
+
+    def get_devices(
+        self,
+        max_age: Optional[float] = None,
+        name_prefix: Optional[str] = None,
+        services: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a snapshot of the device table.
+
+        Args:
+            max_age: Only include devices seen within this many seconds
+            name_prefix: Filter devices by name prefix
+            services: Only include devices advertising one of these service UUIDs
+
+        Returns:
+            List of device dictionaries, strongest signal first
+        """
+        cutoff = time.time() - max_age if max_age else None
+        wanted = {_service_key(s) for s in services} if services else None
+
+        devices = []
+        for entry in list(self.discovered_devices.values()):
+            if cutoff is not None and entry.last_seen < cutoff:
+                continue
+            if name_prefix and not (entry.name and entry.name.startswith(name_prefix)):
+                continue
+            if wanted and not wanted.intersection(_service_key(u) for u in (entry.service_uuids or [])):
+                continue
+            devices.append(entry.to_dict())
+
+        devices.sort(key=lambda d: d["rssi"] if d["rssi"] is not None else -999, reverse=True)
+        return devices
+
+    def clear(self) -> None:
+        """Clear the device table."""
+        self.discovered_devices = {}
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the most recent table change."""
+        return self._sequence
+
+    # ======================================================================
+    # Subscriptions
+    # ======================================================================
+
+    def subscribe(self, maxsize: Optional[int] = None) -> asyncio.Queue:
+        """
+        Subscribe to device table deltas.
+
+        Each queue item is a ``(kind, device)`` tuple where ``kind`` is one of
+        ``"added"``, ``"updated"`` or ``"expired"``. When a subscriber falls
+        behind, the oldest deltas are dropped.
+
+        Args:
+            maxsize: Maximum number of pending deltas
+
+        Returns:
+            Queue receiving deltas
+        """
+        queue = asyncio.Queue(maxsize=maxsize or self.subscriber_queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """
+        Remove a delta subscription.
+
+        Args:
+            queue: Queue returned by :meth:`subscribe`
+        """
+        self._subscribers.discard(queue)
+
+    def set_scan_callback(self, callback: Optional[Callable[[str, Dict[str, Any]], None]]) -> None:
+        """
+        Set a synchronous callback invoked with ``(kind, device)`` for each delta.
+
+        Args:
+            callback: Callback function, or None to clear it
+        """
+        self._scan_callback = callback
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get scanner status information.
+
+        Returns:
+            Dictionary with scanner state and counters
+        """
+        return {
+            "scanning": self.scanning,
+            "filters": {k: v for k, v in self.scan_filters.items()},
+            "device_count": len(self.discovered_devices),
+            "sequence": self._sequence,
+            "advertisement_count": self._advertisement_count,
+            "subscribers": len(self._subscribers),
+            "started_at": self._started_at,
+            "device_ttl": self.device_ttl,
+            "last_error": self._last_error
+        }
 
 # Singleton instance
 _scanner = None
@@ -42,13 +474,3 @@ def get_scanner() -> BleScanner:
     if _scanner is None:
         _scanner = BleScanner()
     return _scanner
-
-def set_client(self, client):
-    """
-    Set the BLE client for the scanner
-    
-    Args:
-        client: The BLE client to use for scanning
-    """
-    self.client = client
-    return self
\ No newline at end of file
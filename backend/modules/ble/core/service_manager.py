@@ -8,12 +8,19 @@ import uuid
 from bleak.backends.service import BleakGATTService, BleakGATTCharacteristic
 from bleak.backends.descriptor import BleakGATTDescriptor
 from bleak import BleakClient, BleakError
+from bleak.uuids import normalize_uuid_str
 
 from backend.modules.ble.models import (
     BleService, BleCharacteristic, BleDescriptor,
     CharacteristicValue, ServicesResult
 )
 from backend.modules.ble.utils.events import ble_event_bus
+from backend.modules.ble.utils.ble_metrics import get_metrics_collector
+from backend.modules.ble.config import get_config
+from .gatt_cache import (
+    get_gatt_cache, build_gatt_table, find_characteristic, read_database_hash,
+    SERVICE_CHANGED_UUID
+)
 from .exceptions import BleServiceError, BleConnectionError
 
 class BleServiceManager:
@@ -28,11 +35,138 @@ class BleServiceManager:
         self._char_descriptions = self._load_characteristic_descriptions()
         self._service_descriptions = self._load_service_descriptions()
         self._active_notifications = {}
+        self._gatt_cache = get_gatt_cache()
+        self._gatt_table: Optional[List[Dict[str, Any]]] = None
+        self._watching_service_changed = False
+        self._characteristics: Dict[str, Any] = {}
     
     def set_client(self, client):
         """Set the BLE client to use for service operations."""
         self.client = client
         self._gatt_services = {}  # Reset cached services
+        self._service_uuids = {}
+        self._gatt_table = None
+        self._watching_service_changed = False
+        self._characteristics = {}
+    
+    async def load_gatt_table(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Load the GATT table for the connected device.
+        
+        The device's Database Hash is read and compared with the persistent
+        GATT cache; on a match the cached table is used, otherwise the table
+        is built from the client's discovered services and cached. A hash
+        that no longer matches drops the cached entry instead, since the
+        client's services may have come from the backend's stale cache.
+        
+        Args:
+            refresh: Ignore any cached table
+            
+        Returns:
+            List of service dictionaries with characteristics and descriptors
+        """
+        if self._gatt_table is not None and not refresh:
+            return self._gatt_table
+        
+        address = getattr(self.client, "address", None)
+        database_hash = await read_database_hash(self.client)
+        
+        table = None
+        stored = None
+        if self._gatt_cache is not None and address and not refresh:
+            stored = self._gatt_cache.get(address)
+            table = self._gatt_cache.lookup(address, database_hash)
+            if table is not None:
+                self.logger.info(f"Using cached GATT table for {address}")
+        
+        if table is None:
+            table = build_gatt_table(self.client.services)
+            if self._gatt_cache is not None and address:
+                if stored is not None and stored.get("database_hash"):
+                    # The connection may have been served from the backend's
+                    # service cache, which the hash shows is out of date; drop
+                    # the entry so the next connect discovers over the air.
+                    self.logger.info(f"GATT database hash changed for {address}")
+                    self._gatt_cache.invalidate(address)
+                else:
+                    self._gatt_cache.put(address, table, database_hash)
+        
+        self._gatt_table = table
+        self._service_uuids = {}
+        for service in table:
+            self._service_uuids[self._get_short_uuid(service["uuid"])] = service["uuid"]
+            self._service_uuids[service["uuid"]] = service["uuid"]
+        
+        await self._watch_service_changed()
+        return table
+    
+    async def _watch_service_changed(self) -> None:
+        """Subscribe to Service Changed indications to invalidate the cache."""
+        if self._watching_service_changed:
+            return
+        
+        char = find_characteristic(self.client.services, SERVICE_CHANGED_UUID)
+        if char is None or "indicate" not in (char.properties or []):
+            return
+        
+        try:
+            await self.client.start_notify(SERVICE_CHANGED_UUID, self._on_service_changed)
+            self._watching_service_changed = True
+        except Exception as e:
+            self.logger.debug(f"Could not subscribe to Service Changed: {e}")
+    
+    def _on_service_changed(self, sender: Any, data: bytearray) -> None:
+        """Drop cached GATT data when the device reports a changed database."""
+        address = getattr(self.client, "address", None)
+        self.logger.info(f"Service Changed indication from {address}")
+        if self._gatt_cache is not None and address:
+            self._gatt_cache.invalidate(address)
+        self._gatt_table = None
+        self._gatt_services = {}
+        self._service_uuids = {}
+        self._characteristics = {}
+    
+    def describe_services(self, table: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build service dictionaries (with descriptions) from a GATT table."""
+        return [
+            {
+                "uuid": service["uuid"],
+                "description": self._get_service_description(service["uuid"]),
+                "characteristics": [],
+                "handle": service["handle"]
+            }
+            for service in table
+        ]
+    
+    def describe_characteristics(self, table: List[Dict[str, Any]], service_uuid: str) -> List[Dict[str, Any]]:
+        """
+        Build characteristic dictionaries (with descriptions) for one service of a GATT table.
+        
+        Raises:
+            BleServiceError: If the service is not in the table
+        """
+        # Resolve short UUID if provided (cached tables of other devices are
+        # not in the lookup, so fall back to expanding it)
+        resolved_uuid = self._service_uuids.get(service_uuid)
+        if resolved_uuid is None:
+            try:
+                resolved_uuid = normalize_uuid_str(service_uuid)
+            except ValueError:
+                resolved_uuid = service_uuid.lower()
+        service = next((svc for svc in table if svc["uuid"] == resolved_uuid), None)
+        if service is None:
+            raise BleServiceError(f"Service {service_uuid} not found")
+        
+        return [
+            {
+                "uuid": char["uuid"],
+                "description": self._get_characteristic_description(char["uuid"]),
+                "properties": char["properties"],
+                "handle": char["handle"],
+                "descriptors": char["descriptors"]
+            }
+            for char in service["characteristics"]
+        ]
     
     async def get_services(self, max_retries: int = 3, retry_delay: float = 1.0) -> List[Dict[str, Any]]:
         """
@@ -56,40 +190,8 @@ class BleServiceManager:
         
         while attempt < max_retries:
             try:
-                self.logger.info(f"Attempting to get services (attempt {attempt + 1}/{max_retries})...")
-                # Get services
-                services = []
-                
-                # Cache service UUIDs for faster lookups
-                if not self._service_uuids:
-                    for service in self.client.services:
-                        short_uuid = self._get_short_uuid(service.uuid)
-                        self._service_uuids[short_uuid] = service.uuid
-                        self._service_uuids[service.uuid] = service.uuid
-                        
-                for service in self.client.services:
-                    # Get service description
-                    description = self._get_service_description(service.uuid)
-                    
-                    # Create service dictionary
-                    service_dict = {
-                        "uuid": service.uuid,
-                        "description": description,
-                        "characteristics": [],
-                        "handle": getattr(service, "handle", None)
-                    }
-                    
-                    # Add to results
-                    services.append(service_dict)
-                    
-                    # Cache the service
-                    self._gatt_services[service.uuid] = service
-                    
-                # Create pydantic model result
-                result = ServicesResult(
-                    services=services,
-                    count=len(services)
-                )
+                table = await self.load_gatt_table(refresh=attempt > 0)
+                services = self.describe_services(table)
                 
                 self.logger.info(f"Successfully retrieved {len(services)} services")
                 return services
@@ -124,60 +226,13 @@ class BleServiceManager:
         if not self.client.is_connected:
             raise BleConnectionError("Device is not connected")
         
-        # Resolve short UUID if provided
-        service_uuid = self._service_uuids.get(service_uuid, service_uuid)
-        
         attempt = 0
         last_error = None
         
         while attempt < max_retries:
             try:
-                self.logger.info(f"Attempting to get characteristics for service {service_uuid} (attempt {attempt + 1}/{max_retries})...")
-                # Get the service
-                if service_uuid not in self._gatt_services:
-                    # Try to find the service in client.services if not cached
-                    found = False
-                    for svc in self.client.services:
-                        if svc.uuid == service_uuid:
-                            self._gatt_services[service_uuid] = svc
-                            found = True
-                            break
-                    if not found:
-                        raise BleServiceError(f"Service {service_uuid} not found")
-                
-                service = self._gatt_services[service_uuid]
-                
-                # Get characteristics
-                characteristics = []
-                for char in service.characteristics:
-                    # Get characteristic description
-                    description = self._get_characteristic_description(char.uuid)
-                    
-                    # Get properties
-                    properties = []
-                    if char.properties:
-                        properties = char.properties
-                    
-                    # Create characteristic dictionary
-                    char_dict = {
-                        "uuid": char.uuid,
-                        "description": description,
-                        "properties": properties,
-                        "handle": getattr(char, "handle", None),
-                        "descriptors": []
-                    }
-                    
-                    # Add descriptors if available
-                    if hasattr(char, "descriptors") and char.descriptors:
-                        for desc in char.descriptors:
-                            desc_dict = {
-                                "uuid": desc.uuid,
-                                "handle": getattr(desc, "handle", None)
-                            }
-                            char_dict["descriptors"].append(desc_dict)
-                    
-                    # Add to results
-                    characteristics.append(char_dict)
+                table = await self.load_gatt_table(refresh=attempt > 0)
+                characteristics = self.describe_characteristics(table, service_uuid)
                     
                 self.logger.info(f"Successfully retrieved {len(characteristics)} characteristics for service {service_uuid}")
                 return characteristics
@@ -215,6 +270,7 @@ class BleServiceManager:
             start_time = asyncio.get_event_loop().time()
             value = await self.client.read_gatt_char(characteristic_uuid)
             end_time = asyncio.get_event_loop().time()
+            get_metrics_collector().record_operation("read", end_time - start_time)
             
             # Emit metric event
             ble_event_bus.emit("operation_completed", {
@@ -229,7 +285,7 @@ class BleServiceManager:
                 hex=value.hex() if value else "",
                 text=self._try_decode_bytes(value),
                 bytes=[b for b in value] if value else [],
-                int=self._try_convert_to_int(value)
+                int_value=self._try_convert_to_int(value)
             )
             
             return char_value
@@ -237,6 +293,7 @@ class BleServiceManager:
             raise
         except Exception as e:
             self.logger.error(f"Error reading characteristic: {e}", exc_info=True)
+            get_metrics_collector().record_operation("read", 0.0, success=False)
             # Emit failed metric
             ble_event_bus.emit("operation_completed", {
                 "operation": "read",
@@ -283,6 +340,7 @@ class BleServiceManager:
                 characteristic_uuid, bytes_value, response=response
             )
             end_time = asyncio.get_event_loop().time()
+            get_metrics_collector().record_operation("write", end_time - start_time)
             
             # Emit metric event
             ble_event_bus.emit("operation_completed", {
@@ -297,6 +355,7 @@ class BleServiceManager:
             raise
         except Exception as e:
             self.logger.error(f"Error writing characteristic: {e}", exc_info=True)
+            get_metrics_collector().record_operation("write", 0.0, success=False)
             # Emit failed metric
             ble_event_bus.emit("operation_completed", {
                 "operation": "write",
@@ -306,6 +365,198 @@ class BleServiceManager:
             })
             raise BleServiceError(f"Error writing characteristic: {e}")
 
+    async def execute_batch(
+        self, operations: List[Dict[str, Any]], stop_on_error: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a list of reads and writes against the device.
+        
+        Consecutive reads are issued together so the stack can pipeline them;
+        writes run one at a time in request order, so a read placed after a
+        write observes it. Each characteristic is resolved once for the batch.
+        
+        Args:
+            operations: Dictionaries with ``op`` ("read" or "write"),
+                ``characteristic`` and, for writes, ``value``, ``value_type``
+                and ``response``
+            stop_on_error: Skip the remaining operations after a failure
+            
+        Returns:
+            One result dictionary per operation, in request order
+        """
+        if not self.client:
+            raise BleConnectionError("No BLE client available")
+        
+        if not self.client.is_connected:
+            raise BleConnectionError("Device is not connected")
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+        index = 0
+        while index < len(operations):
+            if operations[index].get("op") == "read":
+                end = index
+                while end < len(operations) and operations[end].get("op") == "read":
+                    end += 1
+                outcomes = await asyncio.gather(*(
+                    self._batch_read(i, operations[i]) for i in range(index, end)
+                ))
+            else:
+                end = index + 1
+                outcomes = [await self._batch_write(index, operations[index])]
+            
+            for outcome in outcomes:
+                results[outcome["index"]] = outcome
+            index = end
+            
+            if stop_on_error and any(not outcome["success"] for outcome in outcomes):
+                for skipped in range(index, len(operations)):
+                    results[skipped] = self._batch_result(
+                        skipped, operations[skipped], error="Skipped after earlier failure"
+                    )
+                break
+        
+        return results
+    
+    def _batch_result(
+        self, index: int, operation: Dict[str, Any], error: Optional[str] = None, **fields
+    ) -> Dict[str, Any]:
+        result = {
+            "index": index,
+            "op": operation.get("op"),
+            "characteristic": operation.get("characteristic"),
+            "success": error is None
+        }
+        if error is not None:
+            result["error"] = error
+        result.update(fields)
+        return result
+    
+    async def _batch_read(self, index: int, operation: Dict[str, Any]) -> Dict[str, Any]:
+        metrics = get_metrics_collector()
+        start_time = asyncio.get_running_loop().time()
+        try:
+            value = await self.client.read_gatt_char(
+                self._resolve_characteristic(operation["characteristic"])
+            )
+            metrics.record_operation("read", asyncio.get_running_loop().time() - start_time)
+            char_value = CharacteristicValue(
+                hex=value.hex() if value else "",
+                text=self._try_decode_bytes(value),
+                bytes=[b for b in value] if value else [],
+                int_value=self._try_convert_to_int(value)
+            )
+            return self._batch_result(index, operation, value=char_value.model_dump())
+        except Exception as e:
+            metrics.record_operation("read", 0.0, success=False)
+            return self._batch_result(index, operation, error=str(e))
+    
+    async def _batch_write(self, index: int, operation: Dict[str, Any]) -> Dict[str, Any]:
+        if operation.get("op") != "write":
+            return self._batch_result(index, operation, error=f"Unknown operation: {operation.get('op')}")
+        try:
+            bytes_value = self._convert_value_to_bytes(
+                operation.get("value"),
+                operation.get("value_type", "hex"),
+                operation.get("byte_length", 4)
+            )
+            if bytes_value is None:
+                return self._batch_result(
+                    index, operation, error=f"Invalid value or value type: {operation.get('value_type', 'hex')}"
+                )
+            start_time = asyncio.get_running_loop().time()
+            await self.client.write_gatt_char(
+                self._resolve_characteristic(operation["characteristic"]),
+                bytes_value,
+                response=operation.get("response", True)
+            )
+            get_metrics_collector().record_operation("write", asyncio.get_running_loop().time() - start_time)
+            return self._batch_result(index, operation, written=len(bytes_value))
+        except Exception as e:
+            get_metrics_collector().record_operation("write", 0.0, success=False)
+            return self._batch_result(index, operation, error=str(e))
+    
+    async def write_stream(
+        self,
+        characteristic_uuid: str,
+        data: bytes,
+        chunk_size: Optional[int] = None,
+        ack_every: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream a large payload with write-without-response.
+        
+        The payload is split into chunks that fit a single write-without-response
+        PDU. For flow control, every ``ack_every``-th chunk is written with
+        response (when the characteristic allows it), which waits for the
+        device to catch up; other chunks yield to the event loop between writes.
+        
+        Args:
+            characteristic_uuid: UUID of the characteristic
+            data: Payload to send
+            chunk_size: Bytes per write (defaults to the negotiated limit)
+            ack_every: Chunks between acknowledged writes (0 disables)
+            
+        Returns:
+            Dictionary with byte/chunk counts, duration and throughput
+        """
+        if not self.client:
+            raise BleConnectionError("No BLE client available")
+        
+        if not self.client.is_connected:
+            raise BleConnectionError("Device is not connected")
+        
+        characteristic = self._resolve_characteristic(characteristic_uuid)
+        chunk_size = chunk_size or self.max_write_without_response_size(characteristic)
+        if ack_every is None:
+            ack_every = get_config("service.bulk_write_ack_every", 16)
+        can_ack = "write" in (getattr(characteristic, "properties", None) or [])
+        
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        chunks = 0
+        try:
+            for offset in range(0, len(data), chunk_size):
+                chunks += 1
+                acknowledged = bool(can_ack and ack_every and chunks % ack_every == 0)
+                await self.client.write_gatt_char(
+                    characteristic, data[offset:offset + chunk_size], response=acknowledged
+                )
+                if not acknowledged:
+                    await asyncio.sleep(0)
+        except Exception as e:
+            self.logger.error(f"Bulk write failed after {chunks - 1} chunks: {e}", exc_info=True)
+            raise BleServiceError(f"Bulk write failed at offset {(chunks - 1) * chunk_size}: {e}")
+        
+        duration = loop.time() - start_time
+        return {
+            "characteristic": characteristic_uuid,
+            "bytes": len(data),
+            "chunks": chunks,
+            "chunk_size": chunk_size,
+            "duration": duration,
+            "throughput": len(data) / duration if duration > 0 else None
+        }
+    
+    def max_write_without_response_size(self, characteristic: Any = None) -> int:
+        """Largest payload for a single write-without-response."""
+        size = getattr(characteristic, "max_write_without_response_size", None)
+        if not size:
+            size = getattr(self.client, "mtu_size", 23) - 3
+        return max(1, min(size, get_config("service.max_write_without_response_size", 512)))
+    
+    def _resolve_characteristic(self, characteristic_uuid: str) -> Any:
+        """Resolve a characteristic UUID to its Bleak object once per connection."""
+        characteristic = self._characteristics.get(characteristic_uuid)
+        if characteristic is None:
+            try:
+                characteristic = self.client.services.get_characteristic(characteristic_uuid)
+            except Exception:
+                characteristic = None
+            if characteristic is None:
+                return characteristic_uuid
+            self._characteristics[characteristic_uuid] = characteristic
+        return characteristic
+    
     async def start_notify(self, characteristic_uuid: str, callback: Callable) -> bool:
         """
         Start notifications for a characteristic.
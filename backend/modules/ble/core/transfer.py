@@ -0,0 +1,460 @@
+"""
+MTU-aware chunked transfers for large characteristic payloads.
+
+A single ATT write carries at most ``MTU - 3`` bytes, and a characteristic
+value is at most 512 bytes. Larger payloads have to be split, and the best
+chunk size depends on the link:
+
+- ``without_response``: one write-without-response PDU per chunk (fastest)
+- ``with_response``: one acknowledged write per chunk
+- ``long``: chunks up to 512 bytes written with response, which the stack
+  sends as a prepared (long) write of several Prepare Write requests
+
+Chunks can optionally be framed for devices that reassemble transfers
+themselves. Each frame is ``<offset:u32><length:u16><payload>``, optionally
+followed by ``<crc32:u32>`` of header and payload. With an ACK
+characteristic the device notifies the number of bytes it has received
+intact (little-endian u32) after every window of chunks. An ACK short of
+what was sent makes the engine resend from that offset, and a failed upload
+can be resumed from the last acknowledged offset.
+"""
+
+import asyncio
+import logging
+import struct
+import time
+import uuid
+import zlib
+from typing import Dict, Any, List, Optional
+
+from .exceptions import BleServiceError, BleConnectionError
+
+logger = logging.getLogger(__name__)
+
+ATT_HEADER_SIZE = 3
+MAX_ATTRIBUTE_SIZE = 512
+DEFAULT_MTU = 23
+
+FRAME_HEADER = struct.Struct("<IH")
+FRAME_CRC = struct.Struct("<I")
+ACK = struct.Struct("<I")
+
+TRANSFER_MODES = ("auto", "without_response", "with_response", "long")
+
+
+class TransferOptions:
+    """
+    Options for a chunked upload.
+
+    Args:
+        mode: Write mode (auto, without_response, with_response, long)
+        chunk_size: Payload bytes per write (defaults to the MTU-derived size)
+        framing: Prefix each chunk with its offset and length
+        crc: Append a CRC32 to each frame (implies framing)
+        ack_characteristic: Characteristic the device notifies ACKs on
+        ack_window: Chunks sent between ACKs
+        ack_timeout: Seconds to wait for an ACK
+        max_retries: Resends allowed after short ACKs before giving up
+        mtu: MTU to size chunks for (defaults to the negotiated MTU)
+    """
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        chunk_size: Optional[int] = None,
+        framing: bool = False,
+        crc: bool = False,
+        ack_characteristic: Optional[str] = None,
+        ack_window: int = 8,
+        ack_timeout: float = 5.0,
+        max_retries: int = 3,
+        mtu: Optional[int] = None
+    ):
+        if mode not in TRANSFER_MODES:
+            raise ValueError(f"Unknown transfer mode: {mode}")
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.framing = framing or crc
+        self.crc = crc
+        self.ack_characteristic = ack_characteristic
+        self.ack_window = max(1, ack_window)
+        self.ack_timeout = ack_timeout
+        self.max_retries = max_retries
+        self.mtu = mtu
+
+    @property
+    def frame_overhead(self) -> int:
+        if not self.framing:
+            return 0
+        return FRAME_HEADER.size + (FRAME_CRC.size if self.crc else 0)
+
+
+def encode_frame(offset: int, payload: bytes, crc: bool = False) -> bytes:
+    """Frame one chunk as ``<offset:u32><length:u16><payload>[<crc32:u32>]``."""
+    frame = FRAME_HEADER.pack(offset, len(payload)) + payload
+    if crc:
+        frame += FRAME_CRC.pack(zlib.crc32(frame))
+    return frame
+
+
+def decode_frame(frame: bytes, crc: bool = False):
+    """
+    Decode a frame produced by ``encode_frame``.
+
+    Returns:
+        Tuple of (offset, payload)
+
+    Raises:
+        ValueError: If the frame is truncated or its CRC does not match
+    """
+    if len(frame) < FRAME_HEADER.size:
+        raise ValueError("Truncated frame")
+    offset, length = FRAME_HEADER.unpack_from(frame)
+    end = FRAME_HEADER.size + length
+    if len(frame) < end + (FRAME_CRC.size if crc else 0):
+        raise ValueError("Truncated frame")
+    if crc and FRAME_CRC.unpack_from(frame, end)[0] != zlib.crc32(frame[:end]):
+        raise ValueError(f"CRC mismatch in frame at offset {offset}")
+    return offset, bytes(frame[FRAME_HEADER.size:end])
+
+
+class TransferSession:
+    """State of one upload, kept so a failed upload can be resumed."""
+
+    def __init__(self, transfer_id: str, characteristic: str, data: bytes,
+                 options: TransferOptions, address: Optional[str] = None):
+        self.transfer_id = transfer_id
+        self.characteristic = characteristic
+        self.data = data
+        self.options = options
+        self.address = address
+        self.offset = 0          # Next byte to send
+        self.confirmed = 0       # Bytes known to have reached the device
+        self.chunks = 0
+        self.retransmits = 0
+        self.bytes_sent = 0
+        self.duration = 0.0
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self._acked = 0
+        self._ack_event = asyncio.Event()
+
+    def on_ack(self, _sender: Any, data: bytearray) -> None:
+        """Notification callback for the ACK characteristic."""
+        if len(data) >= ACK.size:
+            self._acked = ACK.unpack_from(bytes(data))[0]
+            self._ack_event.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "transfer_id": self.transfer_id,
+            "characteristic": self.characteristic,
+            "address": self.address,
+            "state": self.state,
+            "size": len(self.data),
+            "confirmed": self.confirmed,
+            "chunks": self.chunks,
+            "retransmits": self.retransmits,
+            "bytes_sent": self.bytes_sent,
+            "duration": self.duration,
+            "throughput": self.bytes_sent / self.duration if self.duration > 0 else None,
+            "crc32": zlib.crc32(self.data),
+            "mode": self.options.mode,
+            "error": self.error
+        }
+
+
+class TransferEngine:
+    """
+    Chunked uploads and long reads on top of a ``BleServiceManager``.
+
+    The engine holds no connection itself: each call takes the service
+    manager for the target device, so sessions survive reconnects and can be
+    resumed on a new connection.
+
+    Args:
+        max_sessions: Finished sessions kept for inspection and resume
+    """
+
+    def __init__(self, max_sessions: int = 32):
+        self.max_sessions = max_sessions
+        self._sessions: Dict[str, TransferSession] = {}
+
+    # Sizing
+    @staticmethod
+    def negotiated_mtu(service_manager, options: Optional[TransferOptions] = None) -> int:
+        """MTU to size chunks for."""
+        if options is not None and options.mtu:
+            return options.mtu
+        return getattr(service_manager.client, "mtu_size", None) or DEFAULT_MTU
+
+    def resolve_mode(self, characteristic: Any, options: TransferOptions) -> str:
+        """Pick a write mode, preferring write-without-response when supported."""
+        if options.mode != "auto":
+            return options.mode
+        properties = getattr(characteristic, "properties", None) or []
+        if "write-without-response" in properties:
+            return "without_response"
+        return "long" if "write" in properties else "with_response"
+
+    def chunk_size(self, service_manager, characteristic: Any, mode: str,
+                   options: TransferOptions) -> int:
+        """Payload bytes per write for a mode, after framing overhead."""
+        if mode == "long":
+            size = MAX_ATTRIBUTE_SIZE
+        elif mode == "without_response":
+            size = service_manager.max_write_without_response_size(characteristic)
+            if options.mtu:
+                size = min(size, options.mtu - ATT_HEADER_SIZE)
+        else:
+            size = self.negotiated_mtu(service_manager, options) - ATT_HEADER_SIZE
+        if options.chunk_size:
+            size = min(size, options.chunk_size + options.frame_overhead)
+        size -= options.frame_overhead
+        if size <= 0:
+            raise BleServiceError(f"MTU too small for framed transfers ({size + options.frame_overhead} bytes)")
+        return size
+
+    # Uploads
+    async def upload(
+        self,
+        service_manager,
+        characteristic_uuid: str,
+        data: bytes,
+        options: Optional[TransferOptions] = None,
+        address: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Upload a payload in MTU-sized chunks.
+
+        Args:
+            service_manager: Service manager of the target device
+            characteristic_uuid: Characteristic to write
+            data: Payload
+            options: Transfer options
+            address: Device address, recorded for resume
+
+        Returns:
+            Session dictionary with progress and throughput
+
+        Raises:
+            BleServiceError: If the transfer fails (the session stays resumable)
+        """
+        session = TransferSession(
+            uuid.uuid4().hex, characteristic_uuid, bytes(data), options or TransferOptions(), address
+        )
+        self._add_session(session)
+        return await self._run(service_manager, session)
+
+    async def resume(self, service_manager, transfer_id: str) -> Dict[str, Any]:
+        """
+        Resume a failed upload from the last confirmed offset.
+
+        Raises:
+            BleServiceError: If the transfer is unknown or already complete
+        """
+        session = self._sessions.get(transfer_id)
+        if session is None:
+            raise BleServiceError(f"Unknown transfer: {transfer_id}")
+        if session.state == "completed":
+            raise BleServiceError(f"Transfer {transfer_id} is already complete")
+        if session.state == "running":
+            raise BleServiceError(f"Transfer {transfer_id} is still running")
+        session.offset = session.confirmed
+        session.error = None
+        logger.info(f"Resuming transfer {transfer_id} at offset {session.offset}/{len(session.data)}")
+        return await self._run(service_manager, session)
+
+    async def _run(self, service_manager, session: TransferSession) -> Dict[str, Any]:
+        client = service_manager.client
+        if not client or not client.is_connected:
+            session.state = "failed"
+            session.error = "Device is not connected"
+            raise BleConnectionError("Device is not connected")
+
+        options = session.options
+        characteristic = service_manager._resolve_characteristic(session.characteristic)
+        mode = self.resolve_mode(characteristic, options)
+        chunk_size = self.chunk_size(service_manager, characteristic, mode, options)
+        response = mode != "without_response"
+
+        session.state = "running"
+        session._acked = session.offset
+        session._ack_event.clear()
+        subscribed = False
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        window = 0
+        retries = 0
+        try:
+            if options.ack_characteristic:
+                await client.start_notify(options.ack_characteristic, session.on_ack)
+                subscribed = True
+
+            while session.offset < len(session.data):
+                offset = session.offset
+                payload = session.data[offset:offset + chunk_size]
+                frame = encode_frame(offset, payload, options.crc) if options.framing else payload
+
+                await client.write_gatt_char(characteristic, frame, response=response)
+                session.offset += len(payload)
+                session.chunks += 1
+                session.bytes_sent += len(payload)
+                window += 1
+                if response and not options.ack_characteristic:
+                    session.confirmed = session.offset
+
+                if options.ack_characteristic and (
+                    window >= options.ack_window or session.offset >= len(session.data)
+                ):
+                    window = 0
+                    acked = await self._wait_for_ack(session)
+                    if acked < session.offset:
+                        retries += 1
+                        if retries > options.max_retries:
+                            raise BleServiceError(f"Device kept rejecting data at offset {acked}")
+                        session.retransmits += 1
+                        logger.debug(f"Transfer {session.transfer_id}: resending from {acked}")
+                        session.offset = acked
+                    else:
+                        retries = 0
+                elif not response:
+                    # Let the stack drain queued write-without-response packets
+                    await asyncio.sleep(0)
+
+            if not response and not options.ack_characteristic:
+                session.confirmed = session.offset
+            session.state = "completed"
+        except asyncio.CancelledError:
+            # Leave the session resumable from the last confirmed offset
+            session.state = "failed"
+            session.error = "Cancelled"
+            logger.info(f"Transfer {session.transfer_id} cancelled at {session.offset}/{len(session.data)}")
+            raise
+        except Exception as e:
+            session.state = "failed"
+            session.error = str(e)
+            logger.warning(
+                f"Transfer {session.transfer_id} failed at {session.offset}/{len(session.data)}: {e}"
+            )
+            raise BleServiceError(
+                f"Transfer {session.transfer_id} failed after {session.confirmed} bytes: {e}"
+            )
+        finally:
+            session.duration += loop.time() - start_time
+            if subscribed:
+                try:
+                    await client.stop_notify(options.ack_characteristic)
+                except Exception as e:
+                    logger.debug(f"Could not stop ACK notifications: {e}")
+
+        result = session.to_dict()
+        logger.info(
+            f"Transfer {session.transfer_id} completed: {len(session.data)} bytes in "
+            f"{session.chunks} chunks ({mode}, {chunk_size} bytes/chunk)"
+        )
+        return result
+
+    async def _wait_for_ack(self, session: TransferSession) -> int:
+        """Wait for the device to acknowledge everything sent, or a short ACK."""
+        while session._acked < session.offset:
+            session._ack_event.clear()
+            try:
+                await asyncio.wait_for(session._ack_event.wait(), session.options.ack_timeout)
+            except asyncio.TimeoutError:
+                raise BleServiceError(f"No ACK within {session.options.ack_timeout}s at offset {session.offset}")
+            session.confirmed = max(session.confirmed, min(session._acked, session.offset))
+            if session._acked < session.offset:
+                break
+        return session._acked
+
+    def _add_session(self, session: TransferSession) -> None:
+        self._sessions[session.transfer_id] = session
+        finished = [s for s in self._sessions.values() if s.state in ("completed", "failed")]
+        for old in finished[:max(0, len(self._sessions) - self.max_sessions)]:
+            del self._sessions[old.transfer_id]
+
+    # Long reads
+    async def read_long(
+        self,
+        service_manager,
+        characteristic_uuid: str,
+        length: Optional[int] = None,
+        max_reads: int = 1024
+    ) -> Dict[str, Any]:
+        """
+        Read a value larger than one ATT read.
+
+        The stack already uses Read Blob requests for values up to 512
+        bytes. Devices that expose larger values return the next part on
+        each read. Reading continues until ``length`` bytes have arrived or,
+        without a length, until a read comes back shorter than a full
+        attribute.
+
+        Args:
+            service_manager: Service manager of the target device
+            characteristic_uuid: Characteristic to read
+            length: Expected total length, if known
+            max_reads: Upper bound on reads
+
+        Returns:
+            Dictionary with the reassembled ``data``, read count and throughput
+        """
+        client = service_manager.client
+        if not client or not client.is_connected:
+            raise BleConnectionError("Device is not connected")
+
+        characteristic = service_manager._resolve_characteristic(characteristic_uuid)
+        parts: List[bytes] = []
+        total = 0
+        reads = 0
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        try:
+            while reads < max_reads:
+                value = bytes(await client.read_gatt_char(characteristic))
+                reads += 1
+                parts.append(value)
+                total += len(value)
+                if not value:
+                    break
+                if length is not None:
+                    if total >= length:
+                        break
+                elif len(value) < MAX_ATTRIBUTE_SIZE:
+                    break
+        except Exception as e:
+            raise BleServiceError(f"Long read failed after {total} bytes: {e}")
+
+        duration = loop.time() - start_time
+        data = b"".join(parts)
+        if length is not None:
+            data = data[:length]
+        return {
+            "characteristic": characteristic_uuid,
+            "data": data,
+            "bytes": len(data),
+            "reads": reads,
+            "duration": duration,
+            "throughput": len(data) / duration if duration > 0 else None
+        }
+
+    # Inspection
+    def get_transfer(self, transfer_id: str) -> Optional[Dict[str, Any]]:
+        session = self._sessions.get(transfer_id)
+        return session.to_dict() if session else None
+
+    def list_transfers(self) -> List[Dict[str, Any]]:
+        return [session.to_dict() for session in self._sessions.values()]
+
+
+# Singleton instance
+_transfer_engine = None
+
+def get_transfer_engine() -> TransferEngine:
+    """Get the singleton transfer engine."""
+    global _transfer_engine
+    if _transfer_engine is None:
+        _transfer_engine = TransferEngine()
+    return _transfer_engine
@@ -48,10 +48,15 @@ from .ble_models import (
     ReadResult,
     WriteRequest,
     WriteParams,
+    GattOperation,
+    BatchGattRequest,
+    BulkWriteRequest,
+    TransferRequest,
     
     # Notification Models
     NotificationRequest,
     NotificationSubscription,
+    NotificationBatchPolicy,
     NotificationsResult,
     NotificationEvent,
     NotificationHistory,
@@ -120,10 +125,15 @@ __all__ = [
     "ReadResult",
     "WriteRequest",
     "WriteParams",
+    "GattOperation",
+    "BatchGattRequest",
+    "BulkWriteRequest",
+    "TransferRequest",
     
     # Notification Models
     "NotificationRequest",
     "NotificationSubscription",
+    "NotificationBatchPolicy",
     "NotificationsResult",
     "NotificationEvent",
     "NotificationHistory",
@@ -42,6 +42,11 @@ class MessageType(str, Enum):
     SCAN = "scan"
     SCAN_RESULT = "scan_result"
     SCAN_ERROR = "scan_error"
+    SCAN_SUBSCRIBE = "scan_subscribe"
+    SCAN_UNSUBSCRIBE = "scan_unsubscribe"
+    SCAN_RESYNC = "scan_resync"
+    SCAN_DELTA = "scan_delta"
+    SCAN_SNAPSHOT = "scan_snapshot"
     CONNECT = "connect"
     CONNECT_RESULT = "connect_result"
     CONNECT_ERROR = "connect_error"
@@ -55,11 +60,14 @@ class MessageType(str, Enum):
     READ_RESULT = "read_result"
     WRITE_CHARACTERISTIC = "write_characteristic"
     WRITE_RESULT = "write_result"
+    GATT_BATCH = "gatt_batch"
+    GATT_BATCH_RESULT = "gatt_batch_result"
     SUBSCRIBE = "subscribe"
     SUBSCRIBE_RESULT = "subscribe_result"
     UNSUBSCRIBE = "unsubscribe"
     UNSUBSCRIBE_RESULT = "unsubscribe_result"
     NOTIFICATION = "notification"
+    NOTIFICATION_BATCH = "notification_batch"
     ERROR = "error"
     PING = "ping"
     PONG = "pong"
@@ -393,6 +401,24 @@ class BLEDeviceInfo(BaseModel):
 # Notification Models
 # ============================================================================
 
+class NotificationBatchPolicy(BaseModel):
+    """Batching policy for a notification subscription.
+    
+    Notifications are delivered as one message when ``max_batch_size``
+    samples are pending or ``max_delay_ms`` has passed since the first one,
+    whichever comes first. With ``latest_only`` only the newest sample in
+    each window is delivered.
+    """
+    max_batch_size: int = Field(1, ge=1)
+    max_delay_ms: float = Field(0.0, ge=0)
+    latest_only: bool = False
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether this policy delays or merges notifications at all."""
+        return self.max_batch_size > 1 or self.max_delay_ms > 0
+
+
 class NotificationRequest(BaseModel):
     """Notification request model.
     
@@ -400,12 +426,14 @@ class NotificationRequest(BaseModel):
     """
     characteristic: str
     enable: bool = True
+    batch: Optional[NotificationBatchPolicy] = None
     
 class NotificationSubscription(BaseModel):
     """Notification subscription model."""
     characteristic_uuid: str
     client_id: str
     timestamp: float = Field(default_factory=time.time)
+    batch: NotificationBatchPolicy = Field(default_factory=NotificationBatchPolicy)
 
 
 # ============================================================================
@@ -579,6 +607,45 @@ class WriteRequest(BaseModel):
     value: str
     value_type: Optional[str] = "auto"
     response: Optional[bool] = True
+    address: Optional[str] = None  # Target device (defaults to the current device)
+
+class GattOperation(BaseModel):
+    """One read or write in a batched GATT request."""
+    op: str = Field(..., description="Operation type: read or write")
+    characteristic: str
+    value: Optional[str] = None
+    value_type: Optional[str] = "hex"
+    response: Optional[bool] = True
+
+class BatchGattRequest(BaseModel):
+    """Request model for running several GATT operations in one call."""
+    operations: List[GattOperation]
+    stop_on_error: bool = False
+    address: Optional[str] = None
+
+class BulkWriteRequest(BaseModel):
+    """Request model for streaming a large payload with write-without-response."""
+    characteristic: str
+    value: str
+    value_type: Optional[str] = "hex"
+    chunk_size: Optional[int] = Field(None, gt=0, description="Bytes per write (defaults to the negotiated limit)")
+    ack_every: Optional[int] = Field(None, ge=0, description="Chunks between acknowledged writes (0 disables)")
+    address: Optional[str] = None
+
+class TransferRequest(BaseModel):
+    """Request model for a chunked upload to a characteristic."""
+    characteristic: str
+    value: str
+    value_type: Optional[str] = "hex"
+    mode: str = Field("auto", description="auto, without_response, with_response or long")
+    chunk_size: Optional[int] = Field(None, gt=0, description="Payload bytes per write (defaults to the MTU)")
+    framing: bool = False
+    crc: bool = False
+    ack_characteristic: Optional[str] = None
+    ack_window: int = Field(8, gt=0)
+    ack_timeout: float = Field(5.0, gt=0)
+    max_retries: int = Field(3, ge=0)
+    address: Optional[str] = None
 
 class ServiceFilterRequest(BaseModel):
     """Request model for filtering services."""
@@ -0,0 +1,59 @@
+import random
+import threading
+from backend.modules.ble.utils.histogram import (
+    LatencyHistogram, WindowedHistogram, bucket_index, bucket_upper_bound, BUCKET_COUNT, MAX_VALUE
+)
+from backend.modules.ble.utils.ble_metrics import BleMetricsCollector
+
+def test_buckets_are_contiguous_and_bounded():
+    assert bucket_index(MAX_VALUE) == BUCKET_COUNT - 1
+    for index in range(1, BUCKET_COUNT):
+        assert bucket_index(bucket_upper_bound(index - 1) + 1) == index
+        upper = bucket_upper_bound(index)
+        assert bucket_index(upper) == index
+        assert upper - (bucket_upper_bound(index - 1) + 1) <= max(1, upper // 32)
+
+def test_percentiles_within_relative_error():
+    rng = random.Random(7)
+    values = sorted(int(rng.lognormvariate(9, 1.5)) for _ in range(20000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for percentile, estimate in zip((50, 90, 99, 99.9), histogram.percentiles((50, 90, 99, 99.9))):
+        exact = values[int(percentile / 100 * len(values)) - 1]
+        assert abs(estimate - exact) <= exact * 0.04 + 1
+
+def test_sliding_windows_drop_old_slots():
+    histogram = WindowedHistogram()
+    histogram.record(0.010, now=1000.0)
+    histogram.record(0.020, now=1000.0 + 200)
+    histogram.record(0.030, now=1000.0 + 2000)
+
+    now = 1000.0 + 2000
+    assert histogram.window(60, now).count == 1
+    assert histogram.window(3600, now).count == 3
+    assert histogram.total.count == 3
+
+def test_collector_merges_thread_shards():
+    collector = BleMetricsCollector(max_history=10)
+
+    def worker():
+        for _ in range(500):
+            collector.record_operation("read", 0.005)
+        collector.record_operation("read", 0.0, success=False)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = collector.get_latency_summary("1m")["read"]
+    assert summary["count"] == 2000 and summary["failures"] == 4
+    assert abs(summary["p99"] - 0.005) < 0.0002
+    assert collector.operation_counts["read"] == 2004
+    assert len(collector.get_operation_metrics(limit=25)["operations"]) == 25
+
+    collector.reset_metrics()
+    assert collector.operation_counts["read"] == 0
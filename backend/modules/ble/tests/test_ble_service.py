@@ -28,4 +28,80 @@ async def test_disconnect_device():
         mock_disconnect.return_value = True
         result = await ble_service.disconnect_device("00:11:22:33:44:55")
         assert result["status"] == "disconnected"
-        assert result["address"] == "00:11:22:33:44:55"
\ No newline at end of file
+        assert result["address"] == "00:11:22:33:44:55"
+@pytest.mark.asyncio
+async def test_idle_pass_keeps_primary_device_during_notifications(monkeypatch):
+    from backend.modules.ble.core.connection_pool import BleConnectionPool
+    from backend.modules.ble.utils.events import ble_event_bus
+
+    class FakeClient:
+        def __init__(self, address, disconnected_callback=None, timeout=None):
+            self.address = address
+            self.is_connected = False
+
+        async def connect(self):
+            self.is_connected = True
+
+        async def disconnect(self):
+            self.is_connected = False
+
+    pool = BleConnectionPool(client_factory=FakeClient, idle_timeout=60)
+    ble_service = BleService()
+    monkeypatch.setattr(ble_service, "connection_pool", pool)
+    monkeypatch.setattr(ble_service.service_manager, "start_notify", AsyncMock(return_value=True))
+
+    # What BleDeviceManager.connect_device does for the primary device
+    await pool.connect("AA:00")
+    ble_event_bus.emit("device_connected", {"address": "AA:00"})
+    await ble_event_bus.join(timeout=1.0)
+    assert ble_service.service_manager.client is pool.get("AA:00").client
+    assert await ble_service.subscribe_to_notifications("2a37")
+
+    # A secondary pooled device neither retargets the primary nor is protected
+    await pool.connect("BB:00")
+    await ble_event_bus.join(timeout=1.0)
+    assert ble_service.service_manager.client is pool.get("AA:00").client
+
+    assert await pool.evict_idle(now=float("inf")) == 1
+    assert pool.addresses() == ["AA:00"]
+    assert "2a37" in ble_service.notification_manager.get_active_subscriptions()
+    await pool.close_all()
+
+@pytest.mark.asyncio
+async def test_cached_gatt_results_for_unconnected_device_are_stale(monkeypatch):
+    from backend.modules.ble.core.gatt_cache import GattCache
+
+    cache = GattCache()
+    cache.put("CC:00", [{
+        "uuid": "0000180d-0000-1000-8000-00805f9b34fb",
+        "handle": 10,
+        "characteristics": [{
+            "uuid": "00002a37-0000-1000-8000-00805f9b34fb",
+            "handle": 12,
+            "properties": ["notify"],
+            "descriptors": []
+        }]
+    }], "0102")
+    monkeypatch.setattr("backend.modules.ble.core.ble_service.get_gatt_cache", lambda: cache)
+    ble_service = BleService()
+
+    services = await ble_service.get_services(address="CC:00")
+    characteristics = await ble_service.get_characteristics("180d", address="CC:00")
+
+    assert [s["uuid"] for s in services] == ["0000180d-0000-1000-8000-00805f9b34fb"]
+    assert all(item["stale"] and item["cached_at"] for item in services + characteristics)
+
+@pytest.mark.asyncio
+async def test_disconnect_of_primary_matches_any_address_case():
+    from types import SimpleNamespace
+    from backend.modules.ble.core.notification_manager import BleNotificationManager
+
+    service_manager = SimpleNamespace(client=SimpleNamespace(address="AA:BB:CC:DD:EE:FF"))
+    notification_manager = BleNotificationManager(service_manager=service_manager)
+    notification_manager._active_subscriptions = {"2a37": object()}
+
+    await notification_manager._handle_device_disconnected({"address": "11:22:33:44:55:66"})
+    assert "2a37" in notification_manager._active_subscriptions
+
+    await notification_manager._handle_device_disconnected({"address": "aa:bb:cc:dd:ee:ff"})
+    assert notification_manager._active_subscriptions == {}
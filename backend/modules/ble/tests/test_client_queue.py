@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from backend.modules.ble.comms.client_queue import ClientSendQueue
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0):
+        self.sent = []
+        self.delay = delay
+
+    async def send_json(self, message):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+@pytest.mark.asyncio
+async def test_messages_are_sent_in_order():
+    websocket = FakeWebSocket()
+    send_queue = ClientSendQueue(websocket, max_size=10)
+    send_queue.start()
+
+    for i in range(5):
+        assert send_queue.put({"n": i})
+    await asyncio.sleep(0.01)
+
+    assert [m["n"] for m in websocket.sent] == [0, 1, 2, 3, 4]
+    assert send_queue.get_stats()["sent"] == 5
+    send_queue.close()
+
+@pytest.mark.asyncio
+async def test_drop_oldest_policy():
+    send_queue = ClientSendQueue(FakeWebSocket(), max_size=2, overflow_policy="drop_oldest")
+
+    for i in range(4):
+        send_queue.put({"n": i})
+
+    assert send_queue.depth == 2
+    assert send_queue.dropped == 2
+    assert [entry[1]["n"] for entry in send_queue._entries] == [2, 3]
+
+@pytest.mark.asyncio
+async def test_coalesce_policy_keeps_latest_value_in_place():
+    send_queue = ClientSendQueue(FakeWebSocket(), max_size=10, overflow_policy="coalesce")
+
+    send_queue.put({"v": 1}, key="notification:a")
+    send_queue.put({"v": "other"})
+    send_queue.put({"v": 2}, key="notification:a")
+
+    assert send_queue.depth == 2
+    assert send_queue.coalesced == 1
+    assert [entry[1]["v"] for entry in send_queue._entries] == [2, "other"]
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_closes_queue():
+    closed = []
+    send_queue = ClientSendQueue(
+        FakeWebSocket(), max_size=1, overflow_policy="disconnect", on_close=closed.append
+    )
+
+    assert send_queue.put({"n": 1})
+    assert not send_queue.put({"n": 2})
+    assert send_queue.closed
+    assert len(closed) == 1
@@ -0,0 +1,131 @@
+import asyncio
+import pytest
+from backend.modules.ble.core.connection_pool import BleConnectionPool
+
+class FakeClient:
+    connects = 0
+
+    def __init__(self, address, disconnected_callback=None, timeout=None):
+        self.address = address
+        self.is_connected = False
+        self.disconnected_callback = disconnected_callback
+
+    async def connect(self):
+        FakeClient.connects += 1
+        await asyncio.sleep(0.01)
+        self.is_connected = True
+
+    async def disconnect(self):
+        self.is_connected = False
+
+def _pool(**kwargs):
+    FakeClient.connects = 0
+    return BleConnectionPool(client_factory=FakeClient, **kwargs)
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_connection():
+    pool = _pool()
+    connections = await asyncio.gather(*(pool.connect("AA") for _ in range(5)))
+
+    assert FakeClient.connects == 1
+    assert all(connection is connections[0] for connection in connections)
+    await pool.close_all()
+
+@pytest.mark.asyncio
+async def test_operations_on_one_device_are_serialized():
+    pool = _pool()
+    running, peak = 0, 0
+
+    async def operation(connection):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(pool.run("AA", operation) for _ in range(4)))
+    assert peak == 1
+
+    await asyncio.gather(*(pool.connect(address) for address in ("BB", "CC")))
+    await asyncio.gather(*(pool.run(address, operation) for address in ("AA", "BB", "CC")))
+    assert peak == 3
+    await pool.close_all()
+
+@pytest.mark.asyncio
+async def test_adapter_concurrency_cap():
+    pool = _pool(max_concurrent_operations=2)
+    running, peak = 0, 0
+
+    async def operation(connection):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(pool.run(f"D{i}", operation) for i in range(6)))
+    assert peak == 2
+    await pool.close_all()
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_idle_timeout():
+    pool = _pool(max_connections=2, idle_timeout=60)
+    await pool.connect("AA")
+    await pool.connect("BB")
+    await pool.connect("AA")  # AA becomes most recently used
+
+    await pool.connect("CC")
+    assert pool.addresses() == ["AA", "CC"]
+    assert pool.evictions == 1
+
+    assert await pool.evict_idle(now=float("inf")) == 2
+    assert pool.addresses() == []
+    await pool.close_all()
+
+@pytest.mark.asyncio
+async def test_pinned_connection_is_not_reaped_or_evicted():
+    pool = _pool(max_connections=2, idle_timeout=60)
+    await pool.connect("AA")
+    assert pool.pin("AA")
+    await pool.connect("BB")
+
+    await pool.connect("CC")
+    assert pool.addresses() == ["AA", "CC"]
+
+    assert await pool.evict_idle(now=float("inf")) == 1
+    assert pool.addresses() == ["AA"]
+
+    pool.unpin("AA")
+    assert await pool.evict_idle(now=float("inf")) == 1
+    await pool.close_all()
+
+@pytest.mark.asyncio
+async def test_lost_connection_is_dropped_and_reported():
+    from backend.modules.ble.utils.events import ble_event_bus
+
+    events = []
+    subscription = ble_event_bus.on("device_disconnected", events.append)
+    pool = _pool()
+    connection = await pool.connect("AA")
+    connection.client.is_connected = False
+
+    assert pool.get("AA") is None
+    await ble_event_bus.join(timeout=1.0)
+    ble_event_bus.unsubscribe(subscription)
+    assert {"address": "AA", "reason": "lost"} in events
+    await pool.close_all()
+
+@pytest.mark.asyncio
+async def test_addresses_are_normalized():
+    pool = _pool()
+    pinned = await pool.connect("AA:BB:CC:DD:EE:FF")
+    assert pool.pin("AA:BB:CC:DD:EE:FF")
+
+    # An address copied from scan results (lowercase) reuses the connection
+    assert await pool.connect("aa:bb:cc:dd:ee:ff") is pinned
+    assert FakeClient.connects == 1
+    assert pool.get("aa:bb:cc:dd:ee:ff").pinned
+    assert pool.addresses() == ["AA:BB:CC:DD:EE:FF"]
+
+    assert await pool.disconnect("aa:bb:cc:dd:ee:ff")
+    assert pool.addresses() == []
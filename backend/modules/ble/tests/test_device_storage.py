@@ -0,0 +1,62 @@
+import asyncio
+import json
+import os
+import pytest
+from backend.modules.ble.utils.ble_persistence import BLEDeviceStorage
+
+@pytest.mark.asyncio
+async def test_burst_of_bonds_is_written_once(tmp_path):
+    storage = BLEDeviceStorage(str(tmp_path), flush_delay=0.05)
+    legacy = str(tmp_path / "bonded_devices.txt")
+    storage.attach_legacy_bonded_file(legacy)
+
+    for index in range(500):
+        await storage.add_bonded_device({"address": f"AA:BB:CC:00:{index // 256:02X}:{index % 256:02X}"})
+    await storage.save_device_preferences("AA:BB:CC:00:00:01", {"auto_connect": True})
+    assert len(await storage.get_bonded_devices()) == 500
+    assert not os.path.exists(storage.bonded_devices_file)
+
+    await asyncio.sleep(0.2)
+    assert storage.flush_count == 1
+    with open(storage.bonded_devices_file) as f:
+        assert len(json.load(f)) == 500
+    with open(legacy) as f:
+        assert len(f.read().split()) == 500
+
+    reloaded = BLEDeviceStorage(str(tmp_path))
+    assert await reloaded.get_device_preferences("AA:BB:CC:00:00:01") == {"auto_connect": True}
+
+@pytest.mark.asyncio
+async def test_legacy_text_file_is_migrated(tmp_path):
+    legacy = tmp_path / "bonded_devices.txt"
+    legacy.write_text("11:22:33:44:55:66\n")
+    storage = BLEDeviceStorage(str(tmp_path), flush_delay=0.01)
+    await storage.add_bonded_device({"address": "AA:AA:AA:AA:AA:AA", "name": "Sensor"})
+
+    assert storage.attach_legacy_bonded_file(str(legacy)) == ["AA:AA:AA:AA:AA:AA", "11:22:33:44:55:66"]
+    await storage.remove_bonded_device("AA:AA:AA:AA:AA:AA")
+    await storage.flush()
+
+    assert legacy.read_text() == "11:22:33:44:55:66\n"
+    with open(storage.bonded_devices_file) as f:
+        assert [d["address"] for d in json.load(f)] == ["11:22:33:44:55:66"]
+
+@pytest.mark.asyncio
+async def test_pending_changes_are_flushed_at_exit(tmp_path, monkeypatch):
+    from backend.modules.ble.utils import ble_persistence
+
+    exit_hooks = []
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(ble_persistence, "_persistence_service", None)
+    monkeypatch.setattr(ble_persistence.atexit, "register", exit_hooks.append)
+
+    storage = ble_persistence.get_persistence_service()
+    await storage.add_bonded_device({"address": "AA:BB:CC:DD:EE:FF"})
+    assert not os.path.exists(storage.bonded_devices_file)
+
+    # The process exits before the write-behind delay elapses
+    for hook in exit_hooks:
+        hook()
+    with open(storage.bonded_devices_file) as f:
+        assert [d["address"] for d in json.load(f)] == ["AA:BB:CC:DD:EE:FF"]
+    await storage.flush()
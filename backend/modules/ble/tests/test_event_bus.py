@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from backend.modules.ble.utils.events import BleEventBus
+
+@pytest.mark.asyncio
+async def test_emit_does_not_wait_for_slow_handlers():
+    bus = BleEventBus()
+    release = asyncio.Event()
+    received = []
+
+    async def slow(data):
+        await release.wait()
+
+    bus.on("notification_received", slow)
+    bus.on("notification_*", lambda data: received.append(data["uuid"]))
+    for index in range(3):
+        bus.emit("notification_received", {"uuid": f"char-{index}"})
+    await bus.emit("device_connected", {"address": "AA"})
+
+    await asyncio.sleep(0.01)
+    assert received == ["char-0", "char-1", "char-2"]
+    release.set()
+    assert await bus.join(timeout=1)
+    assert bus.get_stats()["unrouted"] == 1
+
+@pytest.mark.asyncio
+async def test_full_queue_policies():
+    bus = BleEventBus()
+    release = asyncio.Event()
+    seen = {"oldest": [], "newest": [], "coalesce": []}
+
+    def recorder(name):
+        async def handler(data):
+            await release.wait()
+            seen[name].append(data["value"])
+        return handler
+
+    oldest = bus.on("sample", recorder("oldest"), maxsize=2, policy="drop_oldest")
+    newest = bus.on("sample", recorder("newest"), maxsize=2, policy="drop_newest")
+    latest = bus.on("sample", recorder("coalesce"), maxsize=2, policy="coalesce")
+    bus.emit("sample", {"uuid": "a", "value": 0})
+    await asyncio.sleep(0)  # Workers take the first event and block on it
+    for value in range(1, 6):
+        bus.emit("sample", {"uuid": "a" if value % 2 else "b", "value": value})
+    release.set()
+    await bus.join(timeout=1)
+
+    assert seen["oldest"] == [0, 4, 5]
+    assert seen["newest"] == [0, 1, 2]
+    assert seen["coalesce"] == [0, 5, 4]
+    assert oldest.dropped == 3 and newest.dropped == 3
+    assert latest.coalesced == 3 and latest.dropped == 0
+
+@pytest.mark.asyncio
+async def test_wildcard_handler_receives_event_type():
+    bus = BleEventBus()
+    forwarded = []
+
+    async def broadcast(event_type, data):
+        forwarded.append((event_type, data))
+
+    bus.register_ws_broadcast(broadcast)
+    bus.emit("adapter_reset", "hci0")
+    await bus.join(timeout=1)
+    assert forwarded == [("adapter_reset", {"data": "hci0"})]
+
+@pytest.mark.asyncio
+async def test_join_skips_subscriptions_without_a_worker():
+    bus = BleEventBus()
+    release = asyncio.Event()
+    handled = []
+
+    async def blocked(data):
+        await release.wait()
+
+    async def chained(data):
+        handled.append(data)
+        if data < 3:
+            bus.emit("step", data + 1)
+
+    stuck = bus.on("sample", blocked)
+    bus.on("step", chained)
+    for value in range(3):
+        bus.emit("sample", value)
+    await asyncio.sleep(0)
+    await stuck.stop()
+    assert not stuck.idle and not stuck.running
+
+    # Events queued on a stopped worker never drain, so join must not wait on them
+    bus.emit("step", 0)
+    assert await asyncio.wait_for(bus.join(), timeout=1)
+    assert handled == [0, 1, 2, 3]
+
+    release.clear()
+    bus.emit("sample", 3)  # Restarts the worker, which blocks again
+    assert not await bus.join(timeout=0.05)
+    release.set()
+    assert await bus.join(timeout=1)
+    assert stuck.idle
@@ -0,0 +1,40 @@
+import json
+from backend.modules.ble.comms.framing import (
+    FramingOptions, NotificationFrames, decode_value, decode_binary_notification,
+    FORMAT_BINARY, FORMAT_JSON
+)
+
+def _builder(value):
+    return {"type": "notification", "value": value}
+
+def test_negotiation_defaults_and_fields():
+    options = FramingOptions.from_query({})
+    assert options.format == FORMAT_JSON
+    assert options.representations == ("hex", "text", "bytes", "int_value")
+
+    options = FramingOptions.from_query({"format": "binary", "fields": "int_value"})
+    assert options.format == FORMAT_BINARY
+    assert options.representations == ("int_value",)
+
+    assert FramingOptions.from_query({"format": "bogus"}).format == FORMAT_JSON
+
+def test_decode_value_only_computes_requested_fields():
+    assert decode_value(b"\x01\x00", ("int_value",)) == {"int_value": 1}
+    assert decode_value(b"hi", ("hex", "text")) == {"hex": "6869", "text": "hi"}
+
+def test_binary_frame_round_trip():
+    frames = NotificationFrames("2a37", b"\x06\x48", 1700000000.5, _builder)
+    frame = frames.frame_for(FramingOptions(FORMAT_BINARY))
+
+    decoded = decode_binary_notification(frame)
+    assert decoded["characteristic_uuid"] == "00002a37-0000-1000-8000-00805f9b34fb"
+    assert decoded["timestamp"] == 1700000000.5
+    assert decoded["data"] == b"\x06\x48"
+
+def test_frames_are_encoded_once_per_framing():
+    frames = NotificationFrames("2a37", b"\x01", 0.0, _builder)
+    options = FramingOptions(FORMAT_JSON, ("hex",))
+
+    first = frames.frame_for(options)
+    assert frames.frame_for(FramingOptions(FORMAT_JSON, ("hex",))) is first
+    assert json.loads(first) == {"type": "notification", "value": {"hex": "01"}}
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from backend.modules.ble.core.service_manager import BleServiceManager
+
+class FakeServices:
+    def get_characteristic(self, uuid):
+        return SimpleNamespace(uuid=uuid, properties=["read", "write", "write-without-response"],
+                               max_write_without_response_size=20)
+
+class FakeClient:
+    def __init__(self):
+        self.is_connected = True
+        self.services = FakeServices()
+        self.values = {}
+        self.log = []
+        self.reading = 0
+        self.peak = 0
+
+    async def read_gatt_char(self, char):
+        self.reading += 1
+        self.peak = max(self.peak, self.reading)
+        await asyncio.sleep(0.01)
+        self.reading -= 1
+        if char.uuid == "missing":
+            raise ValueError("not found")
+        self.log.append(("read", char.uuid))
+        return self.values.get(char.uuid, b"")
+
+    async def write_gatt_char(self, char, data, response=True):
+        self.log.append(("write", char.uuid, bytes(data), response))
+        self.values[char.uuid] = bytes(data)
+
+@pytest.mark.asyncio
+async def test_reads_run_together_and_writes_keep_order():
+    client = FakeClient()
+    manager = BleServiceManager(client=client)
+
+    results = await manager.execute_batch([
+        {"op": "write", "characteristic": "a", "value": "01"},
+        {"op": "read", "characteristic": "a"},
+        {"op": "read", "characteristic": "b"},
+        {"op": "write", "characteristic": "a", "value": "02"},
+        {"op": "read", "characteristic": "a"},
+    ])
+
+    assert client.peak == 2
+    assert [result["success"] for result in results] == [True] * 5
+    assert results[1]["value"]["hex"] == "01"
+    assert results[4]["value"]["hex"] == "02"
+
+@pytest.mark.asyncio
+async def test_stop_on_error_skips_remaining_operations():
+    client = FakeClient()
+    manager = BleServiceManager(client=client)
+
+    results = await manager.execute_batch([
+        {"op": "read", "characteristic": "missing"},
+        {"op": "write", "characteristic": "a", "value": "01"},
+    ], stop_on_error=True)
+
+    assert [result["success"] for result in results] == [False, False]
+    assert "Skipped" in results[1]["error"]
+    assert not any(entry[0] == "write" for entry in client.log)
+
+@pytest.mark.asyncio
+async def test_write_stream_chunks_and_acknowledges():
+    client = FakeClient()
+    manager = BleServiceManager(client=client)
+
+    result = await manager.write_stream("a", bytes(range(100)), ack_every=2)
+
+    writes = [entry for entry in client.log if entry[0] == "write"]
+    assert result["chunks"] == 5 and result["chunk_size"] == 20
+    assert b"".join(entry[2] for entry in writes) == bytes(range(100))
+    assert [entry[3] for entry in writes] == [False, True, False, True, False]
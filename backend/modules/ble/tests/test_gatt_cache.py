@@ -0,0 +1,128 @@
+import pytest
+from types import SimpleNamespace
+from backend.modules.ble.core.gatt_cache import (
+    GattCache, build_gatt_table, read_database_hash, DATABASE_HASH_UUID
+)
+
+def _services(with_hash=True):
+    chars = [SimpleNamespace(uuid="00002a37-0000-1000-8000-00805f9b34fb", handle=12, properties=["notify"], descriptors=[])]
+    services = [SimpleNamespace(uuid="0000180d-0000-1000-8000-00805f9b34fb", handle=10, characteristics=chars)]
+    if with_hash:
+        hash_char = SimpleNamespace(uuid=DATABASE_HASH_UUID, handle=5, properties=["read"], descriptors=[])
+        services.append(SimpleNamespace(uuid="00001801-0000-1000-8000-00805f9b34fb", handle=3, characteristics=[hash_char]))
+    return services
+
+class FakeClient:
+    def __init__(self, services, value=b"\x01\x02"):
+        self.address = "AA:BB"
+        self.services = services
+        self.value = value
+        self.reads = 0
+
+    async def read_gatt_char(self, uuid):
+        self.reads += 1
+        return self.value
+
+def test_build_gatt_table():
+    table = build_gatt_table(_services(with_hash=False))
+    assert table == [{
+        "uuid": "0000180d-0000-1000-8000-00805f9b34fb",
+        "handle": 10,
+        "characteristics": [{
+            "uuid": "00002a37-0000-1000-8000-00805f9b34fb",
+            "handle": 12,
+            "properties": ["notify"],
+            "descriptors": []
+        }]
+    }]
+
+def test_lookup_requires_matching_hash(tmp_path):
+    cache = GattCache(str(tmp_path))
+    table = build_gatt_table(_services())
+    cache.put("AA:BB", table, "0102")
+
+    assert cache.lookup("AA:BB", "0102") == table
+    assert cache.lookup("AA:BB", "ffff") is None
+    assert cache.lookup("AA:BB", None) is None
+
+    # Survives a restart
+    assert GattCache(str(tmp_path)).lookup("AA:BB", "0102") == table
+
+    cache.invalidate("AA:BB")
+    assert GattCache(str(tmp_path)).get("AA:BB") is None
+
+@pytest.mark.asyncio
+async def test_read_database_hash():
+    assert await read_database_hash(FakeClient(_services())) == "0102"
+    client = FakeClient(_services(with_hash=False))
+    assert await read_database_hash(client) is None
+    assert client.reads == 0
+
+@pytest.mark.asyncio
+async def test_known_device_connects_from_backend_cache():
+    from backend.modules.ble.core.connection_pool import BleConnectionPool
+
+    class PoolClient:
+        instances = []
+
+        def __init__(self, address, disconnected_callback=None, timeout=None, **kwargs):
+            self.address = address
+            self.kwargs = kwargs
+            self.connect_kwargs = None
+            self.is_connected = False
+            PoolClient.instances.append(self)
+
+        async def connect(self, **kwargs):
+            self.connect_kwargs = kwargs
+            self.is_connected = True
+
+        async def disconnect(self):
+            self.is_connected = False
+
+    cache = GattCache()
+    cache.put("AA:BB", build_gatt_table(_services()), "0102")
+    cache.put("CC:DD", build_gatt_table(_services(with_hash=False)), None)
+    pool = BleConnectionPool(client_factory=PoolClient, gatt_cache=cache)
+
+    await pool.connect("AA:BB")
+    await pool.connect("CC:DD")
+    await pool.connect("EE:FF")
+
+    known, unhashed, unknown = PoolClient.instances
+    assert known.kwargs == {"winrt": {"use_cached_services": True}}
+    assert known.connect_kwargs == {"dangerous_use_bleak_cache": True}
+    # Without a hash the backend cache could never be validated
+    assert unhashed.kwargs == {} and unhashed.connect_kwargs == {}
+    assert unknown.kwargs == {} and unknown.connect_kwargs == {}
+    await pool.close_all()
+
+@pytest.mark.asyncio
+async def test_changed_hash_drops_entry_instead_of_caching_backend_table():
+    from backend.modules.ble.core.service_manager import BleServiceManager
+
+    cache = GattCache()
+    cache.put("AA:BB", build_gatt_table(_services()), "0102")
+    client = FakeClient(_services(), value=b"\xff\xff")
+    client.is_connected = True
+    manager = BleServiceManager(client=client)
+    manager._gatt_cache = cache
+
+    table = await manager.load_gatt_table()
+
+    assert table == build_gatt_table(_services())
+    assert cache.get("AA:BB") is None
+
+    # The next connect discovers over the air and is cached again
+    manager.set_client(client)
+    await manager.load_gatt_table()
+    assert cache.get("AA:BB")["database_hash"] == "ffff"
+
+def test_entries_are_keyed_by_normalized_address(tmp_path):
+    cache = GattCache(str(tmp_path))
+    table = build_gatt_table(_services())
+    cache.put("aa:bb:cc:dd:ee:ff", table, "0102")
+
+    assert cache.lookup("AA:BB:CC:DD:EE:FF", "0102") == table
+    assert cache.backend_options("AA:BB:CC:DD:EE:FF")[1] == {"dangerous_use_bleak_cache": True}
+    cache.invalidate("AA:BB:CC:DD:EE:FF")
+    assert GattCache(str(tmp_path)).get("aa:bb:cc:dd:ee:ff") is None
@@ -0,0 +1,61 @@
+import asyncio
+import json
+import pytest
+from backend.modules.ble.models import NotificationBatchPolicy
+from backend.modules.ble.core.notification_manager import _NotificationBatcher
+from backend.modules.ble.comms.framing import (
+    FramingOptions, NotificationBatchFrames, decode_binary_notifications,
+    FORMAT_BINARY, FORMAT_JSON
+)
+
+def _collector():
+    batches = []
+    return batches, lambda uuid, samples, latest_only: batches.append(samples)
+
+@pytest.mark.asyncio
+async def test_batch_flushes_when_full():
+    batches, flush = _collector()
+    batcher = _NotificationBatcher("2a37", NotificationBatchPolicy(max_batch_size=3, max_delay_ms=1000), flush)
+
+    for i in range(7):
+        batcher.add(float(i), bytes([i]))
+
+    assert [len(batch) for batch in batches] == [3, 3]
+    batcher.flush()
+    assert batches[-1] == [(6.0, b"\x06")]
+
+@pytest.mark.asyncio
+async def test_batch_flushes_after_delay():
+    batches, flush = _collector()
+    batcher = _NotificationBatcher("2a37", NotificationBatchPolicy(max_batch_size=100, max_delay_ms=10), flush)
+
+    batcher.add(1.0, b"\x01")
+    batcher.add(2.0, b"\x02")
+    assert batches == []
+
+    await asyncio.sleep(0.05)
+    assert batches == [[(1.0, b"\x01"), (2.0, b"\x02")]]
+
+@pytest.mark.asyncio
+async def test_latest_only_keeps_newest_sample():
+    batches, flush = _collector()
+    batcher = _NotificationBatcher("2a37", NotificationBatchPolicy(max_delay_ms=10, latest_only=True), flush)
+
+    for i in range(5):
+        batcher.add(float(i), bytes([i]))
+    await asyncio.sleep(0.05)
+
+    assert batches == [[(4.0, b"\x04")]]
+
+def test_batch_frames_per_format():
+    samples = [(1.0, b"\x01"), (2.0, b"\x02\x03")]
+    frames = NotificationBatchFrames("2a37", samples, lambda batch: {"samples": batch})
+
+    records = decode_binary_notifications(frames.frame_for(FramingOptions(FORMAT_BINARY)))
+    assert [(r["timestamp"], r["data"]) for r in records] == samples
+
+    message = json.loads(frames.frame_for(FramingOptions(FORMAT_JSON, ("hex",))))
+    assert message == {"samples": [
+        {"timestamp": 1.0, "value": {"hex": "01"}},
+        {"timestamp": 2.0, "value": {"hex": "0203"}}
+    ]}
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from backend.modules.ble.core.notification_log import NotificationLog, SEGMENT_SUFFIX
+from backend.modules.ble.core.notification_manager import BleNotificationManager
+
+UUID = "00002a37-0000-1000-8000-00805f9b34fb"
+OTHER = "00002a38-0000-1000-8000-00805f9b34fb"
+
+def _segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX))
+
+def test_append_and_query_newest_first(tmp_path):
+    log = NotificationLog(str(tmp_path), max_payload=8, index_interval=4)
+    for i in range(20):
+        log.append(UUID if i % 2 else OTHER, float(i), bytes([i]))
+
+    newest = log.query(limit=3)
+    assert [(t, data) for t, _, data in newest] == [(19.0, b"\x13"), (18.0, b"\x12"), (17.0, b"\x11")]
+
+    only = log.query(UUID, start_time=5, end_time=10)
+    assert [t for t, _, _ in only] == [9.0, 7.0, 5.0]
+    assert all(uuid == UUID for _, uuid, _ in only)
+    log.close()
+
+def test_non_uuid_characteristics_are_rejected(tmp_path):
+    log = NotificationLog(str(tmp_path), max_payload=8)
+    log.append(UUID, 1.0, b"\x01")
+    log.append(OTHER, 2.0, b"\x02")
+    with pytest.raises(ValueError):
+        log.append("battery", 3.0, b"\x03")
+
+    # Two non-UUID keys must not collapse onto one shared record key
+    assert log.query("heart-rate") == []
+    assert list(log.replay(characteristic_uuid="heart-rate")) == []
+    assert [data for _, _, data in log.query(UUID)] == [b"\x01"]
+    assert [data for _, _, data in log.query("2a38")] == [b"\x02"]
+    log.close()
+
+def test_segments_roll_and_replay_in_order(tmp_path):
+    log = NotificationLog(str(tmp_path), segment_size=16 + 5 * 34, max_payload=8, index_interval=2)
+    for i in range(23):
+        log.append(UUID, float(i), b"abc")
+
+    assert len(_segments(tmp_path)) == 5
+    assert [t for t, _, _ in log.replay(start_time=3.5, end_time=12)] == [float(i) for i in range(4, 13)]
+    log.close()
+
+def test_reopen_continues_existing_log(tmp_path):
+    log = NotificationLog(str(tmp_path), max_payload=8)
+    log.append(UUID, 1.0, b"a")
+    log.close()
+
+    log = NotificationLog(str(tmp_path), max_payload=8)
+    log.append(UUID, 2.0, b"b")
+    assert [data for _, _, data in log.replay()] == [b"a", b"b"]
+    log.close()
+
+def test_retention_by_size_keeps_active_segment(tmp_path):
+    record_size = 34
+    log = NotificationLog(
+        str(tmp_path), segment_size=16 + 2 * record_size, max_payload=8,
+        retention_bytes=3 * (16 + 2 * record_size)
+    )
+    for i in range(20):
+        log.append(UUID, float(i), b"x")
+
+    assert len(_segments(tmp_path)) <= 4
+    assert log.query(limit=1)[0][0] == 19.0
+    log.close()
+
+def test_age_retention_expires_low_rate_log(tmp_path):
+    log = NotificationLog(str(tmp_path), max_payload=8, retention_seconds=100)
+    start = time.time() - 1000
+    log.append(UUID, start, b"a")
+    # The active segment spans a quarter of the age limit, so it is closed and expired
+    log.append(UUID, start + 30, b"b")
+    assert [data for _, _, data in log.replay()] == [b"b"]
+
+    log.append(UUID, time.time(), b"c")
+    assert [data for _, _, data in log.replay()] == [b"c"]
+    log.close()
+
+def test_export_flushes_from_another_thread(tmp_path):
+    log = NotificationLog(str(tmp_path), max_payload=8, flush_interval=0.0)
+    stop = threading.Event()
+
+    def export():
+        while not stop.is_set():
+            list(log.replay())
+
+    reader = threading.Thread(target=export)
+    reader.start()
+    try:
+        for i in range(2000):
+            log.append(UUID, float(i), b"x")
+    finally:
+        stop.set()
+        reader.join()
+    assert len(list(log.replay())) == 2000
+    log.close()
+
+@pytest.mark.asyncio
+async def test_history_uses_one_key_per_characteristic(tmp_path):
+    manager = BleNotificationManager()
+    manager._notification_log = NotificationLog(str(tmp_path), max_payload=8)
+
+    await manager._notification_callback("2A37", b"\x01")
+    await manager._notification_callback(SimpleNamespace(uuid=UUID), b"\x02")
+
+    history = manager.get_notification_history("2a37")
+    assert history["count"] == 2
+    assert {event["characteristic_uuid"] for event in history["events"]} == {UUID}
+
+    # Served from the on-disk log under the same key once memory is cleared
+    manager.clear_notification_history("2a37")
+    history = manager.get_notification_history(UUID)
+    assert history["count"] == 2 and history["characteristic_uuid"] == UUID
+    assert {event["characteristic_uuid"] for event in manager.get_notification_history()["events"]} == {UUID}
+    manager.close()
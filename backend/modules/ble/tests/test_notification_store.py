@@ -0,0 +1,50 @@
+from backend.modules.ble.core.notification_store import (
+    NotificationRingBuffer, NotificationHistoryStore
+)
+
+def test_ring_buffer_keeps_newest_samples():
+    buffer = NotificationRingBuffer(capacity=3, arena_size=64)
+    for i in range(5):
+        buffer.append(float(i), bytes([i]))
+
+    assert len(buffer) == 3
+    assert buffer.query() == [(2.0, b"\x02"), (3.0, b"\x03"), (4.0, b"\x04")]
+    assert buffer.evicted == 2
+
+def test_arena_wraparound_evicts_overwritten_payloads():
+    buffer = NotificationRingBuffer(capacity=10, arena_size=8)
+    buffer.append(1.0, b"aaa")
+    buffer.append(2.0, b"bbb")
+    buffer.append(3.0, b"ccc")
+
+    assert buffer.query() == [(2.0, b"bbb"), (3.0, b"ccc")]
+
+def test_time_range_query_and_limit():
+    buffer = NotificationRingBuffer(capacity=100)
+    for i in range(100):
+        buffer.append(float(i), b"x")
+
+    assert [t for t, _ in buffer.query(10, 14.5)] == [10.0, 11.0, 12.0, 13.0, 14.0]
+    assert [t for t, _ in buffer.query(10, 20, limit=2)] == [19.0, 20.0]
+    assert buffer.query(200, 300) == []
+
+def test_timestamps_stay_sorted_when_clock_steps_back():
+    buffer = NotificationRingBuffer(capacity=10)
+    buffer.append(5.0, b"a")
+    buffer.append(4.0, b"b")
+
+    assert [t for t, _ in buffer.query()] == [5.0, 5.0]
+
+def test_store_merges_characteristics_newest_first():
+    store = NotificationHistoryStore(capacity=10)
+    for i in range(5):
+        store.append("a", float(i), b"a")
+        store.append("b", i + 0.5, b"b")
+
+    merged = store.query_all(limit=3)
+    assert [(t, uuid) for t, uuid, _ in merged] == [(4.5, "b"), (4.0, "a"), (3.5, "b")]
+    assert [t for t, _, _ in store.query_all(1, 2)] == [2.0, 1.5, 1.0]
+
+    store.clear("a")
+    assert store.query("a") == []
+    assert len(store) == 5
@@ -0,0 +1,62 @@
+import pytest
+from backend.modules.ble.core.scanner import BleScanner
+from backend.modules.ble.comms.scan_stream import ScanDeltaStream, ScanStreamClient
+
+def _device(address, rssi, sequence, name="Sensor"):
+    return {"address": address, "name": name, "rssi": rssi, "tx_power": None,
+            "metadata": {}, "last_seen": 0.0, "sequence": sequence}
+
+async def _noop_send(message):
+    pass
+
+def _client(rssi_threshold=5):
+    client = ScanStreamClient("client", _noop_send, rssi_threshold=rssi_threshold, max_rate=0)
+    client.needs_resync = False
+    return client
+
+@pytest.mark.asyncio
+async def test_delta_reports_added_changed_and_expired():
+    stream = ScanDeltaStream(scanner=BleScanner())
+    client = _client()
+
+    client.pending["aa"] = ("added", _device("aa", -60, 1))
+    delta = stream.build_delta(client)
+    assert delta["seq"] == 1
+    assert [d["address"] for d in delta["added"]] == ["aa"]
+
+    client.pending["aa"] = ("updated", _device("aa", -50, 2, name="Renamed"))
+    delta = stream.build_delta(client)
+    assert delta["seq"] == 2
+    assert delta["changed"] == [{"address": "aa", "rssi": -50, "last_seen": 0.0, "name": "Renamed"}]
+
+    client.pending["aa"] = ("expired", _device("aa", -50, 3))
+    delta = stream.build_delta(client)
+    assert delta["expired"] == ["aa"]
+    assert client.known == {}
+
+@pytest.mark.asyncio
+async def test_rssi_changes_below_threshold_are_suppressed():
+    stream = ScanDeltaStream(scanner=BleScanner())
+    client = _client(rssi_threshold=5)
+    client.known["aa"] = _device("aa", -60, 1)
+
+    client.pending["aa"] = ("updated", _device("aa", -62, 2))
+    assert stream.build_delta(client) is None
+    assert client.seq == 0
+    assert client.suppressed == 1
+
+    client.pending["aa"] = ("updated", _device("aa", -66, 3))
+    assert stream.build_delta(client)["changed"][0]["rssi"] == -66
+
+@pytest.mark.asyncio
+async def test_snapshot_resets_known_state():
+    scanner = BleScanner()
+    stream = ScanDeltaStream(scanner=scanner)
+    client = _client()
+    client.known["stale"] = _device("stale", -70, 1)
+    client.pending["stale"] = ("updated", _device("stale", -40, 2))
+
+    snapshot = stream.build_snapshot(client)
+    assert snapshot["type"] == "scan_snapshot"
+    assert snapshot["devices"] == []
+    assert client.known == {} and client.pending == {}
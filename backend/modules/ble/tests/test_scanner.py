@@ -0,0 +1,103 @@
+import pytest
+from types import SimpleNamespace
+from backend.modules.ble.core.scanner import BleScanner
+
+def _advertisement(address, name="Sensor", rssi=-60, manufacturer_data=None):
+    device = SimpleNamespace(address=address, name=name, rssi=rssi)
+    advertisement = SimpleNamespace(
+        local_name=name,
+        rssi=rssi,
+        tx_power=None,
+        manufacturer_data=manufacturer_data or {},
+        service_data={},
+        service_uuids=["180f"]
+    )
+    return device, advertisement
+
+@pytest.mark.asyncio
+async def test_detection_updates_device_table():
+    scanner = BleScanner(device_ttl=30, prune_interval=5, subscriber_queue_size=10)
+    queue = scanner.subscribe()
+
+    scanner._detection_callback(*_advertisement("AA:BB:CC:DD:EE:FF", manufacturer_data={76: b"\x01\x02"}))
+    scanner._detection_callback(*_advertisement("AA:BB:CC:DD:EE:FF", rssi=-50, manufacturer_data={76: b"\x01\x02"}))
+
+    devices = scanner.get_devices()
+    assert len(devices) == 1
+    assert devices[0]["address"] == "aa:bb:cc:dd:ee:ff"
+    assert devices[0]["rssi"] == -50
+    assert devices[0]["seen_count"] == 2
+    assert devices[0]["metadata"]["manufacturer_data"] == {"76": "0102"}
+
+    assert queue.get_nowait()[0] == "added"
+    assert queue.get_nowait()[0] == "updated"
+
+@pytest.mark.asyncio
+async def test_unchanged_advertisement_publishes_no_delta():
+    scanner = BleScanner(device_ttl=30, prune_interval=5, subscriber_queue_size=10)
+    queue = scanner.subscribe()
+
+    scanner._detection_callback(*_advertisement("11:22:33:44:55:66"))
+    scanner._detection_callback(*_advertisement("11:22:33:44:55:66"))
+
+    assert queue.qsize() == 1
+    assert scanner.get_device("11:22:33:44:55:66")["seen_count"] == 2
+
+@pytest.mark.asyncio
+async def test_prune_expires_stale_devices():
+    scanner = BleScanner(device_ttl=10, prune_interval=5, subscriber_queue_size=10)
+    scanner._detection_callback(*_advertisement("11:22:33:44:55:66"))
+    queue = scanner.subscribe()
+
+    last_seen = scanner.get_device("11:22:33:44:55:66")["last_seen"]
+    expired = scanner.prune_expired(now=last_seen + 11)
+
+    assert expired == ["11:22:33:44:55:66"]
+    assert scanner.get_devices() == []
+    assert queue.get_nowait()[0] == "expired"
+
+class _FakeBleakScanner:
+    instances = []
+
+    def __init__(self, detection_callback=None, **kwargs):
+        self.kwargs = kwargs
+        self.stopped = False
+        _FakeBleakScanner.instances.append(self)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        self.stopped = True
+
+@pytest.mark.asyncio
+async def test_shared_scan_is_not_restarted_or_filtered_per_caller(monkeypatch):
+    monkeypatch.setattr("backend.modules.ble.core.scanner.BleakScanner", _FakeBleakScanner)
+    _FakeBleakScanner.instances = []
+    scanner = BleScanner(device_ttl=30, prune_interval=5, subscriber_queue_size=10)
+
+    assert await scanner.ensure_running(active=True, adapter="hci0")
+    assert await scanner.ensure_running(active=False)
+
+    # One scanner, started without a service filter, never restarted
+    assert len(_FakeBleakScanner.instances) == 1
+    assert "service_uuids" not in _FakeBleakScanner.instances[0].kwargs
+    assert not _FakeBleakScanner.instances[0].stopped
+
+    battery, _ = _advertisement("11:22:33:44:55:66")
+    scanner._detection_callback(battery, SimpleNamespace(
+        local_name="Battery", rssi=-60, tx_power=None, manufacturer_data={}, service_data={},
+        service_uuids=["0000180f-0000-1000-8000-00805f9b34fb"]
+    ))
+    heart, _ = _advertisement("22:33:44:55:66:77")
+    scanner._detection_callback(heart, SimpleNamespace(
+        local_name="Heart", rssi=-60, tx_power=None, manufacturer_data={}, service_data={},
+        service_uuids=["0000180d-0000-1000-8000-00805f9b34fb"]
+    ))
+
+    # Each consumer's filter applies only to its own read
+    assert [d["address"] for d in scanner.get_devices(services=["180f"])] == ["11:22:33:44:55:66"]
+    assert [d["address"] for d in scanner.get_devices(services=["180D"])] == ["22:33:44:55:66:77"]
+    assert len(scanner.get_devices()) == 2
+
+    await scanner.stop()
@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from backend.modules.ble.core.exceptions import BleServiceError
+from backend.modules.ble.core.service_manager import BleServiceManager
+from backend.modules.ble.core.transfer import (
+    TransferEngine, TransferOptions, decode_frame, ACK, MAX_ATTRIBUTE_SIZE
+)
+
+DATA = "data"
+ACK_UUID = "ack"
+
+class FakeServices:
+    def get_characteristic(self, uuid):
+        return SimpleNamespace(uuid=uuid, properties=["write", "write-without-response"])
+
+class FakeDevice:
+    """Reassembles framed writes and acknowledges them like a peripheral would."""
+
+    def __init__(self, mtu=23, fail_after=None, corrupt_offset=None):
+        self.is_connected = True
+        self.mtu_size = mtu
+        self.services = FakeServices()
+        self.received = bytearray()
+        self.writes = []
+        self.fail_after = fail_after
+        self.corrupt_offset = corrupt_offset
+        self.ack_callback = None
+        self.reads = []
+
+    async def start_notify(self, uuid, callback):
+        self.ack_callback = callback
+
+    async def stop_notify(self, uuid):
+        self.ack_callback = None
+
+    async def write_gatt_char(self, char, data, response=True):
+        if self.fail_after is not None and len(self.writes) >= self.fail_after:
+            self.fail_after = None
+            raise OSError("link lost")
+        self.writes.append((bytes(data), response))
+        try:
+            offset, payload = decode_frame(data, crc=True)
+        except ValueError:
+            return
+        if offset == self.corrupt_offset:
+            self.corrupt_offset = None
+            return
+        if offset == len(self.received):
+            self.received += payload
+        if self.ack_callback:
+            asyncio.get_running_loop().call_soon(self.ack_callback, ACK_UUID, ACK.pack(len(self.received)))
+
+    async def read_gatt_char(self, char):
+        return self.reads.pop(0)
+
+def _manager(device):
+    return BleServiceManager(client=device)
+
+@pytest.mark.asyncio
+async def test_chunks_follow_negotiated_mtu():
+    device = FakeDevice(mtu=23)
+    engine = TransferEngine()
+    data = bytes(range(100))
+
+    result = await engine.upload(_manager(device), DATA, data, TransferOptions(mode="with_response"))
+
+    assert [len(frame) for frame, _ in device.writes] == [20, 20, 20, 20, 20]
+    assert b"".join(frame for frame, _ in device.writes) == data
+    assert result["state"] == "completed" and result["confirmed"] == 100
+
+    device = FakeDevice(mtu=23)
+    await engine.upload(_manager(device), DATA, bytes(1200), TransferOptions(mode="long"))
+    assert [len(frame) for frame, _ in device.writes] == [MAX_ATTRIBUTE_SIZE, MAX_ATTRIBUTE_SIZE, 176]
+
+@pytest.mark.asyncio
+async def test_short_ack_triggers_resend():
+    device = FakeDevice(mtu=64, corrupt_offset=51)
+    engine = TransferEngine()
+    options = TransferOptions(mode="without_response", crc=True, ack_characteristic=ACK_UUID, ack_window=4)
+    data = bytes(range(200))
+
+    result = await engine.upload(_manager(device), DATA, data, options)
+
+    assert bytes(device.received) == data
+    assert result["retransmits"] == 1
+    assert all(not response for _, response in device.writes)
+
+@pytest.mark.asyncio
+async def test_failed_upload_resumes_from_confirmed_offset():
+    device = FakeDevice(mtu=23, fail_after=3)
+    engine = TransferEngine()
+    options = TransferOptions(mode="with_response", crc=True, ack_characteristic=ACK_UUID, ack_window=1)
+    data = bytes(range(60))
+
+    with pytest.raises(BleServiceError):
+        await engine.upload(_manager(device), DATA, data, options)
+    transfer = engine.list_transfers()[0]
+    assert transfer["state"] == "failed" and transfer["confirmed"] == len(device.received)
+
+    result = await engine.resume(_manager(device), transfer["transfer_id"])
+    assert result["state"] == "completed"
+    assert bytes(device.received) == data
+
+@pytest.mark.asyncio
+async def test_cancelled_upload_can_be_resumed():
+    device = FakeDevice(mtu=23)
+    engine = TransferEngine()
+    data = bytes(range(60))
+    write = device.write_gatt_char
+    stalled = asyncio.Event()
+
+    async def stall_after_two_writes(char, frame, response=True):
+        if len(device.writes) == 2 and not stalled.is_set():
+            stalled.set()
+            await asyncio.sleep(3600)
+        await write(char, frame, response)
+
+    device.write_gatt_char = stall_after_two_writes
+    task = asyncio.ensure_future(engine.upload(_manager(device), DATA, data, TransferOptions(mode="with_response")))
+    await stalled.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    transfer = engine.list_transfers()[0]
+    assert transfer["state"] == "failed" and transfer["error"] == "Cancelled"
+    assert transfer["confirmed"] == 40
+
+    result = await engine.resume(_manager(device), transfer["transfer_id"])
+    assert result["state"] == "completed"
+    assert b"".join(frame for frame, _ in device.writes) == data
+
+@pytest.mark.asyncio
+async def test_read_long_reassembles_parts():
+    device = FakeDevice()
+    device.reads = [b"a" * MAX_ATTRIBUTE_SIZE, b"b" * MAX_ATTRIBUTE_SIZE, b"c" * 10]
+    engine = TransferEngine()
+
+    result = await engine.read_long(_manager(device), DATA)
+
+    assert result["reads"] == 3
+    assert result["data"] == b"a" * 512 + b"b" * 512 + b"c" * 10
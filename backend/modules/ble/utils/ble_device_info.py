@@ -94,6 +94,16 @@ DEVICE_CATEGORIES = {
     "Audio Device": ["180A", "1800", "1801", "1803"]
 }
 
+def normalize_address(address: str) -> str:
+    """
+    Canonical form of a device address, used as a key across the BLE stack.
+
+    The scanner reports lowercase addresses while Bleak clients and callers
+    often use uppercase, so addresses are compared in uppercase.
+    """
+    return address.strip().upper() if address else address
+
+
 def decode_manufacturer_data(manufacturer_data: Dict) -> Dict:
     """
     Decode manufacturer data to identify the company.
@@ -3,29 +3,479 @@ BLE metrics collector module.
 
 This module provides functionality for collecting and retrieving
 performance metrics for BLE operations.
+
+Operation timings are recorded into per-thread shards, so the hot path
+(``record_operation``) takes no lock. Each shard keeps one windowed latency
+histogram per operation and a preallocated ring of recent operations.
+Readers merge the shards, so their results may miss samples recorded
+concurrently.
 """
 
 import time
 import logging
-from typing import Dict, List, Any, Optional, Set
-from collections import deque
 import threading
+from array import array
+from typing import Dict, List, Any, Optional, Union
+
+from backend.modules.ble.config import get_config
+from .histogram import LatencyHistogram, WindowedHistogram, DEFAULT_PERCENTILES
+from .system_monitor import get_system_monitor
 
 logger = logging.getLogger(__name__)
 
+# Sliding windows reported by get_metrics
+LATENCY_WINDOWS = {"1m": 60.0, "5m": 300.0, "1h": 3600.0}
+
+KNOWN_OPERATIONS = (
+    "scan", "connect", "disconnect", "read", "write", "subscribe",
+    "unsubscribe", "discover_services", "discover_characteristics"
+)
+
+
+class _RecentOperations:
+    """Fixed-size ring of the most recent operations."""
+    
+    __slots__ = ("operations", "timestamps", "durations", "successes", "position", "size")
+    
+    def __init__(self, capacity: int):
+        self.operations: List[Optional[str]] = [None] * capacity
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.durations = array("d", bytes(8 * capacity))
+        self.successes = array("B", bytes(capacity))
+        self.position = 0
+        self.size = 0
+    
+    def append(self, operation: str, timestamp: float, duration: float, success: bool) -> None:
+        position = self.position
+        self.operations[position] = operation
+        self.timestamps[position] = timestamp
+        self.durations[position] = duration
+        self.successes[position] = success
+        position += 1
+        self.position = 0 if position == len(self.operations) else position
+        if self.size < len(self.operations):
+            self.size += 1
+    
+    def newest(self, limit: int) -> List[Dict[str, Any]]:
+        capacity = len(self.operations)
+        records = []
+        for offset in range(1, min(limit, self.size) + 1):
+            index = (self.position - offset) % capacity
+            records.append({
+                "operation": self.operations[index],
+                "timestamp": self.timestamps[index],
+                "duration": self.durations[index],
+                "success": bool(self.successes[index])
+            })
+        return records
+
+
+class _Shard:
+    """Metrics recorded by one thread."""
+    
+    __slots__ = ("histograms", "recent")
+    
+    def __init__(self, capacity: int):
+        self.histograms: Dict[str, WindowedHistogram] = {}
+        self.recent = _RecentOperations(capacity)
+
+
 class BleMetricsCollector:
     """
     Collector for BLE operation metrics.
     
     This class tracks various performance metrics:
     - Operation counts
-    - Operation timings
+    - Operation latency percentiles (all time and sliding windows)
     - Error counts
     - Connection statistics
     """
     
-    # [Full implementation as provided earlier]
+    def __init__(self, max_history: int = 1000):
+        """
+        Initialize the metrics collector.
+        
+        Args:
+            max_history: Number of recent operations kept per thread
+        """
+        self.max_history = max_history
+        self._lock = threading.RLock()
+        
+        # Per-thread shards; the lock only guards registering a new shard
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        
+        # Error counts
+        self.error_counts = {
+            "connection_errors": 0,
+            "adapter_errors": 0,
+            "service_errors": 0,
+            "operation_errors": 0,
+            "timeout_errors": 0,
+            "other_errors": 0
+        }
+        
+        # Device statistics
+        self.device_stats = {
+            "total_devices_discovered": 0,
+            "unique_devices_discovered": set(),
+            "most_connected_device": None,
+            "device_connection_counts": {}
+        }
+        
+        # Start time
+        self.start_time = time.time()
+    
+    @property
+    def system_monitor(self):
+        """Get the system monitor instance."""
+        return get_system_monitor()
+    
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(self.max_history)
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+    
+    def record_operation(self, operation: str, duration: float, success: bool = True) -> None:
+        """
+        Record an operation with its duration.
+        
+        Args:
+            operation: Operation type (scan, connect, etc.)
+            duration: Duration in seconds
+            success: Whether the operation succeeded
+        """
+        shard = self._shard()
+        histogram = shard.histograms.get(operation)
+        if histogram is None:
+            histogram = shard.histograms[operation] = WindowedHistogram()
+        now = time.time()
+        histogram.record(duration, success, now)
+        shard.recent.append(operation, now, duration, success)
+    
+    def record_error(self, error_type: str) -> None:
+        """
+        Record an error occurrence.
+        
+        Args:
+            error_type: Type of error
+        """
+        with self._lock:
+            if error_type in self.error_counts:
+                self.error_counts[error_type] += 1
+            else:
+                self.error_counts["other_errors"] += 1
+    
+    def record_device_discovered(self, device_address: str) -> None:
+        """
+        Record a device discovery.
+        
+        Args:
+            device_address: Device address/ID
+        """
+        with self._lock:
+            self.device_stats["total_devices_discovered"] += 1
+            self.device_stats["unique_devices_discovered"].add(device_address)
+    
+    def record_device_connected(self, device_address: str) -> None:
+        """
+        Record a device connection.
+        
+        Args:
+            device_address: Device address/ID
+        """
+        with self._lock:
+            if device_address in self.device_stats["device_connection_counts"]:
+                self.device_stats["device_connection_counts"][device_address] += 1
+            else:
+                self.device_stats["device_connection_counts"][device_address] = 1
+            
+            # Update most connected device
+            most_connected = self.device_stats["most_connected_device"]
+            if most_connected is None or (
+                self.device_stats["device_connection_counts"][device_address] >
+                self.device_stats["device_connection_counts"].get(most_connected, 0)
+            ):
+                self.device_stats["most_connected_device"] = device_address
     
+    # Aggregation across shards
+    def _merged(self, seconds: Optional[float] = None) -> Dict[str, LatencyHistogram]:
+        """Merge every shard's histograms, all time or over the last ``seconds``."""
+        now = time.time()
+        merged: Dict[str, LatencyHistogram] = {}
+        for shard in list(self._shards):
+            for operation, histogram in list(shard.histograms.items()):
+                into = merged.get(operation)
+                if into is None:
+                    into = merged[operation] = LatencyHistogram()
+                if seconds is None:
+                    into.merge(histogram.total)
+                else:
+                    histogram.window(seconds, now, into)
+        return merged
+    
+    @property
+    def operation_counts(self) -> Dict[str, int]:
+        """Operation attempts (successful and failed) by type."""
+        counts = {operation: 0 for operation in KNOWN_OPERATIONS}
+        for operation, histogram in self._merged().items():
+            counts[operation] = histogram.count + histogram.failures
+        return counts
+    
+    @property
+    def connection_stats(self) -> Dict[str, Any]:
+        """Connection statistics derived from connect/disconnect timings."""
+        merged = self._merged()
+        connects = merged.get("connect") or LatencyHistogram()
+        disconnects = merged.get("disconnect") or LatencyHistogram()
+        return {
+            "total_connections": connects.count + connects.failures,
+            "successful_connections": connects.count,
+            "failed_connections": connects.failures,
+            "avg_connect_time": connects.total / connects.count / 1e6 if connects.count else 0.0,
+            "max_connect_time": connects.max / 1e6,
+            "current_connections": max(0, connects.count - disconnects.count)
+        }
+    
+    def get_histograms(self, window: Union[str, float, None] = None) -> Dict[str, LatencyHistogram]:
+        """
+        Latency histograms by operation, merged across threads.
+        
+        Args:
+            window: Window name ("1m", "5m", "1h"), length in seconds, or
+                None for all time
+        """
+        seconds = LATENCY_WINDOWS.get(window, window) if window is not None else None
+        return self._merged(seconds)
+    
+    def get_latency_summary(self, window: Union[str, float, None] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Latency percentiles by operation.
+        
+        Args:
+            window: Window name ("1m", "5m", "1h"), length in seconds, or
+                None for all time
+        
+        Returns:
+            Dict mapping operation to count, failures, min/max/avg and
+            p50/p90/p99/p999 (in seconds)
+        """
+        return {
+            operation: histogram.summary(DEFAULT_PERCENTILES)
+            for operation, histogram in self.get_histograms(window).items()
+        }
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get all collected metrics."""
+        with self._lock:
+            # Calculate uptime
+            uptime = time.time() - self.start_time
+            
+            # Convert set to list for serialization
+            unique_devices = list(self.device_stats["unique_devices_discovered"])
+            
+            return {
+                "uptime": uptime,
+                "operation_counts": self.operation_counts,
+                "error_counts": self.error_counts.copy(),
+                "connection_stats": self.connection_stats,
+                "device_stats": {
+                    "total_devices_discovered": self.device_stats["total_devices_discovered"],
+                    "unique_devices_count": len(unique_devices),
+                    "most_connected_device": self.device_stats["most_connected_device"],
+                    "device_connection_counts": self.device_stats["device_connection_counts"].copy()
+                },
+                "timing_summary": self._calculate_timing_summary(),
+                "latency_windows": {
+                    name: self.get_latency_summary(seconds)
+                    for name, seconds in LATENCY_WINDOWS.items()
+                }
+            }
+    
+    def get_metrics_summary(self) -> Dict[str, Any]:
+        """Compact summary for health reports: counts and last-minute latencies."""
+        return {
+            "uptime": time.time() - self.start_time,
+            "operation_count": sum(self.operation_counts.values()),
+            "error_count": sum(self.error_counts.values()),
+            "latency_1m": self.get_latency_summary("1m")
+        }
+    
+    # Additional methods for API compatibility
+    def get_adapter_metrics(self, adapter_id: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """
+        Get metrics related to adapter operations.
+        
+        Args:
+            adapter_id: Optional adapter ID to filter by
+            limit: Maximum number of metrics to return
+        
+        Returns:
+            Dict with adapter metrics and summary
+        """
+        with self._lock:
+            return {
+                "adapter_id": adapter_id or "all",
+                "metrics": [],
+                "summary": {
+                    "operation_count": 0,
+                    "error_count": 0
+                }
+            }
+    
+    def get_all_metrics(self, limit: int = 100) -> Dict[str, Any]:
+        """
+        Get all types of metrics.
+        
+        Args:
+            limit: Maximum number of metrics to return per category
+        
+        Returns:
+            Dict with all metrics categories
+        """
+        with self._lock:
+            return {
+                "operations": self._get_operation_metrics_list(limit),
+                "devices": self._get_device_metrics_list(limit),
+                "adapters": [],
+                "system": self._get_system_metrics_list(),
+                "summary": {
+                    "uptime": time.time() - self.start_time,
+                    "operation_count": sum(self.operation_counts.values()),
+                    "error_count": sum(self.error_counts.values()),
+                    "device_count": len(self.device_stats["unique_devices_discovered"])
+                }
+            }
+    
+    def get_operation_metrics(self, limit: int = 100) -> Dict[str, Any]:
+        """
+        Get operation metrics.
+        
+        Args:
+            limit: Maximum number of metrics to return
+        
+        Returns:
+            Dict with operation metrics and summary
+        """
+        return {
+            "operations": self._get_operation_metrics_list(limit),
+            "summary": self._calculate_timing_summary()
+        }
+    
+    def get_device_metrics(self, limit: int = 100) -> Dict[str, Any]:
+        """
+        Get device-related metrics.
+        
+        Args:
+            limit: Maximum number of metrics to return
+        
+        Returns:
+            Dict with device metrics and summary
+        """
+        with self._lock:
+            return {
+                "devices": self._get_device_metrics_list(limit),
+                "summary": {
+                    "total_discovered": self.device_stats["total_devices_discovered"],
+                    "unique_discovered": len(self.device_stats["unique_devices_discovered"]),
+                    "most_connected": self.device_stats["most_connected_device"]
+                }
+            }
+    
+    def clear_all_metrics(self) -> None:
+        """Clear all metrics."""
+        self.reset_metrics()
+    
+    def clear_operation_metrics(self) -> None:
+        """Clear operation metrics."""
+        with self._lock:
+            for shard in self._shards:
+                shard.histograms = {}
+                shard.recent = _RecentOperations(self.max_history)
+    
+    def clear_device_metrics(self) -> None:
+        """Clear device metrics."""
+        with self._lock:
+            self.device_stats["total_devices_discovered"] = 0
+            self.device_stats["unique_devices_discovered"] = set()
+            self.device_stats["device_connection_counts"] = {}
+    
+    def clear_adapter_metrics(self) -> None:
+        """Clear adapter metrics."""
+        pass  # No adapter-specific metrics yet
+    
+    def reset_metrics(self) -> None:
+        """Reset all metrics."""
+        with self._lock:
+            # Reset operation timings and counts
+            self.clear_operation_metrics()
+            
+            # Reset error counts
+            for key in self.error_counts:
+                self.error_counts[key] = 0
+            
+            # Reset device stats
+            self.device_stats = {
+                "total_devices_discovered": 0,
+                "unique_devices_discovered": set(),
+                "most_connected_device": None,
+                "device_connection_counts": {}
+            }
+            
+            # Reset start time
+            self.start_time = time.time()
+    
+    def _calculate_timing_summary(self) -> Dict[str, Dict[str, float]]:
+        """Calculate all-time timing statistics for successful operations."""
+        result = {
+            operation: LatencyHistogram().summary(DEFAULT_PERCENTILES)
+            for operation in KNOWN_OPERATIONS
+        }
+        result.update(self.get_latency_summary())
+        return result
+    
+    def _get_operation_metrics_list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get a list of operation metrics records."""
+        metrics = []
+        for shard in list(self._shards):
+            metrics.extend(shard.recent.newest(limit))
+        
+        # Sort by timestamp (newest first) and limit
+        metrics.sort(key=lambda x: x["timestamp"], reverse=True)
+        return metrics[:limit]
+    
+    def _get_device_metrics_list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get a list of device metrics records."""
+        metrics = []
+        for device_addr in self.device_stats["unique_devices_discovered"]:
+            metrics.append({
+                "address": device_addr,
+                "connections": self.device_stats["device_connection_counts"].get(device_addr, 0),
+                "last_seen": time.time()  # This is a placeholder, would need actual tracking
+            })
+        
+        return metrics[:limit]
+    
+    def _get_system_metrics_list(self) -> List[Dict[str, Any]]:
+        """Get system-level metrics."""
+        return [{
+            "metric": "uptime",
+            "value": time.time() - self.start_time,
+            "unit": "seconds"
+        }, {
+            "metric": "total_operations",
+            "value": sum(self.operation_counts.values()),
+            "unit": "count"
+        }, {
+            "metric": "total_errors",
+            "value": sum(self.error_counts.values()),
+            "unit": "count"
+        }]
+
 # Singleton instance
 _metrics_collector = None
 
@@ -38,7 +488,9 @@ def get_metrics_collector() -> BleMetricsCollector:
     """
     global _metrics_collector
     if _metrics_collector is None:
-        _metrics_collector = BleMetricsCollector()
+        _metrics_collector = BleMetricsCollector(
+            max_history=get_config("metrics.max_entries", 1000)
+        )
     return _metrics_collector
 
 def get_ble_metrics() -> BleMetricsCollector:
@@ -48,4 +500,4 @@ def get_ble_metrics() -> BleMetricsCollector:
     Returns:
         BleMetricsCollector instance
     """
-    return get_metrics_collector()
\ No newline at end of file
+    return get_metrics_collector()
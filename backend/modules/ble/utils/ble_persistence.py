@@ -1,98 +1,248 @@
+import asyncio
+import atexit
 import logging
 import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 from datetime import datetime
 
+from backend.modules.ble.config import get_config
+
 logger = logging.getLogger(__name__)
 
 class BLEDeviceStorage:
-    """Storage class for BLE device information and configurations."""
-    
-    def __init__(self, storage_dir: str = None):
+    """
+    Storage class for BLE device information and configurations.
+
+    Bonded devices and device preferences are loaded once into in-memory
+    indexes keyed by address; reads never touch disk. Changes mark the data
+    dirty and are written behind: one flush ``flush_delay`` seconds after the
+    first change writes every change made meanwhile, in a worker thread, via
+    a temporary file and an atomic rename. Bonding many devices in a burst
+    therefore costs one rewrite instead of one per device.
+
+    The plain address list ``BLEManager`` used to keep (``bonded_devices.txt``)
+    is migrated into the index when attached and rewritten alongside the JSON
+    file, so both formats always list the same devices.
+
+    Args:
+        storage_dir: Directory for the JSON files (defaults to ~/.blemanager)
+        flush_delay: Seconds to batch changes before writing
+    """
+
+    def __init__(self, storage_dir: str = None, flush_delay: Optional[float] = None):
         self.storage_dir = storage_dir or os.path.join(os.path.expanduser("~"), ".blemanager")
         os.makedirs(self.storage_dir, exist_ok=True)
         self.bonded_devices_file = os.path.join(self.storage_dir, "bonded_devices.json")
         self.device_preferences_file = os.path.join(self.storage_dir, "device_preferences.json")
-        
+        self.legacy_bonded_file: Optional[str] = None
+        self.flush_delay = get_config("persistence.flush_delay", 1.0) if flush_delay is None else flush_delay
+
+        self._bonded: Dict[str, Dict[str, Any]] = {}
+        self._preferences: Dict[str, Dict[str, Any]] = {}
+        self._bonded_dirty = False
+        self._preferences_dirty = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self.flush_count = 0
+
+        self._load()
+
+    def _load(self) -> None:
+        devices = self._read_json(self.bonded_devices_file, [])
+        for device in devices if isinstance(devices, list) else []:
+            if isinstance(device, dict) and device.get("address"):
+                self._bonded[device["address"]] = device
+        preferences = self._read_json(self.device_preferences_file, {})
+        if isinstance(preferences, dict):
+            self._preferences = preferences
+        logger.debug(f"Loaded {len(self._bonded)} bonded devices and "
+                     f"{len(self._preferences)} device preferences from {self.storage_dir}")
+
+    @staticmethod
+    def _read_json(path: str, default):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading {path}: {e}", exc_info=True)
+            return default
+
+    def attach_legacy_bonded_file(self, path: str) -> List[str]:
+        """
+        Migrate a plain address-per-line bonded devices file and keep it in sync.
+
+        Addresses only found in the file are added to the index; from then on
+        every flush rewrites the file from the index.
+
+        Args:
+            path: Path of the legacy text file
+
+        Returns:
+            All bonded addresses after the migration
+        """
+        self.legacy_bonded_file = path
+        migrated = 0
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    address = line.strip()
+                    if address and address not in self._bonded:
+                        self._bonded[address] = {"address": address, "bonded_at": None}
+                        migrated += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error reading legacy bonded devices file {path}: {e}")
+
+        if migrated:
+            logger.info(f"Migrated {migrated} bonded devices from {path}")
+            self._bonded_dirty = True
+            self._schedule_flush()
+        elif self._bonded and not os.path.exists(path):
+            self._bonded_dirty = True
+            self._schedule_flush()
+        return list(self._bonded)
+
+    # Bonded devices
+
     async def get_bonded_devices(self) -> List[Dict[str, Any]]:
         """Get list of bonded/paired devices."""
-        try:
-            if not os.path.exists(self.bonded_devices_file):
-                return []
-                
-            with open(self.bonded_devices_file, 'r') as f:
-                devices = json.load(f)
-            return devices
-        except Exception as e:
-            logger.error(f"Error loading bonded devices: {e}", exc_info=True)
-            return []
-            
+        return [dict(device) for device in self._bonded.values()]
+
+    def is_bonded(self, address: str) -> bool:
+        return address in self._bonded
+
+    def bonded_addresses(self) -> List[str]:
+        return list(self._bonded)
+
     async def add_bonded_device(self, device: Dict[str, Any]) -> bool:
         """Add a device to the bonded devices list."""
-        try:
-            devices = await self.get_bonded_devices()
-            
-            # Check if device already exists
-            if any(d.get("address") == device.get("address") for d in devices):
-                # Update the existing device
-                devices = [device if d.get("address") == device.get("address") else d for d in devices]
-            else:
-                # Add timestamp to the device info
-                device["bonded_at"] = datetime.now().isoformat()
-                devices.append(device)
-                
-            with open(self.bonded_devices_file, 'w') as f:
-                json.dump(devices, f, indent=2)
-            return True
-        except Exception as e:
-            logger.error(f"Error adding bonded device: {e}", exc_info=True)
+        return self.mark_bonded(device)
+
+    def mark_bonded(self, device: Dict[str, Any]) -> bool:
+        """
+        Add or update a bonded device without waiting for the write.
+
+        Args:
+            device: Device info with at least ``address``
+
+        Returns:
+            True if the device was recorded
+        """
+        address = device.get("address")
+        if not address:
+            logger.error("Error adding bonded device: missing address")
             return False
-            
+        device = dict(device)
+        existing = self._bonded.get(address)
+        if existing is None or not existing.get("bonded_at"):
+            device.setdefault("bonded_at", datetime.now().isoformat())
+        elif "bonded_at" not in device:
+            device["bonded_at"] = existing["bonded_at"]
+        self._bonded[address] = device
+        self._bonded_dirty = True
+        self._schedule_flush()
+        return True
+
     async def remove_bonded_device(self, address: str) -> bool:
         """Remove a device from the bonded devices list."""
-        try:
-            devices = await self.get_bonded_devices()
-            devices = [d for d in devices if d.get("address") != address]
-            
-            with open(self.bonded_devices_file, 'w') as f:
-                json.dump(devices, f, indent=2)
-            return True
-        except Exception as e:
-            logger.error(f"Error removing bonded device: {e}", exc_info=True)
-            return False
-            
+        if self._bonded.pop(address, None) is not None:
+            self._bonded_dirty = True
+            self._schedule_flush()
+        return True
+
+    # Device preferences
+
     async def get_device_preferences(self, address: str) -> Dict[str, Any]:
         """Get preferences for a specific device."""
-        try:
-            if not os.path.exists(self.device_preferences_file):
-                return {}
-                
-            with open(self.device_preferences_file, 'r') as f:
-                all_preferences = json.load(f)
-                
-            return all_preferences.get(address, {})
-        except Exception as e:
-            logger.error(f"Error loading device preferences: {e}", exc_info=True)
-            return {}
-            
+        return dict(self._preferences.get(address, {}))
+
     async def save_device_preferences(self, address: str, preferences: Dict[str, Any]) -> bool:
         """Save preferences for a specific device."""
+        self._preferences[address] = dict(preferences)
+        self._preferences_dirty = True
+        self._schedule_flush()
+        return True
+
+    # Write-behind
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None or self._flush_task is not None:
+            return
         try:
-            all_preferences = {}
-            
-            if os.path.exists(self.device_preferences_file):
-                with open(self.device_preferences_file, 'r') as f:
-                    all_preferences = json.load(f)
-                    
-            all_preferences[address] = preferences
-            
-            with open(self.device_preferences_file, 'w') as f:
-                json.dump(all_preferences, f, indent=2)
-            return True
-        except Exception as e:
-            logger.error(f"Error saving device preferences: {e}", exc_info=True)
-            return False
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (startup, scripts): write now
+            self.flush_sync()
+            return
+        self._flush_handle = loop.call_later(self.flush_delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._flush_handle = None
+        self._flush_task = asyncio.ensure_future(self._flush_in_background())
+
+    async def _flush_in_background(self) -> None:
+        try:
+            await self.flush()
+        finally:
+            self._flush_task = None
+        if self._bonded_dirty or self._preferences_dirty:
+            self._schedule_flush()
+
+    async def flush(self) -> None:
+        """Write pending changes now, in a worker thread."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        async with self._write_lock:
+            writes = self._take_pending_writes()
+            if writes:
+                await asyncio.to_thread(self._write_files, writes)
+
+    def flush_sync(self) -> None:
+        """Write pending changes now, blocking the caller."""
+        writes = self._take_pending_writes()
+        if writes:
+            self._write_files(writes)
+
+    def _take_pending_writes(self) -> List[tuple]:
+        """Snapshot dirty data (on the caller's thread) and clear the dirty flags."""
+        writes = []
+        if self._bonded_dirty:
+            self._bonded_dirty = False
+            devices = [dict(device) for device in self._bonded.values()]
+            writes.append((self.bonded_devices_file, devices))
+            if self.legacy_bonded_file:
+                writes.append((self.legacy_bonded_file, "".join(f"{d['address']}\n" for d in devices)))
+        if self._preferences_dirty:
+            self._preferences_dirty = False
+            writes.append((self.device_preferences_file,
+                           {address: dict(prefs) for address, prefs in self._preferences.items()}))
+        return writes
+
+    def _write_files(self, writes: Iterable[tuple]) -> None:
+        for path, content in writes:
+            try:
+                with open(path + ".tmp", "w") as f:
+                    if isinstance(content, str):
+                        f.write(content)
+                    else:
+                        json.dump(content, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(path + ".tmp", path)
+            except OSError as e:
+                logger.error(f"Error writing {path}: {e}", exc_info=True)
+                # Keep the change pending so the next flush retries it
+                if path == self.device_preferences_file:
+                    self._preferences_dirty = True
+                else:
+                    self._bonded_dirty = True
+        self.flush_count += 1
 
 # Singleton persistence service
 _persistence_service = None
@@ -102,4 +252,6 @@ def get_persistence_service():
     global _persistence_service
     if _persistence_service is None:
         _persistence_service = BLEDeviceStorage()
-    return _persistence_service
\ No newline at end of file
+        # The app lifespan flushes on a graceful shutdown; this catches the rest
+        atexit.register(_persistence_service.flush_sync)
+    return _persistence_service
@@ -1,97 +1,437 @@
 """BLE event bus for communication between components."""
 
 import asyncio
+import fnmatch
+import inspect
 import logging
-from typing import Dict, List, Any, Callable, Awaitable, Optional
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Any, Callable, Awaitable, Hashable, Optional
+
+from backend.modules.ble.config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Queue overflow policies
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+COALESCE = "coalesce"
+POLICIES = (DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+_KEY_FIELDS = ("address", "device_address", "uuid", "characteristic")
+
+
+def default_coalesce_key(event_type: str, data: Any) -> Hashable:
+    """Coalesce events of one type per device and characteristic."""
+    if isinstance(data, dict):
+        return (event_type,) + tuple(data.get(field) for field in _KEY_FIELDS)
+    return (event_type,)
+
+
+class _Emitted:
+    """
+    Result of ``emit``.
+
+    Emitting only queues the event, so there is nothing to wait for; the
+    object is awaitable so that ``await bus.emit(...)`` keeps working.
+    """
+
+    __slots__ = ("queued",)
+
+    def __init__(self, queued: int):
+        self.queued = queued
+
+    def __await__(self):
+        return iter(())
+
+
+class Subscription:
+    """
+    One handler with its own bounded queue and worker task.
+
+    The emitter only appends to the queue; the worker calls the handler, so
+    a slow handler delays nothing but its own queue. When the queue is full
+    the overflow policy decides what is lost:
+
+    - ``drop_oldest``: discard the oldest queued event (consumers see recent state)
+    - ``drop_newest``: discard the incoming event (consumers see every early event)
+    - ``coalesce``: keep only the latest event per key (e.g. per device and
+      characteristic); a full queue of distinct keys drops the oldest
+
+    Args:
+        pattern: Event type or wildcard pattern (``*``, ``device_*``)
+        handler: Sync or async function called with the event data
+        maxsize: Queue capacity
+        policy: Overflow policy
+        coalesce_key: Key function ``(event_type, data) -> hashable`` for ``coalesce``
+        with_event_type: Call the handler as ``handler(event_type, data)``
+        name: Name used in stats and logs
+    """
+
+    def __init__(
+        self,
+        pattern: str,
+        handler: Callable[..., Any],
+        maxsize: int,
+        policy: str = DROP_OLDEST,
+        coalesce_key: Optional[Callable[[str, Any], Hashable]] = None,
+        with_event_type: bool = False,
+        name: Optional[str] = None
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown event queue policy '{policy}'")
+        self.pattern = pattern
+        self.handler = handler
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.coalesce_key = coalesce_key or default_coalesce_key
+        self.with_event_type = with_event_type
+        self.name = name or getattr(handler, "__qualname__", repr(handler))
+
+        # Entries are (event_type, data, enqueued_at), or keys into _latest when coalescing
+        self._queue: deque = deque()
+        self._latest: Dict[Hashable, tuple] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._drained: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._busy = False
+
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    def put(self, event_type: str, data: Any, now: float) -> None:
+        if self.policy == COALESCE:
+            key = self.coalesce_key(event_type, data)
+            pending = self._latest.get(key)
+            if pending is not None:
+                # Keep the queue position and the first enqueue time
+                self._latest[key] = (event_type, data, pending[2])
+                self.coalesced += 1
+                return
+            if len(self._queue) >= self.maxsize:
+                self._latest.pop(self._queue.popleft(), None)
+                self.dropped += 1
+            self._latest[key] = (event_type, data, now)
+            self._queue.append(key)
+        else:
+            if len(self._queue) >= self.maxsize:
+                if self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append((event_type, data, now))
+
+        if self._drained is not None:
+            self._drained.clear()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _pop(self) -> tuple:
+        entry = self._queue.popleft()
+        if self.policy == COALESCE:
+            return self._latest.pop(entry)
+        return entry
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the worker task on the running loop (no-op if running)."""
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._drained = asyncio.Event()
+            if self._queue:
+                self._wakeup.set()
+            else:
+                self._drained.set()
+            self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+
+    async def _run(self) -> None:
+        try:
+            await self._work()
+        finally:
+            # Wake join() waiters so they re-check (a stopped worker is skipped)
+            self._drained.set()
+
+    async def _work(self) -> None:
+        while True:
+            if not self._queue:
+                self._drained.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            event_type, data, enqueued_at = self._pop()
+            lag = time.perf_counter() - enqueued_at
+            self.total_lag += lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+            self._busy = True
+            try:
+                if self.with_event_type:
+                    result = self.handler(event_type, data)
+                elif data is not None:
+                    result = self.handler(data)
+                else:
+                    result = self.handler()
+                if inspect.isawaitable(result):
+                    await result
+                self.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error in handler {self.name} for event {event_type}: {e}", exc_info=True)
+            finally:
+                self._busy = False
+
+    @property
+    def idle(self) -> bool:
+        return not self._queue and not self._busy
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        received = self.delivered + self.errors
+        return {
+            "name": self.name,
+            "pattern": self.pattern,
+            "policy": self.policy,
+            "queue_depth": len(self._queue),
+            "maxsize": self.maxsize,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "avg_lag": self.total_lag / received if received else 0.0,
+            "max_lag": self.max_lag
+        }
+
+
 class BleEventBus:
     """
     Event bus for BLE-related events.
-    
-    This class provides a simple event system for communication
-    between different components of the BLE module.
+
+    ``emit`` never waits for handlers: each subscription has a bounded
+    queue drained by its own worker task, so hot paths such as
+    notifications can emit from callbacks without awaiting. Subscriptions
+    match event types by exact name or wildcard pattern, and a full queue
+    drops or coalesces events according to the subscription's policy.
     """
-    
+
     def __init__(self):
         """Initialize the event bus."""
-        self.handlers = {}
+        self.subscriptions: List[Subscription] = []
         self.ws_broadcast_fn = None
-    
-    def on(self, event_type: str, handler: Callable[..., Awaitable[None]]) -> None:
+        self._ws_subscription: Optional[Subscription] = None
+        self._routes: Dict[str, List[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.emitted = 0
+        self.unrouted = 0
+
+    @property
+    def handlers(self) -> Dict[str, List[Callable[..., Any]]]:
+        """Handlers by event pattern."""
+        handlers: Dict[str, List[Callable[..., Any]]] = {}
+        for subscription in self.subscriptions:
+            handlers.setdefault(subscription.pattern, []).append(subscription.handler)
+        return handlers
+
+    def on(
+        self,
+        event_type: str,
+        handler: Callable[..., Any],
+        maxsize: Optional[int] = None,
+        policy: Optional[str] = None,
+        coalesce_key: Optional[Callable[[str, Any], Hashable]] = None,
+        with_event_type: bool = False
+    ) -> Subscription:
         """
         Register a handler for an event type.
-        
+
         Args:
-            event_type: Event type to listen for
-            handler: Async function to handle the event
+            event_type: Event type to listen for, or a wildcard pattern (``*``, ``device_*``)
+            handler: Function (sync or async) to handle the event
+            maxsize: Queue capacity (defaults to ``events.queue_size``)
+            policy: ``drop_oldest``, ``drop_newest`` or ``coalesce`` (defaults to ``events.policy``)
+            coalesce_key: Key function for ``coalesce``; defaults to per device and characteristic
+            with_event_type: Call the handler as ``handler(event_type, data)`` (useful with wildcards)
+
+        Returns:
+            The subscription, for stats and ``unsubscribe``
         """
-        if event_type not in self.handlers:
-            self.handlers[event_type] = []
-        
-        self.handlers[event_type].append(handler)
+        subscription = Subscription(
+            event_type,
+            handler,
+            maxsize or get_config("events.queue_size", 1000),
+            policy or get_config("events.policy", DROP_OLDEST),
+            coalesce_key,
+            with_event_type
+        )
+        self.subscriptions.append(subscription)
+        self._routes.clear()
+        loop = self._current_loop()
+        if loop is not None:
+            subscription.start(loop)
         logger.debug(f"Registered handler for event: {event_type}")
-    
-    def off(self, event_type: str, handler: Optional[Callable[..., Awaitable[None]]] = None) -> None:
+        return subscription
+
+    def off(self, event_type: str, handler: Optional[Callable[..., Any]] = None) -> None:
         """
         Remove a handler for an event type.
-        
+
         Args:
-            event_type: Event type
+            event_type: Event type or pattern it was registered with
             handler: Handler to remove (if None, removes all handlers for the event)
         """
+        for subscription in list(self.subscriptions):
+            if subscription.pattern == event_type and (handler is None or subscription.handler == handler):
+                self.unsubscribe(subscription)
         if handler is None:
-            self.handlers[event_type] = []
             logger.debug(f"Removed all handlers for event: {event_type}")
-        elif event_type in self.handlers:
-            self.handlers[event_type] = [h for h in self.handlers[event_type] if h != handler]
+        else:
             logger.debug(f"Removed specific handler for event: {event_type}")
-    
-    async def emit(self, event_type: str, data: Any = None) -> None:
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription; events still queued for it are discarded."""
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+            self._routes.clear()
+        if subscription._task is not None:
+            subscription._task.cancel()
+            subscription._task = None
+            subscription._loop = None
+
+    def _match(self, event_type: str) -> List[Subscription]:
+        routes = self._routes.get(event_type)
+        if routes is None:
+            routes = [s for s in self.subscriptions if fnmatch.fnmatchcase(event_type, s.pattern)]
+            self._routes[event_type] = routes
+        return routes
+
+    def _current_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        if loop is not self._loop:
+            self._loop = loop
+            self._loop_thread = threading.get_ident()
+        return loop
+
+    def emit(self, event_type: str, data: Any = None) -> _Emitted:
         """
         Emit an event.
-        
+
+        Queues the event for every matching subscription and returns without
+        waiting for handlers. Awaiting the result is allowed but not needed.
+        Calls from other threads are handed to the bus's event loop.
+
         Args:
             event_type: Event type to emit
             data: Event data
+
+        Returns:
+            Awaitable whose ``queued`` is the number of subscriptions reached
         """
-        logger.debug(f"Emitting event: {event_type}")
-        
-        if event_type in self.handlers:
-            tasks = []
-            for handler in self.handlers[event_type]:
-                try:
-                    if data is not None:
-                        task = asyncio.create_task(handler(data))
-                    else:
-                        task = asyncio.create_task(handler())
-                    tasks.append(task)
-                except Exception as e:
-                    logger.error(f"Error creating task for event {event_type}: {e}")
-            
-            # Wait for all handlers to complete
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Also broadcast to WebSocket if registered
-        if self.ws_broadcast_fn is not None:
+        loop = self._current_loop()
+        if loop is None and self._loop is not None and threading.get_ident() != self._loop_thread:
+            if self._loop.is_running():
+                self._loop.call_soon_threadsafe(self.emit, event_type, data)
+                return _Emitted(0)
+
+        self.emitted += 1
+        routes = self._match(event_type)
+        if not routes:
+            self.unrouted += 1
+            return _Emitted(0)
+
+        now = time.perf_counter()
+        for subscription in routes:
+            subscription.put(event_type, data, now)
+            if loop is not None and subscription._loop is not loop:
+                subscription.start(loop)
+        return _Emitted(len(routes))
+
+    async def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued event has been handled.
+
+        Subscriptions without a running worker are skipped: their queues
+        are kept but nothing would ever drain them.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if all queues drained in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            busy = [s for s in self.subscriptions if s.running and not s.idle]
+            if not busy:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
             try:
-                # Convert data to a format suitable for WebSocket transmission
-                ws_data = data if isinstance(data, dict) else {"data": data}
-                await self.ws_broadcast_fn(event_type, ws_data)
-            except Exception as e:
-                logger.error(f"Error broadcasting event to WebSocket: {e}")
-    
+                # A handler may emit again, so re-check after each round
+                await asyncio.wait_for(asyncio.gather(*(s._drained.wait() for s in busy)), remaining)
+            except asyncio.TimeoutError:
+                return False
+
+    async def stop(self) -> None:
+        """Stop all subscription workers (queued events are kept)."""
+        for subscription in list(self.subscriptions):
+            await subscription.stop()
+
     def register_ws_broadcast(self, broadcast_fn: Callable[[str, Dict[str, Any]], Awaitable[None]]) -> None:
         """
         Register a WebSocket broadcast function.
-        
+
+        The function receives every event through its own ``*`` subscription,
+        so WebSocket sends never hold up emitters or other handlers.
+
         Args:
             broadcast_fn: Function to broadcast messages to WebSocket clients
         """
+        if self._ws_subscription is not None:
+            self.unsubscribe(self._ws_subscription)
         self.ws_broadcast_fn = broadcast_fn
+
+        async def forward(event_type: str, data: Any) -> None:
+            # Convert data to a format suitable for WebSocket transmission
+            await broadcast_fn(event_type, data if isinstance(data, dict) else {"data": data})
+
+        self._ws_subscription = self.on("*", forward, with_event_type=True)
+        self._ws_subscription.name = "ws_broadcast"
         logger.debug("Registered WebSocket broadcast function")
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Emit counts and per-subscription queue depth, lag and drops."""
+        return {
+            "emitted": self.emitted,
+            "unrouted": self.unrouted,
+            "subscriptions": [s.get_stats() for s in self.subscriptions]
+        }
+
+
 # Singleton instance
-ble_event_bus = BleEventBus()
\ No newline at end of file
+ble_event_bus = BleEventBus()
@@ -0,0 +1,246 @@
+"""
+Fixed-size latency histograms for BLE operation metrics.
+
+Durations are recorded in microseconds into log-linear buckets, like HDR
+histograms: values below 32 get exact buckets, and every power of two above
+that is split into 32 sub-buckets. That bounds the relative error at about
+3%. Recording is one index computation and a few integer updates. Percentiles
+come from a single pass over the counts, without keeping individual samples.
+"""
+
+import math
+import time
+from array import array
+from typing import Dict, Any, Iterable, List, Optional
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_VALUE_BITS = 32
+MAX_VALUE = (1 << MAX_VALUE_BITS) - 1          # ~71 minutes in microseconds
+BUCKET_COUNT = SUB_BUCKETS * (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1)
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def bucket_index(value: int) -> int:
+    """Bucket for a value in microseconds."""
+    if value < SUB_BUCKETS:
+        return value if value > 0 else 0
+    if value > MAX_VALUE:
+        value = MAX_VALUE
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return ((shift + 1) << SUB_BUCKET_BITS) + (value >> shift) - SUB_BUCKETS
+
+
+def bucket_upper_bound(index: int) -> int:
+    """Largest value that falls into a bucket."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    sub_bucket = (index & (SUB_BUCKETS - 1)) + SUB_BUCKETS
+    return ((sub_bucket + 1) << shift) - 1
+
+
+def _percentile_key(percentile: float) -> str:
+    return "p" + f"{percentile:g}".replace(".", "")
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in microseconds."""
+
+    __slots__ = ("counts", "count", "failures", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = array("I", bytes(4 * BUCKET_COUNT))
+        self.count = 0
+        self.failures = 0
+        self.total = 0
+        self.min = MAX_VALUE
+        self.max = 0
+
+    def record(self, micros: int) -> None:
+        """Record one successful duration."""
+        self.counts[bucket_index(micros)] += 1
+        self.count += 1
+        self.total += micros
+        if micros < self.min:
+            self.min = micros
+        if micros > self.max:
+            self.max = micros
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's counts into this one."""
+        if other.count:
+            counts = self.counts
+            for index, value in enumerate(other.counts):
+                if value:
+                    counts[index] += value
+            self.count += other.count
+            self.total += other.total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.failures += other.failures
+
+    def percentiles(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> List[int]:
+        """
+        Values at several percentiles in one pass.
+
+        Each value is the upper bound of the bucket holding that rank, capped
+        at the largest recorded value.
+
+        Args:
+            percentiles: Percentiles between 0 and 100
+
+        Returns:
+            Values in microseconds, in the order requested
+        """
+        percentiles = list(percentiles)
+        if not self.count:
+            return [0] * len(percentiles)
+        targets = sorted(
+            (max(1, math.ceil(p / 100.0 * self.count)), position)
+            for position, p in enumerate(percentiles)
+        )
+        results = [0] * len(percentiles)
+        cumulative = 0
+        target_index = 0
+        for index, value in enumerate(self.counts):
+            if not value:
+                continue
+            cumulative += value
+            while target_index < len(targets) and cumulative >= targets[target_index][0]:
+                results[targets[target_index][1]] = min(bucket_upper_bound(index), self.max)
+                target_index += 1
+            if target_index == len(targets):
+                break
+        return results
+
+    def cumulative_counts(self, bounds: Iterable[float]) -> List[int]:
+        """
+        Counts at or below each bound, for exporting with coarser buckets.
+
+        Args:
+            bounds: Ascending upper bounds in microseconds
+
+        Returns:
+            Cumulative count per bound (exact to bucket resolution)
+        """
+        results = []
+        cumulative = 0
+        index = 0
+        counts = self.counts
+        for bound in bounds:
+            last = bucket_index(int(bound))
+            # Include the bucket containing the bound only if it ends there
+            if bucket_upper_bound(last) > bound:
+                last -= 1
+            while index <= last:
+                cumulative += counts[index]
+                index += 1
+            results.append(cumulative)
+        return results
+
+    def summary(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        """Count, failures, min/max/avg and percentiles, with durations in seconds."""
+        percentiles = list(percentiles)
+        result = {
+            "count": self.count,
+            "failures": self.failures,
+            "min": self.min / 1e6 if self.count else 0.0,
+            "max": self.max / 1e6,
+            "avg": self.total / self.count / 1e6 if self.count else 0.0
+        }
+        for percentile, value in zip(percentiles, self.percentiles(percentiles)):
+            result[_percentile_key(percentile)] = value / 1e6
+        return result
+
+
+class _SlotRing:
+    """Rotating per-interval histograms covering ``width * len(slots)`` seconds."""
+
+    __slots__ = ("width", "epochs", "slots")
+
+    def __init__(self, width: float, count: int):
+        self.width = width
+        self.epochs = [-1] * count
+        self.slots: List[Optional[LatencyHistogram]] = [None] * count
+
+    @property
+    def span(self) -> float:
+        return self.width * len(self.slots)
+
+    def current(self, now: float) -> LatencyHistogram:
+        epoch = int(now // self.width)
+        index = epoch % len(self.slots)
+        slot = self.slots[index]
+        if self.epochs[index] != epoch or slot is None:
+            slot = LatencyHistogram()
+            self.slots[index] = slot
+            self.epochs[index] = epoch
+        return slot
+
+    def collect(self, seconds: float, now: float, into: LatencyHistogram) -> None:
+        last = int(now // self.width)
+        first = last - max(1, math.ceil(seconds / self.width)) + 1
+        for epoch, slot in zip(self.epochs, self.slots):
+            if slot is not None and first <= epoch <= last:
+                into.merge(slot)
+
+
+class WindowedHistogram:
+    """
+    Latency histogram with an all-time total and sliding time windows.
+
+    Samples go into the total and into the current slot of each ring. A
+    window query merges the slots of the finest ring that spans it, so
+    windows are rounded to that ring's slot width.
+
+    Args:
+        rings: ``(slot_width_seconds, slot_count)`` pairs, finest first
+    """
+
+    DEFAULT_RINGS = ((10.0, 30), (300.0, 12))
+
+    __slots__ = ("total", "_rings")
+
+    def __init__(self, rings=DEFAULT_RINGS):
+        self.total = LatencyHistogram()
+        self._rings = [_SlotRing(width, count) for width, count in rings]
+
+    def record(self, duration: float, success: bool = True, now: Optional[float] = None) -> None:
+        """
+        Record an operation.
+
+        Args:
+            duration: Duration in seconds
+            success: Failed operations are counted but not timed
+            now: Timestamp (defaults to the current time)
+        """
+        if now is None:
+            now = time.time()
+        if success:
+            micros = int(duration * 1e6)
+            self.total.record(micros)
+            for ring in self._rings:
+                ring.current(now).record(micros)
+        else:
+            self.total.failures += 1
+            for ring in self._rings:
+                ring.current(now).failures += 1
+
+    def window(self, seconds: float, now: Optional[float] = None,
+               into: Optional[LatencyHistogram] = None) -> LatencyHistogram:
+        """
+        Histogram of the last ``seconds`` seconds.
+
+        Args:
+            seconds: Window length
+            now: Timestamp (defaults to the current time)
+            into: Histogram to merge into (for combining shards)
+        """
+        if now is None:
+            now = time.time()
+        into = into if into is not None else LatencyHistogram()
+        ring = next((ring for ring in self._rings if ring.span >= seconds), self._rings[-1])
+        ring.collect(seconds, now, into)
+        return into
@@ -23,6 +23,8 @@ try:
 except ImportError:
     CPU_INFO_AVAILABLE = False
 
+from backend.caching import discovery
+
 # Import the event bus for notifications
 from .events import ble_event_bus
 
@@ -240,7 +242,7 @@ class SystemMonitor:
                 self.issues_detected.append(issue)
                 logger.warning(issue)
     
-    async def get_bluetooth_health_report(self) -> Dict[str, Any]:
+    async def get_bluetooth_health_report(self, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Generate a comprehensive health report for the Bluetooth subsystem.
         
@@ -251,9 +253,26 @@ class SystemMonitor:
         - Identified issues
         - Recommendations
         
+        Concurrent calls share one report, which is reused for a few seconds
+        (``DISCOVERY_TTL_BLUETOOTH_HEALTH``); failed reports are not reused.
+        
+        Args:
+            force_refresh: If True, build a new report
+        
         Returns:
             Dict with health report information
         """
+        # Routes create a monitor per request, so the report is shared across instances
+        report = await discovery.discover(
+            discovery.BLUETOOTH_HEALTH,
+            self._build_health_report,
+            force_refresh=force_refresh,
+            should_cache=lambda report: "error" not in report
+        )
+        return dict(report)
+    
+    async def _build_health_report(self) -> Dict[str, Any]:
+        """Build the health report without the cache."""
         try:
             # Get system metrics
             system_metrics = await self.get_system_metrics()
@@ -10,7 +10,8 @@ import json
 from backend.models import (
     SuccessResponse, ErrorResponse
 )
-from backend.models import CacheItem, CacheStats, CachePolicy  # Import CacheItem
+from backend.models import CacheItem, CacheStats, CacheStatsReport, CachePolicy  # Import CacheItem
+from backend.caching.cache import get_cache, get_all_cache_stats
 from backend.utils.utils import Singleton
 
 
@@ -25,16 +26,22 @@ CACHE_SERVICE_AVAILABLE = os.environ.get('CACHE_SERVICE', 'True').lower() == 'tr
 SIMULATION_MODE = os.environ.get('SIMULATION_MODE', 'False').lower() == 'true'
 
 class CacheManager(metaclass=Singleton):
-    """Manager for caching data"""
+    """Manager for caching data (the "app" namespace of the shared cache library)"""
     
     def __init__(self, default_ttl: int = 300):
-        self.cache: Dict[str, CacheItem] = {}
         self.default_ttl = default_ttl
-        self.hits = 0
-        self.misses = 0
-        self.cache_policy = CachePolicy(max_size=1000, eviction_policy="LRU")  # Example policy
+        self.cache_policy = CachePolicy(max_size=1000, eviction_policy="LRU")
+        self.cache = get_cache("app", max_entries=self.cache_policy.max_size, ttl=default_ttl)
         self.load_cache_from_env()
 
+    @property
+    def hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self.cache.misses
+
     def load_cache_from_env(self):
         """Load initial cache data from environment variable."""
         cache_data_json = os.environ.get("CACHE_DATA")
@@ -49,32 +56,15 @@ class CacheManager(metaclass=Singleton):
                 logger.error("Failed to decode CACHE_DATA environment variable.")
 
     def get(self, key: str) -> Optional[Any]:
-        item = self.cache.get(key)
-        if item:
-            if item.expiry is None or item.expiry > time.time():
-                self.hits += 1
-                logger.debug(f"Cache hit for key: {key}")
-                return item.value
-            else:
-                self.delete(key)  # Automatically remove expired item
-                self.misses += 1
-                logger.debug(f"Cache expired for key: {key}")
-                return None
-        else:
-            self.misses += 1
-            logger.debug(f"Cache miss for key: {key}")
-            return None
+        return self.cache.get(key)
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None):
-        expiry = time.time() + (ttl or self.default_ttl) if ttl is not None else None
-        new_item = CacheItem(key=key, value=value, expiry=expiry)
-        self.cache[key] = new_item
+        # Without a ttl the namespace default (default_ttl) applies
+        self.cache.set(key, value, ttl)
         logger.debug(f"Cache set for key: {key} with TTL: {ttl}")
-        self.enforce_cache_policy()
 
     def delete(self, key: str) -> bool:
-        if key in self.cache:
-            del self.cache[key]
+        if self.cache.delete(key):
             logger.debug(f"Cache delete for key: {key}")
             return True
         return False
@@ -84,24 +74,19 @@ class CacheManager(metaclass=Singleton):
         logger.debug("Cache cleared")
 
     def get_keys(self):
-        return list(self.cache.keys())
-
-    def get_stats(self) -> CacheStats:
-        return CacheStats(
-            size=len(self.cache),
-            hits=self.hits,
-            misses=self.misses,
-            policy=self.cache_policy
-        )
+        return [str(key) for key in self.cache.keys()]
 
-    def enforce_cache_policy(self):
-        """Enforce the cache eviction policy if the cache exceeds max_size."""
-        if len(self.cache) > self.cache_policy.max_size:
-            if self.cache_policy.eviction_policy == "LRU":
-                # Sort cache items by last access (not implemented in this example)
-                # For simplicity, just delete the oldest item
-                oldest_key = next(iter(self.cache))
-                self.delete(oldest_key)
-                logger.info("Cache eviction (LRU): Removed oldest item.")
-            else:
-                logger.warning("Unknown cache eviction policy. No eviction performed.")
\ No newline at end of file
+    def cache_result(self, ttl: Optional[int] = None, key_func=None):
+        """Decorator caching a sync or async function's results (async calls are single-flight)."""
+        return self.cache.cached(ttl=ttl, key_func=key_func)
+
+    def get_stats(self) -> CacheStatsReport:
+        """Stats of this cache plus every named cache namespace."""
+        stats = self.cache.get_stats()
+        return CacheStatsReport(
+            size=stats["size"],
+            hits=stats["hits"],
+            misses=stats["misses"],
+            policy=self.cache_policy,
+            namespaces=get_all_cache_stats()
+        )
@@ -8,6 +8,7 @@ from fastapi import HTTPException, status
 
 # Add these imports
 from backend.models import ReaderResponse, ReadersResponse, SuccessResponse, ErrorResponse
+from backend.caching import discovery
 
 # Try to import the card libraries with fallbacks
 try:
@@ -31,9 +32,15 @@ logger = logging.getLogger(__name__)
 SIMULATION_MODE = os.environ.get('SIMULATION_MODE', 'False').lower() in ('true', '1', 'yes')
 DEVICE_OPERATION_TIMEOUT = int(os.environ.get('DEVICE_OPERATION_TIMEOUT', '10'))  # seconds
 
+
+def _is_cacheable(response: Any) -> bool:
+    """Errors and timeouts are not cached, so the next call retries."""
+    return not isinstance(response, ErrorResponse) and getattr(response, "status", None) != "error"
+
+
 class DeviceManager:
     executor = ThreadPoolExecutor()
-    _reader_cache = {"timestamp": 0, "readers": None, "cache_duration": 5}  # 5 second cache
+    _reader_cache = {"timestamp": 0, "readers": None}  # Last discovered readers
     _selected_reader = None
     
     @staticmethod
@@ -41,6 +48,9 @@ class DeviceManager:
         """
         List all available smartcard and NFC readers.
         
+        Concurrent calls share one discovery, and a successful result is
+        reused for a few seconds (``DISCOVERY_TTL_CARD_READERS``).
+        
         Args:
             force_refresh: If True, bypass the cache and force a new device discovery
             
@@ -48,17 +58,16 @@ class DeviceManager:
             Dictionary with readers information
         """
         logger.info("Listing smartcard and NFC readers (force_refresh=%s)", force_refresh)
-        
-        # Check cache if not forcing refresh
-        current_time = time.time()
-        if not force_refresh and DeviceManager._reader_cache["readers"] is not None:
-            if current_time - DeviceManager._reader_cache["timestamp"] < DeviceManager._reader_cache["cache_duration"]:
-                logger.debug("Using cached reader list")
-                return ReadersResponse(
-                    status="success",
-                    data={"readers": DeviceManager._reader_cache["readers"]}
-                )
-        
+        return await discovery.discover(
+            discovery.CARD_READERS,
+            DeviceManager._discover_smartcard_readers,
+            force_refresh=force_refresh,
+            should_cache=_is_cacheable
+        )
+    
+    @staticmethod
+    async def _discover_smartcard_readers() -> ReadersResponse:
+        """Discover smartcard and NFC readers without the cache."""
         loop = asyncio.get_event_loop()
         try:
             # Use a timeout to prevent hanging
@@ -90,9 +99,9 @@ class DeviceManager:
                     'simulation': SIMULATION_MODE
                 })
             
-            # Update cache
+            # Keep the last reader list for select_reader
             DeviceManager._reader_cache["readers"] = reader_list
-            DeviceManager._reader_cache["timestamp"] = current_time
+            DeviceManager._reader_cache["timestamp"] = time.time()
             
             return ReadersResponse(
                 status="success",
@@ -136,13 +145,29 @@ class DeviceManager:
             return []
     
     @staticmethod
-    async def discover_nfc_device() -> SuccessResponse:
+    async def discover_nfc_device(force_refresh: bool = False) -> SuccessResponse:
         """
         Discover NFC devices connected to the system.
         
+        Concurrent calls share one discovery, and a successful result is
+        reused for a few seconds (``DISCOVERY_TTL_NFC_DEVICE``).
+        
+        Args:
+            force_refresh: If True, bypass the cache
+        
         Returns:
             SuccessResponse with NFC device information
         """
+        return await discovery.discover(
+            discovery.NFC_DEVICE,
+            DeviceManager._discover_nfc_device,
+            force_refresh=force_refresh,
+            should_cache=_is_cacheable
+        )
+    
+    @staticmethod
+    async def _discover_nfc_device() -> SuccessResponse:
+        """Discover NFC devices without the cache."""
         try:
             if SIMULATION_MODE:
                 # Return simulated NFC device
@@ -396,6 +421,7 @@ class DeviceManager:
             
             # Clear the cache to force refresh with new simulation setting
             DeviceManager._reader_cache["readers"] = None
+            discovery.invalidate(discovery.CARD_READERS, discovery.NFC_DEVICE)
             
             return SuccessResponse(
                 status="success",
@@ -2,13 +2,17 @@ import asyncio
 import time
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Dict, List, Set, Optional, Any, TypeVar, Generic
+from typing import Dict, Iterable, List, Set, Optional, Any, TypeVar, Generic
 
+import numpy as np
 from fastapi import FastAPI
 from backend.ws.manager import manager
 from backend.ws.events import create_event, DeviceStatus
 from backend.logging.logging_config import setup_logging
 from backend.modules.ble.ble_manager import BleDeviceManager  # Import for BLEDeviceMonitor
+from backend.modules.ble.core.scanner import get_scanner
+from backend.modules.uwb_tracking import TrackFilter, STALE
+from backend.modules.uwb_manager import UWBManager
 
 # Set up logging
 logger = setup_logging()
@@ -16,15 +20,32 @@ logger = setup_logging()
 T = TypeVar('T')  # Type for the monitor data
 
 class Monitor(ABC, Generic[T]):
-    """Abstract base class for all monitoring tasks."""
+    """
+    Abstract base class for all monitoring tasks.
+
+    A monitor polls every ``interval`` seconds, but ``notify`` makes it poll
+    right away (at most once per ``min_gap`` seconds), so sources that know
+    when something changed do not have to wait for the next tick. While
+    nobody would receive its broadcasts (``is_idle``) the monitor does not
+    poll at all; it sleeps until notified, e.g. when a client joins its room.
+    """
+
+    # Shortest time between the starts of two polls
+    min_gap = 0.1
+    # Stop polling while is_idle() is true
+    pause_when_idle = True
     
     def __init__(self, name: str, interval: float = 1.0):
         self.name = name
         self.interval = interval
         self.running = False
+        self.paused = False
         self.task: Optional[asyncio.Task] = None
         self.last_update: Optional[datetime] = None
         self.room_name: Optional[str] = None
+        self.polls = 0
+        self.notifications = 0
+        self._wake: Optional[asyncio.Event] = None
         
     async def start(self, room_name: Optional[str] = None) -> None:
         if self.running:
@@ -32,6 +53,7 @@ class Monitor(ABC, Generic[T]):
             return
         self.room_name = room_name
         self.running = True
+        self._wake = asyncio.Event()
         self.task = asyncio.create_task(self._monitoring_loop())
         logger.info(f"Started monitor: {self.name}")
         
@@ -48,19 +70,50 @@ class Monitor(ABC, Generic[T]):
             self.task = None
         logger.info(f"Stopped monitor: {self.name}")
         
+    def notify(self) -> None:
+        """Poll as soon as possible; something this monitor reports has changed."""
+        if self._wake is not None:
+            self.notifications += 1
+            self._wake.set()
+
+    def has_audience(self) -> bool:
+        """Whether anyone would receive this monitor's broadcasts."""
+        if self.room_name:
+            return manager.room_size(self.room_name) > 0
+        return bool(manager.active_clients)
+
+    def is_idle(self) -> bool:
+        """Whether polling can pause; by default, while nobody is listening."""
+        return not self.has_audience()
+        
     async def _monitoring_loop(self) -> None:
         try:
             while self.running:
-                start_time = time.time()
+                if self.pause_when_idle and self.is_idle():
+                    # Nothing to do until a client joins or a source notifies
+                    self.paused = True
+                    self._wake.clear()
+                    await self._wake.wait()
+                    self.paused = False
+                    continue
+                self._wake.clear()
+                start_time = time.monotonic()
                 try:
                     data = await self.get_state()
                     await self.process_update(data)
                     self.last_update = datetime.now()
                 except Exception as e:
                     logger.error(f"Error in monitor {self.name}: {str(e)}", exc_info=True)
-                elapsed = time.time() - start_time
-                sleep_time = max(0.1, self.interval - elapsed)
-                await asyncio.sleep(sleep_time)
+                self.polls += 1
+                elapsed = time.monotonic() - start_time
+                try:
+                    await asyncio.wait_for(self._wake.wait(), max(self.min_gap, self.interval - elapsed))
+                except asyncio.TimeoutError:
+                    continue
+                # Notified early: coalesce bursts of notifications into one poll per min_gap
+                remaining = self.min_gap - (time.monotonic() - start_time)
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
         except asyncio.CancelledError:
             logger.info(f"Monitoring task {self.name} cancelled")
             raise
@@ -76,8 +129,12 @@ class Monitor(ABC, Generic[T]):
         pass
 
     async def broadcast_update(self, event_type: str, **kwargs) -> None:
-        clean_kwargs = kwargs.copy()
-        event = create_event(event_type, **clean_kwargs)
+        # Skip building the event when nobody would receive it
+        if not self.has_audience():
+            return
+        # Monitor payloads are produced internally, so skip Pydantic validation;
+        # the manager encodes the event once for all recipients
+        event = create_event(event_type, validate=False, **kwargs)
         if self.room_name:
             await manager.broadcast_to_room(self.room_name, event)
         else:
@@ -91,12 +148,23 @@ class DeviceMonitor(Monitor[Dict[str, Dict[str, Any]]]):
         
     def register_device_repository(self, repository: Any) -> None:
         self.device_repositories.append(repository)
+
+    @staticmethod
+    async def _get_devices(repo: Any) -> List[Any]:
+        return await repo.get_all_devices()
         
     async def get_state(self) -> Dict[str, Dict[str, Any]]:
+        # Poll all repositories concurrently; a slow one no longer delays the rest
+        results = await asyncio.gather(
+            *(self._get_devices(repo) for repo in self.device_repositories),
+            return_exceptions=True
+        )
         devices = {}
-        for repo in self.device_repositories:
+        for repo, repo_devices in zip(self.device_repositories, results):
+            if isinstance(repo_devices, Exception):
+                logger.error(f"Error getting devices from {repo.__class__.__name__}: {str(repo_devices)}")
+                continue
             try:
-                repo_devices = await repo.get_all_devices()
                 for device in repo_devices:
                     device_id = getattr(device, "id", None) or getattr(device, "device_id", None)
                     if device_id:
@@ -131,16 +199,66 @@ class DeviceMonitor(Monitor[Dict[str, Dict[str, Any]]]):
         self.previous_state = current_state.copy()
 
 class UWBPositionMonitor(Monitor[Dict[str, Dict[str, Any]]]):
-    def __init__(self, uwb_system, uwb_repository, interval: float = 0.5):
+    """
+    Broadcasts smoothed UWB tag positions.
+
+    Fixes pass through a per-tag Kalman filter (``TrackFilter``), which drops
+    outliers and estimates velocity. Positions are broadcast when the
+    smoothed position moved by ``position_threshold``, and the poll interval
+    adapts to the fastest tag: about the time it needs to move that far,
+    between ``min_interval`` and ``max_interval``. Between polls,
+    ``get_position`` extrapolates from the filter without touching hardware.
+    Moved positions also update the ``UWBManager`` spatial index, which
+    raises the proximity and geofence events. Recorded location history is
+    flushed to disk every ``history_flush_interval`` seconds and when the
+    monitor stops.
+    """
+
+    def __init__(self, uwb_system, uwb_repository, interval: float = 0.5,
+                 min_interval: Optional[float] = None, max_interval: float = 2.0,
+                 history_flush_interval: float = 30.0):
         super().__init__(name="uwb_position_monitor", interval=interval)
         self.uwb_system = uwb_system
         self.uwb_repository = uwb_repository
         self.tracked_devices: Set[str] = set()
         self.previous_positions: Dict[str, Dict[str, float]] = {}
         self.position_threshold = 0.1
+        self.min_interval = interval if min_interval is None else min_interval
+        self.max_interval = max(max_interval, self.min_interval)
+        self.filter = TrackFilter()
+        self._spatial_ids: Set[str] = set()
+        self.history_flush_interval = history_flush_interval
+        self._last_history_flush = time.monotonic()
         
     def track_devices(self, device_ids: List[str]) -> None:
         self.tracked_devices = set(device_ids)
+        for device_id in self.filter.ids:
+            if device_id not in self.tracked_devices:
+                self.filter.remove(device_id)
+                self.previous_positions.pop(device_id, None)
+        self.notify()
+
+    def is_idle(self) -> bool:
+        # Polling also records location history, so keep going without clients
+        return not self.tracked_devices
+
+    async def stop(self) -> None:
+        was_running = self.running
+        await super().stop()
+        if was_running:
+            await self.flush_history()
+
+    async def flush_history(self) -> None:
+        """Write changed location histories to disk, off the event loop."""
+        self._last_history_flush = time.monotonic()
+        try:
+            await asyncio.to_thread(self.uwb_repository.flush_history)
+        except Exception as e:
+            logger.error(f"Error flushing location history: {str(e)}")
+
+    def get_position(self, device_id: str, at: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """Filtered position of a tracked device, extrapolated to ``at`` (default now)."""
+        return self.filter.position_at(device_id, time.time() if at is None else at)
         
     async def get_state(self) -> Dict[str, Dict[str, Any]]:
         if not self.tracked_devices:
@@ -148,19 +266,38 @@ class UWBPositionMonitor(Monitor[Dict[str, Dict[str, Any]]]):
         positions = {}
         try:
             device_positions = await self.uwb_system.get_device_positions(list(self.tracked_devices))
-            for device_id, position in device_positions.items():
-                positions[device_id] = {
-                    "x": position.get("x", 0),
-                    "y": position.get("y", 0),
-                    "z": position.get("z", 0),
-                    "timestamp": datetime.now()
-                }
-                await self.uwb_repository.update_device_location(device_id, {"x": position.get("x", 0), "y": position.get("y", 0), "z": position.get("z", 0)})
+            now = time.time()
+            ids = list(device_positions)
+            fixes = np.array([[device_positions[d].get("x", 0), device_positions[d].get("y", 0),
+                               device_positions[d].get("z", 0)] for d in ids], dtype=float).reshape(-1, 3)
+            times = np.array([device_positions[d].get("timestamp") or now for d in ids], dtype=float)
+            outcome = self.filter.update(ids, fixes, times)
+
+            # Mirror new raw fixes only; a repeated poll of the same fix is not a new location.
+            # History gets the filtered positions from process_update instead.
+            for device_id, fix, result in zip(ids, fixes, outcome):
+                if result != STALE:
+                    await self.uwb_repository.update_device_location(
+                        device_id, {"x": float(fix[0]), "y": float(fix[1]), "z": float(fix[2])},
+                        record_history=False)
+
+            tracked_ids, smoothed, _ = self.filter.predict(now, ids)
+            for device_id, (x, y, z) in zip(tracked_ids, smoothed):
+                positions[device_id] = {"x": float(x), "y": float(y), "z": float(z), "timestamp": datetime.now()}
+            self._adapt_interval(tracked_ids)
         except Exception as e:
             logger.error(f"Error getting UWB positions: {str(e)}")
         return positions
+
+    def _adapt_interval(self, device_ids: List[str]) -> None:
+        speeds = self.filter.speeds(device_ids)
+        fastest = float(speeds.max()) if len(speeds) else 0.0
+        interval = self.position_threshold / fastest if fastest > 0 else self.max_interval
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
     
     async def process_update(self, positions: Dict[str, Dict[str, Any]]) -> None:
+        if time.monotonic() - self._last_history_flush >= self.history_flush_interval:
+            await self.flush_history()
         if not positions:
             return
         position_updates = {}
@@ -178,6 +315,17 @@ class UWBPositionMonitor(Monitor[Dict[str, Dict[str, Any]]]):
                     await self.uwb_repository.add_location_history(update["device_id"], update["position"])
             except Exception as e:
                 logger.error(f"Error storing position history: {str(e)}")
+        await self._update_spatial(position_updates)
+
+    async def _update_spatial(self, positions: Dict[str, Dict[str, float]]) -> None:
+        removed = self._spatial_ids - self.tracked_devices
+        if not positions and not removed:
+            return
+        try:
+            await UWBManager.update_spatial(positions, removed)
+            self._spatial_ids = (self._spatial_ids - removed) | set(positions)
+        except Exception as e:
+            logger.error(f"Error updating UWB spatial index: {str(e)}")
     
     def _position_changed(self, device_id: str, position: Dict[str, Any]) -> bool:
         if device_id not in self.previous_positions:
@@ -244,23 +392,88 @@ class HardwareMonitor(Monitor[Dict[str, Dict[str, Any]]]):
         self.previous_states = current_states.copy()
 
 class BLEDeviceMonitor(Monitor[List[Dict[str, Any]]]):
-    """Monitors BLE devices in real-time."""
+    """
+    Monitors BLE devices in real-time.
+
+    The first poll starts the continuous scanner and reads its device table.
+    After that the monitor consumes the scanner's delta queue, keeping the
+    latest delta per device, and broadcasts them at most once per ``min_gap``.
+    """
+
+    # Deltas arrive continuously while anything advertises
+    min_gap = 1.0
     
-    def __init__(self, ble_service: BleDeviceManager, interval: float = 5.0):
+    def __init__(self, ble_service: BleDeviceManager, interval: float = 5.0, scanner=None):
         super().__init__(name="ble_device_monitor", interval=interval)
         self.ble_service = ble_service
+        self.scanner = scanner or get_scanner()
         self.tracked_devices: Set[str] = set()
+        self._last_sequence = 0
+        self._deltas: Optional[asyncio.Queue] = None
+        self._delta_task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    async def start(self, room_name: Optional[str] = None) -> None:
+        await super().start(room_name)
+        if self._deltas is None:
+            self._deltas = self.scanner.subscribe()
+            self._delta_task = asyncio.create_task(self._consume_deltas())
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._delta_task:
+            self._delta_task.cancel()
+            try:
+                await self._delta_task
+            except asyncio.CancelledError:
+                pass
+            self._delta_task = None
+        if self._deltas is not None:
+            self.scanner.unsubscribe(self._deltas)
+            self._deltas = None
+        self._pending.clear()
+
+    async def _consume_deltas(self) -> None:
+        while True:
+            kind, device = await self._deltas.get()
+            # Expired devices are no longer in the table, so they were never broadcast
+            if kind == "expired":
+                continue
+            if self.tracked_devices and device["address"] not in self.tracked_devices:
+                continue
+            self._pending[device["address"]] = device
+            self.notify()
     
     def track_devices(self, device_addresses: Set[str]):
         """Set the BLE devices to monitor."""
         self.tracked_devices = device_addresses
         logger.info(f"Tracking BLE devices: {self.tracked_devices}")
+        self.notify()
     
     async def get_state(self) -> List[Dict[str, Any]]:
-        """Scan for BLE devices."""
+        """Read BLE devices changed since the last poll from the continuous scanner."""
+        if self._deltas is not None and self.scanner.scanning:
+            # Deltas already queued by the first poll's table read are skipped
+            devices = [
+                device for device in self._pending.values()
+                if (device.get("sequence") or 0) > self._last_sequence
+            ]
+            self._pending = {}
+            self._last_sequence = max([self._last_sequence] + [device.get("sequence") or 0 for device in devices])
+            return devices
         try:
+            # Only the first call waits for the scanner to warm up; later calls
+            # read the live device table
             devices = await self.ble_service.scan_devices(scan_time=3, active=True)
-            return [device for device in devices if not self.tracked_devices or device["address"] in self.tracked_devices]
+            last_sequence = self._last_sequence
+            self._last_sequence = max(
+                [last_sequence] + [device.get("sequence") or 0 for device in devices]
+            )
+            return [
+                device for device in devices
+                if (not self.tracked_devices or device["address"] in self.tracked_devices)
+                and (device.get("sequence") is None or device["sequence"] > last_sequence)
+            ]
         except Exception as e:
             logger.error(f"Error scanning BLE devices: {str(e)}", exc_info=True)
             return []
@@ -268,13 +481,14 @@ class BLEDeviceMonitor(Monitor[List[Dict[str, Any]]]):
     async def process_update(self, devices: List[Dict[str, Any]]) -> None:
         """Broadcast updates for detected BLE devices."""
         for device in devices:
+            metadata = device.get("metadata") or {}
             await self.broadcast_update(
                 "ble.device",
                 address=device["address"],
                 name=device["name"],
                 rssi=device["rssi"],
-                manufacturer_data=device.get("manufacturer_data", {}),
-                services=device.get("service_uuids", [])
+                manufacturer_data=metadata.get("manufacturer_data", device.get("manufacturer_data", {})),
+                services=metadata.get("service_uuids", device.get("service_uuids", []))
             )
             logger.debug(f"BLE device update: {device['address']} - {device['name']}")
 
@@ -316,8 +530,52 @@ class MonitoringManager:
     def get_running_monitors(self) -> Dict[str, Monitor]:
         return {name: monitor for name, monitor in self.monitors.items() if monitor.running}
 
+    def notify(self, name: str) -> bool:
+        """Tell a monitor that its data changed so it polls now instead of at the next tick."""
+        monitor = self.monitors.get(name)
+        if monitor is None:
+            logger.error(f"Monitor {name} not found")
+            return False
+        monitor.notify()
+        return True
+
+    def notify_on(self, bus: Any, event_types: Iterable[str], name: str) -> None:
+        """
+        Notify a monitor whenever one of the event types is emitted on an event bus.
+
+        Args:
+            bus: Event bus with ``on(event_type, handler, with_event_type=...)``
+            event_types: Event types or wildcard patterns
+            name: Monitor to notify
+        """
+        def on_change(event_type: str, data: Any) -> None:
+            self.notify(name)
+
+        for event_type in event_types:
+            bus.on(event_type, on_change, with_event_type=True)
+
+    def wake_idle(self, room: Optional[str] = None) -> None:
+        """Wake paused monitors that may have an audience again after a client joined ``room``."""
+        for monitor in self.monitors.values():
+            if monitor.paused and (monitor.room_name is None or monitor.room_name == room):
+                monitor.notify()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "running": monitor.running,
+                "paused": monitor.paused,
+                "interval": monitor.interval,
+                "polls": monitor.polls,
+                "notifications": monitor.notifications,
+                "last_update": monitor.last_update.isoformat() if monitor.last_update else None
+            }
+            for name, monitor in self.monitors.items()
+        }
+
 # Global instance
 monitoring_manager = MonitoringManager()
+manager.add_join_listener(monitoring_manager.wake_idle)
 
 # Initialize monitors
 device_monitor = DeviceMonitor()
@@ -0,0 +1,173 @@
+import asyncio
+import pytest
+from backend.ws.manager import manager
+from backend.modules.monitors import BLEDeviceMonitor, DeviceMonitor, Monitor, MonitoringManager, UWBPositionMonitor
+
+
+class CountingMonitor(Monitor[int]):
+    def __init__(self, interval: float = 60.0):
+        super().__init__(name="counting", interval=interval)
+        self.audience = True
+
+    def has_audience(self) -> bool:
+        return self.audience
+
+    async def get_state(self) -> int:
+        return self.polls
+
+    async def process_update(self, data: int) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_notify_polls_before_the_interval_and_coalesces():
+    monitor = CountingMonitor()
+    await monitor.start()
+    await asyncio.sleep(0.05)
+    assert monitor.polls == 1
+
+    for _ in range(20):
+        monitor.notify()
+    await asyncio.sleep(0.3)
+    await monitor.stop()
+    # One poll for the whole burst, not one per notification
+    assert monitor.polls == 2
+
+
+@pytest.mark.asyncio
+async def test_idle_monitor_pauses_until_woken():
+    monitors = MonitoringManager()
+    monitor = CountingMonitor()
+    monitor.audience = False
+    monitors.register_monitor(monitor)
+    await monitor.start()
+    await asyncio.sleep(0.05)
+    assert monitor.paused and monitor.polls == 0
+
+    # Changes nobody would see are ignored
+    monitor.notify()
+    await asyncio.sleep(0.05)
+    assert monitor.polls == 0
+
+    monitor.audience = True
+    monitors.wake_idle(None)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    assert not monitor.paused and monitor.polls == 1
+
+
+class SlowRepository:
+    def __init__(self, device_id: str):
+        self.device_id = device_id
+
+    async def get_all_devices(self):
+        await asyncio.sleep(0.1)
+        return [type("Device", (), {"device_id": self.device_id})()]
+
+
+class BrokenRepository:
+    async def get_all_devices(self):
+        raise RuntimeError("offline")
+
+
+@pytest.mark.asyncio
+async def test_device_monitor_polls_repositories_concurrently():
+    monitor = DeviceMonitor()
+    for index in range(5):
+        monitor.register_device_repository(SlowRepository(f"dev{index}"))
+    monitor.register_device_repository(BrokenRepository())
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    devices = await monitor.get_state()
+    assert loop.time() - start < 0.3
+    assert sorted(devices) == [f"dev{index}" for index in range(5)]
+
+
+class FakeScanner:
+    def __init__(self):
+        self.scanning = False
+        self.queues = set()
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        self.queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.queues.discard(queue)
+
+    def publish(self, kind, device):
+        for queue in self.queues:
+            queue.put_nowait((kind, device))
+
+
+class FakeBleService:
+    def __init__(self, scanner):
+        self.scanner = scanner
+        self.scans = 0
+
+    async def scan_devices(self, scan_time=5.0, active=True):
+        self.scans += 1
+        self.scanner.scanning = True
+        return [{"address": "AA", "name": "A", "rssi": -50, "sequence": 1}]
+
+
+@pytest.mark.asyncio
+async def test_ble_monitor_consumes_scanner_deltas(monkeypatch):
+    scanner = FakeScanner()
+    service = FakeBleService(scanner)
+    monitor = BLEDeviceMonitor(service, interval=60.0, scanner=scanner)
+    monitor.min_gap = 0.05
+    broadcasts = []
+
+    async def broadcast_update(event_type, **kwargs):
+        broadcasts.append(kwargs)
+
+    monkeypatch.setattr(monitor, "has_audience", lambda: True)
+    monkeypatch.setattr(monitor, "broadcast_update", broadcast_update)
+    await monitor.start()
+    await asyncio.sleep(0.02)
+    assert service.scans == 1 and [b["address"] for b in broadcasts] == ["AA"]
+
+    # A burst of advertisements becomes one poll with the latest delta per device,
+    # without reading the device table again
+    for rssi in range(-80, -60):
+        scanner.publish("updated", {"address": "BB", "name": "B", "rssi": rssi, "sequence": rssi + 100})
+    scanner.publish("expired", {"address": "AA", "name": "A", "rssi": -50, "sequence": 41})
+    await asyncio.sleep(0.15)
+    await monitor.stop()
+
+    assert service.scans == 1 and monitor.polls == 2
+    assert [(b["address"], b["rssi"]) for b in broadcasts[1:]] == [("BB", -61)]
+    assert not scanner.queues
+
+
+def test_uwb_monitor_keeps_recording_without_clients():
+    monitor = UWBPositionMonitor(uwb_system=None, uwb_repository=None)
+    assert monitor.is_idle()
+    monitor.track_devices(["T1"])
+    assert not monitor.has_audience() and not monitor.is_idle()
+
+
+@pytest.mark.asyncio
+async def test_uwb_monitor_flushes_history_on_timer_and_stop(tmp_path):
+    from backend.repositories.location_history import LocationHistoryStore
+    from backend.repositories.uwb_repository import UWBRepository
+
+    repository = UWBRepository(LocationHistoryStore(capacity=100, persist_dir=str(tmp_path)))
+    monitor = UWBPositionMonitor(uwb_system=None, uwb_repository=repository, history_flush_interval=60)
+    await repository.register_device("T1")
+    await repository.add_location_history("T1", {"x": 1.0, "y": 2.0, "z": 0.0})
+
+    await monitor.process_update({})
+    assert not list(tmp_path.glob("*.npz"))
+
+    monitor.history_flush_interval = 0
+    await monitor.process_update({})
+    assert [path.name for path in tmp_path.glob("*.npz")] == ["T1.npz"]
+
+    await repository.register_device("T2")
+    await monitor.start()
+    await monitor.stop()
+    assert sorted(path.name for path in tmp_path.glob("*.npz")) == ["T1.npz", "T2.npz"]
@@ -0,0 +1,132 @@
+import math
+import time
+import pytest
+from backend.models import UWBAnchor, UWBPosition, UWBRangingResult, SuccessResponse, ErrorResponse
+from backend.modules.uwb_manager import UWBManager, UWBDevice, UWBMode
+from backend.modules.uwb_positioning import PositioningEngine
+from backend.modules.uwb_spatial import GEOFENCE_EVENT, PROXIMITY_EVENT, UWBSpatialIndex
+
+ANCHORS = [
+    UWBAnchor(anchor_id="A0", x=0.0, y=0.0, z=2.5),
+    UWBAnchor(anchor_id="A1", x=20.0, y=0.0, z=0.3),
+    UWBAnchor(anchor_id="A2", x=20.0, y=15.0, z=2.8),
+    UWBAnchor(anchor_id="A3", x=0.0, y=15.0, z=0.5),
+]
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(UWBManager, "_anchors", {})
+    monkeypatch.setattr(UWBManager, "_devices", {})
+    monkeypatch.setattr(UWBManager, "_spatial_listeners", [])
+    monkeypatch.setattr(UWBManager, "positioning", PositioningEngine())
+    monkeypatch.setattr(UWBManager, "spatial", UWBSpatialIndex())
+    return UWBManager
+
+
+def _ranges(tag_id, x, y, z):
+    return [
+        UWBRangingResult(
+            anchor_id=anchor.anchor_id, tag_id=tag_id,
+            distance=math.dist((x, y, z), (anchor.x, anchor.y, anchor.z))
+        )
+        for anchor in ANCHORS
+    ]
+
+
+@pytest.mark.asyncio
+async def test_update_positions_without_anchors_returns_error(manager):
+    response = await manager.update_positions(_ranges("T1", 5.0, 5.0, 1.0))
+    assert isinstance(response, ErrorResponse)
+    assert response.error == "No UWB anchors configured"
+
+
+@pytest.mark.asyncio
+async def test_update_positions_solves_and_updates_devices(manager):
+    manager._anchors.update({anchor.anchor_id: anchor for anchor in ANCHORS})
+    manager.positioning.set_anchors(manager._anchors)
+    manager._devices["T1"] = UWBDevice("T1", UWBMode.TAG)
+
+    response = await manager.update_positions(_ranges("T1", 5.0, 6.0, 1.0) + _ranges("T2", 12.0, 3.0, 1.5))
+    assert isinstance(response, SuccessResponse) and response.success
+    assert set(response.data["positions"]) == {"T1", "T2"}
+
+    location = manager._devices["T1"].get_location()
+    assert location.x == pytest.approx(5.0, abs=1e-3)
+    assert location.y == pytest.approx(6.0, abs=1e-3)
+
+    position = manager._get_position_sync("T2")
+    assert position.success and position.data["x"] == pytest.approx(12.0, abs=1e-3)
+    assert isinstance(manager._get_position_sync("T3"), ErrorResponse)
+
+
+class FakeUWBSystem:
+    def __init__(self):
+        self.positions = {}
+
+    async def get_device_positions(self, device_ids):
+        return {device_id: dict(self.positions[device_id]) for device_id in device_ids if device_id in self.positions}
+
+
+class FakeUWBRepository:
+    async def update_device_location(self, device_id, location, record_history=True):
+        return True
+
+    async def add_location_history(self, device_id, position):
+        return True
+
+    def flush_history(self):
+        return 0
+
+
+@pytest.mark.asyncio
+async def test_tracked_positions_raise_proximity_and_geofence_events(manager):
+    from backend.modules.monitors import UWBPositionMonitor
+
+    events = []
+    manager.add_spatial_listener(lambda event_type, payload: events.append((event_type, payload)))
+    response = await manager.add_geofence("dock", [[0, 0], [4, 0], [4, 4], [0, 4]], name="Dock")
+    assert response.success and response.data["devices_inside"] == []
+
+    system = FakeUWBSystem()
+    now = time.time()
+    system.positions = {
+        "T1": {"x": 2.0, "y": 2.0, "z": 0.0, "timestamp": now},
+        "T2": {"x": 2.5, "y": 2.0, "z": 0.0, "timestamp": now},
+    }
+    monitor = UWBPositionMonitor(system, FakeUWBRepository())
+    monitor.track_devices(["T1", "T2"])
+    await monitor.process_update(await monitor.get_state())
+
+    entered = {payload["device_id"] for event_type, payload in events
+               if event_type == GEOFENCE_EVENT and payload["transition"] == "enter"}
+    assert entered == {"T1", "T2"}
+    assert any(event_type == PROXIMITY_EVENT and payload["active"] for event_type, payload in events)
+
+    nearby = await manager.get_nearby_devices("T1")
+    assert nearby.success and nearby.data["devices"][0]["device_id"] == "T2"
+
+    # Devices no longer tracked leave the index
+    events.clear()
+    monitor.track_devices(["T1"])
+    await monitor.process_update(await monitor.get_state())
+    assert (GEOFENCE_EVENT, "T2", "exit") in {
+        (event_type, payload.get("device_id"), payload.get("transition")) for event_type, payload in events
+    }
+    assert any(event_type == PROXIMITY_EVENT and not payload["active"] for event_type, payload in events)
+
+    removed = await manager.remove_geofence("dock")
+    assert removed.success
+    assert isinstance(await manager.remove_geofence("dock"), ErrorResponse)
+    assert isinstance(await manager.get_nearby_devices("T2"), ErrorResponse)
+
+
+@pytest.mark.asyncio
+async def test_registered_device_location_and_removal(manager):
+    manager._devices["T1"] = UWBDevice("T1", UWBMode.TAG)
+    response = await manager.update_device_location("T1", UWBPosition(x=1.0, y=1.0))
+    assert response.success and manager.spatial.grid.position("T1") == (1.0, 1.0, 0.0)
+
+    assert (await manager.remove_device("T1")).success
+    assert isinstance(await manager.remove_device("T1"), ErrorResponse)
+    assert isinstance(await manager.update_device_location("T1", UWBPosition(x=0.0, y=0.0)), ErrorResponse)
@@ -0,0 +1,58 @@
+import numpy as np
+from backend.modules.uwb_positioning import PositioningEngine, multilaterate
+
+ANCHORS = {
+    "A0": {"x": 0.0, "y": 0.0, "z": 2.5},
+    "A1": {"x": 20.0, "y": 0.0, "z": 0.3},
+    "A2": {"x": 20.0, "y": 15.0, "z": 2.8},
+    "A3": {"x": 0.0, "y": 15.0, "z": 0.5},
+    "A4": {"x": 10.0, "y": 7.0, "z": 3.0},
+}
+
+
+def _anchor_matrix(anchors):
+    return np.array([[a["x"], a["y"], a["z"]] for a in anchors.values()])
+
+
+def test_multilaterate_batch_recovers_exact_positions():
+    anchors = _anchor_matrix(ANCHORS)
+    truth = np.random.default_rng(0).uniform([1, 1, 0], [19, 14, 2], (200, 3))
+    ranges = np.linalg.norm(truth[:, None, :] - anchors[None, :, :], axis=2)
+
+    positions, residuals, counts = multilaterate(anchors, ranges)
+    assert np.allclose(positions, truth, atol=1e-4)
+    assert residuals.max() < 1e-4 and (counts == 5).all()
+
+
+def test_engine_skips_underdetermined_tags_and_warm_starts():
+    engine = PositioningEngine()
+    engine.set_anchors(ANCHORS)
+    assert engine.dims == 3
+    anchors = _anchor_matrix(ANCHORS)
+    tag = np.array([4.0, 9.0, 1.2])
+    distances = np.linalg.norm(anchors - tag, axis=1)
+    batch = [{"tag_id": "t1", "anchor_id": a, "distance": d} for a, d in zip(ANCHORS, distances)]
+    batch += [{"tag_id": "t2", "anchor_id": "A0", "distance": 3.0},
+              {"tag_id": "t2", "anchor_id": "A1", "distance": 5.0},
+              {"tag_id": "t3", "anchor_id": "unknown", "distance": 1.0}]
+
+    fixes = engine.solve(batch, timestamp=1.0)
+    assert list(fixes) == ["t1"]
+    assert np.allclose([fixes["t1"].x, fixes["t1"].y, fixes["t1"].z], tag, atol=1e-4)
+    assert engine.get_stats()["rejected"] == 1
+
+    engine.solve(batch[:5], timestamp=2.0)
+    assert engine.get_fix("t1").timestamp == 2.0
+
+
+def test_coplanar_anchors_solve_in_2d_at_tag_height():
+    engine = PositioningEngine(tag_height=1.0)
+    engine.set_anchors({f"B{i}": {"x": x, "y": y, "z": 2.5}
+                        for i, (x, y) in enumerate([(0, 0), (10, 0), (10, 10), (0, 10)])})
+    assert engine.dims == 2
+    tag = np.array([3.0, 4.0, 1.0])
+    batch = [{"tag_id": "t", "anchor_id": f"B{i}", "distance": float(np.linalg.norm(np.array([x, y, 2.5]) - tag))}
+             for i, (x, y) in enumerate([(0, 0), (10, 0), (10, 10), (0, 10)])]
+
+    fix = engine.solve(batch, timestamp=0.0)["t"]
+    assert (round(fix.x, 6), round(fix.y, 6), fix.z) == (3.0, 4.0, 1.0)
@@ -0,0 +1,60 @@
+import itertools
+import math
+import random
+from backend.modules.uwb_spatial import Geofence, SpatialGrid, UWBSpatialIndex
+
+
+def test_grid_queries_match_brute_force():
+    rng = random.Random(0)
+    grid = SpatialGrid(cell_size=2.0)
+    points = {f"t{i}": (rng.uniform(0, 50), rng.uniform(0, 50), rng.uniform(0, 3)) for i in range(500)}
+    for point_id, position in points.items():
+        grid.update(point_id, *position)
+    # Move some points across cells
+    for point_id in list(points)[:100]:
+        points[point_id] = (rng.uniform(0, 50), rng.uniform(0, 50), 1.0)
+        grid.update(point_id, *points[point_id])
+
+    center = (25.0, 25.0, 1.0)
+    expected = sorted(p for p, pos in points.items() if math.dist(center, pos) <= 4.0)
+    assert sorted(p for p, _ in grid.query_radius(*center, 4.0)) == expected
+
+    nearest = grid.nearest(*center, k=5)
+    brute = sorted(points, key=lambda p: math.dist(center, points[p]))[:5]
+    assert [p for p, _ in nearest] == brute
+
+    pairs = {(a, b) for a, b, _ in grid.pairs_within(1.0)}
+    brute_pairs = {(a, b) for a, b in itertools.combinations(sorted(points), 2)
+                   if math.dist(points[a], points[b]) <= 1.0}
+    assert pairs == brute_pairs
+
+
+def test_proximity_events_with_exit_margin():
+    index = UWBSpatialIndex(proximity_radius=1.0, exit_margin=0.5)
+    assert index.update("a", 0, 0, 0) == []
+    assert index.update("b", 5, 0, 0) == []
+
+    events = index.update("b", 0.8, 0, 0)
+    assert events == [("uwb.proximity", {"device1": "b", "device2": "a", "distance": 0.8, "active": True})]
+    # Inside the margin: still near, no event
+    assert index.update("b", 1.3, 0, 0) == []
+    events = index.update("a", -0.5, 0, 0)
+    assert [(e[1]["device1"], e[1]["active"]) for e in events] == [("a", False)]
+    assert index.near_pairs() == []
+
+
+def test_geofence_enter_exit_and_removal():
+    index = UWBSpatialIndex()
+    index.update("inside", 2, 2, 1)
+    events = index.add_geofence(Geofence("room", [(0, 0), (4, 0), (4, 4), (0, 4)], max_z=2.5))
+    assert [(e[1]["device_id"], e[1]["transition"]) for e in events] == [("inside", "enter")]
+
+    assert index.update("other", 10, 10, 1) == []
+    events = index.update("other", 3, 1, 1)
+    assert [(e[0], e[1]["transition"]) for e in events] == [("uwb.geofence", "enter")]
+    events = index.update("other", 3, 1, 3.0)  # above the fence
+    assert [e[1]["transition"] for e in events] == ["exit"]
+
+    events = index.remove("inside")
+    assert [e[1]["transition"] for e in events] == ["exit"]
+    assert index.devices_in("room") == []
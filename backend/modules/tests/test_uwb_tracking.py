@@ -0,0 +1,53 @@
+import numpy as np
+from backend.modules.uwb_tracking import TrackFilter, ACCEPTED, REJECTED, STALE, STARTED
+
+
+def test_filter_smooths_and_estimates_velocity_for_many_tags():
+    rng = np.random.default_rng(0)
+    tracks = TrackFilter(measurement_noise=0.1, capacity=4)
+    ids = [f"tag{i}" for i in range(100)]
+    start = rng.uniform(0, 20, (100, 3))
+    velocity = np.zeros((100, 3))
+    velocity[:, 0] = 1.0
+
+    errors_raw, errors_filtered = [], []
+    for step in range(50):
+        t = step * 0.1
+        truth = start + velocity * t
+        fixes = truth + rng.normal(0, 0.1, truth.shape)
+        tracks.update(ids, fixes, t)
+        if step > 20:
+            _, smoothed, _ = tracks.predict(t)
+            errors_raw.append(np.abs(fixes - truth).mean())
+            errors_filtered.append(np.abs(smoothed - truth).mean())
+
+    assert len(tracks) == 100
+    assert np.mean(errors_filtered) < 0.7 * np.mean(errors_raw)
+    assert abs(tracks.speeds().mean() - 1.0) < 0.1
+
+    # Extrapolation follows the estimated velocity
+    position = tracks.position_at("tag0", 4.9 + 0.5)
+    assert abs(position["x"] - (start[0, 0] + 5.4)) < 0.3
+
+
+def test_outliers_are_gated_then_track_restarts():
+    tracks = TrackFilter(measurement_noise=0.05, max_misses=3)
+    assert tracks.update(["a"], [[0, 0, 0]], 0.0)[0] == STARTED
+    for t in (0.1, 0.2, 0.3):
+        assert tracks.update(["a"], [[0, 0, 0]], t)[0] == ACCEPTED
+    assert tracks.update(["a"], [[0, 0, 0]], 0.3)[0] == STALE
+
+    assert tracks.update(["a"], [[5, 0, 0]], 0.4)[0] == REJECTED
+    assert tracks.position_at("a", 0.4)["x"] < 0.1
+    assert tracks.update(["a"], [[5, 0, 0]], 0.5)[0] == REJECTED
+    assert tracks.update(["a"], [[5, 0, 0]], 0.6)[0] == STARTED
+    assert tracks.position_at("a", 0.6)["x"] == 5.0
+
+
+def test_remove_and_drop_stale_keep_rows_consistent():
+    tracks = TrackFilter()
+    tracks.update(["a", "b", "c"], [[1, 0, 0], [2, 0, 0], [3, 0, 0]], [0.0, 5.0, 5.0])
+    assert tracks.drop_stale(now=6.0, max_age=2.0) == ["a"]
+    assert tracks.ids == ["c", "b"]
+    ids, positions, _ = tracks.predict(6.0, ["b", "c", "missing"])
+    assert ids == ["b", "c"] and positions[:, 0].tolist() == [2.0, 3.0]
@@ -3,8 +3,9 @@ import threading
 import logging
 import os
 import asyncio
+import inspect
 from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, List, Any, Optional, Union
+from typing import Awaitable, Callable, Dict, Iterable, List, Any, Optional, Union
 from enum import Enum
 
 # Import centralized models
@@ -12,6 +13,8 @@ from backend.models import (
     UWBAnchor, UWBPosition, UWBRangingResult,
     SuccessResponse, ErrorResponse
 )
+from backend.modules.uwb_positioning import PositionFix, PositioningEngine
+from backend.modules.uwb_spatial import Geofence, UWBSpatialIndex
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -59,6 +62,9 @@ class UWBManager:
     _tags = {}  # Tracked UWB tags
     _devices: Dict[str, UWBDevice] = {}
     _lock = threading.Lock()
+    positioning = PositioningEngine()  # Multilateration over the _anchors table
+    spatial = UWBSpatialIndex()  # Proximity and geofences, updated with every location
+    _spatial_listeners: List[Callable[[str, Dict[str, Any]], Any]] = []
 
     @classmethod
     async def register_device(cls, device_id: str, device_type: UWBMode) -> SuccessResponse:
@@ -82,17 +88,17 @@ class UWBManager:
         """Update the location of a UWB device."""
         logger.info(f"Updating location of UWB device: {device_id} to {location}")
         with cls._lock:
-            if device_id in cls._devices:
-                cls._devices[device_id].update_location(location)
-                return SuccessResponse(
-                    status="success",
-                    message=f"Device {device_id} location updated to {location}."
-                )
-            else:
+            if device_id not in cls._devices:
                 return ErrorResponse(
-                    status="error",
-                    message=f"Device {device_id} not registered."
+                    error=f"Device {device_id} not registered."
                 )
+            cls._devices[device_id].update_location(location)
+            events = cls.spatial.update(device_id, location.x, location.y, location.z)
+        await cls._publish_spatial_events(events)
+        return SuccessResponse(
+            success=True,
+            message=f"Device {device_id} location updated to {location}."
+        )
 
     @classmethod
     async def get_device_location(cls, device_id: str) -> SuccessResponse:
@@ -140,17 +146,18 @@ class UWBManager:
         """Remove a UWB device."""
         logger.info(f"Removing UWB device: {device_id}")
         with cls._lock:
-            if device_id in cls._devices:
-                del cls._devices[device_id]
-                return SuccessResponse(
-                    status="success",
-                    message=f"Device {device_id} removed."
-                )
-            else:
+            if device_id not in cls._devices:
                 return ErrorResponse(
-                    status="error",
-                    message=f"Device {device_id} not registered."
+                    error=f"Device {device_id} not registered."
                 )
+            del cls._devices[device_id]
+            cls.positioning.forget(device_id)
+            events = cls.spatial.remove(device_id)
+        await cls._publish_spatial_events(events)
+        return SuccessResponse(
+            success=True,
+            message=f"Device {device_id} removed."
+        )
 
     @classmethod
     async def add_anchor(cls, anchor: UWBAnchor) -> SuccessResponse:
@@ -167,16 +174,16 @@ class UWBManager:
         
         if SIMULATION_MODE:
             cls._anchors[anchor.anchor_id] = anchor
+            cls.positioning.set_anchors(cls._anchors)
             return SuccessResponse(
-                status="success",
+                success=True,
                 message="UWB anchor added successfully (simulated)",
                 data={'anchor_id': anchor.anchor_id}
             )
         
         if not UWB_HARDWARE_AVAILABLE:
             return ErrorResponse(
-                status="error",
-                message="UWB hardware not available"
+                error="UWB hardware not available"
             )
             
         try:
@@ -191,8 +198,7 @@ class UWBManager:
         except Exception as e:
             logger.exception("Error adding UWB anchor: %s", str(e))
             return ErrorResponse(
-                status="error",
-                message=f"Failed to add UWB anchor: {str(e)}"
+                error=f"Failed to add UWB anchor: {str(e)}"
             )
     
     @classmethod
@@ -204,9 +210,10 @@ class UWBManager:
             
             # For now, we'll just store the anchor in memory
             cls._anchors[anchor.anchor_id] = anchor
+            cls.positioning.set_anchors(cls._anchors)
             
             return SuccessResponse(
-                status="success",
+                success=True,
                 message="UWB anchor added successfully",
                 data={'anchor_id': anchor.anchor_id}
             )
@@ -214,8 +221,7 @@ class UWBManager:
         except Exception as e:
             logger.exception("Error in synchronous UWB anchor addition: %s", str(e))
             return ErrorResponse(
-                status="error",
-                message=f"UWB anchor addition error: {str(e)}"
+                error=f"UWB anchor addition error: {str(e)}"
             )
     
     @classmethod
@@ -240,15 +246,14 @@ class UWBManager:
                 timestamp=time.time()
             )
             return SuccessResponse(
-                status="success",
+                success=True,
                 message="UWB position retrieved successfully (simulated)",
                 data=position.model_dump()
             )
         
         if not UWB_HARDWARE_AVAILABLE:
             return ErrorResponse(
-                status="error",
-                message="UWB hardware not available"
+                error="UWB hardware not available"
             )
             
         try:
@@ -263,27 +268,30 @@ class UWBManager:
         except Exception as e:
             logger.exception("Error getting UWB position: %s", str(e))
             return ErrorResponse(
-                status="error",
-                message=f"Failed to get UWB position: {str(e)}"
+                error=f"Failed to get UWB position: {str(e)}"
             )
     
     @classmethod
     def _get_position_sync(cls, tag_id: str) -> SuccessResponse:
         """Synchronous method to get the current position of a UWB tag"""
         try:
-            # In a real implementation, this would use UWB ranging data
-            # from multiple anchors to calculate the tag's position
+            # Last multilateration fix from update_positions
+            fix = cls.positioning.get_fix(tag_id)
+            if fix is None:
+                return ErrorResponse(
+                    error=f"No position fix for UWB tag {tag_id}"
+                )
             
-            # For now, we'll simulate position data
             position = UWBPosition(
-                x=1.0,
-                y=2.0,
-                z=0.5,
-                timestamp=time.time()
+                x=fix.x,
+                y=fix.y,
+                z=fix.z,
+                timestamp=fix.timestamp,
+                accuracy=fix.residual
             )
             
             return SuccessResponse(
-                status="success",
+                success=True,
                 message="UWB position retrieved successfully",
                 data=position.model_dump()
             )
@@ -291,9 +299,184 @@ class UWBManager:
         except Exception as e:
             logger.exception("Error in synchronous UWB position retrieval: %s", str(e))
             return ErrorResponse(
-                status="error",
-                message=f"UWB position retrieval error: {str(e)}"
+                error=f"UWB position retrieval error: {str(e)}"
+            )
+    
+    @classmethod
+    async def update_positions(cls, measurements: List[Union[UWBRangingResult, Dict[str, Any]]]) -> SuccessResponse:
+        """
+        Solve tag positions from a batch of ranging measurements
+        
+        All tags in the batch are solved together by the positioning engine;
+        registered devices get their location updated.
+        
+        Args:
+            measurements: Anchor-to-tag ranges, any number of tags and anchors
+            
+        Returns:
+            SuccessResponse with the solved positions by tag ID
+        """
+        if not cls._anchors:
+            return ErrorResponse(
+                error="No UWB anchors configured"
+            )
+            
+        try:
+            loop = asyncio.get_event_loop()
+            fixes = await loop.run_in_executor(
+                cls.executor,
+                lambda: cls._update_positions_sync(measurements)
+            )
+            with cls._lock:
+                events = cls.spatial.update_many(
+                    (tag_id, fix.x, fix.y, fix.z) for tag_id, fix in fixes.items() if tag_id in cls._devices
+                )
+            await cls._publish_spatial_events(events)
+            
+            return SuccessResponse(
+                success=True,
+                message=f"Solved positions for {len(fixes)} UWB tags",
+                data={"positions": {tag_id: fix.to_dict() for tag_id, fix in fixes.items()}}
             )
+                
+        except Exception as e:
+            logger.exception("Error solving UWB positions: %s", str(e))
+            return ErrorResponse(
+                error=f"Failed to solve UWB positions: {str(e)}"
+            )
+    
+    @classmethod
+    def _update_positions_sync(cls, measurements: List[Union[UWBRangingResult, Dict[str, Any]]]) -> Dict[str, PositionFix]:
+        """Synchronous method to solve a ranging batch and update device locations"""
+        timestamp = time.time()
+        fixes = cls.positioning.solve(measurements, timestamp)
+        
+        with cls._lock:
+            for tag_id, fix in fixes.items():
+                device = cls._devices.get(tag_id)
+                if device is not None:
+                    device.update_location(UWBPosition(
+                        x=fix.x, y=fix.y, z=fix.z, timestamp=timestamp, accuracy=fix.residual
+                    ))
+        
+        return fixes
+    
+    @classmethod
+    def add_spatial_listener(cls, listener: Callable[[str, Dict[str, Any]], Union[None, Awaitable[None]]]) -> None:
+        """
+        Register a function called with every proximity and geofence event
+        
+        Args:
+            listener: Sync or async function called as listener(event_type, payload)
+        """
+        cls._spatial_listeners.append(listener)
+    
+    @classmethod
+    async def _publish_spatial_events(cls, events: List[tuple]) -> None:
+        for event_type, payload in events:
+            for listener in list(cls._spatial_listeners):
+                try:
+                    result = listener(event_type, payload)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Error in UWB spatial listener for {event_type}: {e}", exc_info=True)
+    
+    @classmethod
+    async def update_spatial(cls, positions: Dict[str, Dict[str, float]], removed: Iterable[str] = ()) -> int:
+        """
+        Move tags in the spatial index and publish the events it raises
+        
+        Used by live tracking (UWBPositionMonitor), whose tags live in the
+        UWB repository rather than the registered device table.
+        
+        Args:
+            positions: Positions ({"x", "y", "z"}) by device ID
+            removed: Devices no longer tracked
+            
+        Returns:
+            Number of proximity and geofence events published
+        """
+        with cls._lock:
+            events = []
+            for device_id in removed:
+                events.extend(cls.spatial.remove(device_id))
+            events.extend(cls.spatial.update_many(
+                (device_id, position.get("x", 0.0), position.get("y", 0.0), position.get("z", 0.0))
+                for device_id, position in positions.items()
+            ))
+        await cls._publish_spatial_events(events)
+        return len(events)
+    
+    @classmethod
+    async def add_geofence(cls, fence_id: str, polygon: List[List[float]], min_z: Optional[float] = None,
+                           max_z: Optional[float] = None, name: Optional[str] = None) -> SuccessResponse:
+        """
+        Add or replace a polygon geofence
+        
+        Args:
+            fence_id: Geofence ID
+            polygon: Vertices [x, y] in order
+            min_z: Lowest height inside the fence
+            max_z: Highest height inside the fence
+            name: Display name
+            
+        Returns:
+            SuccessResponse with the devices already inside
+        """
+        try:
+            fence = Geofence(fence_id, polygon, min_z, max_z, name)
+        except ValueError as e:
+            return ErrorResponse(error=str(e))
+        with cls._lock:
+            events = cls.spatial.add_geofence(fence)
+        await cls._publish_spatial_events(events)
+        return SuccessResponse(
+            success=True,
+            message=f"Geofence {fence_id} added",
+            data={"geofence": fence.to_dict(), "devices_inside": cls.spatial.devices_in(fence_id)}
+        )
+    
+    @classmethod
+    async def remove_geofence(cls, fence_id: str) -> SuccessResponse:
+        """Remove a geofence; devices inside get exit events."""
+        with cls._lock:
+            if fence_id not in cls.spatial.geofences:
+                return ErrorResponse(error=f"Geofence {fence_id} not found")
+            events = cls.spatial.remove_geofence(fence_id)
+        await cls._publish_spatial_events(events)
+        return SuccessResponse(success=True, message=f"Geofence {fence_id} removed")
+    
+    @classmethod
+    async def get_nearby_devices(cls, device_id: str, radius: Optional[float] = None,
+                                 count: Optional[int] = None) -> SuccessResponse:
+        """
+        Find devices near a device
+        
+        Args:
+            device_id: Device to search around
+            radius: Search radius in meters (defaults to the proximity radius)
+            count: Return only the nearest ``count`` devices
+            
+        Returns:
+            SuccessResponse with devices and distances, closest first
+        """
+        with cls._lock:
+            position = cls.spatial.grid.position(device_id)
+            if position is None:
+                return ErrorResponse(error=f"No location for device {device_id}")
+            if count is not None:
+                found = cls.spatial.grid.nearest(*position, k=count, max_radius=radius, exclude=device_id)
+            else:
+                found = sorted(
+                    cls.spatial.grid.query_radius(*position, radius or cls.spatial.proximity_radius, exclude=device_id),
+                    key=lambda item: item[1]
+                )
+        return SuccessResponse(
+            success=True,
+            message=f"Found {len(found)} devices near {device_id}",
+            data={"devices": [{"device_id": other, "distance": distance} for other, distance in found]}
+        )
     
     @classmethod
     async def get_ranging(cls, anchor_id: str, tag_id: str) -> SuccessResponse:
@@ -0,0 +1,327 @@
+"""
+UWB multilateration engine.
+
+Solves the positions of many tags at once from batches of anchor-to-tag
+ranges. The ranges of one batch form a (tags x anchors) matrix, with NaN
+where an anchor did not range a tag, and every step works on the whole
+matrix instead of looping over tags:
+
+1. Start point: the range equations of each tag are linearized
+   (``|p|^2 - 2 a.p = d^2 - |a|^2``) and the stacked per-tag normal
+   equations are solved in one call. Tags solved in an earlier batch start
+   from their previous position instead, which usually converges in one or
+   two iterations.
+2. Gauss-Newton refinement of the range residuals with stacked DxD normal
+   equations. Levenberg-Marquardt damping, adapted per tag, keeps weakly
+   constrained tags (few anchors, poor geometry) from diverging.
+
+When all anchors are at about the same height, height is not observable;
+the engine then solves in 2D with the tag at ``tag_height`` and projects
+the ranges onto the horizontal plane.
+
+Anchors are held as a matrix that is rebuilt only when the anchor set changes.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ITERATIONS = 10
+DEFAULT_TOLERANCE = 1e-4          # meters; stop when every step is smaller
+MIN_HEIGHT_SPREAD = 0.3           # meters of anchor height spread for a 3D solve
+_MIN_DISTANCE = 1e-9
+
+
+def _linear_start(anchors: np.ndarray, ranges: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Closed-form start points from the linearized range equations, shape (T, D)."""
+    dims = anchors.shape[1]
+    # Unknowns per tag are (p, |p|^2); one row per anchor
+    rows = np.hstack([-2.0 * anchors, np.ones((anchors.shape[0], 1))])
+    targets = np.where(weights > 0, ranges ** 2, 0.0) - (anchors ** 2).sum(axis=1)
+    normal = np.einsum("ta,ai,aj->tij", weights, rows, rows)
+    rhs = np.einsum("ta,ai,ta->ti", weights, rows, targets)
+    # pinv copes with tags whose anchors do not determine a unique solution
+    solution = np.einsum("tij,tj->ti", np.linalg.pinv(normal), rhs)
+    return solution[:, :dims]
+
+
+def _cost(positions: np.ndarray, anchors: np.ndarray, ranges: np.ndarray,
+          weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-tag squared residual sum, plus offsets and distances to the anchors."""
+    offsets = positions[:, None, :] - anchors[None, :, :]
+    distances = np.maximum(np.linalg.norm(offsets, axis=2), _MIN_DISTANCE)
+    residuals = np.where(weights > 0, distances - ranges, 0.0)
+    return (weights * residuals ** 2).sum(axis=1), offsets, distances
+
+
+def multilaterate(
+    anchors: np.ndarray,
+    ranges: np.ndarray,
+    initial: Optional[np.ndarray] = None,
+    weights: Optional[np.ndarray] = None,
+    iterations: int = DEFAULT_ITERATIONS,
+    tolerance: float = DEFAULT_TOLERANCE
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Least-squares positions of many tags.
+
+    Args:
+        anchors: Anchor positions, shape (A, D)
+        ranges: Measured ranges, shape (T, A); NaN where missing
+        initial: Start positions, shape (T, D); rows with NaN use the linear start
+        weights: Per-range weights, shape (T, A) (defaults to 1 where measured)
+        iterations: Maximum Gauss-Newton iterations
+        tolerance: Stop once every tag's step is below this (meters)
+
+    Returns:
+        Positions (T, D), RMS range residual per tag (T,), anchors used per tag (T,)
+    """
+    anchors = np.asarray(anchors, dtype=np.float64)
+    ranges = np.asarray(ranges, dtype=np.float64)
+    measured = np.isfinite(ranges)
+    if weights is None:
+        weights = measured.astype(np.float64)
+    else:
+        weights = np.where(measured, np.asarray(weights, dtype=np.float64), 0.0)
+    ranges = np.where(measured, ranges, 0.0)
+    tags, dims = ranges.shape[0], anchors.shape[1]
+    counts = measured.sum(axis=1)
+    if tags == 0:
+        return np.empty((0, dims)), np.empty(0), counts
+
+    positions = _linear_start(anchors, ranges, weights)
+    if initial is not None:
+        initial = np.asarray(initial, dtype=np.float64)
+        known = np.isfinite(initial).all(axis=1)
+        positions[known] = initial[known]
+    # Degenerate start points fall back to the centroid of the ranging anchors
+    bad = ~np.isfinite(positions).all(axis=1)
+    if bad.any():
+        totals = np.maximum(weights[bad].sum(axis=1, keepdims=True), _MIN_DISTANCE)
+        positions[bad] = weights[bad] @ anchors / totals
+
+    damping = np.full(tags, 1e-3)
+    identity = np.eye(dims)
+    cost, offsets, distances = _cost(positions, anchors, ranges, weights)
+    for _ in range(iterations):
+        jacobian = offsets / distances[:, :, None]
+        residuals = np.where(weights > 0, distances - ranges, 0.0)
+        normal = np.einsum("ta,tai,taj->tij", weights, jacobian, jacobian)
+        gradient = np.einsum("ta,tai,ta->ti", weights, jacobian, residuals)
+        scale = np.maximum(np.trace(normal, axis1=1, axis2=2) / dims, 1.0)
+        normal = normal + (damping * scale)[:, None, None] * identity
+        step = np.linalg.solve(normal, gradient[:, :, None])[:, :, 0]
+
+        candidate = positions - step
+        new_cost, new_offsets, new_distances = _cost(candidate, anchors, ranges, weights)
+        accept = new_cost <= cost
+        positions = np.where(accept[:, None], candidate, positions)
+        cost = np.where(accept, new_cost, cost)
+        offsets = np.where(accept[:, None, None], new_offsets, offsets)
+        distances = np.where(accept[:, None], new_distances, distances)
+        damping = np.clip(np.where(accept, damping * 0.3, damping * 10.0), 1e-9, 1e6)
+
+        if np.all(np.abs(step[accept]) < tolerance) and accept.all():
+            break
+
+    rms = np.sqrt(cost / np.maximum(weights.sum(axis=1), _MIN_DISTANCE))
+    return positions, rms, counts
+
+
+class PositionFix:
+    """Solved position of one tag."""
+
+    __slots__ = ("tag_id", "x", "y", "z", "residual", "anchors", "timestamp")
+
+    def __init__(self, tag_id: str, x: float, y: float, z: float, residual: float,
+                 anchors: int, timestamp: float):
+        self.tag_id = tag_id
+        self.x = x
+        self.y = y
+        self.z = z
+        self.residual = residual
+        self.anchors = anchors
+        self.timestamp = timestamp
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tag_id": self.tag_id,
+            "x": self.x,
+            "y": self.y,
+            "z": self.z,
+            "residual": self.residual,
+            "anchors": self.anchors,
+            "timestamp": self.timestamp
+        }
+
+
+class PositioningEngine:
+    """
+    Batched multilateration over a fixed anchor table.
+
+    ``set_anchors`` builds the anchor matrix; ``solve`` takes a batch of
+    range measurements for any number of tags and returns one fix per tag
+    that has enough anchors (3 in 2D, 4 in 3D). The last fix of each tag is
+    kept as the start point of its next solve.
+
+    Args:
+        tag_height: Tag height used when the anchors are coplanar (defaults
+            to the anchors' mean height)
+        iterations: Maximum Gauss-Newton iterations per solve
+        max_residual: Fixes with a larger RMS range residual (meters) are rejected
+    """
+
+    def __init__(self, tag_height: Optional[float] = None, iterations: int = DEFAULT_ITERATIONS,
+                 max_residual: float = 1.0):
+        self.tag_height = tag_height
+        self.iterations = iterations
+        self.max_residual = max_residual
+        self._lock = threading.Lock()
+        self._anchor_ids: List[str] = []
+        self._anchor_index: Dict[str, int] = {}
+        self._anchor_matrix = np.empty((0, 3))
+        self._dims = 3
+        self._height = 0.0
+        self._fixes: Dict[str, PositionFix] = {}
+        self.solves = 0
+        self.rejected = 0
+
+    @property
+    def anchor_ids(self) -> List[str]:
+        return list(self._anchor_ids)
+
+    @property
+    def dims(self) -> int:
+        return self._dims
+
+    def set_anchors(self, anchors: Dict[str, Any]) -> None:
+        """
+        Rebuild the anchor matrix.
+
+        Args:
+            anchors: Anchor ID to anchor; anchors have ``x``, ``y`` and ``z``
+                attributes or keys
+        """
+        ids, rows = [], []
+        for anchor_id, anchor in anchors.items():
+            if isinstance(anchor, dict):
+                rows.append((anchor["x"], anchor["y"], anchor.get("z") or 0.0))
+            else:
+                rows.append((anchor.x, anchor.y, getattr(anchor, "z", None) or 0.0))
+            ids.append(anchor_id)
+        matrix = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        heights = matrix[:, 2]
+        with self._lock:
+            self._anchor_ids = ids
+            self._anchor_index = {anchor_id: i for i, anchor_id in enumerate(ids)}
+            self._anchor_matrix = matrix
+            spread = heights.max() - heights.min() if len(heights) else 0.0
+            self._dims = 3 if spread >= MIN_HEIGHT_SPREAD else 2
+            self._height = (self.tag_height if self.tag_height is not None
+                            else float(heights.mean()) if len(heights) else 0.0)
+        logger.info(f"Positioning engine using {len(ids)} anchors ({self._dims}D)")
+
+    def build_ranges(self, measurements: Iterable[Any]) -> Tuple[List[str], np.ndarray]:
+        """
+        Arrange measurements as a (tags x anchors) range matrix.
+
+        Args:
+            measurements: Items with ``tag_id``, ``anchor_id`` and ``distance``
+                (objects or dicts); unknown anchors are skipped and a repeated
+                pair keeps its last range
+
+        Returns:
+            Tag IDs in row order and the range matrix (NaN where missing)
+        """
+        tag_index: Dict[str, int] = {}
+        rows, cols, values = [], [], []
+        anchor_index = self._anchor_index
+        for m in measurements:
+            if isinstance(m, dict):
+                tag_id, anchor_id, distance = m["tag_id"], m["anchor_id"], m["distance"]
+            else:
+                tag_id, anchor_id, distance = m.tag_id, m.anchor_id, m.distance
+            col = anchor_index.get(anchor_id)
+            if col is None:
+                continue
+            rows.append(tag_index.setdefault(tag_id, len(tag_index)))
+            cols.append(col)
+            values.append(distance)
+        ranges = np.full((len(tag_index), len(anchor_index)), np.nan)
+        if values:
+            ranges[rows, cols] = values
+        return list(tag_index), ranges
+
+    def solve(self, measurements: Iterable[Any], timestamp: float) -> Dict[str, PositionFix]:
+        """
+        Solve every tag in a batch of range measurements.
+
+        Args:
+            measurements: Range measurements (see ``build_ranges``)
+            timestamp: Time of the batch
+
+        Returns:
+            Tag ID to fix, for tags with enough anchors and a small residual
+        """
+        with self._lock:
+            tag_ids, ranges = self.build_ranges(measurements)
+            return self._solve(tag_ids, ranges, timestamp)
+
+    def solve_matrix(self, tag_ids: List[str], ranges: np.ndarray, timestamp: float) -> Dict[str, PositionFix]:
+        """Solve a prepared range matrix whose columns follow ``anchor_ids``."""
+        with self._lock:
+            return self._solve(tag_ids, np.asarray(ranges, dtype=np.float64), timestamp)
+
+    def _solve(self, tag_ids: List[str], ranges: np.ndarray, timestamp: float) -> Dict[str, PositionFix]:
+        if not tag_ids or not self._anchor_ids:
+            return {}
+        anchors = self._anchor_matrix
+        dims = self._dims
+        if dims == 2:
+            # Horizontal ranges to the anchors, with the tag at the fixed height
+            dz = anchors[:, 2] - self._height
+            ranges = np.sqrt(np.maximum(ranges ** 2 - dz ** 2, 0.0))
+            anchors = anchors[:, :2]
+
+        initial = np.full((len(tag_ids), dims), np.nan)
+        for row, tag_id in enumerate(tag_ids):
+            fix = self._fixes.get(tag_id)
+            if fix is not None:
+                initial[row] = (fix.x, fix.y, fix.z)[:dims]
+
+        positions, residuals, counts = multilaterate(anchors, ranges, initial, iterations=self.iterations)
+        self.solves += 1
+
+        valid = (counts >= dims + 1) & (residuals <= self.max_residual) & np.isfinite(positions).all(axis=1)
+        self.rejected += int(len(tag_ids) - valid.sum())
+        fixes: Dict[str, PositionFix] = {}
+        for row in np.flatnonzero(valid):
+            x, y = float(positions[row, 0]), float(positions[row, 1])
+            z = float(positions[row, 2]) if dims == 3 else self._height
+            tag_id = tag_ids[row]
+            fixes[tag_id] = PositionFix(tag_id, x, y, z, float(residuals[row]), int(counts[row]), timestamp)
+        self._fixes.update(fixes)
+        return fixes
+
+    def get_fix(self, tag_id: str) -> Optional[PositionFix]:
+        """Last fix of a tag, if any."""
+        return self._fixes.get(tag_id)
+
+    def get_fixes(self) -> Dict[str, PositionFix]:
+        return dict(self._fixes)
+
+    def forget(self, tag_id: str) -> None:
+        self._fixes.pop(tag_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "anchors": len(self._anchor_ids),
+            "dims": self._dims,
+            "tags": len(self._fixes),
+            "solves": self.solves,
+            "rejected": self.rejected
+        }
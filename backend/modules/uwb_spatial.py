@@ -0,0 +1,373 @@
+"""
+Spatial index for UWB tags: proximity and geofence events.
+
+Tags are bucketed in a uniform grid over the floor plane (x, y). Moving a
+tag is O(1), and a radius query only visits the cells the radius covers,
+so proximity checks cost O(neighbours) per moved tag instead of
+comparing every pair of tags on every tick.
+
+``UWBSpatialIndex`` keeps the set of near pairs and each tag's geofences.
+On every update it checks only the moved tags and returns the changes as
+events:
+
+- ``uwb.proximity`` with ``active`` True when two tags come within
+  ``proximity_radius``, and False once they separate past the radius plus
+  ``exit_margin`` (the margin stops pairs at the edge from flapping)
+- ``uwb.geofence`` with ``transition`` ``enter`` or ``exit`` for polygon
+  geofences; fences are indexed by the grid cells their bounding box covers
+
+Distances are 3D; only the bucketing ignores height.
+"""
+
+import logging
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[int, int]
+Event = Tuple[str, Dict[str, Any]]
+
+PROXIMITY_EVENT = "uwb.proximity"
+GEOFENCE_EVENT = "uwb.geofence"
+
+
+class SpatialGrid:
+    """
+    Uniform grid of points bucketed by (x, y) cell.
+
+    Args:
+        cell_size: Cell edge in meters; about the usual query radius works best
+    """
+
+    def __init__(self, cell_size: float = 2.0):
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Set[str]] = {}
+        self._points: Dict[str, Tuple[float, float, float]] = {}
+        self._point_cells: Dict[str, Cell] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, point_id: str) -> bool:
+        return point_id in self._points
+
+    def cell_of(self, x: float, y: float) -> Cell:
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def position(self, point_id: str) -> Optional[Tuple[float, float, float]]:
+        return self._points.get(point_id)
+
+    def update(self, point_id: str, x: float, y: float, z: float = 0.0) -> None:
+        """Insert or move a point."""
+        cell = self.cell_of(x, y)
+        old = self._point_cells.get(point_id)
+        if old != cell:
+            if old is not None:
+                self._discard(point_id, old)
+            self._cells.setdefault(cell, set()).add(point_id)
+            self._point_cells[point_id] = cell
+        self._points[point_id] = (x, y, z)
+
+    def remove(self, point_id: str) -> bool:
+        cell = self._point_cells.pop(point_id, None)
+        if cell is None:
+            return False
+        self._discard(point_id, cell)
+        del self._points[point_id]
+        return True
+
+    def _discard(self, point_id: str, cell: Cell) -> None:
+        members = self._cells[cell]
+        members.discard(point_id)
+        if not members:
+            del self._cells[cell]
+
+    def _cells_within(self, x: float, y: float, radius: float) -> Iterable[Set[str]]:
+        return self._cells_in_box(x - radius, y - radius, x + radius, y + radius)
+
+    def _cells_in_box(self, min_x: float, min_y: float, max_x: float, max_y: float) -> Iterable[Set[str]]:
+        (x0, y0), (x1, y1) = self.cell_of(min_x, min_y), self.cell_of(max_x, max_y)
+        cells = self._cells
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+            # Box covers more cells than are occupied: visit the occupied ones
+            return (members for (cx, cy), members in cells.items() if x0 <= cx <= x1 and y0 <= cy <= y1)
+        return (cells[(cx, cy)] for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1) if (cx, cy) in cells)
+
+    def query_box(self, min_x: float, min_y: float, max_x: float, max_y: float) -> List[str]:
+        """Points whose (x, y) lies in a rectangle."""
+        points = self._points
+        return [point_id for members in self._cells_in_box(min_x, min_y, max_x, max_y) for point_id in members
+                if min_x <= points[point_id][0] <= max_x and min_y <= points[point_id][1] <= max_y]
+
+    def query_radius(self, x: float, y: float, z: float, radius: float,
+                     exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Points within ``radius`` (3D) of a location, with their distances."""
+        found = []
+        limit = radius * radius
+        points = self._points
+        for members in self._cells_within(x, y, radius):
+            for point_id in members:
+                px, py, pz = points[point_id]
+                d2 = (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2
+                if d2 <= limit and point_id != exclude:
+                    found.append((point_id, math.sqrt(d2)))
+        return found
+
+    def nearest(self, x: float, y: float, z: float, k: int = 1, max_radius: Optional[float] = None,
+                exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        The ``k`` nearest points, closest first.
+
+        Searches rings of cells outward until ``k`` points are found within
+        the searched radius, so the cost depends on local density rather
+        than on the number of points.
+        """
+        available = len(self._points) - (1 if exclude in self._points else 0)
+        k = min(k, available)
+        if k <= 0:
+            return []
+        radius = self.cell_size
+        while True:
+            found = self.query_radius(x, y, z, radius, exclude)
+            if len(found) >= k or (max_radius is not None and radius >= max_radius) \
+                    or len(found) == available:
+                found.sort(key=lambda item: item[1])
+                if max_radius is not None:
+                    found = [item for item in found if item[1] <= max_radius]
+                return found[:k]
+            radius = radius * 2 if max_radius is None else min(radius * 2, max_radius)
+
+    def pairs_within(self, radius: float) -> List[Tuple[str, str, float]]:
+        """All pairs of points within ``radius`` of each other (full scan)."""
+        pairs = []
+        for point_id, (x, y, z) in self._points.items():
+            for other, distance in self.query_radius(x, y, z, radius, exclude=point_id):
+                if point_id < other:
+                    pairs.append((point_id, other, distance))
+        return pairs
+
+
+def _point_in_polygon(x: float, y: float, polygon: Sequence[Tuple[float, float]]) -> bool:
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+class Geofence:
+    """
+    Polygon on the floor plane, optionally limited to a height band.
+
+    Args:
+        fence_id: Geofence ID
+        polygon: Vertices (x, y) in order
+        min_z: Lowest height inside the fence
+        max_z: Highest height inside the fence
+        name: Display name
+    """
+
+    def __init__(self, fence_id: str, polygon: Sequence[Tuple[float, float]],
+                 min_z: Optional[float] = None, max_z: Optional[float] = None,
+                 name: Optional[str] = None):
+        if len(polygon) < 3:
+            raise ValueError("A geofence polygon needs at least 3 vertices")
+        self.fence_id = fence_id
+        self.polygon = [(float(x), float(y)) for x, y in polygon]
+        self.min_z = min_z
+        self.max_z = max_z
+        self.name = name or fence_id
+        xs = [x for x, _ in self.polygon]
+        ys = [y for _, y in self.polygon]
+        self.bounds = (min(xs), min(ys), max(xs), max(ys))
+
+    def contains(self, x: float, y: float, z: float = 0.0) -> bool:
+        min_x, min_y, max_x, max_y = self.bounds
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            return False
+        if (self.min_z is not None and z < self.min_z) or (self.max_z is not None and z > self.max_z):
+            return False
+        return _point_in_polygon(x, y, self.polygon)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fence_id": self.fence_id,
+            "name": self.name,
+            "polygon": self.polygon,
+            "min_z": self.min_z,
+            "max_z": self.max_z
+        }
+
+
+class UWBSpatialIndex:
+    """
+    Incremental proximity and geofence tracking for UWB tags.
+
+    Args:
+        cell_size: Grid cell edge in meters
+        proximity_radius: Distance at which two tags count as near
+        exit_margin: Extra distance before a near pair counts as separated
+    """
+
+    def __init__(self, cell_size: float = 2.0, proximity_radius: float = 1.0, exit_margin: float = 0.2):
+        self.grid = SpatialGrid(cell_size)
+        self.proximity_radius = proximity_radius
+        self.exit_margin = exit_margin
+        self.geofences: Dict[str, Geofence] = {}
+        self._fence_cells: Dict[Cell, Set[str]] = {}
+        self._near: Dict[str, Set[str]] = {}
+        self._inside: Dict[str, Set[str]] = {}
+        self.events = 0
+
+    # Tags
+
+    def update(self, device_id: str, x: float, y: float, z: float = 0.0) -> List[Event]:
+        """Move a tag and return the proximity and geofence changes it caused."""
+        self.grid.update(device_id, x, y, z)
+        events = self._check_proximity(device_id, x, y, z)
+        events.extend(self._check_geofences(device_id, x, y, z))
+        self.events += len(events)
+        return events
+
+    def update_many(self, positions: Iterable[Tuple[str, float, float, float]]) -> List[Event]:
+        """Move many tags (``(device_id, x, y, z)`` items); events of all of them."""
+        events: List[Event] = []
+        for device_id, x, y, z in positions:
+            events.extend(self.update(device_id, x, y, z))
+        return events
+
+    def remove(self, device_id: str) -> List[Event]:
+        """Drop a tag; ends its proximities and geofence memberships."""
+        events: List[Event] = []
+        position = self.grid.position(device_id)
+        if position is None:
+            return events
+        for other in self._near.pop(device_id, set()):
+            self._near.get(other, set()).discard(device_id)
+            events.append(self._proximity_event(device_id, other, None, False))
+        for fence_id in self._inside.pop(device_id, set()):
+            events.append(self._geofence_event(device_id, fence_id, "exit", position))
+        self.grid.remove(device_id)
+        self.events += len(events)
+        return events
+
+    def _check_proximity(self, device_id: str, x: float, y: float, z: float) -> List[Event]:
+        exit_radius = self.proximity_radius + self.exit_margin
+        old = self._near.get(device_id, set())
+        distances = dict(self.grid.query_radius(x, y, z, exit_radius, exclude=device_id))
+        new = {other for other, distance in distances.items()
+               if distance <= self.proximity_radius or other in old}
+
+        events = []
+        for other in new - old:
+            self._near.setdefault(other, set()).add(device_id)
+            events.append(self._proximity_event(device_id, other, distances[other], True))
+        for other in old - new:
+            self._near.get(other, set()).discard(device_id)
+            position = self.grid.position(other)
+            distance = math.dist((x, y, z), position) if position else None
+            events.append(self._proximity_event(device_id, other, distance, False))
+        if new:
+            self._near[device_id] = new
+        else:
+            self._near.pop(device_id, None)
+        return events
+
+    @staticmethod
+    def _proximity_event(device1: str, device2: str, distance: Optional[float], active: bool) -> Event:
+        return PROXIMITY_EVENT, {
+            "device1": device1,
+            "device2": device2,
+            "distance": distance if distance is not None else -1.0,
+            "active": active
+        }
+
+    # Geofences
+
+    def _check_geofences(self, device_id: str, x: float, y: float, z: float) -> List[Event]:
+        candidates = self._fence_cells.get(self.grid.cell_of(x, y), ())
+        old = self._inside.get(device_id, set())
+        if not candidates and not old:
+            return []
+        new = {fence_id for fence_id in candidates if self.geofences[fence_id].contains(x, y, z)}
+        events = [self._geofence_event(device_id, fence_id, "enter", (x, y, z)) for fence_id in new - old]
+        events.extend(self._geofence_event(device_id, fence_id, "exit", (x, y, z)) for fence_id in old - new)
+        if new:
+            self._inside[device_id] = new
+        else:
+            self._inside.pop(device_id, None)
+        return events
+
+    def _geofence_event(self, device_id: str, fence_id: str, transition: str,
+                        position: Tuple[float, float, float]) -> Event:
+        fence = self.geofences.get(fence_id)
+        return GEOFENCE_EVENT, {
+            "device_id": device_id,
+            "geofence_id": fence_id,
+            "geofence_name": fence.name if fence else fence_id,
+            "transition": transition,
+            "location": {"x": position[0], "y": position[1], "z": position[2]}
+        }
+
+    def _fence_cell_range(self, fence: Geofence) -> Iterable[Cell]:
+        min_x, min_y, max_x, max_y = fence.bounds
+        (x0, y0), (x1, y1) = self.grid.cell_of(min_x, min_y), self.grid.cell_of(max_x, max_y)
+        return ((cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1))
+
+    def add_geofence(self, fence: Geofence) -> List[Event]:
+        """Add or replace a geofence; returns enter events for tags already inside."""
+        events = self.remove_geofence(fence.fence_id) if fence.fence_id in self.geofences else []
+        self.geofences[fence.fence_id] = fence
+        for cell in self._fence_cell_range(fence):
+            self._fence_cells.setdefault(cell, set()).add(fence.fence_id)
+
+        for device_id in self.grid.query_box(*fence.bounds):
+            x, y, z = self.grid.position(device_id)
+            if fence.contains(x, y, z):
+                self._inside.setdefault(device_id, set()).add(fence.fence_id)
+                events.append(self._geofence_event(device_id, fence.fence_id, "enter", (x, y, z)))
+        self.events += len(events)
+        return events
+
+    def remove_geofence(self, fence_id: str) -> List[Event]:
+        """Remove a geofence; returns exit events for tags that were inside."""
+        fence = self.geofences.get(fence_id)
+        if fence is None:
+            return []
+        events = []
+        for device_id in [d for d, fences in self._inside.items() if fence_id in fences]:
+            self._inside[device_id].discard(fence_id)
+            if not self._inside[device_id]:
+                del self._inside[device_id]
+            events.append(self._geofence_event(device_id, fence_id, "exit", self.grid.position(device_id)))
+        for cell in self._fence_cell_range(fence):
+            members = self._fence_cells.get(cell)
+            if members is not None:
+                members.discard(fence_id)
+                if not members:
+                    del self._fence_cells[cell]
+        del self.geofences[fence_id]
+        self.events += len(events)
+        return events
+
+    # Queries
+
+    def near_pairs(self) -> List[Tuple[str, str]]:
+        """Pairs currently within proximity."""
+        return [(a, b) for a, others in self._near.items() for b in others if a < b]
+
+    def devices_in(self, fence_id: str) -> List[str]:
+        return [device_id for device_id, fences in self._inside.items() if fence_id in fences]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "devices": len(self.grid),
+            "geofences": len(self.geofences),
+            "near_pairs": len(self.near_pairs()),
+            "events": self.events
+        }
@@ -0,0 +1,253 @@
+"""
+Kalman tracking filter for UWB tag positions.
+
+Raw UWB fixes jitter by several centimeters even for a tag lying still, and
+an occasional multipath fix can be meters off. ``TrackFilter`` runs one
+constant-velocity Kalman filter per tag to smooth the fixes, estimate
+velocity, reject outliers and extrapolate positions between measurements.
+
+All tags live in one set of arrays (struct of arrays), so a batch of
+measurements for many tags is one vectorized predict/update. The axes are
+filtered independently (isotropic noise), which keeps each tag's
+covariance to three numbers per axis instead of a 6x6 matrix.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Outcome of each measurement passed to update()
+STALE = -1       # not newer than the track's last measurement; ignored
+REJECTED = 0     # outside the gate; counted as a miss
+ACCEPTED = 1
+STARTED = 2      # new track, or a track restarted after too many misses
+
+CHI2_GATE_3DOF = 16.27  # 99.9% for three degrees of freedom
+
+
+class TrackFilter:
+    """
+    Constant-velocity Kalman filters for many tags.
+
+    Args:
+        measurement_noise: Standard deviation of a position fix (meters)
+        process_noise: Acceleration noise density (m^2/s^3); higher follows
+            maneuvers faster, lower smooths more
+        gate: Squared Mahalanobis distance past which a fix is an outlier
+        max_misses: Consecutive outliers after which the track restarts at
+            the new fix (the tag really moved)
+        max_extrapolation: Longest time (seconds) a position is extrapolated
+            past the last fix
+        capacity: Initial number of tracks allocated
+    """
+
+    def __init__(
+        self,
+        measurement_noise: float = 0.1,
+        process_noise: float = 0.5,
+        gate: float = CHI2_GATE_3DOF,
+        max_misses: int = 3,
+        max_extrapolation: float = 2.0,
+        capacity: int = 64
+    ):
+        self.measurement_var = measurement_noise ** 2
+        self.process_noise = process_noise
+        self.gate = gate
+        self.max_misses = max_misses
+        self.max_extrapolation = max_extrapolation
+        self.initial_velocity_var = 1.0
+
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._allocate(capacity)
+
+        self.accepted = 0
+        self.rejected = 0
+
+    def _allocate(self, capacity: int) -> None:
+        old = getattr(self, "pos", None)
+        count = len(self._ids)
+        arrays = {
+            "pos": np.zeros((capacity, 3)),
+            "vel": np.zeros((capacity, 3)),
+            "p_pp": np.zeros((capacity, 3)),   # position variance
+            "p_pv": np.zeros((capacity, 3)),   # position/velocity covariance
+            "p_vv": np.zeros((capacity, 3)),   # velocity variance
+            "time": np.zeros(capacity),
+            "misses": np.zeros(capacity, dtype=np.int32),
+        }
+        for name, array in arrays.items():
+            if old is not None:
+                array[:count] = getattr(self, name)[:count]
+            setattr(self, name, array)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, tag_id: str) -> bool:
+        return tag_id in self._index
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    def _start(self, rows: np.ndarray, positions: np.ndarray, times: np.ndarray) -> None:
+        self.pos[rows] = positions
+        self.vel[rows] = 0.0
+        self.p_pp[rows] = self.measurement_var
+        self.p_pv[rows] = 0.0
+        self.p_vv[rows] = self.initial_velocity_var
+        self.time[rows] = times
+        self.misses[rows] = 0
+
+    def _rows_for(self, ids: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows of the tags, creating tracks for new ones; also returns the new-track mask."""
+        rows = np.empty(len(ids), dtype=np.intp)
+        new = np.zeros(len(ids), dtype=bool)
+        for i, tag_id in enumerate(ids):
+            row = self._index.get(tag_id)
+            if row is None:
+                row = len(self._ids)
+                if row >= len(self.time):
+                    self._allocate(2 * len(self.time))
+                self._index[tag_id] = row
+                self._ids.append(tag_id)
+                new[i] = True
+            rows[i] = row
+        return rows, new
+
+    def update(self, ids: Sequence[str], positions: Any, timestamps: Any) -> np.ndarray:
+        """
+        Fold in one batch of position fixes.
+
+        Args:
+            ids: Tag ID of each fix (each tag at most once per batch)
+            positions: Fixes, shape (M, 3)
+            timestamps: Fix times in seconds, shape (M,) or a scalar
+
+        Returns:
+            Outcome per fix: ``STARTED``, ``ACCEPTED``, ``REJECTED`` or ``STALE``
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        times = np.broadcast_to(np.asarray(timestamps, dtype=np.float64), (len(ids),))
+        outcome = np.full(len(ids), STALE, dtype=np.int8)
+        if not len(ids):
+            return outcome
+
+        rows, new = self._rows_for(ids)
+        if new.any():
+            self._start(rows[new], positions[new], times[new])
+            outcome[new] = STARTED
+
+        dt = times - self.time[rows]
+        active = ~new & (dt > 0)
+        if not active.any():
+            return outcome
+        idx = np.flatnonzero(active)
+        r, z, dt = rows[idx], positions[idx], dt[idx][:, None]
+
+        # Predict to the fix time
+        q = self.process_noise
+        pos = self.pos[r] + self.vel[r] * dt
+        p_pp = self.p_pp[r] + 2 * dt * self.p_pv[r] + dt ** 2 * self.p_vv[r] + q * dt ** 3 / 3
+        p_pv = self.p_pv[r] + dt * self.p_vv[r] + q * dt ** 2 / 2
+        p_vv = self.p_vv[r] + q * dt
+
+        # Gate on the Mahalanobis distance of the innovation
+        innovation = z - pos
+        s = p_pp + self.measurement_var
+        distance = (innovation ** 2 / s).sum(axis=1)
+        accept = distance <= self.gate
+        misses = self.misses[r] + 1
+        restart = ~accept & (misses >= self.max_misses)
+
+        k_p, k_v = p_pp / s, p_pv / s
+        a = accept[:, None]
+        self.pos[r] = np.where(a, pos + k_p * innovation, self.pos[r])
+        self.vel[r] = np.where(a, self.vel[r] + k_v * innovation, self.vel[r])
+        self.p_pp[r] = np.where(a, (1 - k_p) * p_pp, self.p_pp[r])
+        self.p_pv[r] = np.where(a, (1 - k_p) * p_pv, self.p_pv[r])
+        self.p_vv[r] = np.where(a, p_vv - k_v * p_pv, self.p_vv[r])
+        self.time[r] = np.where(accept, times[idx], self.time[r])
+        self.misses[r] = np.where(accept, 0, misses)
+        if restart.any():
+            self._start(r[restart], z[restart], times[idx][restart])
+
+        outcome[idx] = np.where(restart, STARTED, np.where(accept, ACCEPTED, REJECTED))
+        accepted = int(accept.sum())
+        self.accepted += accepted
+        self.rejected += len(idx) - accepted
+        return outcome
+
+    def predict(self, at: float, ids: Optional[Sequence[str]] = None) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Extrapolated positions without changing the tracks.
+
+        Args:
+            at: Time to predict for (clamped to ``max_extrapolation`` past each fix)
+            ids: Tags to predict (all tracks if None; unknown tags are skipped)
+
+        Returns:
+            Tag IDs, positions (N, 3) and position standard deviations (N, 3)
+        """
+        if ids is None:
+            ids = list(self._ids)
+            rows = np.arange(len(ids))
+        else:
+            ids = [tag_id for tag_id in ids if tag_id in self._index]
+            rows = np.array([self._index[tag_id] for tag_id in ids], dtype=np.intp)
+        dt = np.clip(at - self.time[rows], 0.0, self.max_extrapolation)[:, None]
+        positions = self.pos[rows] + self.vel[rows] * dt
+        variance = (self.p_pp[rows] + 2 * dt * self.p_pv[rows] + dt ** 2 * self.p_vv[rows]
+                    + self.process_noise * dt ** 3 / 3)
+        return ids, positions, np.sqrt(variance)
+
+    def position_at(self, tag_id: str, at: float) -> Optional[Dict[str, float]]:
+        """Extrapolated position of one tag, or None if it has no track."""
+        ids, positions, std = self.predict(at, [tag_id])
+        if not ids:
+            return None
+        x, y, z = positions[0]
+        row = self._index[tag_id]
+        return {
+            "x": float(x), "y": float(y), "z": float(z),
+            "accuracy": float(np.linalg.norm(std[0])),
+            "speed": float(np.linalg.norm(self.vel[row])),
+            "timestamp": float(at)
+        }
+
+    def speeds(self, ids: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Estimated speed (m/s) of each tag."""
+        if ids is None:
+            return np.linalg.norm(self.vel[:len(self._ids)], axis=1)
+        rows = np.array([self._index[tag_id] for tag_id in ids if tag_id in self._index], dtype=np.intp)
+        return np.linalg.norm(self.vel[rows], axis=1)
+
+    def remove(self, tag_id: str) -> bool:
+        """Drop a track; the last track takes its row."""
+        row = self._index.pop(tag_id, None)
+        if row is None:
+            return False
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._ids[row] = moved
+            self._index[moved] = row
+            for name in ("pos", "vel", "p_pp", "p_pv", "p_vv", "time", "misses"):
+                array = getattr(self, name)
+                array[row] = array[last]
+        self._ids.pop()
+        return True
+
+    def drop_stale(self, now: float, max_age: float) -> List[str]:
+        """Drop tracks without a fix for ``max_age`` seconds."""
+        stale = [self._ids[row] for row in np.flatnonzero(now - self.time[:len(self._ids)] > max_age)]
+        for tag_id in stale:
+            self.remove(tag_id)
+        return stale
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"tracks": len(self._ids), "accepted": self.accepted, "rejected": self.rejected}
@@ -0,0 +1,315 @@
+"""
+Numeric location history for UWB devices.
+
+Each device keeps its samples in ring buffers: float64 timestamps (epoch
+seconds) and an (N, 3) float64 array of x, y, z. Appending writes one row
+in place; nothing is copied until the buffer has to grow, and it doubles
+each time until it reaches ``capacity``. After that the oldest samples are
+overwritten. Samples are kept in time order, so time-window queries are
+binary searches.
+
+Query results can be downsampled on the server:
+
+- ``nth``: every Nth sample
+- ``lttb``: Largest-Triangle-Three-Buckets, which keeps the shape of the
+  track (turns, stops) in ``points`` samples
+- ``mean``: per-interval mean position, one sample per ``interval`` seconds
+
+With a ``persist_dir`` each device's history is saved as an ``.npz`` file
+by ``flush`` (written to a temporary file and renamed into place) and loaded
+again on first use.
+"""
+
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 100_000
+INITIAL_SIZE = 256
+
+DOWNSAMPLE_METHODS = ("nth", "lttb", "mean")
+
+
+class LocationHistory:
+    """
+    Ring buffer of timestamped positions for one device.
+
+    Args:
+        capacity: Maximum number of samples kept
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = max(1, capacity)
+        size = min(INITIAL_SIZE, self.capacity)
+        self._times = np.empty(size)
+        self._xyz = np.empty((size, 3))
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self) -> None:
+        size = min(2 * len(self._times), self.capacity)
+        times, xyz = self.arrays()
+        self._times = np.empty(size)
+        self._xyz = np.empty((size, 3))
+        self._times[:self._count] = times
+        self._xyz[:self._count] = xyz
+        self._start = 0
+
+    def append(self, timestamp: float, x: float, y: float, z: float) -> None:
+        """Add a sample; a timestamp older than the newest sample is moved up to it."""
+        if self._count:
+            last = self._times[(self._start + self._count - 1) % len(self._times)]
+            if timestamp < last:
+                timestamp = last
+        if self._count == len(self._times) and len(self._times) < self.capacity:
+            self._grow()
+        size = len(self._times)
+        if self._count < size:
+            index = (self._start + self._count) % size
+            self._count += 1
+        else:
+            # Full: overwrite the oldest sample
+            index = self._start
+            self._start = (self._start + 1) % size
+        self._times[index] = timestamp
+        self._xyz[index] = (x, y, z)
+
+    @classmethod
+    def from_arrays(cls, times: np.ndarray, xyz: np.ndarray, capacity: int = DEFAULT_CAPACITY) -> "LocationHistory":
+        """History holding the newest ``capacity`` of the given samples (in time order)."""
+        history = cls(capacity)
+        times = np.maximum.accumulate(np.asarray(times, dtype=np.float64)[-history.capacity:])
+        xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)[-history.capacity:]
+        size = max(len(history._times), len(times))
+        history._times = np.empty(size)
+        history._xyz = np.empty((size, 3))
+        history._times[:len(times)] = times
+        history._xyz[:len(times)] = xyz
+        history._count = len(times)
+        return history
+
+    def _slice(self, first: int, last: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Logical samples [first, last) in time order (copies)."""
+        size = len(self._times)
+        begin = (self._start + first) % size
+        length = last - first
+        if length <= 0:
+            return np.empty(0), np.empty((0, 3))
+        if begin + length <= size:
+            return self._times[begin:begin + length].copy(), self._xyz[begin:begin + length].copy()
+        head = size - begin
+        return (np.concatenate([self._times[begin:], self._times[:length - head]]),
+                np.concatenate([self._xyz[begin:], self._xyz[:length - head]]))
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """All samples in time order."""
+        return self._slice(0, self._count)
+
+    def _search(self, timestamp: float, side: str) -> int:
+        """Logical index of ``timestamp`` (like ``np.searchsorted`` over the ring)."""
+        size = len(self._times)
+        end = self._start + self._count
+        if end <= size:
+            return int(np.searchsorted(self._times[self._start:end], timestamp, side))
+        # Wrapped: search the older segment first, then the newer one
+        head = size - self._start
+        index = int(np.searchsorted(self._times[self._start:], timestamp, side))
+        if index < head:
+            return index
+        return head + int(np.searchsorted(self._times[:end - size], timestamp, side))
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None,
+              last: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples in a time window, in time order.
+
+        Args:
+            start: Earliest timestamp (inclusive)
+            end: Latest timestamp (inclusive)
+            last: Keep only the newest ``last`` samples of the window
+        """
+        first = 0 if start is None else self._search(start, "left")
+        stop = self._count if end is None else self._search(end, "right")
+        if last is not None:
+            first = max(first, stop - last)
+        return self._slice(first, stop)
+
+    def latest(self) -> Optional[Tuple[float, np.ndarray]]:
+        if not self._count:
+            return None
+        index = (self._start + self._count - 1) % len(self._times)
+        return float(self._times[index]), self._xyz[index].copy()
+
+
+def downsample_nth(times: np.ndarray, xyz: np.ndarray, step: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Every ``step``-th sample, always keeping the newest."""
+    if step <= 1 or len(times) <= 1:
+        return times, xyz
+    index = np.arange(0, len(times), step)
+    if index[-1] != len(times) - 1:
+        index = np.append(index, len(times) - 1)
+    return times[index], xyz[index]
+
+
+def downsample_mean(times: np.ndarray, xyz: np.ndarray, interval: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean time and position per ``interval`` seconds."""
+    if interval <= 0 or not len(times):
+        return times, xyz
+    buckets = np.floor((times - times[0]) / interval).astype(np.int64)
+    _, inverse, counts = np.unique(buckets, return_inverse=True, return_counts=True)
+    mean_times = np.bincount(inverse, weights=times) / counts
+    mean_xyz = np.stack([np.bincount(inverse, weights=xyz[:, axis]) / counts for axis in range(3)], axis=1)
+    return mean_times, mean_xyz
+
+
+def downsample_lttb(times: np.ndarray, xyz: np.ndarray, points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets down to ``points`` samples.
+
+    The first and last samples are kept; from each bucket in between, the
+    sample forming the largest triangle with the previously kept sample and
+    the next bucket's mean is kept. Triangle areas are summed over the
+    three axes against time.
+    """
+    count = len(times)
+    if points >= count or points < 3:
+        return times, xyz
+    # Relative times keep the areas well conditioned for epoch timestamps
+    t = times - times[0]
+    edges = np.linspace(1, count - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        next_lo, next_hi = hi, edges[bucket + 2] if bucket + 2 < len(edges) else count
+        next_t = t[next_lo:next_hi].mean()
+        next_xyz = xyz[next_lo:next_hi].mean(axis=0)
+        dt_next, dt_candidates = next_t - t[previous], t[lo:hi] - t[previous]
+        areas = np.abs(dt_next * (xyz[lo:hi] - xyz[previous]) - dt_candidates[:, None] * (next_xyz - xyz[previous])).sum(axis=1)
+        previous = lo + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return times[selected], xyz[selected]
+
+
+def downsample(times: np.ndarray, xyz: np.ndarray, method: str, value: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a history query result.
+
+    Args:
+        times: Timestamps in time order
+        xyz: Positions, shape (N, 3)
+        method: ``nth`` (value: step), ``lttb`` (value: points) or ``mean`` (value: seconds)
+        value: Parameter of the method
+    """
+    if method == "nth":
+        return downsample_nth(times, xyz, int(value))
+    if method == "lttb":
+        return downsample_lttb(times, xyz, int(value))
+    if method == "mean":
+        return downsample_mean(times, xyz, float(value))
+    raise ValueError(f"Unknown downsampling method '{method}' (use one of {', '.join(DOWNSAMPLE_METHODS)})")
+
+
+class LocationHistoryStore:
+    """
+    Location histories of all devices, optionally persisted.
+
+    Args:
+        capacity: Samples kept per device
+        persist_dir: Directory for ``.npz`` files (None keeps history in memory only)
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, persist_dir: Optional[str] = None):
+        self.capacity = capacity
+        self.persist_dir = persist_dir
+        self._histories: Dict[str, LocationHistory] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+
+    def _path(self, device_id: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", device_id)
+        return os.path.join(self.persist_dir, f"{safe}.npz")
+
+    def get(self, device_id: str, create: bool = False) -> Optional[LocationHistory]:
+        """A device's history, loading it from disk on first use."""
+        history = self._histories.get(device_id)
+        if history is None and (create or self.persist_dir):
+            history = self._load(device_id) if self.persist_dir else None
+            if history is None and create:
+                history = LocationHistory(self.capacity)
+            if history is not None:
+                self._histories[device_id] = history
+        return history
+
+    def _load(self, device_id: str) -> Optional[LocationHistory]:
+        path = self._path(device_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                history = LocationHistory.from_arrays(data["times"], data["xyz"], self.capacity)
+            logger.debug(f"Loaded {len(history)} location samples for {device_id}")
+            return history
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"Error loading location history {path}: {e}")
+            return None
+
+    def append(self, device_id: str, timestamp: float, x: float, y: float, z: float) -> None:
+        self.get(device_id, create=True).append(timestamp, x, y, z)
+        if self.persist_dir:
+            self._dirty.add(device_id)
+
+    def remove(self, device_id: str) -> None:
+        self._histories.pop(device_id, None)
+        self._dirty.discard(device_id)
+
+    def flush(self) -> int:
+        """
+        Write changed histories to disk.
+
+        Returns:
+            Number of devices written
+        """
+        if not self.persist_dir:
+            return 0
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            written = 0
+            for device_id in dirty:
+                history = self._histories.get(device_id)
+                if history is None:
+                    continue
+                times, xyz = history.arrays()
+                path = self._path(device_id)
+                try:
+                    with open(path + ".tmp", "wb") as f:
+                        np.savez(f, times=times, xyz=xyz)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(path + ".tmp", path)
+                    written += 1
+                except OSError as e:
+                    logger.error(f"Error writing location history {path}: {e}")
+                    self._dirty.add(device_id)
+            return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "devices": len(self._histories),
+            "samples": sum(len(h) for h in self._histories.values()),
+            "capacity": self.capacity,
+            "persist_dir": self.persist_dir,
+            "pending_writes": len(self._dirty)
+        }
@@ -0,0 +1,76 @@
+import time
+
+import numpy as np
+import pytest
+from backend.repositories.location_history import (
+    LocationHistory, LocationHistoryStore, downsample_lttb, downsample_mean, downsample_nth
+)
+from backend.repositories.uwb_repository import UWBRepository
+
+
+def test_ring_buffer_wraps_and_queries_windows():
+    history = LocationHistory(capacity=1000)
+    for i in range(2500):
+        history.append(float(i), i, 2 * i, 0.0)
+    assert len(history) == 1000
+
+    times, xyz = history.arrays()
+    assert times[0] == 1500 and times[-1] == 2499
+    assert np.array_equal(xyz[:, 1], 2 * times)
+
+    times, _ = history.query(1990.0, 2010.5)
+    assert times.tolist() == list(range(1990, 2011))
+    times, _ = history.query(end=2000.0, last=3)
+    assert times.tolist() == [1998, 1999, 2000]
+    assert history.query(0.0, 100.0)[0].size == 0
+
+    # Out-of-order samples keep the buffer sorted
+    history.append(10.0, 0, 0, 0)
+    assert history.latest()[0] == 2499
+
+
+def test_downsampling():
+    times = np.arange(100, dtype=float)
+    xyz = np.zeros((100, 3))
+    xyz[50, 0] = 10.0  # a spike LTTB must keep
+
+    nth_times, _ = downsample_nth(times, xyz, 10)
+    assert nth_times.tolist() == list(range(0, 100, 10)) + [99]
+
+    mean_times, mean_xyz = downsample_mean(times, xyz, 25.0)
+    assert mean_times.tolist() == [12.0, 37.0, 62.0, 87.0]
+    assert mean_xyz[2, 0] == pytest.approx(0.4)
+
+    lttb_times, lttb_xyz = downsample_lttb(times, xyz, 10)
+    assert len(lttb_times) == 10 and lttb_times[0] == 0 and lttb_times[-1] == 99
+    assert 50.0 in lttb_times.tolist() and lttb_xyz[:, 0].max() == 10.0
+
+
+def test_store_persists_and_reloads(tmp_path):
+    store = LocationHistoryStore(capacity=100, persist_dir=str(tmp_path))
+    for i in range(150):
+        store.append("tag/1", float(i), i, 0, 0)
+    assert store.flush() == 1
+    assert store.flush() == 0
+
+    reloaded = LocationHistoryStore(capacity=100, persist_dir=str(tmp_path))
+    times, xyz = reloaded.get("tag/1").arrays()
+    assert times[0] == 50 and times[-1] == 149 and xyz[-1, 0] == 149
+    assert reloaded.get("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_repository_history_queries():
+    repository = UWBRepository(LocationHistoryStore(capacity=1000))
+    await repository.register_device("tag", {"x": 0.0, "y": 0.0, "z": 0.0})
+    start = time.time()
+    for i in range(200):
+        await repository.add_location_history("tag", {"x": float(i), "y": 0.0, "z": 0.0, "timestamp": start + i})
+
+    latest = await repository.get_location_history("tag", limit=2)
+    assert [entry["location"]["x"] for entry in latest] == [199.0, 198.0]
+
+    window = await repository.get_location_history("tag", start + 100, start + 149, limit=None,
+                                                   downsample_method="nth", downsample_value=10)
+    assert [entry["location"]["x"] for entry in window] == [149.0, 140.0, 130.0, 120.0, 110.0, 100.0]
+    assert await repository.get_location_history("missing") == []
@@ -1,16 +1,36 @@
 import logging
+import os
+import time
 import uuid
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 
+from backend.repositories.location_history import LocationHistoryStore, downsample
+
 logger = logging.getLogger(__name__)
 
+# Samples kept per device and where history is persisted (unset: memory only)
+HISTORY_CAPACITY = int(os.environ.get('UWB_HISTORY_CAPACITY', '100000'))
+HISTORY_DIR = os.environ.get('UWB_HISTORY_DIR') or None
+
+
+def _to_epoch(value: Union[None, float, int, str, datetime]) -> Optional[float]:
+    """Epoch seconds from a number, an ISO string or a datetime."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
 class UWBRepository:
     """Repository for UWB devices and position tracking."""
     
-    def __init__(self):
+    def __init__(self, history: Optional[LocationHistoryStore] = None):
         self.devices = {}
-        self.location_history = {}
+        self.location_history = history or LocationHistoryStore(HISTORY_CAPACITY, HISTORY_DIR)
         self.active_tracking = set()
         
     async def register_device(self, device_id: str, 
@@ -33,16 +53,11 @@ class UWBRepository:
             "device_id": device_id,
             "registered_at": datetime.now().isoformat(),
             "current_location": initial_location,
+            "updated_at": time.time(),
             "status": "active"
         }
         
-        # Initialize location history
-        self.location_history[device_id] = [
-            {
-                "timestamp": datetime.now().isoformat(),
-                "location": initial_location
-            }
-        ]
+        self._record(device_id, initial_location)
         
         logger.info(f"Registered UWB device {device_id}")
         return True
@@ -111,32 +126,73 @@ class UWBRepository:
             
         return False
         
-    async def get_location_history(self, device_id: str, 
-                               limit: int = 10) -> List[Dict[str, Any]]:
+    async def get_location_history(self, device_id: str,
+                               start_time: Union[None, float, str, datetime] = None,
+                               end_time: Union[None, float, str, datetime] = None,
+                               limit: Optional[int] = 10,
+                               downsample_method: Optional[str] = None,
+                               downsample_value: float = 0) -> List[Dict[str, Any]]:
         """
         Get location history for a device.
         
         Args:
             device_id: Device ID to get history for
-            limit: Maximum number of history entries to return
+            start_time: Earliest sample (epoch seconds, ISO string or datetime)
+            end_time: Latest sample (epoch seconds, ISO string or datetime)
+            limit: Maximum number of history entries to return (None for all)
+            downsample_method: ``nth``, ``lttb`` or ``mean`` to downsample the window
+            downsample_value: Step, point count or interval (seconds) for the method
             
         Returns:
-            List of location history entries
+            List of location history entries, most recent first
         """
-        if device_id not in self.location_history:
+        history = self.location_history.get(device_id)
+        if history is None:
             return []
-            
+
+        if downsample_method:
+            times, xyz = history.query(_to_epoch(start_time), _to_epoch(end_time))
+            times, xyz = downsample(times, xyz, downsample_method, downsample_value)
+            if limit is not None:
+                times, xyz = times[-limit:], xyz[-limit:]
+        else:
+            times, xyz = history.query(_to_epoch(start_time), _to_epoch(end_time), limit)
+
         # Return most recent entries first
-        return list(reversed(self.location_history[device_id]))[:limit]
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(t).isoformat(),
+                "location": {"x": x, "y": y, "z": z}
+            }
+            for t, (x, y, z) in zip(times[::-1].tolist(), xyz[::-1].tolist())
+        ]
+
+    async def add_location_history(self, device_id: str, position: Dict[str, Any]) -> bool:
+        """
+        Add a location sample without changing the current location.
+        
+        Args:
+            device_id: Device ID the sample belongs to
+            position: Location (x, y, z) with an optional ``timestamp``
+            
+        Returns:
+            True if the sample was stored
+        """
+        if device_id not in self.devices:
+            return False
+        self._record(device_id, position, position.get("timestamp"))
+        return True
         
     async def update_device_location(self, device_id: str, 
-                                location: Dict[str, float]) -> bool:
+                                location: Dict[str, float],
+                                record_history: bool = True) -> bool:
         """
         Update location for a device.
         
         Args:
             device_id: Device ID to update
             location: New location (x, y, z)
+            record_history: Also add the location to the history
             
         Returns:
             True if update successful
@@ -146,18 +202,25 @@ class UWBRepository:
             
         # Update current location
         self.devices[device_id]["current_location"] = location
+        self.devices[device_id]["updated_at"] = time.time()
         
-        # Add to history
-        self.location_history[device_id].append({
-            "timestamp": datetime.now().isoformat(),
-            "location": location
-        })
-        
-        # Limit history size
-        if len(self.location_history[device_id]) > 100:
-            self.location_history[device_id] = self.location_history[device_id][-100:]
+        if record_history:
+            self._record(device_id, location)
             
         return True
+
+    def _record(self, device_id: str, location: Dict[str, Any], timestamp: Any = None) -> None:
+        self.location_history.append(
+            device_id,
+            _to_epoch(timestamp) or time.time(),
+            float(location.get("x", 0.0)),
+            float(location.get("y", 0.0)),
+            float(location.get("z", 0.0))
+        )
+
+    def flush_history(self) -> int:
+        """Persist changed location histories (no-op without ``UWB_HISTORY_DIR``)."""
+        return self.location_history.flush()
         
     def get_mock_devices(self) -> List[Dict[str, Any]]:
         """Get mock devices for testing."""
@@ -2,13 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Dict, Any
 
 from backend.modules.cache_manager import CacheManager
-from backend.models import CacheItem, CacheStats
+from backend.models import CacheItem, CacheStatsReport
 
 router = APIRouter()
 
-@router.get("/cache/stats", response_model=CacheStats)
+@router.get("/cache/stats", response_model=CacheStatsReport)
 async def get_cache_stats(cache: CacheManager = Depends(CacheManager)):
-    """Retrieve cache statistics."""
+    """Retrieve cache statistics, including every named cache namespace."""
     return cache.get_stats()
 
 @router.get("/cache/keys", response_model=List[str])
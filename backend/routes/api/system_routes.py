@@ -9,6 +9,8 @@ from datetime import datetime
 
 from backend.logging.logging_config import get_api_logger
 from ..utils import handle_errors
+from backend.core.request_metrics import get_request_metrics
+from backend.core.loop_monitor import get_loop_monitor
 
 # Define router with proper prefix and tags
 router = APIRouter(tags=["system"])
@@ -209,4 +211,49 @@ async def get_processes():
         }
     except Exception as e:
         logger.error(f"Error getting processes: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to get processes: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to get processes: {str(e)}")
+
+@router.get("/system/perf/routes", summary="Get per-route request latency")
+@handle_errors
+async def get_route_performance(slow_limit: int = 10):
+    """
+    Get request latency per route template and the most recent slow requests.
+    
+    Args:
+        slow_limit: Maximum number of slow requests (with stack samples) to return.
+    
+    Returns:
+        Dictionary with status, per-route statistics and slow requests.
+    """
+    request_metrics = get_request_metrics()
+    if request_metrics is None:
+        return {
+            "status": "success",
+            "data": {"slow_threshold": None, "routes": [], "slow_requests": []}
+        }
+
+    return {
+        "status": "success",
+        "data": {
+            "slow_threshold": request_metrics.slow_threshold,
+            "routes": request_metrics.get_route_stats(),
+            "slow_requests": request_metrics.get_slow_requests(slow_limit)
+        }
+    }
+
+@router.get("/system/perf/loop", summary="Get event loop lag and blocking call sites")
+@handle_errors
+async def get_loop_performance(limit: int = 10):
+    """
+    Get event loop scheduling lag and the call sites that blocked the loop.
+    
+    Args:
+        limit: Maximum number of blocking sites and recent stalls to return.
+    
+    Returns:
+        Dictionary with status, lag percentiles and blocking call sites.
+    """
+    return {
+        "status": "success",
+        "data": get_loop_monitor().get_stats(limit)
+    }
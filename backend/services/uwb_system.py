@@ -46,6 +46,37 @@ class UWBSystem:
         """
         return await self.repository.get_device_location(device_id)
         
+    async def get_device_positions(self, device_ids: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Get the latest position fix of several UWB devices.
+        
+        Args:
+            device_ids: Device IDs to get positions for
+            
+        Returns:
+            Dictionary of device ID to position (x, y, z and the fix timestamp);
+            unknown devices are left out
+        """
+        positions = {}
+        for device_id in device_ids:
+            device = self.repository.devices.get(device_id)
+            if device is not None:
+                positions[device_id] = {**device["current_location"], "timestamp": device.get("updated_at")}
+        return positions
+        
+    async def get_device_position(self, device_id: str) -> Optional[Dict[str, float]]:
+        """
+        Get the latest position fix of a UWB device.
+        
+        Args:
+            device_id: Device ID to get the position for
+            
+        Returns:
+            Position (x, y, z and the fix timestamp) or None if not found
+        """
+        positions = await self.get_device_positions([device_id])
+        return positions.get(device_id)
+        
     async def start_tracking(self, device_ids: List[str] = None) -> Dict[str, bool]:
         """
         Start position tracking for devices.
@@ -100,7 +131,7 @@ class UWBSystem:
         Returns:
             List of location history entries
         """
-        return await self.repository.get_location_history(device_id, limit)
+        return await self.repository.get_location_history(device_id, limit=limit)
         
     async def update_device_location(self, device_id: str, 
                                 location: Dict[str, float]) -> bool:
@@ -115,13 +115,22 @@ class UWBProximityEvent(BaseEvent):
     device1: str
     device2: str
     distance: float
+    active: bool = True  # False once the devices have separated
+    
+class UWBGeofenceEvent(BaseEvent):
+    """UWB device entering or leaving a geofence."""
+    device_id: str
+    geofence_id: str
+    geofence_name: Optional[str] = None
+    transition: str  # enter, exit
+    location: Optional[Location3D] = None
     
 class UWBLocationHistoryEvent(BaseEvent):
     """History of locations for a UWB device."""
     device_id: str
     history: List[Dict[str, Any]]
-    start_time: datetime
-    end_time: datetime
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
 
 # --- Biometric Events ---
 
@@ -273,6 +282,7 @@ class EventRegistry:
         self.register_event("uwb.location", "UWB device location", UWBLocationEvent, EventCategory.UWB)
         self.register_event("uwb.position_update", "UWB position update", UWBPositionUpdateEvent, EventCategory.UWB)
         self.register_event("uwb.proximity", "UWB proximity alert", UWBProximityEvent, EventCategory.UWB)
+        self.register_event("uwb.geofence", "UWB geofence transition", UWBGeofenceEvent, EventCategory.UWB)
         self.register_event("uwb.location_history", "UWB location history", UWBLocationHistoryEvent, EventCategory.UWB)
         
         # Biometric events
@@ -347,12 +357,23 @@ class EventRegistry:
 event_registry = EventRegistry()
 
 # Convenience functions for creating events
-def create_event(event_type: str, **kwargs) -> dict:
-    """Create an event message with the specified type and payload data."""
+def create_event(event_type: str, validate: bool = True, **kwargs) -> dict:
+    """
+    Create an event message with the specified type and payload data.
+    
+    Args:
+        event_type: Registered event type
+        validate: Validate the payload against the event schema. Trusted
+            internal producers can pass False to only apply schema defaults.
+        **kwargs: Payload fields
+    """
     schema = event_registry.get_event_schema(event_type)
-    if schema:
+    if schema and validate:
         # Validate against schema if available
         payload = schema(**kwargs).model_dump()
+    elif schema:
+        # Fill in defaults without running validation
+        payload = schema.model_construct(**kwargs).model_dump(warnings=False)
     else:
         # Use raw kwargs if no schema
         payload = kwargs
@@ -9,6 +9,8 @@ from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect, HTTPException, status
 from pydantic import BaseModel, ValidationError
 
+from backend.ws.serialization import encode_message
+
 logger = logging.getLogger(__name__)
 
 # Type definitions for handler functions
@@ -42,6 +44,11 @@ class WebSocketManager:
         # Metrics
         self.connection_count = 0
         self.message_count = 0
+        self.send_timeouts = 0
+        # Seconds a single broadcast send may take before the client is dropped
+        self.send_timeout = 5.0
+        # Called with the room name (None for a new connection) when a client joins
+        self.join_listeners: List[Callable[[Optional[str]], None]] = []
         
     async def connect(self, websocket: WebSocket, client_id: str = None, user_id: str = None) -> str:
         """Accept a WebSocket connection and register the client."""
@@ -50,6 +57,7 @@ class WebSocketManager:
         self.active_clients[websocket] = client
         self.connection_count += 1
         logger.info(f"Client {client.client_id} connected. Total connections: {self.connection_count}")
+        self._notify_join(None)
         return client.client_id
         
     async def disconnect(self, websocket: WebSocket) -> None:
@@ -74,7 +82,7 @@ class WebSocketManager:
             return False
         
         try:
-            await websocket.send_json(message)
+            await websocket.send_text(encode_message(message))
             self.active_clients[websocket].update_activity()
             self.message_count += 1
             return True
@@ -82,15 +90,59 @@ class WebSocketManager:
             logger.error(f"Error sending message: {str(e)}")
             return False
     
+    async def _send_frame(self, websocket: WebSocket, frame: str) -> bool:
+        """Send a pre-encoded frame to one client with a timeout."""
+        client = self.active_clients.get(websocket)
+        if client is None:
+            return False
+        try:
+            await asyncio.wait_for(websocket.send_text(frame), timeout=self.send_timeout)
+            client.update_activity()
+            self.message_count += 1
+            return True
+        except asyncio.TimeoutError:
+            # A partially sent frame leaves the socket unusable - drop the client
+            self.send_timeouts += 1
+            logger.warning(f"Send to client {client.client_id} timed out after {self.send_timeout}s, disconnecting")
+            await self.disconnect(websocket)
+            try:
+                # Close the socket too, so the endpoint's receive loop ends
+                await asyncio.wait_for(websocket.close(code=1011), timeout=self.send_timeout)
+            except Exception as e:
+                logger.debug(f"Error closing timed out WebSocket: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Error sending message: {str(e)}")
+            return False
+    
+    async def broadcast_frame(self, frame: str, targets: List[WebSocket], exclude: WebSocket = None) -> int:
+        """
+        Send an already encoded frame to several clients concurrently.
+        
+        Args:
+            frame: Encoded JSON text frame
+            targets: Recipient WebSockets
+            exclude: Optional WebSocket to skip
+            
+        Returns:
+            Number of clients the frame was sent to
+        """
+        recipients = [ws for ws in targets if ws is not exclude and ws in self.active_clients]
+        if not recipients:
+            return 0
+        if len(recipients) == 1:
+            return int(await self._send_frame(recipients[0], frame))
+        
+        results = await asyncio.gather(*(self._send_frame(ws, frame) for ws in recipients))
+        return sum(1 for result in results if result)
+    
     async def broadcast_message(self, message: dict, exclude: WebSocket = None) -> int:
         """Broadcast a message to all connected clients."""
-        sent_count = 0
-        for client_ws in list(self.active_clients.keys()):
-            if client_ws != exclude:
-                success = await self.send_message(client_ws, message)
-                if success:
-                    sent_count += 1
-        return sent_count
+        if not self.active_clients:
+            return 0
+        # Encode once and share the frame between all recipients
+        frame = encode_message(message)
+        return await self.broadcast_frame(frame, list(self.active_clients.keys()), exclude)
     
     async def broadcast_to_room(self, room: str, message: dict, exclude: WebSocket = None) -> int:
         """Broadcast a message to all clients in a specific room."""
@@ -98,13 +150,23 @@ class WebSocketManager:
             logger.warning(f"Attempted to broadcast to non-existent room: {room}")
             return 0
             
-        sent_count = 0
-        for client_ws in self.rooms[room]:
-            if client_ws != exclude and client_ws in self.active_clients:
-                success = await self.send_message(client_ws, message)
-                if success:
-                    sent_count += 1
-        return sent_count
+        frame = encode_message(message)
+        return await self.broadcast_frame(frame, list(self.rooms[room]), exclude)
+    
+    def add_join_listener(self, listener: Callable[[Optional[str]], None]) -> None:
+        """Register a function called when a client connects (None) or joins a room."""
+        self.join_listeners.append(listener)
+
+    def _notify_join(self, room: Optional[str]) -> None:
+        for listener in self.join_listeners:
+            try:
+                listener(room)
+            except Exception as e:
+                logger.error(f"Error in join listener: {e}")
+
+    def room_size(self, room: str) -> int:
+        """Get the number of clients in a room."""
+        return len(self.rooms.get(room, ()))
     
     async def join_room(self, websocket: WebSocket, room: str) -> bool:
         """Add a client to a room."""
@@ -121,6 +183,7 @@ class WebSocketManager:
         self.active_clients[websocket].rooms.add(room)
         
         logger.info(f"Client {self.active_clients[websocket].client_id} joined room: {room}")
+        self._notify_join(room)
         return True
     
     async def leave_room(self, websocket: WebSocket, room: str) -> bool:
@@ -212,7 +275,7 @@ class WebSocketManager:
             return False
             
         try:
-            await websocket.send_json(message)
+            await websocket.send_text(encode_message(message))
             self.active_clients[websocket].update_activity()
             self.message_count += 1
             return True
@@ -275,6 +338,7 @@ class WebSocketManager:
         return {
             "active_connections": self.connection_count,
             "total_messages": self.message_count,
+            "send_timeouts": self.send_timeouts,
             "active_rooms": len(self.rooms),
             "room_connections": {room: len(clients) for room, clients in self.rooms.items()},
             "authenticated_clients": sum(1 for client in self.active_clients.values() if client.user_id is not None)
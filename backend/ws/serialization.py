@@ -0,0 +1,68 @@
+# backend/ws/serialization.py
+"""
+Shared JSON encoding for WebSocket broadcasts.
+
+Broadcasts encode a message once into a text frame and send that same frame
+to every recipient instead of letting ``send_json`` re-encode the dict per
+client. ``orjson`` is used when it is installed; otherwise the standard
+library encoder is used with compact separators.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+# Try to import the fast JSON encoder with fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _default(value: Any) -> Any:
+    """Convert values the JSON encoders do not handle natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+def encode_message(message: Any) -> str:
+    """
+    Encode a message into a JSON text frame.
+
+    Args:
+        message: Dictionary or Pydantic model to encode
+
+    Returns:
+        JSON string ready for ``WebSocket.send_text``
+    """
+    if hasattr(message, "model_dump"):
+        message = message.model_dump(mode="json")
+
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(
+                message, default=_default, option=orjson.OPT_NON_STR_KEYS
+            ).decode("utf-8")
+        except TypeError as e:
+            # orjson is stricter about some types (e.g. int subclasses, huge ints)
+            logger.debug(f"orjson could not encode message, falling back to json: {e}")
+
+    return json.dumps(message, default=_default, separators=(",", ":"))
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from enum import Enum
+
+from backend.ws import manager as manager_module
+from backend.ws.manager import WebSocketManager
+from backend.ws.serialization import encode_message
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.frames = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        await asyncio.sleep(self.delay)
+        self.frames.append(frame)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+class Status(Enum):
+    ONLINE = "online"
+
+
+def test_encode_message_handles_non_json_types():
+    frame = encode_message({"at": datetime(2024, 1, 2, 3, 4, 5), "status": Status.ONLINE,
+                            "ids": {1}, "raw": b"\x01\xff"})
+    assert json.loads(frame) == {"at": "2024-01-02T03:04:05", "status": "online",
+                                 "ids": [1], "raw": "01ff"}
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_once_and_honours_exclude(monkeypatch):
+    encoded = []
+
+    def counting_encode(message):
+        encoded.append(message)
+        return encode_message(message)
+
+    monkeypatch.setattr(manager_module, "encode_message", counting_encode)
+    manager = WebSocketManager()
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for ws in sockets:
+        await manager.connect(ws)
+
+    sent = await manager.broadcast_message({"type": "ping"}, exclude=sockets[1])
+
+    assert sent == 2 and len(encoded) == 1
+    assert sockets[0].frames == sockets[2].frames == ['{"type":"ping"}']
+    assert sockets[1].frames == []
+
+
+@pytest.mark.asyncio
+async def test_timed_out_client_is_dropped_and_closed():
+    manager = WebSocketManager()
+    manager.send_timeout = 0.01
+    fast, slow = FakeWebSocket(), FakeWebSocket(delay=1.0)
+    for ws in (fast, slow):
+        await manager.connect(ws)
+    await manager.join_room(slow, "uwb")
+
+    sent = await manager.broadcast_message({"type": "ping"})
+
+    assert sent == 1 and manager.send_timeouts == 1
+    assert slow not in manager.active_clients and manager.room_size("uwb") == 0
+    assert slow.close_code == 1011
+    assert fast.frames == ['{"type":"ping"}']
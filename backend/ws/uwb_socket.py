@@ -10,6 +10,7 @@ from backend.modules.monitors import UWBPositionMonitor, monitoring_manager
 
 from backend.repositories.uwb_repository import UWBRepository
 from backend.services.uwb_system import UWBSystem
+from backend.modules.uwb_manager import UWBManager
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,15 @@ monitoring_manager.register_monitor(uwb_monitor)
 # Create router
 router = APIRouter()
 
+
+async def broadcast_spatial_event(event_type: str, payload: Dict[str, Any]) -> None:
+    """Forward proximity and geofence events to the UWB room."""
+    if manager.room_size("uwb"):
+        await manager.broadcast_to_room("uwb", create_event(event_type, validate=False, **payload))
+
+
+UWBManager.add_spatial_listener(broadcast_spatial_event)
+
 # Create UWB WebSocket endpoint
 uwb_endpoint = websocket_factory.create_endpoint(
     path="/ws/uwb",
@@ -107,8 +117,9 @@ async def get_uwb_device_location(websocket: WebSocket, payload: dict):
             await manager.send_error(websocket, f"Device {device_id} not found")
             return
             
-        # Get current location from UWB system
-        location = await uwb_system.get_device_position(device_id)
+        # Tracked devices are answered from the tracking filter, extrapolated to now;
+        # others from the UWB system's last fix
+        location = uwb_monitor.get_position(device_id) or await uwb_system.get_device_position(device_id)
         
         if not location:
             # Fall back to repository location
@@ -139,6 +150,9 @@ async def start_uwb_position_tracking(websocket: WebSocket, payload: dict):
     try:
         # Set monitor properties
         uwb_monitor.track_devices(device_ids)
+        # Fastest update rate; the monitor slows down while the tags are still
+        uwb_monitor.min_interval = update_frequency
+        uwb_monitor.max_interval = max(uwb_monitor.max_interval, update_frequency)
         uwb_monitor.interval = update_frequency
         
         # Start monitor if not already running
@@ -172,6 +186,8 @@ async def get_uwb_location_history(websocket: WebSocket, payload: dict):
     start_time = payload.get("start_time")
     end_time = payload.get("end_time")
     limit = payload.get("limit", 100)
+    downsample = payload.get("downsample")  # nth, lttb or mean
+    downsample_value = payload.get("downsample_value", 0)
     
     if not device_id:
         await manager.send_error(websocket, "Device ID is required")
@@ -182,7 +198,9 @@ async def get_uwb_location_history(websocket: WebSocket, payload: dict):
             device_id,
             start_time,
             end_time,
-            limit
+            limit,
+            downsample,
+            downsample_value
         )
         
         await manager.send_message(websocket, create_event(
@@ -196,10 +214,87 @@ async def get_uwb_location_history(websocket: WebSocket, payload: dict):
         logger.error(f"Error getting UWB location history: {str(e)}")
         await manager.send_error(websocket, f"Error getting location history: {str(e)}")
 
+async def add_uwb_geofence(websocket: WebSocket, payload: dict):
+    """Add or replace a geofence; tracked devices crossing it raise geofence events."""
+    geofence_id = payload.get("geofence_id")
+    polygon = payload.get("polygon")
+    
+    if not geofence_id or not polygon:
+        await manager.send_error(websocket, "Geofence ID and polygon are required")
+        return
+    
+    try:
+        response = await UWBManager.add_geofence(
+            geofence_id,
+            polygon,
+            payload.get("min_z"),
+            payload.get("max_z"),
+            payload.get("name")
+        )
+        if not response.success:
+            await manager.send_error(websocket, response.error)
+            return
+        
+        await manager.send_message(websocket, create_event(
+            "uwb.geofence_added",
+            **response.data
+        ))
+    except Exception as e:
+        logger.error(f"Error adding UWB geofence: {str(e)}")
+        await manager.send_error(websocket, f"Error adding geofence: {str(e)}")
+
+async def remove_uwb_geofence(websocket: WebSocket, payload: dict):
+    """Remove a geofence; devices inside get exit events."""
+    geofence_id = payload.get("geofence_id")
+    
+    if not geofence_id:
+        await manager.send_error(websocket, "Geofence ID is required")
+        return
+    
+    try:
+        response = await UWBManager.remove_geofence(geofence_id)
+        if not response.success:
+            await manager.send_error(websocket, response.error)
+            return
+        
+        await manager.send_message(websocket, create_event(
+            "uwb.geofence_removed",
+            geofence_id=geofence_id
+        ))
+    except Exception as e:
+        logger.error(f"Error removing UWB geofence: {str(e)}")
+        await manager.send_error(websocket, f"Error removing geofence: {str(e)}")
+
+async def get_nearby_uwb_devices(websocket: WebSocket, payload: dict):
+    """Get tracked devices near a device, closest first."""
+    device_id = payload.get("device_id")
+    
+    if not device_id:
+        await manager.send_error(websocket, "Device ID is required")
+        return
+    
+    try:
+        response = await UWBManager.get_nearby_devices(device_id, payload.get("radius"), payload.get("count"))
+        if not response.success:
+            await manager.send_error(websocket, response.error)
+            return
+        
+        await manager.send_message(websocket, create_event(
+            "uwb.nearby_devices",
+            device_id=device_id,
+            devices=response.data["devices"]
+        ))
+    except Exception as e:
+        logger.error(f"Error getting nearby UWB devices: {str(e)}")
+        await manager.send_error(websocket, f"Error getting nearby devices: {str(e)}")
+
 # Register handlers
 websocket_factory.register_handler("uwb_socket", "register_device", register_uwb_device)
 websocket_factory.register_handler("uwb_socket", "get_active_devices", get_active_uwb_devices)
 websocket_factory.register_handler("uwb_socket", "get_device_location", get_uwb_device_location)
 websocket_factory.register_handler("uwb_socket", "start_position_tracking", start_uwb_position_tracking)
 websocket_factory.register_handler("uwb_socket", "stop_position_tracking", stop_uwb_position_tracking)
-websocket_factory.register_handler("uwb_socket", "get_location_history", get_uwb_location_history)
\ No newline at end of file
+websocket_factory.register_handler("uwb_socket", "get_location_history", get_uwb_location_history)
+websocket_factory.register_handler("uwb_socket", "add_geofence", add_uwb_geofence)
+websocket_factory.register_handler("uwb_socket", "remove_geofence", remove_uwb_geofence)
+websocket_factory.register_handler("uwb_socket", "get_nearby_devices", get_nearby_uwb_devices)
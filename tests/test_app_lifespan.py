@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+
+from app import app
+from backend.core.loop_monitor import get_loop_monitor
+from backend.modules.monitors import monitoring_manager
+
+def test_lifespan_starts_and_stops_background_services():
+    with TestClient(app) as client:
+        response = client.get("/api/system/perf/loop")
+        assert response.status_code == 200
+        assert response.json()["data"]["running"] is True
+        assert monitoring_manager.get_running_monitors()
+
+    assert get_loop_monitor().running is False
+    assert monitoring_manager.get_running_monitors() == {}
+
+def test_shutdown_flushes_pending_bonds(tmp_path, monkeypatch):
+    import json
+    import app as app_module
+    from backend.modules.ble.utils.ble_persistence import BLEDeviceStorage
+
+    storage = BLEDeviceStorage(str(tmp_path), flush_delay=60)
+    monkeypatch.setattr(app_module, "get_persistence_service", lambda: storage)
+
+    with TestClient(app) as client:
+        client.portal.call(storage.add_bonded_device, {"address": "AA:BB:CC:DD:EE:FF"})
+
+    with open(storage.bonded_devices_file) as f:
+        assert [d["address"] for d in json.load(f)] == ["AA:BB:CC:DD:EE:FF"]
+
+def test_bus_event_wakes_a_started_monitor():
+    from backend.modules.ble.utils.events import ble_event_bus
+
+    async def emit_connected():
+        await ble_event_bus.emit("device_connected", {"address": "AA:BB:CC:DD:EE:FF"})
+        await ble_event_bus.join(timeout=1.0)
+
+    with TestClient(app) as client:
+        monitor = monitoring_manager.get_monitor("device_monitor")
+        assert monitor.running
+        before = monitor.notifications
+        client.portal.call(emit_connected)
+        assert monitor.notifications == before + 1